@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 import html
 import json
-from collections import Counter
+from datetime import datetime, timedelta
 
 import streamlit as st
 import streamlit.components.v1 as components
@@ -17,10 +18,11 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from ax_agent_factory.core.pipeline_manager import PipelineManager
-from ax_agent_factory.core import stage_runner_ax
-from ax_agent_factory.models.stages import PIPELINE_STAGES
+from ax_agent_factory.core import stage_runner_ax, stage_state
+from ax_agent_factory.models.stages import CORE_STAGES, PIPELINE_STAGES
 from ax_agent_factory.infra import db
 from ax_agent_factory.infra import ax_workflow_repo, ax_agent_repo, ax_skill_repo
+from ax_agent_factory.infra import events, job_queue, metrics, perf_report, search, tracing
 from ax_agent_factory.infra.logging_config import setup_logging
 from ax_agent_factory.core.schemas.workflow import MermaidDiagram
 from types import SimpleNamespace
@@ -28,6 +30,7 @@ from types import SimpleNamespace
 
 st.set_page_config(page_title="AX Agent Factory - PoC", layout="wide")
 setup_logging()
+metrics.start_exporters_from_env()
 
 
 def main() -> None:
@@ -42,6 +45,20 @@ def main() -> None:
             help="없으면 Gemini가 웹에서 JD/직무 설명을 찾아서 합성합니다.",
             key="sidebar_manual_jd_text",
         )
+        force_rerun_labels = st.multiselect(
+            "강제 재실행 단계",
+            [s.ui_label for s in PIPELINE_STAGES if s.implemented],
+            help="입력 바뀌지 않은 단계는 저장된 결과를 재사용합니다. 선택한 단계는 항상 다시 실행합니다.",
+        )
+        resume_run = st.checkbox(
+            "중단된 실행 이어서 (resume)",
+            help="완료로 기록된 단계(stage_runs)는 입력이 바뀌었어도 다시 실행하지 않고 저장된 결과를 불러와, 첫 미완료 단계부터 실행합니다.",
+        )
+        use_queue = st.checkbox(
+            "작업 큐로 실행",
+            value=os.environ.get("AX_UI_QUEUE", "").lower() in ("1", "true", "yes"),
+            help="이 세션에서 바로 실행하지 않고 job_queue에 넣습니다. `python -m ax_agent_factory.cli.worker`가 처리합니다.",
+        )
         run_stage0 = st.button("0. Job Research만 실행")
         run_stage1 = st.button("1. IVC까지 실행")
         run_stage13 = st.button("1.3 Static까지 실행")
@@ -98,8 +115,8 @@ def main() -> None:
             st.session_state.stage6_deep_research = results["stage6_deep_research"]
         if "stage7_skill_cards" in results:
             st.session_state.stage7_skill_cards = results["stage7_skill_cards"]
-        if "stage8_agent_prompts" in results:
-            st.session_state.stage8_agent_prompts = results["stage8_agent_prompts"]
+        if "stage8_prompts" in results:
+            st.session_state.stage8_agent_prompts = results["stage8_prompts"]
         st.session_state.last_completed_ui_label = target_label
 
     def _run_until(target_label: str) -> None:
@@ -107,18 +124,59 @@ def main() -> None:
         if job_run is None:
             st.warning("JobRun이 없습니다. 먼저 JobRun을 생성/선택하세요.")
             return
-        with st.spinner(f"{target_label} 단계까지 실행 중..."):
+        if use_queue:
+            item_id = job_queue.enqueue_job(
+                job_run.id, target_label, manual_jd_text=manual_jd_text or None, force_rerun=force_rerun_labels
+            )
+            st.session_state.queue_item = {"id": item_id, "loaded": False}
+            job_queue.refresh_queue_depth()
+            st.info(f"{target_label} 단계까지 작업 큐에 등록했습니다 (#{item_id}). 워커가 처리합니다.")
+            return
+        with st.status(f"{target_label} 단계까지 실행 중...", expanded=True) as status:
             try:
-                results = pipeline.run_pipeline_until_stage(
-                    job_run,
-                    target_label,
-                    manual_jd_text=manual_jd_text or None,
+                results = events.run_streaming(
+                    lambda: pipeline.run_pipeline_until_stage(
+                        job_run,
+                        target_label,
+                        manual_jd_text=manual_jd_text or None,
+                        force_rerun=force_rerun_labels,
+                        resume=resume_run,
+                    ),
+                    lambda event: _show_progress_event(status, event),
                 )
                 _store_results(results, target_label)
+                status.update(label=f"{target_label} 단계까지 실행 완료", state="complete", expanded=False)
                 st.success(f"{target_label} 단계까지 실행 완료!")
             except Exception as exc:  # pragma: no cover - UI feedback
+                status.update(label=f"{target_label} 실행 실패", state="error")
                 st.error(f"{target_label} 실행 중 오류 발생: {exc}")
 
+    def _poll_queue_item() -> None:
+        queued = st.session_state.get("queue_item")
+        item = job_queue.get_queue_item(queued["id"]) if queued else None
+        if item is None:
+            return
+        progress = job_queue.item_progress(item)
+        with st.expander(f"작업 큐 #{item['id']} → {item['target']}: {item['status']}", expanded=item["status"] != "done"):
+            st.caption(
+                f"시도 {item['attempts']}/{item['max_attempts']} · 워커 {item['lease_owner'] or '-'} · "
+                f"하트비트 {item['heartbeat_at'] or '-'}"
+            )
+            if progress["stages"]:
+                st.write("완료 단계: " + " → ".join(progress["stages"]))
+            if item["last_error"]:
+                st.error(item["last_error"])
+            if item["status"] in job_queue.ACTIVE_STATUSES:
+                st.button("진행 상황 새로고침", key="queue_refresh")
+        if item["status"] == "done" and not queued["loaded"]:
+            # the worker saved every stage artifact, so this only loads results
+            target = item["ax_target"] or item["target"]
+            results = pipeline.run_pipeline_until_stage(
+                db.get_job_run(item["job_run_id"]), target, manual_jd_text=item["manual_jd_text"]
+            )
+            _store_results(results, target)
+            queued["loaded"] = True
+
     if run_stage0 and company_name and job_title:
         job_run = pipeline.create_or_get_job_run(
             company_name, job_title, manual_jd_text=manual_jd_text or None
@@ -202,8 +260,16 @@ def main() -> None:
             )
             for a in agents_rows
         ]
+        bar = st.progress(0.0, text="Stage 6 Deep Skill Research 실행 중...")
+
+        def _on_agent_done(p: stage_runner_ax.DeepResearchProgress) -> None:
+            retried = f" (재시도 {p.attempts - 1}회)" if p.attempts > 1 else ""
+            bar.progress(p.done / p.total, text=f"Stage 6: {p.done}/{p.total} 완료 — {p.agent_id}{retried}")
+
         with st.spinner("Stage 6 Deep Skill Research 실행 중..."):
-            result = stage_runner_ax.run_stage6_deep_skill_research(jr.id, agents=agents_lite or None)
+            result = stage_runner_ax.run_stage6_deep_skill_research(
+                jr.id, agents=agents_lite or None, on_progress=_on_agent_done
+            )
             st.session_state.stage6_deep_research = result
             st.success("Stage 6 완료")
 
@@ -220,15 +286,7 @@ def main() -> None:
             )
             for a in agents_rows
         ]
-        deep_rows = ax_skill_repo.get_deep_research_results(jr.id)
-        deep_models = [
-            stage_runner_ax.DeepSkillResearchResult(
-                agent_id=row["agent_id"],
-                research_focus=row.get("research_focus") or "skill",
-                sections=json.loads(row["sections_json"]) if row.get("sections_json") else {},
-            )
-            for row in deep_rows
-        ]
+        deep_models = stage_state.deep_research_from_rows(ax_skill_repo.get_deep_research_results(jr.id))
         with st.spinner("Stage 7 Skill Extractor 실행 중..."):
             result = stage_runner_ax.run_stage7_skill_extractor(
                 jr.id,
@@ -245,47 +303,16 @@ def main() -> None:
             st.session_state.stage8_agent_prompts = result
             st.success("Stage 8 완료")
 
-    if run_ax_all:
-        jr = _ensure_job_run()
-        if workflow_mermaid is None:
-            st.warning("Workflow Mermaid 결과가 필요합니다. 2.2 실행 후 다시 시도하세요.")
-        else:
-            with st.spinner("AX 전체 실행 중 (4→8)..."):
-                stage4 = stage_runner_ax.run_stage4_ax_workflow(jr.id, workflow_mermaid.mermaid_code)
-                st.session_state.stage4_ax_workflow = stage4
-                stage5 = stage_runner_ax.run_stage5_agent_architect(jr.id)
-                st.session_state.stage5_agent_specs = stage5
-                agents_rows = ax_agent_repo.get_agents(jr.id)
-                agents_lite = [
-                    stage_runner_ax.AgentSpecLite(
-                        agent_id=a["agent_id"],
-                        agent_name=a["agent_name"],
-                        role_and_goal=a.get("role_and_goal") or "",
-                        agent_type=a.get("agent_type") or "",
-                        execution_environment=a.get("execution_environment") or "",
-                    )
-                    for a in agents_rows
-                ]
-                stage6 = stage_runner_ax.run_stage6_deep_skill_research(jr.id, agents=agents_lite or None)
-                st.session_state.stage6_deep_research = stage6
-                deep_rows = ax_skill_repo.get_deep_research_results(jr.id)
-                deep_models = [
-                    stage_runner_ax.DeepSkillResearchResult(
-                        agent_id=row["agent_id"],
-                        research_focus=row.get("research_focus") or "skill",
-                        sections=json.loads(row["sections_json"]) if row.get("sections_json") else {},
-                    )
-                    for row in deep_rows
-                ]
-                stage7 = stage_runner_ax.run_stage7_skill_extractor(
-                    jr.id, agents=agents_lite or None, deep_research_results=deep_models or None
-                )
-                st.session_state.stage7_skill_cards = stage7
-                stage8 = stage_runner_ax.run_stage8_prompt_builder(jr.id)
-                st.session_state.stage8_agent_prompts = stage8
-                st.success("AX 전체 실행 완료")
+    if run_ax_all and company_name and job_title:
+        # Registered pipeline stages: unchanged stages (0.1~8) load their stored results.
+        job_run = pipeline.create_or_get_job_run(company_name, job_title, manual_jd_text=manual_jd_text or None)
+        st.session_state.job_run = job_run
+        st.session_state.manual_jd_text = manual_jd_text or None
+        _run_until("8")
 
-    implemented_stages = [s for s in PIPELINE_STAGES if s.implemented]
+    _poll_queue_item()
+
+    implemented_stages = [s for s in CORE_STAGES if s.implemented]
     stage_map = {s.id: s for s in implemented_stages}
     tab_defs: list[tuple[str, str]] = [(s.tab_title, s.id) for s in implemented_stages]
 
@@ -355,6 +382,9 @@ def main() -> None:
     with ax_tabs[4]:
         render_stage8_prompt_tabs(stage8_agent_prompts)
 
+    render_search_panel()
+    render_perf_panel()
+    render_trace_waterfall(job_run)
     render_log_expander()
 
 
@@ -510,107 +540,18 @@ def render_stage0_summarize_tabs(job_run, job_research_result, manual_jd_text: s
         )
 
 
-def _db_rows_to_task_atoms(rows: list[dict]) -> list[dict]:
-    """Convert job_tasks rows into task_atoms-like dicts."""
-    return [
-        {
-            "task_id": row.get("task_id"),
-            "task_original_sentence": row.get("task_original_sentence"),
-            "task_korean": row.get("task_korean"),
-            "task_english": row.get("task_english"),
-            "notes": row.get("notes"),
-        }
-        for row in rows or []
-    ]
-
-
-def _db_rows_to_ivc_tasks(rows: list[dict]) -> list[dict]:
-    """Convert job_tasks rows into ivc_tasks-like dicts."""
-    ivc_tasks: list[dict] = []
-    for row in rows or []:
-        if row.get("ivc_phase"):
-            ivc_tasks.append(
-                {
-                    "task_id": row.get("task_id"),
-                    "task_korean": row.get("task_korean"),
-                    "task_original_sentence": row.get("task_original_sentence"),
-                    "ivc_phase": row.get("ivc_phase"),
-                    "ivc_exec_subphase": row.get("ivc_exec_subphase"),
-                    "primitive_lv1": row.get("primitive_lv1"),
-                    "classification_reason": row.get("classification_reason"),
-                }
-            )
-    return ivc_tasks
-
-
-def _db_rows_to_phase_summary(rows: list[dict]) -> dict:
-    """Build a simple phase_summary-style dict from job_tasks rows."""
-    counter: Counter[str] = Counter()
-    for row in rows or []:
-        phase = row.get("ivc_phase")
-        if phase:
-            counter[phase] += 1
-    return {phase: {"count": count} for phase, count in counter.items()}
-
-
-def _db_rows_to_static_meta(rows: list[dict]) -> list[dict]:
-    """Extract static classification style rows from job_tasks."""
-    static_meta: list[dict] = []
-    for row in rows or []:
-        if any(
-            row.get(field)
-            for field in [
-                "static_type_lv1",
-                "static_type_lv2",
-                "domain_lv1",
-                "domain_lv2",
-                "rag_required",
-                "recommended_execution_env",
-            ]
-        ):
-            static_meta.append(
-                {
-                    "task_id": row.get("task_id"),
-                    "task_korean": row.get("task_korean"),
-                    "static_type_lv1": row.get("static_type_lv1"),
-                    "static_type_lv2": row.get("static_type_lv2"),
-                    "domain_lv1": row.get("domain_lv1"),
-                    "domain_lv2": row.get("domain_lv2"),
-                    "rag_required": bool(row.get("rag_required")),
-                    "rag_reason": row.get("rag_reason"),
-                    "value_score": row.get("value_score"),
-                    "complexity_score": row.get("complexity_score"),
-                    "value_complexity_quadrant": row.get("value_complexity_quadrant"),
-                    "recommended_execution_env": row.get("recommended_execution_env"),
-                    "autoability_reason": row.get("autoability_reason"),
-                    "data_entities": json.loads(row["data_entities_json"]) if row.get("data_entities_json") else [],
-                    "tags": json.loads(row["tags_json"]) if row.get("tags_json") else [],
-                }
-            )
-    return static_meta
+def _load_latest_llm_log(job_run_id: int | None, stage_name: str, *, include_text: bool = False) -> dict | None:
+    """Fetch the latest LLM call log (metadata only unless include_text) for a stage and job_run_id."""
+    if job_run_id is None:
+        return None
+    return db.get_latest_llm_call(job_run_id, stage_name, include_text=include_text)
 
 
-def _db_rows_to_static_summary(rows: list[dict]) -> dict:
-    """Summarize static meta counts for fallback rendering."""
-    counter: Counter[str] = Counter()
-    for row in rows or []:
-        static_type = row.get("static_type_lv1")
-        if static_type:
-            counter[static_type] += 1
-    if not counter:
+def _load_llm_log_texts(log: dict | None) -> dict:
+    """Fetch the large prompt/output text columns of a metadata-only log row on demand."""
+    if not log or log.get("id") is None:
         return {}
-    return {"static_type_lv1_counts": dict(counter)}
-
-
-def _load_latest_llm_log(job_run_id: int | None, stage_name: str) -> dict | None:
-    """Fetch the latest LLM call log for a stage and job_run_id."""
-    if job_run_id is None:
-        return None
-    calls = db.get_llm_calls_by_job_run(job_run_id)
-    for call in calls:
-        if call.stage_name == stage_name:
-            return call.__dict__
-    return None
+    return db.get_llm_call_texts(log["id"]) or {}
 
 
 def render_stage1_task_extractor_tabs(job_run, job_research_result, task_result, manual_jd_text: str | None = None) -> None:
@@ -619,7 +560,7 @@ def render_stage1_task_extractor_tabs(job_run, job_research_result, task_result,
     if job_research_result is None and job_run is not None:
         job_research_result = db.get_job_research_result(job_run.id)
     db_task_rows = db.get_job_tasks(job_run.id) if job_run is not None else []
-    fallback_task_atoms = _db_rows_to_task_atoms(db_task_rows)
+    fallback_task_atoms = stage_state.task_atoms_from_rows(db_task_rows)
     tabs = st.tabs(["Input", "결과", "LLM 답변 원문", "LLM 답변 파싱", "에러", "설명", "I/O"])
 
     with tabs[0]:
@@ -718,9 +659,9 @@ def render_stage1_phase_classifier_tabs(job_run, job_research_result, ivc_result
         tasks = db.get_job_tasks(job_run.id)
     else:
         tasks = None
-    fallback_ivc_tasks = _db_rows_to_ivc_tasks(tasks or [])
-    fallback_phase_summary = _db_rows_to_phase_summary(tasks or [])
-    fallback_task_atoms = _db_rows_to_task_atoms(tasks or [])
+    fallback_ivc_tasks = stage_state.ivc_tasks_from_rows(tasks or [])
+    fallback_phase_summary = stage_state.phase_summary_from_rows(tasks or [])
+    fallback_task_atoms = stage_state.task_atoms_from_rows(tasks or [])
     tabs = st.tabs(["Input", "결과", "LLM 답변 원문", "LLM 답변 파싱", "에러", "설명", "I/O"])
 
     with tabs[0]:
@@ -822,8 +763,8 @@ def render_stage1_phase_classifier_tabs(job_run, job_research_result, ivc_result
 def render_stage1_static_classifier_tabs(job_run, phase_result, static_result) -> None:
     """Render Static Task Classifier tabs."""
     tasks = db.get_job_tasks(job_run.id) if job_run is not None else None
-    fallback_static_meta = _db_rows_to_static_meta(tasks or [])
-    fallback_static_summary = _db_rows_to_static_summary(tasks or [])
+    fallback_static_meta = stage_state.static_meta_from_rows(tasks or [])
+    fallback_static_summary = stage_state.static_summary_from_rows(tasks or [])
     static_log = _load_latest_llm_log(job_run.id if job_run else None, "stage1_static_classifier")
     tabs = st.tabs(["Input", "결과", "LLM Raw", "LLM Cleaned JSON", "Error", "설명", "I/O"])
 
@@ -867,8 +808,13 @@ def render_stage1_static_classifier_tabs(job_run, phase_result, static_result) -
         llm_raw = getattr(static_result, "llm_raw_text", None) if static_result else None
         if llm_raw:
             st.text_area("LLM raw response", value=llm_raw, height=300, key="stage1_static_llm_raw")
-        elif static_log and static_log.get("output_text_raw"):
-            st.text_area("LLM raw response (from log)", value=static_log["output_text_raw"], height=300, key="stage1_static_llm_raw_log")
+        elif static_log:
+            if st.checkbox("로그에서 LLM 원문 불러오기", key="stage1_static_llm_raw_load"):
+                raw_text = _load_llm_log_texts(static_log).get("output_text_raw")
+                if raw_text:
+                    st.text_area("LLM raw response (from log)", value=raw_text, height=300, key="stage1_static_llm_raw_log")
+                else:
+                    st.info("로그에 LLM 원문이 없습니다.")
         elif static_result:
             st.info("LLM 원문이 없습니다. (스텁 또는 로깅 미연동)")
         else:
@@ -878,8 +824,13 @@ def render_stage1_static_classifier_tabs(job_run, phase_result, static_result) -
         cleaned = getattr(static_result, "llm_cleaned_json", None) if static_result else None
         if cleaned:
             st.text_area("정규화된 JSON 문자열", value=cleaned, height=300, key="stage1_static_llm_cleaned")
-        elif static_log and static_log.get("output_json_parsed"):
-            st.text_area("정규화된 JSON 문자열 (from log)", value=static_log["output_json_parsed"], height=300, key="stage1_static_llm_cleaned_log")
+        elif static_log:
+            if st.checkbox("로그에서 정규화된 JSON 불러오기", key="stage1_static_llm_cleaned_load"):
+                cleaned_text = _load_llm_log_texts(static_log).get("output_json_parsed")
+                if cleaned_text:
+                    st.text_area("정규화된 JSON 문자열 (from log)", value=cleaned_text, height=300, key="stage1_static_llm_cleaned_log")
+                else:
+                    st.info("로그에 정규화된 JSON 문자열이 없습니다.")
         elif static_result:
             st.info("정규화된 JSON 문자열이 없습니다. (LLM 스텁 또는 로깅 미연동)")
         else:
@@ -1015,11 +966,14 @@ def render_stage2_workflow_struct_tabs(job_run, phase_result, workflow_plan) ->
 
 def render_stage2_workflow_mermaid_tabs(job_run, workflow_plan, workflow_mermaid) -> None:
     """Render Workflow Mermaid (2.2) tabs."""
-    mermaid_log = _load_latest_llm_log(job_run.id if job_run else None, "stage2_workflow_mermaid")
     if workflow_plan is None and job_run is not None:
         workflow_plan = db.get_workflow_plan(job_run.id)
     if workflow_mermaid is None and job_run is not None:
         workflow_mermaid = db.get_workflow_mermaid_result(job_run.id)
+    mermaid_log = None
+    if workflow_mermaid is None:
+        # Only fall back to the (large) logged output when no Mermaid result is stored.
+        mermaid_log = _load_latest_llm_log(job_run.id if job_run else None, "stage2_workflow_mermaid", include_text=True)
     if workflow_mermaid is None and mermaid_log and mermaid_log.get("output_json_parsed"):
         try:
             parsed = json.loads(mermaid_log["output_json_parsed"])
@@ -1265,6 +1219,135 @@ def render_mermaid_chart(mermaid_code: str, height: int = 600) -> None:
     components.html(html_content, height=height, scrolling=True)
 
 
+STAGE_LABELS = {s.id: s.label for s in PIPELINE_STAGES}
+
+
+def _show_progress_event(status, event: events.ProgressEvent) -> None:
+    """Render a pipeline progress event into an st.status container."""
+    label = STAGE_LABELS.get(event.stage_id or "", event.stage_id or "")
+    if event.kind == "stage_started":
+        status.update(label=f"{label} 실행 중...")
+    elif event.kind == "llm_call_started":
+        status.update(label=f"{label} · LLM 호출 중 ({event.data.get('llm_stage')})...")
+    elif event.kind == "partial_result":
+        mark = "✅" if event.data.get("ok") else "⚠️"
+        status.write(f"{mark} {label}: {event.data.get('item')} 완료 (시도 {event.data.get('attempts')}회)")
+    elif event.kind == "stage_finished":
+        if event.data.get("artifact") == "hit":
+            status.write(f"↩️ {label}: 이전 결과 사용")
+        else:
+            mark = "✅" if event.data.get("status") == "ok" else "❌"
+            status.write(
+                f"{mark} {label}: {event.elapsed_ms / 1000:.1f}s · LLM {event.data.get('llm_calls', 0)}회 · "
+                f"토큰 {event.data.get('tokens_total', 0):,}"
+            )
+
+
+SEARCH_DOC_TYPE_LABELS = {"job_run": "JobRun", "jd": "JD", "task": "Task", "skill": "Skill", "prompt": "Prompt"}
+
+
+def render_search_panel() -> None:
+    """Full-text search over previous runs (search_index FTS5 table)."""
+    with st.expander("과거 작업 검색 (JD / Task / Skill / Prompt)"):
+        query = st.text_input("검색어", key="search_query", placeholder="예: CRM 데이터 정리")
+        doc_types = st.multiselect(
+            "대상",
+            list(SEARCH_DOC_TYPE_LABELS),
+            default=list(SEARCH_DOC_TYPE_LABELS),
+            format_func=SEARCH_DOC_TYPE_LABELS.get,
+            key="search_doc_types",
+        )
+        if not query.strip():
+            return
+        try:
+            hits = search.search(query, doc_types=doc_types or None, limit=50)
+        except Exception as exc:  # pragma: no cover - UI feedback
+            st.error(f"검색 실패: {exc}")
+            return
+        if not hits:
+            st.info("검색 결과가 없습니다.")
+            return
+        st.dataframe(
+            [
+                {
+                    "job_run_id": h.job_run_id,
+                    "회사": h.company_name,
+                    "직무": h.job_title,
+                    "유형": SEARCH_DOC_TYPE_LABELS.get(h.doc_type, h.doc_type),
+                    "제목": h.title,
+                    "일치 내용": h.snippet,
+                    "점수": h.score,
+                }
+                for h in hits
+            ]
+        )
+
+
+def render_perf_panel() -> None:
+    """Show per-stage LLM latency/token rollups (reads llm_call_rollups only)."""
+    with st.expander("LLM 성능 리포트 (stage별 p50/p95/p99)"):
+        window_hours = st.selectbox("기간", [24, 24 * 7, 24 * 30], format_func=lambda h: f"최근 {h // 24}일", key="perf_window")
+        since = (datetime.utcnow() - timedelta(hours=window_hours)).isoformat()
+        compare = st.checkbox("직전 동일 기간과 비교", key="perf_compare")
+        try:
+            current = perf_report.load_stage_summaries(since=since)
+            if not compare:
+                if not current:
+                    st.info("선택한 기간에 rollup 데이터가 없습니다.")
+                    return
+                st.dataframe([s.__dict__ for s in current])
+                return
+            prev_since = (datetime.utcnow() - timedelta(hours=window_hours * 2)).isoformat()
+            previous = perf_report.load_stage_summaries(since=prev_since, until=since)
+            st.caption("A = 직전 기간, B = 선택 기간")
+            st.dataframe(perf_report.compare_summaries(previous, current))
+        except Exception as exc:  # pragma: no cover - UI feedback
+            st.error(f"성능 리포트 조회 실패: {exc}")
+
+
+def render_trace_waterfall(job_run) -> None:
+    """Draw the span waterfall of the current job_run's latest pipeline trace."""
+    trace_id = getattr(job_run, "trace_id", None) if job_run else None
+    if not trace_id:
+        return
+    with st.expander("Trace waterfall (stage / DB / LLM spans)"):
+        try:
+            spans = tracing.load_trace(trace_id)
+        except Exception as exc:  # pragma: no cover - UI feedback
+            st.error(f"trace 조회 실패: {exc}")
+            return
+        if not spans:
+            st.info("trace 파일에서 span을 찾지 못했습니다.")
+            return
+        start = min(s["start_ns"] for s in spans)
+        total_ns = max(max(s["end_ns"] for s in spans) - start, 1)
+        parents = {s["span_id"]: s["parent_span_id"] for s in spans}
+
+        def _depth(span_id: str | None) -> int:
+            depth = 0
+            while parents.get(span_id):
+                span_id = parents[span_id]
+                depth += 1
+            return depth
+
+        rows = []
+        for s in spans:
+            left = (s["start_ns"] - start) / total_ns * 100
+            width = max((s["end_ns"] - s["start_ns"]) / total_ns * 100, 0.3)
+            color = "#e57373" if s["status"] == "error" else ("#64b5f6" if s["name"].startswith("llm.") else "#81c784")
+            label = html.escape(f"{s['name']} ({s['duration_ms']:.1f} ms)")
+            indent = _depth(s["span_id"]) * 12
+            rows.append(
+                f'<div style="display:flex;font:12px monospace;margin:1px 0;">'
+                f'<div style="width:38%;padding-left:{indent}px;white-space:nowrap;overflow:hidden;">{label}</div>'
+                f'<div style="width:62%;position:relative;background:#f5f5f5;">'
+                f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;background:{color};"></div>'
+                f"</div></div>"
+            )
+        st.caption(f"trace_id={trace_id} · spans={len(spans)} · total={total_ns / 1_000_000:.1f} ms")
+        st.markdown("".join(rows), unsafe_allow_html=True)
+
+
 def render_log_expander() -> None:
     """Show tail of logs/app.log for quick debugging."""
     log_path = Path("logs/app.log")
@@ -1281,4 +1364,5 @@ def render_log_expander() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    with tracing.span("ui.rerender"):
+        main()
@@ -0,0 +1 @@
+"""Micro-benchmarks (run with `python -m ax_agent_factory.benchmarks.<name>`)."""
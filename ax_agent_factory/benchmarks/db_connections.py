@@ -0,0 +1,111 @@
+"""Compare connect-per-call SQLite access with the persistent, tuned ConnectionManager.
+
+Runs the same db helpers twice against fresh files:
+- legacy: new sqlite3 connection per helper call, sqlite3 defaults
+  (journal_mode=DELETE, synchronous=FULL)
+- pooled: one connection per thread, WAL + SQLiteTuning defaults
+
+Examples:
+    python -m ax_agent_factory.benchmarks.db_connections
+    python -m ax_agent_factory.benchmarks.db_connections --writes 2000 --reads 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from ax_agent_factory.infra import db
+from ax_agent_factory.infra.sqlite_conn import ConnectionManager, SQLiteTuning
+
+
+def _use_manager(manager: ConnectionManager) -> None:
+    db.DB_PATH = manager.path
+    db._connections = manager
+    db._ensure_tables()
+
+
+def _run_mode(mode: str, path: str, writes: int, reads: int) -> dict:
+    if mode == "legacy":
+        manager = ConnectionManager(path, SQLiteTuning.legacy(), persistent=False)
+    else:
+        manager = ConnectionManager(path, SQLiteTuning())
+    _use_manager(manager)
+    job_run = db.create_or_get_job_run("bench", "bench")
+
+    start = time.perf_counter()
+    for i in range(writes):
+        db.save_llm_call_log(
+            {
+                "created_at": f"2025-12-04T10:{i % 60:02d}:00",
+                "job_run_id": job_run.id,
+                "stage_name": f"stage{i % 5}",
+                "model_name": "bench-model",
+                "input_payload_json": "{}",
+                "output_text_raw": "x" * 2048,
+                "status": "success",
+                "latency_ms": 100 + i % 900,
+            }
+        )
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(reads):
+        db.get_job_run(job_run.id)
+        db.get_latest_llm_call(job_run.id, f"stage{i % 5}")
+    read_s = time.perf_counter() - start
+
+    connects = manager.connects
+    manager.close_all()
+    return {
+        "mode": mode,
+        "writes": writes,
+        "write_ops_s": writes / write_s if write_s else float("inf"),
+        "reads": reads * 2,
+        "read_ops_s": reads * 2 / read_s if read_s else float("inf"),
+        "connects": connects,
+    }
+
+
+def run_benchmark(writes: int = 500, reads: int = 2000, workdir: Optional[str] = None) -> list[dict]:
+    """Run legacy then pooled mode on separate fresh DB files and return one row per mode."""
+    previous_path = db.DB_PATH
+    previous_manager = db._connections
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        try:
+            return [
+                _run_mode(mode, str(Path(tmp) / f"{mode}.db"), writes, reads) for mode in ("legacy", "pooled")
+            ]
+        finally:
+            db.DB_PATH = previous_path
+            db._connections = previous_manager
+
+
+def format_results(rows: list[dict]) -> str:
+    header = f"{'mode':<8} {'writes/s':>10} {'reads/s':>10} {'connects':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(f"{r['mode']:<8} {r['write_ops_s']:>10.0f} {r['read_ops_s']:>10.0f} {r['connects']:>9}")
+    if len(rows) == 2:
+        lines.append(
+            f"speedup: writes x{rows[1]['write_ops_s'] / rows[0]['write_ops_s']:.1f}, "
+            f"reads x{rows[1]['read_ops_s'] / rows[0]['read_ops_s']:.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=500, help="save_llm_call_log calls per mode")
+    parser.add_argument("--reads", type=int, default=2000, help="get_job_run + get_latest_llm_call pairs per mode")
+    parser.add_argument("--workdir", help="directory for the temporary DB files (default: system temp)")
+    args = parser.parse_args(argv)
+    print(format_results(run_benchmark(args.writes, args.reads, args.workdir)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
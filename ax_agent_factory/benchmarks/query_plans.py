@@ -0,0 +1,143 @@
+"""Hot DB access paths on a large synthetic database, with and without the lookup indexes.
+
+Populates a fresh DB with `--runs` job runs (default 100k), each with tasks, an LLM
+call log, an AX workflow, an agent, a skill card, a deep research doc and a prompt
+(plain executemany INSERTs) after one run seeded through the real helpers, then
+times every query_plans.HOT_PATHS call (best of --repeat, read cache off):
+- indexed: the schema as migrated
+- dropped: the same DB after dropping LOOKUP_INDEXES (the pre-migration 7/8 plans)
+
+Examples:
+    python -m ax_agent_factory.benchmarks.query_plans
+    python -m ax_agent_factory.benchmarks.query_plans --runs 20000 --tasks 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from ax_agent_factory.infra import db, query_plans
+from ax_agent_factory.infra.sqlite_conn import ConnectionManager
+
+# Indexes whose absence turns a hot path into a full scan.
+LOOKUP_INDEXES = ("idx_job_runs_dedup_hash", "idx_ax_workflows_run")
+_BATCH = 5000
+
+
+def populate(runs: int, tasks_per_run: int) -> None:
+    conn = db._get_conn()
+    cur = conn.cursor()
+    now = "2026-01-01T00:00:00"
+    first_id = cur.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM job_runs").fetchone()[0]
+    for start in range(first_id, first_id + runs, _BATCH):
+        ids = range(start, min(start + _BATCH, first_id + runs))
+        cur.executemany(
+            "INSERT INTO job_runs (id, company_name, job_title, dedup_hash, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(i, f"회사{i}", f"직무{i % 500}", db.job_run_dedup_hash(f"회사{i}", f"직무{i % 500}", None), now, now) for i in ids],
+        )
+        cur.executemany(
+            "INSERT INTO job_tasks (job_run_id, task_id, task_original_sentence, task_korean, created_at, updated_at) "
+            "VALUES (?, ?, '문장', '과업', ?, ?)",
+            [(i, f"T{t:02d}", now, now) for i in ids for t in range(tasks_per_run)],
+        )
+        cur.executemany(
+            "INSERT INTO llm_call_logs (created_at, job_run_id, stage_name, model_name, input_payload_json, status) "
+            "VALUES (?, ?, 'stage1_task_extractor', 'm', '{}', 'success')",
+            [(now, i) for i in ids],
+        )
+        for table, columns, values in (
+            ("ax_workflows", "workflow_name", "'AX'"),
+            ("ax_agents", "agent_id, agent_name", "'A1', '에이전트'"),
+            ("ax_agent_task_links", "agent_id, task_id", "'A1', 'T00'"),
+            ("ax_skills", "skill_public_id, skill_name", "'S1', '스킬'"),
+            ("ax_deep_research_docs", "agent_id, sections_json", "'A1', '{}'"),
+            ("ax_prompts", "agent_id, system_prompt", "'A1', '프롬프트'"),
+        ):
+            cur.executemany(
+                f"INSERT INTO {table} (job_run_id, {columns}, created_at, updated_at) VALUES (?, {values}, ?, ?)",
+                [(i, now, now) for i in ids],
+            )
+    conn.commit()
+    conn.close()
+
+
+def _time(path: query_plans.HotPath, ctx: query_plans.QueryContext, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path.call(ctx)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def _time_all(ctx: query_plans.QueryContext, repeat: int) -> dict[str, float]:
+    cache_enabled, db.read_cache.enabled = db.read_cache.enabled, False
+    try:
+        return {path.name: _time(path, ctx, repeat) for path in query_plans.HOT_PATHS}
+    finally:
+        db.read_cache.enabled = cache_enabled
+
+
+def run_benchmark(runs: int = 100_000, tasks_per_run: int = 5, repeat: int = 5, workdir: Optional[str] = None) -> list[dict]:
+    previous_path, previous_manager = db.DB_PATH, db._connections
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        manager = ConnectionManager(str(Path(tmp) / "plans.db"))
+        db.DB_PATH, db._connections = manager.path, manager
+        try:
+            db._ensure_tables()
+            # The measured run is the oldest, so "newest row first" lookups cannot stop early.
+            ctx = query_plans.seed_job_run()
+            start = time.perf_counter()
+            populate(runs, tasks_per_run)
+            populate_s = time.perf_counter() - start
+            scans = {r.name: len(r.scans) for r in query_plans.check_plans(ctx)}
+            indexed = _time_all(ctx, repeat)
+            conn = db._get_conn()
+            for index in LOOKUP_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {index}")
+            conn.commit()
+            conn.close()
+            dropped = _time_all(ctx, repeat)
+        finally:
+            manager.close_all()
+            db.DB_PATH, db._connections = previous_path, previous_manager
+    return [
+        {
+            "path": path.name,
+            "indexed_ms": indexed[path.name],
+            "dropped_ms": dropped[path.name],
+            "scans": scans[path.name],
+            "runs": runs,
+            "populate_s": populate_s,
+        }
+        for path in query_plans.HOT_PATHS
+    ]
+
+
+def format_results(rows: list[dict]) -> str:
+    header = f"{'path':<34} {'indexed ms':>11} {'dropped ms':>11} {'scans':>6}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(f"{r['path']:<34} {r['indexed_ms']:>11.3f} {r['dropped_ms']:>11.3f} {r['scans']:>6}")
+    if rows:
+        lines.append(f"({rows[0]['runs']} runs, populate {rows[0]['populate_s']:.1f}s)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=100_000, help="number of synthetic job runs")
+    parser.add_argument("--tasks", type=int, default=5, help="tasks per run")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per path (best is reported)")
+    parser.add_argument("--workdir", help="directory for the temporary DB file (default: system temp)")
+    args = parser.parse_args(argv)
+    print(format_results(run_benchmark(args.runs, args.tasks, args.repeat, args.workdir)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+"""Full-text search latency: FTS5 trigram search_index vs LIKE scans of the source tables.
+
+Populates a fresh DB with synthetic runs (JD + tasks + skills + prompts per run,
+plain INSERTs so the triggers maintain the index), then times the same queries with:
+- like: `LIKE '%term%'` over job_tasks / job_research_results / ax_skills / ax_prompts
+- fts: search.search() (bm25-ranked, top 20)
+
+Examples:
+    python -m ax_agent_factory.benchmarks.search_index
+    python -m ax_agent_factory.benchmarks.search_index --runs 5000 --tasks 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from ax_agent_factory.infra import db, search
+from ax_agent_factory.infra.sqlite_conn import ConnectionManager
+
+# Queries are planted into ~0.5% of the task sentences; filler text is drawn from a
+# few thousand synthetic Hangul words so term selectivity resembles real JDs.
+QUERIES = ("CRM 데이터 정리", "제안서 검토", "만족도 설문 분석", "커리큘럼 설계")
+_PLANT_RATE = 0.005
+
+
+def _vocabulary(rng: random.Random, size: int = 4000) -> list[str]:
+    syllables = [chr(0xAC00 + i * 28) for i in range(0, 399, 3)]
+    return ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 3))) for _ in range(size)]
+
+
+_VOCAB = _vocabulary(random.Random(0))
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    text = " ".join(rng.choice(_VOCAB) for _ in range(n))
+    if rng.random() < _PLANT_RATE:
+        text += " " + rng.choice(QUERIES)
+    return text
+
+
+def populate(runs: int, tasks_per_run: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    conn = db._get_conn()
+    cur = conn.cursor()
+    now = "2026-01-01T00:00:00"
+    for r in range(runs):
+        cur.execute(
+            "INSERT INTO job_runs (company_name, job_title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (f"회사{r}", _sentence(rng, 2), now, now),
+        )
+        job_run_id = cur.lastrowid
+        cur.execute(
+            "INSERT INTO job_research_results (job_run_id, raw_job_desc, research_sources_json, created_at, updated_at) "
+            "VALUES (?, ?, '[]', ?, ?)",
+            (job_run_id, _sentence(rng, 80), now, now),
+        )
+        cur.executemany(
+            "INSERT INTO job_tasks (job_run_id, task_id, task_original_sentence, task_korean, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(job_run_id, f"T{t:02d}", _sentence(rng, 10), _sentence(rng, 3), now, now) for t in range(tasks_per_run)],
+        )
+        cur.execute(
+            "INSERT INTO ax_skills (job_run_id, skill_public_id, skill_name, purpose, created_at, updated_at) "
+            "VALUES (?, 'S1', ?, ?, ?, ?)",
+            (job_run_id, _sentence(rng, 3), _sentence(rng, 15), now, now),
+        )
+        cur.execute(
+            "INSERT INTO ax_prompts (job_run_id, agent_id, system_prompt, created_at, updated_at) VALUES (?, 'A1', ?, ?, ?)",
+            (job_run_id, _sentence(rng, 40), now, now),
+        )
+    conn.commit()
+    conn.close()
+
+
+def _like_scan(query: str) -> int:
+    terms = query.split()
+    sources = (
+        ("job_tasks", "task_korean || ' ' || task_original_sentence"),
+        ("job_research_results", "raw_job_desc"),
+        ("ax_skills", "skill_name || ' ' || COALESCE(purpose, '')"),
+        ("ax_prompts", "COALESCE(system_prompt, '')"),
+    )
+    conn = db._get_conn()
+    found = 0
+    for table, expr in sources:
+        where = " AND ".join(f"{expr} LIKE ?" for _ in terms)
+        found += conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE {where}", [f"%{t}%" for t in terms]
+        ).fetchone()[0]
+    conn.close()
+    return found
+
+
+def _time(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def run_benchmark(runs: int = 2000, tasks_per_run: int = 20, workdir: Optional[str] = None) -> list[dict]:
+    previous_path, previous_manager = db.DB_PATH, db._connections
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        manager = ConnectionManager(str(Path(tmp) / "search.db"))
+        db.DB_PATH, db._connections = manager.path, manager
+        try:
+            db._ensure_tables()
+            start = time.perf_counter()
+            populate(runs, tasks_per_run)
+            populate_s = time.perf_counter() - start
+            for query in QUERIES:
+                rows.append(
+                    {
+                        "query": query,
+                        "like_ms": _time(_like_scan, query),
+                        "fts_ms": _time(search.search, query),
+                        "hits": len(search.search(query)),
+                        "populate_s": populate_s,
+                    }
+                )
+        finally:
+            manager.close_all()
+            db.DB_PATH, db._connections = previous_path, previous_manager
+    return rows
+
+
+def format_results(rows: list[dict]) -> str:
+    header = f"{'query':<20} {'like ms':>9} {'fts ms':>8} {'speedup':>8} {'top hits':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['query']:<20} {r['like_ms']:>9.2f} {r['fts_ms']:>8.2f} {r['like_ms'] / r['fts_ms']:>7.1f}x {r['hits']:>9}"
+        )
+    if rows:
+        lines.append(f"(populate incl. trigger indexing: {rows[0]['populate_s']:.1f}s)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=2000, help="number of synthetic job runs")
+    parser.add_argument("--tasks", type=int, default=20, help="tasks per run")
+    parser.add_argument("--workdir", help="directory for the temporary DB file (default: system temp)")
+    args = parser.parse_args(argv)
+    print(format_results(run_benchmark(args.runs, args.tasks, args.workdir)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,237 @@
+"""Row-by-row vs set-based persistence of task atoms, classifications and workflow plans.
+
+For each task count the same synthetic Stage 1/1.3/2.1 outputs are written with:
+- legacy: the previous per-row loops (INSERT OR IGNORE + UPDATE per task, delete all
+  edges then re-insert one at a time)
+- bulk: db.save_task_atoms / apply_ivc_classification / apply_static_classification /
+  apply_workflow_plan (executemany upserts + edge diff)
+
+"replan" re-applies the workflow plan with one edge changed, which is the common
+re-run case the edge diff targets.
+
+Examples:
+    python -m ax_agent_factory.benchmarks.task_persistence
+    python -m ax_agent_factory.benchmarks.task_persistence --sizes 10 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ax_agent_factory.core.schemas.common import IVCAtomicTask, IVCTask, TaskStaticMeta
+from ax_agent_factory.core.schemas.workflow import WorkflowEdge, WorkflowNode, WorkflowPlan
+from ax_agent_factory.infra import db
+from ax_agent_factory.infra.sqlite_conn import ConnectionManager
+
+
+def build_payload(n: int) -> tuple[list[IVCAtomicTask], list[IVCTask], list[TaskStaticMeta], WorkflowPlan]:
+    ids = [f"T{i:04d}" for i in range(1, n + 1)]
+    atoms = [
+        IVCAtomicTask(task_id=t, task_original_sentence=f"sentence {t}", task_korean=f"과업 {t}", task_english=None, notes=None)
+        for t in ids
+    ]
+    ivc = [
+        IVCTask(
+            task_id=t,
+            task_korean=f"과업 {t}",
+            task_original_sentence=f"sentence {t}",
+            ivc_phase="P2_DECIDE",
+            ivc_exec_subphase=None,
+            primitive_lv1="Analyze",
+            classification_reason="bench",
+        )
+        for t in ids
+    ]
+    static = [
+        TaskStaticMeta(
+            task_id=t,
+            task_korean=f"과업 {t}",
+            static_type_lv1="DOCS",
+            static_type_lv2=None,
+            domain_lv1=None,
+            domain_lv2=None,
+            rag_required=False,
+            rag_reason=None,
+            value_score=3,
+            complexity_score=2,
+            value_complexity_quadrant="MID",
+            recommended_execution_env="human",
+            autoability_reason=None,
+            data_entities=["doc"],
+            tags=["bench"],
+        )
+        for t in ids
+    ]
+    plan = WorkflowPlan(
+        workflow_name="bench",
+        nodes=[WorkflowNode(node_id=t, label=f"과업 {t}", stage_id="S1", stream_id="S1_ST1") for t in ids],
+        edges=[WorkflowEdge(source=a, target=b) for a, b in zip(ids, ids[1:])],
+    )
+    return atoms, ivc, static, plan
+
+
+def _legacy_persist(job_run_id: int, atoms, ivc, static, plan: WorkflowPlan) -> None:
+    """Previous implementation: one statement (or two) per row."""
+    conn = db._get_conn()
+    cur = conn.cursor()
+    now = datetime.utcnow().isoformat()
+
+    def ensure(task_id: str) -> None:
+        cur.execute(
+            "INSERT OR IGNORE INTO job_tasks (job_run_id, task_id, task_original_sentence, task_korean, "
+            "task_english, notes, created_at, updated_at) VALUES (?, ?, '', '', NULL, NULL, ?, ?)",
+            (job_run_id, task_id, now, now),
+        )
+
+    for a in atoms:
+        cur.execute(
+            "INSERT INTO job_tasks (job_run_id, task_id, task_original_sentence, task_korean, task_english, notes, "
+            "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(job_run_id, task_id) DO UPDATE SET "
+            "task_original_sentence = excluded.task_original_sentence, task_korean = excluded.task_korean, "
+            "task_english = excluded.task_english, notes = excluded.notes, updated_at = excluded.updated_at",
+            (job_run_id, a.task_id, a.task_original_sentence, a.task_korean, a.task_english, a.notes, now, now),
+        )
+    for t in ivc:
+        ensure(t.task_id)
+        cur.execute(
+            "UPDATE job_tasks SET ivc_phase = ?, ivc_exec_subphase = ?, primitive_lv1 = ?, classification_reason = ?, "
+            "updated_at = ? WHERE job_run_id = ? AND task_id = ?",
+            (t.ivc_phase, t.ivc_exec_subphase, t.primitive_lv1, t.classification_reason, now, job_run_id, t.task_id),
+        )
+    for m in static:
+        ensure(m.task_id)
+        cur.execute(
+            "UPDATE job_tasks SET static_type_lv1 = ?, static_type_lv2 = ?, domain_lv1 = ?, domain_lv2 = ?, "
+            "rag_required = ?, rag_reason = ?, value_score = ?, complexity_score = ?, value_complexity_quadrant = ?, "
+            "recommended_execution_env = ?, autoability_reason = ?, data_entities_json = ?, tags_json = ?, "
+            "updated_at = ? WHERE job_run_id = ? AND task_id = ?",
+            (
+                m.static_type_lv1, m.static_type_lv2, m.domain_lv1, m.domain_lv2, 1 if m.rag_required else 0,
+                m.rag_reason, m.value_score, m.complexity_score, m.value_complexity_quadrant,
+                m.recommended_execution_env, m.autoability_reason, json.dumps(m.data_entities, ensure_ascii=False),
+                json.dumps(m.tags, ensure_ascii=False), now, job_run_id, m.task_id,
+            ),
+        )
+    _legacy_workflow(cur, job_run_id, plan, now)
+    conn.commit()
+    conn.close()
+
+
+def _legacy_workflow(cur, job_run_id: int, plan: WorkflowPlan, now: str) -> None:
+    for node in plan.nodes:
+        cur.execute(
+            "INSERT OR IGNORE INTO job_tasks (job_run_id, task_id, task_original_sentence, task_korean, "
+            "task_english, notes, created_at, updated_at) VALUES (?, ?, '', '', NULL, NULL, ?, ?)",
+            (job_run_id, node.node_id, now, now),
+        )
+        cur.execute(
+            "UPDATE job_tasks SET stage_id = ?, stream_id = ?, workflow_node_label = ?, is_entry = ?, is_exit = ?, "
+            "is_hub = ?, updated_at = ? WHERE job_run_id = ? AND task_id = ?",
+            (node.stage_id, node.stream_id, node.label, int(node.is_entry), int(node.is_exit), int(node.is_hub), now,
+             job_run_id, node.node_id),
+        )
+    cur.execute("DELETE FROM job_task_edges WHERE job_run_id = ?", (job_run_id,))
+    for edge in plan.edges:
+        cur.execute(
+            "INSERT INTO job_task_edges (job_run_id, source_task_id, target_task_id, label, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_run_id, edge.source, edge.target, edge.label, now, now),
+        )
+
+
+def _bulk_persist(job_run_id: int, atoms, ivc, static, plan: WorkflowPlan) -> None:
+    db.save_task_atoms(job_run_id, atoms)
+    db.apply_ivc_classification(job_run_id, ivc)
+    db.apply_static_classification(job_run_id, static)
+    db.apply_workflow_plan(job_run_id, plan)
+
+
+def _replan(plan: WorkflowPlan) -> WorkflowPlan:
+    changed = plan.copy(deep=True)
+    if changed.edges:
+        changed.edges[-1] = WorkflowEdge(source=changed.edges[-1].source, target=changed.edges[0].source, label="loop")
+    return changed
+
+
+def _measure(fn, *args) -> tuple[float, int]:
+    """Run fn and return (elapsed ms, SQL statement executions incl. each executemany row)."""
+    conn = db._get_conn()
+    statements: list[str] = []
+    conn.raw.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    try:
+        fn(*args)
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        conn.raw.set_trace_callback(None)
+        conn.close()
+    return elapsed, len(statements)
+
+
+def run_benchmark(sizes: tuple[int, ...] = (10, 100, 1000), workdir: Optional[str] = None) -> list[dict]:
+    previous_path, previous_manager = db.DB_PATH, db._connections
+    rows: list[dict] = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        try:
+            for n in sizes:
+                atoms, ivc, static, plan = build_payload(n)
+                replan = _replan(plan)
+                row: dict = {"tasks": n}
+                for mode, persist in (("legacy", _legacy_persist), ("bulk", _bulk_persist)):
+                    manager = ConnectionManager(str(Path(tmp) / f"{mode}_{n}.db"))
+                    db.DB_PATH, db._connections = manager.path, manager
+                    db._ensure_tables()
+                    job_run_id = db.create_or_get_job_run("bench", f"{mode}-{n}").id
+                    row[f"{mode}_ms"], row[f"{mode}_statements"] = _measure(persist, job_run_id, atoms, ivc, static, plan)
+                    if mode == "legacy":
+                        def _legacy_replan(jid=job_run_id):
+                            conn = db._get_conn()
+                            _legacy_workflow(conn.cursor(), jid, replan, datetime.utcnow().isoformat())
+                            conn.commit()
+                            conn.close()
+
+                        row["legacy_replan_ms"], row["legacy_replan_statements"] = _measure(_legacy_replan)
+                    else:
+                        row["bulk_replan_ms"], row["bulk_replan_statements"] = _measure(
+                            db.apply_workflow_plan, job_run_id, replan
+                        )
+                    manager.close_all()
+                rows.append(row)
+        finally:
+            db.DB_PATH, db._connections = previous_path, previous_manager
+    return rows
+
+
+def format_results(rows: list[dict]) -> str:
+    header = (
+        f"{'tasks':>6} {'legacy ms':>10} {'bulk ms':>9} {'speedup':>8} {'execs L/B':>12} "
+        f"{'replan L ms':>12} {'replan B ms':>12} {'replan execs L/B':>17}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['tasks']:>6} {r['legacy_ms']:>10.1f} {r['bulk_ms']:>9.1f} {r['legacy_ms'] / r['bulk_ms']:>7.1f}x "
+            f"{str(r['legacy_statements']) + '/' + str(r['bulk_statements']):>12} "
+            f"{r['legacy_replan_ms']:>12.1f} {r['bulk_replan_ms']:>12.1f} "
+            f"{str(r['legacy_replan_statements']) + '/' + str(r['bulk_replan_statements']):>17}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="task counts to benchmark")
+    parser.add_argument("--workdir", help="directory for the temporary DB files (default: system temp)")
+    args = parser.parse_args(argv)
+    print(format_results(run_benchmark(tuple(args.sizes), args.workdir)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Command-line entrypoints (run with `python -m ax_agent_factory.cli.<name>`)."""
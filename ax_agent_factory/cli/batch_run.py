@@ -0,0 +1,82 @@
+"""Run many (company, job_title) requests headlessly, resumable from a checkpoint.
+
+Examples:
+    python -m ax_agent_factory.cli.batch_run jobs.jsonl --out data/batch/2026-10
+    python -m ax_agent_factory.cli.batch_run jobs.csv --out data/batch/2026-10 --target 2.2 --ax 8 --workers 8
+    python -m ax_agent_factory.cli.batch_run jobs.jsonl --out data/batch/2026-10 --processes 4 --workers 2
+    python -m ax_agent_factory.cli.batch_run jobs.jsonl --out data/batch/bench --scaling 1,2,4,8
+
+Re-running the same command after a crash skips finished requests and resumes the
+rest (see core/batch_runner.py). The summary is printed and written to <out>/summary.json.
+--scaling runs the requests once per process count on scratch databases in <out>/scaling
+and adds the speedup/efficiency table to the summary (the --db database is not written).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+from ax_agent_factory.core import batch_runner
+from ax_agent_factory.infra import db, events
+from ax_agent_factory.models.stages import AX_STAGES, CORE_STAGES
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run job requests (JSONL/CSV) through the pipeline without the UI.")
+    parser.add_argument("requests", help="JSONL or CSV file with company_name, job_title[, manual_jd_text, ...]")
+    parser.add_argument("--out", required=True, help="Directory for checkpoint.jsonl and summary.json")
+    parser.add_argument("--db", help="SQLite path (default: AX_DB_PATH or data/ax_factory.db)")
+    parser.add_argument(
+        "--target", default="2.2", choices=[s.ui_label for s in CORE_STAGES], help="Last Stage 0~2 step to run"
+    )
+    parser.add_argument("--ax", choices=[s.ui_label for s in AX_STAGES], help="Run on through AX stages up to this one")
+    parser.add_argument("--workers", type=int, default=batch_runner.DEFAULT_BATCH_WORKERS, help="Concurrent requests (per process)")
+    parser.add_argument("--retries", type=int, default=0, help="Extra attempts per failed request")
+    parser.add_argument("--progress", action="store_true", help="Print progress events (stages, LLM calls) to stderr")
+    parser.add_argument("--processes", type=int, help="Shard requests across this many worker processes")
+    parser.add_argument(
+        "--scaling",
+        nargs="?",
+        const=",".join(map(str, batch_runner.DEFAULT_SCALING_PROCESSES)),
+        metavar="COUNTS",
+        help="Benchmark at these process counts (default 1,2,4,8) instead of a normal run",
+    )
+    return parser
+
+
+def print_event(event: events.ProgressEvent) -> None:
+    print(event.format(), file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.set_db_path(args.db)
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    requests = batch_runner.load_requests(args.requests)
+    options = {
+        "target": args.target,
+        "ax_target": args.ax,
+        "workers": args.workers,
+        "retries": args.retries,
+        "on_event": print_event if args.progress else None,
+    }
+    if args.scaling:
+        counts = [int(n) for n in args.scaling.split(",")]
+        summary = batch_runner.run_scaling(requests, out_dir=str(out / "scaling"), process_counts=counts, **options)
+    else:
+        summary = batch_runner.run_batch(
+            requests, checkpoint_path=str(out / "checkpoint.jsonl"), processes=args.processes, **options
+        )
+    (out / "summary.json").write_text(json.dumps(summary.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+    print(summary.format())
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
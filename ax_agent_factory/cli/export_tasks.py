@@ -0,0 +1,39 @@
+"""Incremental columnar export of job_tasks (Parquet, CSV without pyarrow).
+
+Examples:
+    python -m ax_agent_factory.cli.export_tasks --out data/analytics/job_tasks
+    python -m ax_agent_factory.cli.export_tasks --out data/analytics/job_tasks --format csv --full
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+from ax_agent_factory.infra import analytics_export, db
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Export job_tasks across runs for analytics (month partitions).")
+    parser.add_argument("--db", help="SQLite path (default: AX_DB_PATH or data/ax_factory.db)")
+    parser.add_argument("--out", default="data/analytics/job_tasks", help="Output directory")
+    parser.add_argument("--format", choices=("auto", "parquet", "csv"), default="auto")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and rewrite every job run")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.set_db_path(args.db)
+    result = analytics_export.export_job_tasks(args.out, fmt=args.format, full=args.full)
+    print(
+        f"Exported {result.rows} task rows from {result.job_runs} changed job runs "
+        f"({result.format}, watermark={result.watermark or '-'})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Per-stage LLM latency/token report from llm_call_rollups.
+
+Examples:
+    python -m ax_agent_factory.cli.perf_report --since 2025-12-01
+    python -m ax_agent_factory.cli.perf_report \
+        --window-a 2025-12-01T00:2025-12-02T00 --window-b 2025-12-02T00:2025-12-03T00
+    python -m ax_agent_factory.cli.perf_report --prompt-version-a v1 --prompt-version-b v2
+    python -m ax_agent_factory.cli.perf_report --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+from ax_agent_factory.infra import db, perf_report
+
+
+def _parse_window(value: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """'START:END' (ISO hours, END exclusive; either side may be empty) -> (since, until)."""
+    if not value:
+        return None, None
+    # ISO timestamps contain ':' only after the hour, so split on the separator that follows a full hour.
+    if value.count(":") != 1:
+        raise argparse.ArgumentTypeError("window must look like 2025-12-01T00:2025-12-02T00")
+    since, until = value.split(":")
+    return since or None, until or None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AX Agent Factory LLM stage performance report (rollup based).")
+    parser.add_argument("--db", help="SQLite path (default: AX_DB_PATH or data/ax_factory.db)")
+    parser.add_argument("--since", help="Report window start (ISO, inclusive) when not comparing")
+    parser.add_argument("--until", help="Report window end (ISO, exclusive) when not comparing")
+    parser.add_argument("--stage", help="Filter by stage_name")
+    parser.add_argument("--window-a", help="Baseline window START:END (hours, e.g. 2025-12-01T00:2025-12-02T00)")
+    parser.add_argument("--window-b", help="Candidate window START:END")
+    parser.add_argument("--prompt-version-a", help="Baseline prompt_version ('' for unversioned)")
+    parser.add_argument("--prompt-version-b", help="Candidate prompt_version")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute rollups from llm_call_logs first")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.set_db_path(args.db)
+    if args.rebuild:
+        count = db.rebuild_llm_call_rollups()
+        print(f"Rebuilt rollups from {count} llm_call_logs rows.")
+
+    comparing = any([args.window_a, args.window_b, args.prompt_version_a is not None, args.prompt_version_b is not None])
+    if not comparing:
+        summaries = perf_report.load_stage_summaries(since=args.since, until=args.until, stage_name=args.stage)
+        if not summaries:
+            print("No rollup rows in the selected window.")
+            return 0
+        print(perf_report.format_summary_table(summaries))
+        return 0
+
+    since_a, until_a = _parse_window(args.window_a)
+    since_b, until_b = _parse_window(args.window_b)
+    if not args.window_a and not args.window_b:
+        since_a = since_b = args.since
+        until_a = until_b = args.until
+    baseline = perf_report.load_stage_summaries(
+        since=since_a, until=until_a, prompt_version=args.prompt_version_a, stage_name=args.stage
+    )
+    candidate = perf_report.load_stage_summaries(
+        since=since_b, until=until_b, prompt_version=args.prompt_version_b, stage_name=args.stage
+    )
+    print(f"A: window={args.window_a or '-'} prompt_version={args.prompt_version_a}")
+    print(f"B: window={args.window_b or '-'} prompt_version={args.prompt_version_b}")
+    print(perf_report.format_comparison_table(perf_report.compare_summaries(baseline, candidate)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Export/import a job run as a compressed snapshot archive.
+
+Examples:
+    python -m ax_agent_factory.cli.snapshot export 12 runs/job12.axsnap.jsonl.gz
+    python -m ax_agent_factory.cli.snapshot export 12 job12.jsonl.gz --include-logs
+    python -m ax_agent_factory.cli.snapshot import job12.jsonl.gz --db data/staging.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Optional
+
+from ax_agent_factory.infra import db, snapshot
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AX Agent Factory job-run snapshot export/import.")
+    parser.add_argument("--db", help="SQLite path (default: AX_DB_PATH or data/ax_factory.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Write one job run to a gzip JSONL archive")
+    export.add_argument("job_run_id", type=int)
+    export.add_argument("path")
+    export.add_argument("--include-logs", action="store_true", help="Also export llm_call_logs rows")
+    imp = sub.add_parser("import", help="Restore an archive as a new job run")
+    imp.add_argument("path")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.set_db_path(args.db)
+    start = time.perf_counter()
+    if args.command == "export":
+        info = snapshot.export_job_run(args.job_run_id, args.path, include_logs=args.include_logs)
+        action = f"Exported job_run {info.job_run_id} to {args.path}"
+    else:
+        info = snapshot.import_job_run(args.path)
+        action = f"Imported {args.path} as job_run {info.job_run_id}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{action} ({sum(info.rows.values())} rows, {elapsed_ms:.0f} ms)")
+    for table, count in info.rows.items():
+        print(f"  {table:<30} {count:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
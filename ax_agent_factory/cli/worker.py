@@ -0,0 +1,68 @@
+"""Run job_queue workers: claim queued stage targets and execute them.
+
+Examples:
+    python -m ax_agent_factory.cli.worker --threads 4
+    python -m ax_agent_factory.cli.worker --once          # drain the queue and exit
+
+Start as many worker processes as the LLM quota allows; they share the queue through
+the database (see infra/job_queue.py for leases, retries and the dead-letter state).
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+from typing import Optional
+
+from ax_agent_factory.core import queue_worker
+from ax_agent_factory.infra import db, job_queue
+from ax_agent_factory.infra.logging_config import setup_logging
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Execute queued pipeline runs (job_queue table).")
+    parser.add_argument("--db", help="SQLite path (default: AX_DB_PATH or data/ax_factory.db)")
+    parser.add_argument("--threads", type=int, default=1, help="Worker threads in this process")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue has no due item")
+    parser.add_argument("--max-items", type=int, help="Exit after each thread processed this many items")
+    parser.add_argument("--poll", type=float, default=queue_worker.DEFAULT_POLL_S, help="Seconds between empty polls")
+    parser.add_argument("--lease", type=int, help="Lease seconds (default: AX_QUEUE_LEASE_S or 120)")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db.set_db_path(args.db)
+    workers = [
+        queue_worker.QueueWorker(queue_worker.default_worker_id(n), lease_s=args.lease, poll_s=args.poll)
+        for n in range(max(1, args.threads))
+    ]
+    counts = [0] * len(workers)
+
+    def run(n: int) -> None:
+        counts[n] = workers[n].run(max_items=args.max_items, until_empty=args.once)
+
+    threads = [threading.Thread(target=run, args=(n,), name=f"worker-{n}") for n in range(len(workers))]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(0.5)
+    except KeyboardInterrupt:
+        logging.getLogger(__name__).info("Stopping after the current items...")
+        for w in workers:
+            w.stop()
+        for t in threads:
+            t.join()
+    depth = job_queue.refresh_queue_depth()
+    print(f"processed {sum(counts)} items; queued {depth['queued']}, running {depth['running']}")
+    return 0
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
@@ -0,0 +1,446 @@
+"""Headless batch execution of job requests through PipelineManager (Stage 0~2, optionally AX 4~8).
+
+Requests come from a JSONL or CSV file with company_name and job_title columns
+(manual_jd_text, industry_context and business_goal are optional). Each request is
+keyed by db.job_run_dedup_hash, so duplicates in the input run once and map onto
+the same job_run as the UI would.
+
+Progress goes to an append-only checkpoint file (JSONL, flushed and fsynced per
+line): one record when a request starts, one per completed stage and one when it
+finishes or fails. Running the same batch again with the same checkpoint skips
+finished requests; an interrupted one runs with resume=True (stages done in
+stage_runs are restored from their artifacts or the DB without LLM calls).
+
+Requests run on a thread pool in this process by default. With processes=N they are
+sharded by key across N worker processes (pydantic validation and JSON repair are
+CPU-bound and serialize on the GIL); on the native SQLite path every write of those
+processes goes through one writer thread in this process (infra/db_writer.py), so
+they never contend for the database lock. run_scaling() runs the same requests at
+1/2/4/8 processes on scratch databases and reports speedup and efficiency.
+
+This module must stay importable without streamlit (batch CLI, workers).
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.infra import circuit_breaker, db, db_writer, events, storage
+
+logger = logging.getLogger(__name__)
+
+REQUEST_FIELDS = ("company_name", "job_title", "manual_jd_text", "industry_context", "business_goal")
+DEFAULT_BATCH_WORKERS = 4
+DEFAULT_SCALING_PROCESSES = (1, 2, 4, 8)
+_SUMMED_FIELDS = (
+    "requests", "duplicates", "skipped", "succeeded", "failed", "llm_calls", "tokens_prompt", "tokens_completion",
+    "tokens_total", "stub_fallback", "llm_errors",
+)
+
+
+@dataclass
+class BatchRequest:
+    """One (company, job_title) pipeline request."""
+
+    company_name: str
+    job_title: str
+    manual_jd_text: Optional[str] = None
+    industry_context: Optional[str] = None
+    business_goal: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return db.job_run_dedup_hash(self.company_name, self.job_title, self.manual_jd_text)
+
+
+def load_requests(path: str) -> list[BatchRequest]:
+    """Parse a .jsonl/.json-lines or .csv request file (blank optional fields become None)."""
+    source = Path(path)
+    with source.open(encoding="utf-8", newline="") as fh:
+        if source.suffix.lower() == ".csv":
+            rows = list(csv.DictReader(fh))
+        else:
+            rows = [json.loads(line) for line in fh if line.strip()]
+    requests: list[BatchRequest] = []
+    for n, row in enumerate(rows, start=1):
+        values = {k: (str(row[k]).strip() or None) if row.get(k) is not None else None for k in REQUEST_FIELDS}
+        if not values["company_name"] or not values["job_title"]:
+            raise ValueError(f"{path}: request {n} needs company_name and job_title")
+        requests.append(BatchRequest(**values))
+    return requests
+
+
+class BatchCheckpoint:
+    """Append-only JSONL progress log; state() folds it into the latest status per request key."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def record(self, key: str, event: str, **fields) -> None:
+        line = json.dumps({"key": key, "event": event, "at": datetime.utcnow().isoformat(), **fields}, ensure_ascii=False)
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def state(self) -> dict[str, dict]:
+        states: dict[str, dict] = {}
+        if not self.path.exists():
+            return states
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:  # torn last line after a crash
+                    continue
+                state = states.setdefault(record["key"], {"status": None, "job_run_id": None, "stages": []})
+                if record["event"] == "started":
+                    state.update(status="running", job_run_id=record.get("job_run_id"))
+                elif record["event"] == "stage":
+                    state["stages"].append(record["stage"])
+                elif record["event"] in ("done", "failed"):
+                    state.update(status=record["event"], error=record.get("error"))
+        return states
+
+
+@dataclass
+class BatchSummary:
+    """Outcome of one run_batch call (written as summary.json)."""
+
+    requests: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    llm_calls: int = 0
+    tokens_prompt: int = 0
+    tokens_completion: int = 0
+    tokens_total: int = 0
+    stub_fallback: int = 0
+    llm_errors: int = 0
+    failures: list[dict] = field(default_factory=list)
+    processes: int = 0  # 0: thread pool in the calling process
+    db_writes: int = 0  # writes (and group commits) of the single-writer actor in process mode
+    db_write_groups: int = 0
+    scaling: list[dict] = field(default_factory=list)
+
+    @property
+    def runs_per_min(self) -> float:
+        executed = self.succeeded + self.failed
+        return executed * 60 / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "runs_per_min": round(self.runs_per_min, 2)}
+
+    def add(self, shard: dict) -> None:
+        """Fold a worker process's summary (to_dict()) into this one."""
+        for name in _SUMMED_FIELDS:
+            setattr(self, name, getattr(self, name) + shard[name])
+        self.failures.extend(shard["failures"])
+
+    def format(self) -> str:
+        lines = [
+            f"requests {self.requests} (duplicates {self.duplicates}, already done {self.skipped})",
+            f"succeeded {self.succeeded}, failed {self.failed} in {self.elapsed_s:.1f}s ({self.runs_per_min:.1f} runs/min)",
+            f"LLM calls {self.llm_calls}, tokens {self.tokens_total} (prompt {self.tokens_prompt}, "
+            f"completion {self.tokens_completion}), stub fallbacks {self.stub_fallback}, errors {self.llm_errors}",
+        ]
+        if self.processes:
+            lines.append(
+                f"{self.processes} processes, {self.db_writes} DB writes in {self.db_write_groups} group commits"
+            )
+        lines += [f"  FAILED {f['company_name']} / {f['job_title']}: {f['error']}" for f in self.failures]
+        if self.scaling:
+            lines.append("processes  elapsed_s  runs/min  speedup  efficiency")
+            lines += [
+                f"{r['processes']:>9}  {r['elapsed_s']:>9.1f}  {r['runs_per_min']:>8.1f}  {r['speedup']:>7.2f}  "
+                f"{r['efficiency']:>10.0%}"
+                for r in self.scaling
+            ]
+        return "\n".join(lines)
+
+
+def run_request(
+    request: BatchRequest,
+    *,
+    target: str = "2.2",
+    ax_target: Optional[str] = None,
+    checkpoint: Optional[BatchCheckpoint] = None,
+    resume: bool = False,
+    pipeline: Optional[PipelineManager] = None,
+    on_event: Optional[events.Listener] = None,
+) -> int:
+    """Run one request to target (or on to AX stage ax_target); returns its job_run id. on_event gets its progress events."""
+    pipeline = pipeline or PipelineManager()
+    job_run = pipeline.create_or_get_job_run(
+        request.company_name,
+        request.job_title,
+        request.manual_jd_text,
+        industry_context=request.industry_context,
+        business_goal=request.business_goal,
+    )
+
+    def on_stage_done(stage_id: str, _result) -> None:
+        if checkpoint is not None:
+            checkpoint.record(request.key, "stage", stage=stage_id, job_run_id=job_run.id)
+
+    if checkpoint is not None:
+        checkpoint.record(request.key, "started", job_run_id=job_run.id)
+    with events.subscribe(on_event):
+        pipeline.run_pipeline_until_stage(
+            job_run, ax_target or target, manual_jd_text=request.manual_jd_text, on_stage_done=on_stage_done, resume=resume
+        )
+    return job_run.id
+
+
+def run_batch(
+    requests: list[BatchRequest],
+    *,
+    checkpoint_path: str,
+    target: str = "2.2",
+    ax_target: Optional[str] = None,
+    workers: int = DEFAULT_BATCH_WORKERS,
+    retries: int = 0,
+    processes: Optional[int] = None,
+    on_event: Optional[events.Listener] = None,
+) -> BatchSummary:
+    """
+    Run every request not yet finished in checkpoint_path on a pool of `workers` threads,
+    or with processes=N, on N worker processes running `workers` threads each.
+    on_event receives every request's progress events (in process mode it is pickled
+    to the worker processes, so pass a module-level function).
+    """
+    if processes:
+        return _run_processes(
+            requests,
+            processes=processes,
+            checkpoint_path=checkpoint_path,
+            target=target,
+            ax_target=ax_target,
+            workers=workers,
+            retries=retries,
+            on_event=on_event,
+        )
+    checkpoint = BatchCheckpoint(checkpoint_path)
+    states = checkpoint.state()
+    summary = BatchSummary(requests=len(requests))
+    pending: dict[str, BatchRequest] = {}
+    seen: set[str] = set()
+    for request in requests:
+        if request.key in seen:
+            summary.duplicates += 1
+            continue
+        seen.add(request.key)
+        if (states.get(request.key) or {}).get("status") == "done":
+            summary.skipped += 1
+        else:
+            pending[request.key] = request
+    lock = threading.Lock()
+
+    def execute(request: BatchRequest) -> None:
+        started_at = datetime.utcnow().isoformat()
+        resume = request.key in states
+        job_run_id: Optional[int] = None
+        error: Optional[str] = None
+        for attempt in range(retries + 1):
+            try:
+                job_run_id = run_request(
+                    request,
+                    target=target,
+                    ax_target=ax_target,
+                    checkpoint=checkpoint,
+                    resume=resume or attempt > 0,
+                    on_event=on_event,
+                )
+                error = None
+                break
+            except Exception as exc:
+                logger.exception(
+                    "Batch request %s / %s failed (attempt %d)", request.company_name, request.job_title, attempt + 1
+                )
+                error = f"{type(exc).__name__}: {exc}"
+                if isinstance(exc, circuit_breaker.CircuitOpenError) and attempt < retries:
+                    time.sleep(exc.retry_after_s)  # retrying before the circuit may close would fail the same way
+        if error is None:
+            checkpoint.record(request.key, "done", job_run_id=job_run_id)
+        else:
+            checkpoint.record(request.key, "failed", error=error)
+            job_run_id = db.create_or_get_job_run(request.company_name, request.job_title, request.manual_jd_text).id
+        totals = db.get_llm_call_totals(job_run_id, since=started_at)
+        with lock:
+            if error is None:
+                summary.succeeded += 1
+            else:
+                summary.failed += 1
+                summary.failures.append(
+                    {"company_name": request.company_name, "job_title": request.job_title, "error": error}
+                )
+            summary.llm_calls += totals["calls"]
+            summary.tokens_prompt += totals["tokens_prompt"]
+            summary.tokens_completion += totals["tokens_completion"]
+            summary.tokens_total += totals["tokens_total"]
+            summary.stub_fallback += totals["stub_fallback"]
+            summary.llm_errors += totals["errors"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+        list(pool.map(execute, pending.values()))
+    summary.elapsed_s = time.perf_counter() - start
+    return summary
+
+
+def shard_requests(requests: list[BatchRequest], processes: int) -> list[list[BatchRequest]]:
+    """Split requests into `processes` shards by key (duplicates land in the same shard, order kept)."""
+    shards: list[list[BatchRequest]] = [[] for _ in range(processes)]
+    for request in requests:
+        shards[int(request.key[:8], 16) % processes].append(request)
+    return shards
+
+
+def _run_shard(
+    worker: str,
+    db_path: str,
+    requests: list[BatchRequest],
+    options: dict,
+    writes: Optional[Any],
+    replies: Optional[Any],
+    results: Any,
+) -> None:
+    """Worker process entry point: run one shard, forwarding writes to the parent's DBWriter."""
+    try:
+        db.set_db_path(db_path)
+        if writes is not None:
+            storage.set_writer(db_writer.WriterClient(worker, writes, replies))
+        results.put((worker, run_batch(requests, **options).to_dict(), None))
+    except BaseException as exc:
+        results.put((worker, None, f"{type(exc).__name__}: {exc}"))
+
+
+def _run_processes(requests: list[BatchRequest], *, processes: int, **options) -> BatchSummary:
+    ctx = multiprocessing.get_context("spawn")
+    writer = db_writer.DBWriter(ctx).start() if storage.get_store() is None else None
+    results = ctx.Queue()
+    procs: list[Any] = []
+    running: dict[str, tuple[Any, int]] = {}
+    summary = BatchSummary(processes=processes)
+    start = time.perf_counter()
+    try:
+        for n, shard in enumerate(shard_requests(requests, processes)):
+            if not shard:
+                continue
+            worker = f"shard-{n}"
+            proc = ctx.Process(
+                target=_run_shard,
+                args=(
+                    worker,
+                    db.DB_PATH,
+                    shard,
+                    options,
+                    writer.requests if writer else None,
+                    writer.reply_queue(worker) if writer else None,
+                    results,
+                ),
+                name=f"batch-{worker}",
+            )
+            proc.start()
+            procs.append(proc)
+            running[worker] = (proc, len(shard))
+        exited: set[str] = set()
+        while running:
+            try:
+                worker, shard_summary, error = results.get(timeout=1.0)
+            except queue.Empty:
+                # A process that died without reporting gets one more poll for a result still in flight.
+                for worker, (proc, size) in list(running.items()):
+                    if proc.is_alive():
+                        continue
+                    if worker in exited:
+                        del running[worker]
+                        summary.requests += size
+                        summary.failed += size
+                        summary.failures.append(
+                            {"company_name": worker, "job_title": f"{size} requests", "error": f"exit code {proc.exitcode}"}
+                        )
+                    exited.add(worker)
+                continue
+            _, size = running.pop(worker)
+            if shard_summary is not None:
+                summary.add(shard_summary)
+            else:
+                summary.requests += size
+                summary.failed += size
+                summary.failures.append({"company_name": worker, "job_title": f"{size} requests", "error": error})
+    finally:
+        for proc, _ in running.values():
+            proc.terminate()
+        for proc in procs:
+            proc.join()
+        if writer is not None:
+            writer.stop()
+    summary.elapsed_s = time.perf_counter() - start
+    if writer is not None:
+        summary.db_writes = writer.stats.calls
+        summary.db_write_groups = writer.stats.groups
+    return summary
+
+
+def run_scaling(
+    requests: list[BatchRequest],
+    *,
+    out_dir: str,
+    process_counts: Iterable[int] = DEFAULT_SCALING_PROCESSES,
+    **options,
+) -> BatchSummary:
+    """
+    Run the same requests once per process count, each on a fresh database and checkpoint
+    under out_dir (the configured DB is not touched). Returns the last run's summary with
+    `scaling` rows: elapsed time, throughput, speedup over the first run and efficiency
+    (speedup / ideal speedup).
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    original = db.DB_PATH
+    rows: list[dict] = []
+    summary = BatchSummary()
+    try:
+        for processes in process_counts:
+            db_path = out / f"scaling-p{processes}.db"
+            checkpoint = out / f"scaling-p{processes}.checkpoint.jsonl"
+            for path in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm"), checkpoint):
+                path.unlink(missing_ok=True)
+            db.set_db_path(str(db_path))
+            summary = run_batch(requests, checkpoint_path=str(checkpoint), processes=processes, **options)
+            rows.append(
+                {
+                    "processes": processes,
+                    "elapsed_s": round(summary.elapsed_s, 3),
+                    "runs_per_min": round(summary.runs_per_min, 2),
+                    "succeeded": summary.succeeded,
+                    "failed": summary.failed,
+                }
+            )
+    finally:
+        db.set_db_path(original)
+    base = rows[0] if rows else None
+    for row in rows:
+        speedup = base["elapsed_s"] / row["elapsed_s"] if row["elapsed_s"] else 0.0
+        row["speedup"] = round(speedup, 2)
+        row["efficiency"] = round(speedup / (row["processes"] / base["processes"]), 3)
+    summary.scaling = rows
+    return summary
@@ -50,23 +50,14 @@ class StaticTaskClassifier:
                 result.llm_raw_text = llm_output.get("_raw_text")  # type: ignore[attr-defined]
                 result.llm_cleaned_json = llm_output.get("_cleaned_json")  # type: ignore[attr-defined]
                 result.llm_error = llm_output.get("llm_error")  # type: ignore[attr-defined]
-            if job_run_id is not None:
-                try:
-                    db.apply_static_classification(job_run_id, result.task_static_meta)
-                except Exception:
-                    logger.exception("Failed to persist static classification to job_tasks")
-            return result
         except InvalidLLMJsonError:
             logger.warning("Static classifier JSON parse failed; returning stub", exc_info=False)
             result = self._stub_result(phase_result)
         except Exception:
             logger.error("Static classifier unexpected error", exc_info=True)
             raise
-        if job_run_id is not None:
-            try:
-                db.apply_static_classification(job_run_id, result.task_static_meta)
-            except Exception:
-                logger.exception("Failed to persist static classification to job_tasks")
+        if job_run_id is not None:  # a failed write fails the stage (it runs in the stage's unit of work)
+            db.apply_static_classification(job_run_id, result.task_static_meta)
         return result
 
     def _stub_result(self, phase_result: PhaseClassificationResult) -> StaticClassificationResult:
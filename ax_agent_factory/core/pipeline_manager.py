@@ -2,28 +2,41 @@
 
 from __future__ import annotations
 
+import contextlib
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Union
 
-from ax_agent_factory.core import research
+from ax_agent_factory.core import research, stage_runner_ax, stage_state
 from ax_agent_factory.core.ivc.phase_classifier import IVCPhaseClassifier
 from ax_agent_factory.core.ivc.pipeline import run_ivc_pipeline
 from ax_agent_factory.core.ivc.static_classifier import run_static_classifier
 from ax_agent_factory.core.ivc.task_extractor import IVCTaskExtractor
 from ax_agent_factory.core.schemas.common import IVCTaskListInput, JobInput, JobMeta
+from ax_agent_factory.core.stage_scheduler import ExecutionPlan, StageScheduler, StageTask, stage_dependencies
 from ax_agent_factory.core.workflow import WorkflowMermaidRenderer, WorkflowStructPlanner, run_workflow
 from ax_agent_factory.models.job_run import JobResearchResult, JobRun
 from ax_agent_factory.models.stages import PIPELINE_STAGES, StageMeta
-from ax_agent_factory.infra import db
+from ax_agent_factory.infra import artifacts, db, events, metrics, tracing
 
 logger = logging.getLogger(__name__)
 
+# run_pipeline_until_stage result key per stage (also what a stage artifact restores).
+STAGE_RESULT_KEYS: dict[str, str] = {s.id: s.output for s in PIPELINE_STAGES}
+# Upstream stages per stage (from declared inputs/outputs); their output hashes feed the artifact key.
+STAGE_DEPENDENCIES: dict[str, tuple[str, ...]] = stage_dependencies(PIPELINE_STAGES)
+# Stages whose worker threads persist each item as it completes (Stage 6: one deep research
+# doc per agent). They run outside the stage's unit of work, which would otherwise hold the
+# write lock those threads wait on; only the artifact and "done" marker commit together.
+PER_ITEM_COMMIT_STAGES = frozenset({"S6_DEEP_SKILL_RESEARCH"})
+
 
 class PipelineManager:
     """Manage stage execution and caching across the pipeline."""
 
-    def __init__(self) -> None:
+    def __init__(self, *, max_workers: Optional[int] = None) -> None:
         self.stages = sorted(PIPELINE_STAGES, key=lambda s: (s.ui_group, s.ui_step))
+        self.max_workers = max_workers
 
     def create_or_get_job_run(
         self,
@@ -124,10 +137,8 @@ class PipelineManager:
         )
         extractor = IVCTaskExtractor(llm_client=llm_client)
         result = extractor.run(job_input, job_run_id=job_run.id)
-        try:
-            db.save_task_atoms(job_run.id, result.task_atoms)
-        except Exception:
-            logger.exception("Failed to persist task_atoms for Stage 1.1")
+        # Not caught: a failed write must fail the stage (see Stage 2.1).
+        db.save_task_atoms(job_run.id, result.task_atoms)
         return result
 
     def run_stage_1_2_phase_classifier(
@@ -157,10 +168,7 @@ class PipelineManager:
         classifier = IVCPhaseClassifier(llm_client=llm_client)
         result = classifier.run(classifier_input, job_run_id=job_run.id)
         result.task_atoms = task_extraction_result.task_atoms
-        try:
-            db.apply_ivc_classification(job_run.id, result.ivc_tasks)
-        except Exception:
-            logger.exception("Failed to persist IVC classification for Stage 1.2")
+        db.apply_ivc_classification(job_run.id, result.ivc_tasks)
         return result
 
     def run_stage_2_dna(self, *args, **kwargs):  # pragma: no cover - stub
@@ -196,11 +204,12 @@ class PipelineManager:
                 ]
             ivc_payload["static_summary"] = getattr(static_result, "static_summary", None)
         plan = planner.run(job_meta, ivc_payload, job_run_id=job_run.id)
-        try:
+        # Not caught: inside a pipeline stage this joins the stage's unit of work, and a
+        # failure here rolls the whole stage back, so the stage must fail with it. The
+        # same holds for every stage's result writes; only LLM parse failures fall back.
+        with db.transaction():
             db.apply_workflow_plan(job_run.id, plan)
             db.save_workflow_plan(job_run.id, plan)
-        except Exception:
-            logger.exception("Failed to persist workflow struct plan")
         return plan
 
     def run_stage_2_2_workflow_mermaid(self, job_run: JobRun, workflow_plan, *, llm_client=None):
@@ -208,10 +217,7 @@ class PipelineManager:
             raise ValueError("job_run is required for Stage 2.2 Workflow")
         renderer = WorkflowMermaidRenderer(llm_client=llm_client)
         mermaid = renderer.run(workflow_plan, job_run_id=job_run.id)
-        try:
-            db.save_workflow_mermaid_result(job_run.id, workflow_plan, mermaid)
-        except Exception:
-            logger.exception("Failed to persist workflow mermaid result")
+        db.save_workflow_mermaid_result(job_run.id, workflow_plan, mermaid)
         return mermaid
 
     def run_stage_3_workflow(self, *args, **kwargs):  # pragma: no cover - stub
@@ -247,6 +253,10 @@ class PipelineManager:
             return order[-1]
         return order[idx + 1]
 
+    def execution_plan(self, target_ui_label: str) -> ExecutionPlan:
+        """Stages run_pipeline_until_stage(target_ui_label) would schedule, in dependency levels."""
+        return StageScheduler(self._implemented_stages(), {}, max_workers=self.max_workers).plan([target_ui_label])
+
     def run_pipeline_until_stage(
         self,
         job_run: JobRun,
@@ -254,84 +264,245 @@ class PipelineManager:
         *,
         manual_jd_text: Optional[str] = None,
         llm_client=None,
+        force_rerun: Union[bool, Iterable[str]] = False,
+        on_stage_done: Optional[Callable[[str, Any], None]] = None,
+        resume: bool = False,
     ) -> dict:
-        """Execute stages sequentially until target_ui_label."""
-        results: dict = {}
-        label_to_stage = {s.ui_label: s for s in self.stages}
-        target_stage = label_to_stage.get(target_ui_label)
-        if target_stage is None:
+        """
+        Execute the target stage and every stage it depends on (Stage 0~2 and AX 4~8).
+
+        Dependencies come from StageMeta inputs/outputs; StageScheduler runs each stage
+        on its worker pool as soon as the stages producing its inputs are done (see
+        execution_plan()). Stages after the target are not run.
+
+        A stage whose inputs (upstream outputs, prompt, model, job meta) hash to its
+        current stage artifact is not re-executed; the stored result is loaded instead.
+        force_rerun=True re-executes every stage; an iterable of stage ids or UI labels
+        (e.g. {"0.1"}) re-executes just those, and downstream stages follow whenever the
+        forced output differs. on_stage_done(stage_id, result) is called as each stage
+        completes (executed or loaded); subscribe with infra.events for finer progress
+        (stage_started/stage_finished with timings and tokens, each LLM call).
+
+        Every stage's state is kept in stage_runs; "done" commits together with the
+        stage's results. resume=True continues after a crash: stages already done are
+        not re-executed even if their inputs changed since (their result comes from the
+        recorded artifact, or is rebuilt from the DB), and execution continues from the
+        first stage that is not done (see resume_point()).
+        """
+        if not any(s.ui_label == target_ui_label for s in self.stages):
             raise ValueError(f"Unknown target_ui_label: {target_ui_label}")
+        forced = self._resolve_force_rerun(force_rerun)
+        runs = db.get_stage_runs(job_run.id)
+        output_hashes: dict[str, str] = {}
+        stage_config = {
+            "job": [job_run.company_name, job_run.job_title, job_run.industry_context, job_run.business_goal],
+            "manual_jd_text": manual_jd_text,
+        }
 
-        def _should_run(stage: StageMeta) -> bool:
-            if stage.ui_group < target_stage.ui_group:
-                return True
-            if stage.ui_group == target_stage.ui_group and stage.ui_step <= target_stage.ui_step:
-                return True
-            return False
-
-        # Stage execution
-        for stage in self.stages:
-            if not stage.implemented or not _should_run(stage):
-                continue
-            if stage.id == "S0_1_COLLECT":
-                collect = self.run_stage_0_1_collect(job_run, manual_jd_text=manual_jd_text)
-                results["stage0_collect"] = collect
-            elif stage.id == "S0_2_SUMMARIZE":
-                summarize = self.run_stage_0_2_summarize(
-                    job_run,
-                    collect_result=results.get("stage0_collect"),
-                    manual_jd_text=manual_jd_text,
-                )
-                results["stage0_summarize"] = summarize
-            elif stage.id == "S1_1_TASK_EXTRACT":
-                job_research = results.get("stage0_summarize") or db.get_job_research_result(job_run.id)
-                extraction = self.run_stage_1_1_task_extractor(
-                    job_run, job_research_result=job_research, llm_client=llm_client
-                )
-                results["stage1_task_extract"] = extraction
-            elif stage.id == "S1_2_PHASE_CLASSIFY":
-                job_research = results.get("stage0_summarize") or db.get_job_research_result(job_run.id)
-                extraction = results.get("stage1_task_extract")
-                phase = self.run_stage_1_2_phase_classifier(
-                    job_run,
-                    task_extraction_result=extraction,
-                    job_research_result=job_research,
-                    llm_client=llm_client,
-                )
-                results["stage1_phase"] = phase
-            elif stage.id == "S1_3_STATIC_CLASSIFY":
-                phase = results.get("stage1_phase")
-                if phase is None:
-                    job_research = results.get("stage0_summarize") or db.get_job_research_result(job_run.id)
-                    extraction = results.get("stage1_task_extract")
-                    phase = self.run_stage_1_2_phase_classifier(
-                        job_run,
-                        task_extraction_result=extraction,
-                        job_research_result=job_research,
-                        llm_client=llm_client,
+        def scheduled(stage: StageMeta, run: Callable[[dict], Any]) -> StageTask:
+            def task(inputs: dict) -> Any:
+                with tracing.span(f"stage.{stage.id}", ui_label=stage.ui_label) as stage_span, metrics.track_stage(
+                    stage.id
+                ), events.stage(stage.id, job_run_id=job_run.id) as progress:
+                    started_at = datetime.utcnow().isoformat()
+                    key = artifacts.input_hash(
+                        stage.id,
+                        upstream={dep: output_hashes.get(dep) for dep in STAGE_DEPENDENCIES[stage.id]},
+                        prompt_name=stage.prompt_name,
+                        config=stage_config,
+                        client=llm_client,
                     )
-                    results["stage1_phase"] = phase
-                static_result = self.run_stage_1_3_static(job_run=job_run, phase_result=phase, llm_client=llm_client)
-                results["stage1_static"] = static_result
-            elif stage.id == "S2_1_WORKFLOW_STRUCT":
-                phase = results.get("stage1_phase")
-                if phase is None:
-                    raise ValueError("Phase result missing for Workflow Struct")
-                plan = self.run_stage_2_1_workflow_struct(
-                    job_run, phase, static_result=results.get("stage1_static"), llm_client=llm_client
-                )
-                results["stage2_plan"] = plan
-            elif stage.id == "S2_2_WORKFLOW_MERMAID":
-                plan = results.get("stage2_plan")
-                if plan is None:
-                    phase = results.get("stage1_phase")
-                    if phase is None:
-                        raise ValueError("Workflow plan missing and phase_result unavailable")
-                    plan = self.run_stage_2_1_workflow_struct(
-                        job_run, phase, static_result=results.get("stage1_static"), llm_client=llm_client
-                    )
-                    results["stage2_plan"] = plan
-                mermaid = self.run_stage_2_2_workflow_mermaid(job_run, plan, llm_client=llm_client)
-                results["stage2_mermaid"] = mermaid
+                    previous = runs.get(stage.id)
+                    stored = None
+                    if stage.id in forced:
+                        artifacts.ARTIFACT_LOOKUPS.inc(stage=stage.id, result="forced")
+                    else:
+                        if resume and previous is not None and previous["status"] == "done":
+                            stored = self._restore_stage(job_run, stage.id, previous)
+                        if stored is None:
+                            stored = artifacts.load(job_run.id, stage.id, key)
+                    if stored is not None:
+                        output_hashes[stage.id] = stored.output_hash
+                        if stage_span is not None:
+                            stage_span.set_attribute("artifact", "hit")
+                        if progress is not None:
+                            progress.attributes["artifact"] = "hit"
+                        if previous is None or (previous["status"], previous["artifact_id"]) != ("done", stored.artifact_id):
+                            db.save_stage_run(
+                                job_run.id,
+                                stage.id,
+                                "done",
+                                started_at=started_at,
+                                input_hash=stored.input_hash,
+                                artifact_id=stored.artifact_id,
+                            )
+                        return stored.result
+                    try:
+                        with contextlib.ExitStack() as unit:
+                            if stage.id not in PER_ITEM_COMMIT_STAGES:
+                                # One commit per stage: the stage's results and its "done" marker land
+                                # together. The transaction begins at the first write (after the LLM
+                                # call returns); LLM call logs commit on their own (db.run_detached).
+                                unit.enter_context(db.transaction(immediate=False))
+                            result = run(inputs)
+                            with db.transaction(immediate=False):  # joins the stage's unit of work
+                                artifact_id = None
+                                if result is not None:
+                                    saved = artifacts.save(job_run.id, stage.id, key, result)
+                                    output_hashes[stage.id] = saved.output_hash
+                                    artifact_id = saved.artifact_id
+                                db.save_stage_run(
+                                    job_run.id,
+                                    stage.id,
+                                    "done",
+                                    started_at=started_at,
+                                    input_hash=key,
+                                    artifact_id=artifact_id,
+                                )
+                    except Exception as exc:
+                        db.save_stage_run(
+                            job_run.id,
+                            stage.id,
+                            "failed",
+                            started_at=started_at,
+                            input_hash=key,
+                            error=f"{type(exc).__name__}: {exc}",
+                        )
+                        raise
+                    return result
+
+            return StageTask(run=task)
+
+        runners = self._stage_runners(job_run, manual_jd_text=manual_jd_text, llm_client=llm_client)
+        scheduler = StageScheduler(
+            self._implemented_stages(),
+            {s.id: scheduled(s, runners[s.id]) for s in self._implemented_stages()},
+            max_workers=self.max_workers,
+        )
+
+        with tracing.span(
+            "pipeline.run_until_stage", job_run_id=job_run.id, target_ui_label=target_ui_label
+        ) as root_span, metrics.PIPELINE_RUNS_IN_PROGRESS.track_inprogress():
+            if root_span is not None and job_run.id is not None:
+                try:
+                    db.set_job_run_trace_id(job_run.id, root_span.trace_id)
+                    job_run.trace_id = root_span.trace_id
+                except Exception:
+                    logger.exception("Failed to store trace_id for job_run %s", job_run.id)
+            return scheduler.run([target_ui_label], on_stage_done=on_stage_done)
+
+    def resume_point(self, job_run: JobRun, target_ui_label: str) -> Optional[str]:
+        """First stage (in execution order) toward the target that is not done in stage_runs; None if all are."""
+        runs = db.get_stage_runs(job_run.id)
+        for stage_id in self.execution_plan(target_ui_label).stage_ids:
+            if (runs.get(stage_id) or {}).get("status") != "done":
+                return stage_id
+        return None
+
+    def _restore_stage(self, job_run: JobRun, stage_id: str, run: dict) -> Optional[artifacts.StageArtifact]:
+        """Result of a stage recorded as done: its artifact if readable, else rebuilt from the DB."""
+        if run["artifact_id"] is not None:
+            row = db.get_stage_artifact(run["artifact_id"])
+            stored = artifacts.from_row(row) if row else None
+            if stored is not None:
+                artifacts.ARTIFACT_LOOKUPS.inc(stage=stage_id, result="resumed")
+                return stored
+        result = stage_state.restore_result(job_run, stage_id)
+        if result is None:
+            return None
+        artifacts.ARTIFACT_LOOKUPS.inc(stage=stage_id, result="resumed")
+        return artifacts.describe(stage_id, run["input_hash"] or "", result)
+
+    def _implemented_stages(self) -> list[StageMeta]:
+        return [s for s in self.stages if s.implemented]
+
+    def _stage_runners(self, job_run: JobRun, *, manual_jd_text: Optional[str], llm_client) -> dict[str, Callable[[dict], Any]]:
+        """Stage id -> callable(inputs) that executes the stage (inputs keyed by StageMeta.inputs)."""
+
+        def collect(inputs: dict):
+            return self.run_stage_0_1_collect(job_run, manual_jd_text=manual_jd_text)
 
-        return results
+        def summarize(inputs: dict):
+            return self.run_stage_0_2_summarize(
+                job_run, collect_result=inputs["stage0_collect"], manual_jd_text=manual_jd_text
+            )
+
+        def task_extract(inputs: dict):
+            job_research = inputs["stage0_summarize"] or db.get_job_research_result(job_run.id)
+            return self.run_stage_1_1_task_extractor(job_run, job_research_result=job_research, llm_client=llm_client)
+
+        def phase_classify(inputs: dict):
+            job_research = inputs["stage0_summarize"] or db.get_job_research_result(job_run.id)
+            return self.run_stage_1_2_phase_classifier(
+                job_run,
+                task_extraction_result=inputs["stage1_task_extract"],
+                job_research_result=job_research,
+                llm_client=llm_client,
+            )
+
+        def static_classify(inputs: dict):
+            if inputs["stage1_phase"] is None:
+                raise ValueError("Phase result missing for Static classifier")
+            return self.run_stage_1_3_static(job_run=job_run, phase_result=inputs["stage1_phase"], llm_client=llm_client)
+
+        def workflow_struct(inputs: dict):
+            if inputs["stage1_phase"] is None:
+                raise ValueError("Phase result missing for Workflow Struct")
+            return self.run_stage_2_1_workflow_struct(
+                job_run, inputs["stage1_phase"], static_result=inputs["stage1_static"], llm_client=llm_client
+            )
+
+        def workflow_mermaid(inputs: dict):
+            if inputs["stage2_plan"] is None:
+                raise ValueError("Workflow plan missing for Workflow Mermaid")
+            return self.run_stage_2_2_workflow_mermaid(job_run, inputs["stage2_plan"], llm_client=llm_client)
+
+        def ax_workflow(inputs: dict):
+            if inputs["stage2_mermaid"] is None:
+                raise ValueError("Workflow Mermaid missing for AX Workflow")
+            return stage_runner_ax.run_stage4_ax_workflow(job_run.id, inputs["stage2_mermaid"].mermaid_code)
+
+        def agent_architect(inputs: dict):
+            return stage_runner_ax.run_stage5_agent_architect(job_run.id)
+
+        def deep_skill_research(inputs: dict):
+            return stage_runner_ax.run_stage6_deep_skill_research(job_run.id)
+
+        def skill_extract(inputs: dict):
+            return stage_runner_ax.run_stage7_skill_extractor(
+                job_run.id, deep_research_results=inputs["stage6_deep_research"]
+            )
+
+        def prompt_build(inputs: dict):
+            return stage_runner_ax.run_stage8_prompt_builder(job_run.id)
+
+        return {
+            "S0_1_COLLECT": collect,
+            "S0_2_SUMMARIZE": summarize,
+            "S1_1_TASK_EXTRACT": task_extract,
+            "S1_2_PHASE_CLASSIFY": phase_classify,
+            "S1_3_STATIC_CLASSIFY": static_classify,
+            "S2_1_WORKFLOW_STRUCT": workflow_struct,
+            "S2_2_WORKFLOW_MERMAID": workflow_mermaid,
+            "S4_AX_WORKFLOW": ax_workflow,
+            "S5_AGENT_ARCHITECT": agent_architect,
+            "S6_DEEP_SKILL_RESEARCH": deep_skill_research,
+            "S7_SKILL_EXTRACT": skill_extract,
+            "S8_PROMPT_BUILD": prompt_build,
+        }
+
+    def _resolve_force_rerun(self, force_rerun: Union[bool, Iterable[str]]) -> set[str]:
+        """Stage ids to re-execute regardless of stored artifacts (accepts ids or UI labels)."""
+        if force_rerun is True:
+            return {s.id for s in self.stages}
+        if not force_rerun:
+            return set()
+        by_label = {s.ui_label: s.id for s in self.stages}
+        known = {s.id for s in self.stages}
+        forced = set()
+        for item in force_rerun:
+            stage_id = by_label.get(item, item)
+            if stage_id not in known:
+                raise ValueError(f"Unknown stage for force_rerun: {item}")
+            forced.add(stage_id)
+        return forced
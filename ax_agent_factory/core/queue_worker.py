@@ -0,0 +1,144 @@
+"""Worker loop that executes job_queue items (infra/job_queue.py) outside the UI process.
+
+Each QueueWorker claims one item at a time, runs PipelineManager to the item's target
+(or on to AX stage ax_target) and marks it done or failed. While an item runs, a
+heartbeat thread extends the lease every lease/3 seconds; a heartbeat that fails
+(database is locked) is logged and retried on the next beat, and only a rejected one
+means the lease was lost. Every completed stage is written to the item's progress
+right away, so the UI can poll it. A retry (after a failure or a crashed worker) runs
+with resume=True: stages done in stage_runs are not re-executed. When a stage hits an
+open LLM circuit (infra/circuit_breaker.py) the item is deferred without using an
+attempt and the worker pauses until the circuit may close.
+
+    python -m ax_agent_factory.cli.worker --threads 4
+
+This module must stay importable without streamlit.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.infra import circuit_breaker, db, job_queue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_S = 1.0
+
+
+def default_worker_id(n: int = 0) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{n}"
+
+
+class LeaseLost(RuntimeError):
+    """The item's lease expired and another worker may have claimed it."""
+
+
+class QueueWorker:
+    """Claims and runs queue items until stopped (run) or the queue is empty (run_once)."""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        *,
+        lease_s: Optional[int] = None,
+        poll_s: float = DEFAULT_POLL_S,
+        pipeline: Optional[PipelineManager] = None,
+    ) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_s = lease_s or job_queue.lease_seconds()
+        self.poll_s = poll_s
+        self.pipeline = pipeline or PipelineManager()
+        self.stop_event = threading.Event()
+        self.paused_until = 0.0  # time.monotonic() before which no item is claimed (open LLM circuit)
+
+    def process(self, item: dict) -> Optional[str]:
+        """Run one claimed item; returns its new status ("done", "queued", "dead") or None if the lease was lost."""
+        item_id = item["id"]
+        progress = job_queue.item_progress(item)
+        stages: list[str] = list(progress["stages"])
+        lost = threading.Event()
+        finished = threading.Event()
+
+        def beat() -> None:
+            try:
+                renewed = job_queue.heartbeat_job(item_id, self.worker_id, lease_s=self.lease_s, progress={"stages": stages})
+            except Exception:  # transient (database is locked): the next beat renews the lease
+                logger.warning("Heartbeat for queue item %s failed; retrying", item_id, exc_info=True)
+                return
+            if not renewed:
+                lost.set()
+
+        def heartbeat_loop() -> None:
+            while not finished.wait(self.lease_s / 3):
+                beat()
+
+        def on_stage_done(stage_id: str, _result) -> None:
+            if lost.is_set():
+                raise LeaseLost(f"queue item {item_id} lost its lease")
+            stages.append(stage_id)
+            beat()
+
+        heartbeat = threading.Thread(target=heartbeat_loop, name=f"heartbeat-{item_id}", daemon=True)
+        heartbeat.start()
+        try:
+            job_run = db.get_job_run(item["job_run_id"])
+            if job_run is None:
+                raise LookupError(f"job_run {item['job_run_id']} not found")
+            self.pipeline.run_pipeline_until_stage(
+                job_run,
+                item["ax_target"] or item["target"],
+                manual_jd_text=item["manual_jd_text"],
+                force_rerun=json.loads(item["force_rerun_json"] or "[]"),
+                on_stage_done=on_stage_done,
+                resume=item["attempts"] > 1,
+            )
+        except circuit_breaker.CircuitOpenError as exc:
+            logger.warning("Queue item %s deferred %.0fs: %s", item_id, exc.retry_after_s, exc)
+            self.paused_until = time.monotonic() + exc.retry_after_s
+            deferred = job_queue.defer_job(item_id, self.worker_id, exc.retry_after_s, f"{type(exc).__name__}: {exc}")
+            status = "queued" if deferred else None
+        except Exception as exc:
+            logger.exception("Queue item %s failed (attempt %s)", item_id, item["attempts"])
+            status = job_queue.fail_job(item_id, self.worker_id, f"{type(exc).__name__}: {exc}")
+        else:
+            status = "done" if job_queue.complete_job(item_id, self.worker_id) else None
+        finally:
+            finished.set()
+            heartbeat.join()
+        if status is None:
+            logger.warning("Queue item %s: lease lost before the result was recorded", item_id)
+        job_queue.refresh_queue_depth()
+        return status
+
+    def run_once(self) -> bool:
+        """Claim and process one due item; False if there was none (or the worker is paused)."""
+        if time.monotonic() < self.paused_until:
+            return False
+        item = job_queue.claim_job(self.worker_id, lease_s=self.lease_s)
+        if item is None:
+            return False
+        self.process(item)
+        return True
+
+    def run(self, *, max_items: Optional[int] = None, until_empty: bool = False) -> int:
+        """Process items until stop(), max_items or (until_empty) an empty poll; returns the count."""
+        done = 0
+        while not self.stop_event.is_set() and (max_items is None or done < max_items):
+            if self.run_once():
+                done += 1
+            elif until_empty:
+                break
+            else:
+                self.stop_event.wait(self.poll_s)
+        return done
+
+    def stop(self) -> None:
+        self.stop_event.set()
@@ -13,6 +13,12 @@ if not hasattr(BaseModel, "model_dump"):  # type: ignore[attr-defined]
 
     BaseModel.model_dump = _model_dump  # type: ignore[attr-defined]
 
+if not hasattr(BaseModel, "model_dump_json"):  # type: ignore[attr-defined]
+    def _model_dump_json(self, *args, **kwargs):
+        return self.json(*args, **kwargs)
+
+    BaseModel.model_dump_json = _model_dump_json  # type: ignore[attr-defined]
+
 
 class JobMeta(BaseModel):
     """직무 메타 정보."""
@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
+import contextvars
+import functools
 import json
-from typing import List, Optional
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, List, Optional
 
 from ax_agent_factory.core.schemas.ax import (
     AgentPromptSet,
@@ -21,15 +28,59 @@ from ax_agent_factory.core.schemas.ax import (
     TaskCard,
     TaskCardLite,
 )
+from ax_agent_factory.core import stage_state
 from ax_agent_factory.core.schemas.common import JobMeta
+from ax_agent_factory.core.stage_scheduler import current_stage, stage_workers
 from ax_agent_factory.infra import (
     ax_agent_repo,
     ax_prompt_repo,
     ax_skill_repo,
     ax_workflow_repo,
+    circuit_breaker,
     db,
+    events,
     llm_client,
+    metrics,
+    tracing,
 )
+from ax_agent_factory.models.stages import AX_STAGES
+
+logger = logging.getLogger(__name__)
+
+
+_STAGE_IDS = {s.run_fn_name: s.id for s in AX_STAGES}
+
+
+def _stage_span(stage_name: str):
+    """
+    Trace span, stage metrics and progress events for an AX stage runner called on its own
+    (UI buttons), with the job_run pointed at the trace. Run as a PipelineManager stage, the
+    runner is already spanned, timed and reported under the stage id (and the pipeline's
+    root span set the trace id), so it just runs.
+    """
+
+    def decorator(fn):
+        stage_id = _STAGE_IDS[fn.__name__]
+
+        @functools.wraps(fn)
+        def wrapper(job_run_id: int, *args, **kwargs):
+            if current_stage() is not None:
+                return fn(job_run_id, *args, **kwargs)
+            parent = tracing.current_span()
+            with tracing.span(f"stage.{stage_name}", job_run_id=job_run_id) as stage_span, metrics.track_stage(
+                stage_name
+            ), events.stage(stage_id, job_run_id=job_run_id):
+                if stage_span is not None and not (parent is not None and parent.name.startswith(("stage.", "pipeline."))):
+                    # Written before the stage's own transaction begins, and committed on its own.
+                    try:
+                        db.set_job_run_trace_id(job_run_id, stage_span.trace_id)
+                    except Exception:
+                        logger.exception("Failed to store trace_id for job_run %s", job_run_id)
+                return fn(job_run_id, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 def _build_job_meta(job_run) -> JobMeta:
@@ -66,6 +117,7 @@ def _load_task_cards(job_run_id: int) -> List[TaskCard]:
     return cards
 
 
+@_stage_span("stage4_ax_workflow")
 def run_stage4_ax_workflow(job_run_id: int, workflow_mermaid_code: str = "") -> AXWorkflowResult:
     job_run = db.get_job_run(job_run_id)
     if job_run is None:
@@ -78,12 +130,15 @@ def run_stage4_ax_workflow(job_run_id: int, workflow_mermaid_code: str = "") ->
         task_cards=task_cards,
     )
     output = llm_client.call_ax_workflow_architect(input_pack, job_run_id=job_run_id)
-    result = AXWorkflowResult(**output)
-    ax_workflow_id = ax_workflow_repo.upsert_ax_workflow(job_run_id, result)
-    ax_workflow_repo.sync_ax_agents_from_agent_table(job_run_id, ax_workflow_id, result.agent_table)
+    with tracing.span("validate.AXWorkflowResult", require_parent=True):
+        result = AXWorkflowResult(**output)
+    with db.transaction():
+        ax_workflow_id = ax_workflow_repo.upsert_ax_workflow(job_run_id, result)
+        ax_workflow_repo.sync_ax_agents_from_agent_table(job_run_id, ax_workflow_id, result.agent_table)
     return result
 
 
+@_stage_span("stage5_agent_architect")
 def run_stage5_agent_architect(job_run_id: int, payload: Optional[dict] = None) -> dict:
     """
     Build payload from latest AX workflow agent_table if available, call LLM, and upsert agent specs.
@@ -95,46 +150,154 @@ def run_stage5_agent_architect(job_run_id: int, payload: Optional[dict] = None)
             "job_run_id": job_run_id,
         }
     output = llm_client.call_agent_architect(payload, job_run_id=job_run_id)
-    try:
-        from ax_agent_factory.core.schemas.ax import AgentArchitectResult
+    from ax_agent_factory.core.schemas.ax import AgentArchitectResult
 
-        parsed = AgentArchitectResult(**output)
-        ax_agent_repo.apply_agent_specs(job_run_id, parsed.agent_specs)
-    except Exception:
+    try:
+        with tracing.span("validate.AgentArchitectResult", require_parent=True):
+            parsed = AgentArchitectResult(**output)
+    except (TypeError, ValueError):  # pydantic ValidationError is a ValueError
         # leave raw output for debugging
-        pass
+        return output
+    ax_agent_repo.apply_agent_specs(job_run_id, parsed.agent_specs)  # not caught: a failed write fails the stage
     return output
 
 
-def run_stage6_deep_skill_research(job_run_id: int, agents: Optional[List[AgentSpecLite]] = None) -> List[DeepSkillResearchResult]:
+def _load_agents_lite(job_run_id: int) -> List[AgentSpecLite]:
+    return [
+        AgentSpecLite(
+            agent_id=row["agent_id"],
+            agent_name=row["agent_name"],
+            role_and_goal=row.get("role_and_goal") or "",
+            agent_type=row.get("agent_type") or "",
+            execution_environment=row.get("execution_environment") or "",
+        )
+        for row in ax_agent_repo.get_agents(job_run_id)
+    ]
+
+
+def _deep_research_inputs(job_run_id: int, agents: Optional[List[AgentSpecLite]] = None) -> List[DeepSkillResearchInput]:
+    """One Stage 6 payload per agent (agents default to the job run's stored agents)."""
     job_run = db.get_job_run(job_run_id)
     if job_run is None:
         raise ValueError("job_run not found")
     job_meta = _build_job_meta(job_run)
     if agents is None:
-        agent_rows = ax_agent_repo.get_agents(job_run_id)
-        agents = [
-            AgentSpecLite(
-                agent_id=row["agent_id"],
-                agent_name=row["agent_name"],
-                role_and_goal=row.get("role_and_goal", ""),
-                agent_type=row.get("agent_type", ""),
-                execution_environment=row.get("execution_environment", ""),
-            )
-            for row in agent_rows
-        ]
-    results: List[DeepSkillResearchResult] = []
-    tasks = _load_task_cards(job_run_id)
-    task_lite = [TaskCardLite(task_id=t.task_id, title=t.title, phase=t.phase) for t in tasks]
-    for agent in agents:
-        payload = DeepSkillResearchInput(job_meta=job_meta, agent=agent, tasks=task_lite)
-        output = llm_client.call_deep_skill_research(payload, job_run_id=job_run_id)
-        parsed = DeepSkillResearchResult(**output)
-        ax_skill_repo.save_deep_research_result(job_run_id, parsed)
-        results.append(parsed)
+        agents = _load_agents_lite(job_run_id)
+    task_lite = [TaskCardLite(task_id=t.task_id, title=t.title, phase=t.phase) for t in _load_task_cards(job_run_id)]
+    return [DeepSkillResearchInput(job_meta=job_meta, agent=agent, tasks=task_lite) for agent in agents]
+
+
+def deep_research_workers() -> int:
+    """Concurrent Stage 6 agent calls (env AX_DEEP_RESEARCH_WORKERS, default: the stage pool size)."""
+    value = os.environ.get("AX_DEEP_RESEARCH_WORKERS")
+    return max(1, int(value)) if value not in (None, "") else stage_workers()
+
+
+def deep_research_retries() -> int:
+    """Extra attempts per agent when its call fails (env AX_DEEP_RESEARCH_RETRIES, default 2)."""
+    value = os.environ.get("AX_DEEP_RESEARCH_RETRIES")
+    return max(0, int(value)) if value not in (None, "") else 2
+
+
+def _retry_delay_s(attempt: int) -> float:
+    """Backoff before attempt n+1 (env AX_DEEP_RESEARCH_RETRY_S, default 2s, doubled per attempt)."""
+    return float(os.environ.get("AX_DEEP_RESEARCH_RETRY_S", 2)) * 2 ** (attempt - 1)
+
+
+@dataclass
+class DeepResearchProgress:
+    """Reported to run_stage6_deep_skill_research's on_progress as each agent finishes."""
+
+    done: int
+    total: int
+    agent_id: str
+    attempts: int
+    ok: bool  # False when the kept result is a stub fallback (llm_error)
+
+
+def _research_agent(
+    job_run_id: int, payload: DeepSkillResearchInput, *, retries: int = 0
+) -> tuple[DeepSkillResearchResult, int]:
+    """
+    One agent's research, persisted as soon as it is accepted; returns (result, attempts).
+
+    A call that raises or comes back as a stub fallback (llm_error) is retried up to
+    `retries` times with backoff. The last fallback is kept so the stage still
+    completes; an exception on the last attempt propagates, as does CircuitOpenError
+    right away (the model is known to be failing).
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            output = llm_client.call_deep_skill_research(payload, job_run_id=job_run_id)
+            with tracing.span("validate.DeepSkillResearchResult", require_parent=True):
+                parsed = DeepSkillResearchResult(**output)
+        except circuit_breaker.CircuitOpenError:
+            raise
+        except Exception:
+            if attempt > retries:
+                raise
+            logger.warning("Stage 6 agent %s attempt %d failed; retrying", payload.agent.agent_id, attempt, exc_info=True)
+        else:
+            if not parsed.llm_error or attempt > retries:
+                ax_skill_repo.save_deep_research_result(job_run_id, parsed)
+                return parsed, attempt
+            logger.warning("Stage 6 agent %s attempt %d: %s; retrying", payload.agent.agent_id, attempt, parsed.llm_error)
+        time.sleep(_retry_delay_s(attempt))
+
+
+@_stage_span("stage6_deep_skill_research")
+def run_stage6_deep_skill_research(
+    job_run_id: int,
+    agents: Optional[List[AgentSpecLite]] = None,
+    *,
+    max_workers: Optional[int] = None,
+    retries: Optional[int] = None,
+    on_progress: Optional[Callable[[DeepResearchProgress], None]] = None,
+) -> List[DeepSkillResearchResult]:
+    """
+    Research every agent concurrently (at most max_workers calls in flight).
+
+    Each result is saved to ax_deep_research_docs as soon as its agent finishes;
+    the returned list keeps the agent order. on_progress is called from the calling
+    thread after each agent. If an agent still fails after its retries, the
+    remaining queued agents are cancelled and the error is raised.
+    """
+    payloads = _deep_research_inputs(job_run_id, agents)
+    if not payloads:
+        return []
+    retries = deep_research_retries() if retries is None else retries
+    results: List[Optional[DeepSkillResearchResult]] = [None] * len(payloads)
+    workers = min(max_workers or deep_research_workers(), len(payloads))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage6") as pool:
+        futures = {
+            pool.submit(contextvars.copy_context().run, _research_agent_item, job_run_id, payload, retries): n
+            for n, payload in enumerate(payloads)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                n = futures[future]
+                result, attempts = future.result()
+                results[n] = result
+                if on_progress is not None:
+                    on_progress(
+                        DeepResearchProgress(
+                            done=done,
+                            total=len(payloads),
+                            agent_id=payloads[n].agent.agent_id,
+                            attempts=attempts,
+                            ok=not result.llm_error,
+                        )
+                    )
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
     return results
 
 
+@_stage_span("stage7_skill_extractor")
 def run_stage7_skill_extractor(
     job_run_id: int,
     agents: Optional[List[AgentSpecLite]] = None,
@@ -147,27 +310,9 @@ def run_stage7_skill_extractor(
     tasks = _load_task_cards(job_run_id)
     task_lite = [TaskCardLite(task_id=t.task_id, title=t.title, phase=t.phase) for t in tasks]
     if agents is None:
-        agent_rows = ax_agent_repo.get_agents(job_run_id)
-        agents = [
-            AgentSpecLite(
-                agent_id=row["agent_id"],
-                agent_name=row["agent_name"],
-                role_and_goal=row.get("role_and_goal", ""),
-                agent_type=row.get("agent_type", ""),
-                execution_environment=row.get("execution_environment", ""),
-            )
-            for row in agent_rows
-        ]
+        agents = _load_agents_lite(job_run_id)
     if deep_research_results is None:
-        deep_rows = ax_skill_repo.get_deep_research_results(job_run_id)
-        deep_research_results = [
-            DeepSkillResearchResult(
-                agent_id=row["agent_id"],
-                research_focus=row.get("research_focus") or "skill",
-                sections=json.loads(row["sections_json"]) if row.get("sections_json") else {},
-            )
-            for row in deep_rows
-        ]
+        deep_research_results = stage_state.deep_research_from_rows(ax_skill_repo.get_deep_research_results(job_run_id))
     agent_tasks = {a.agent_id: task_lite for a in agents} if agents else {}
     payload = SkillExtractorInput(
         job_meta=job_meta,
@@ -176,11 +321,13 @@ def run_stage7_skill_extractor(
         deep_research_results=deep_research_results or [],
     )
     output = llm_client.call_skill_extractor(json.loads(payload.model_dump_json(ensure_ascii=False)), job_run_id=job_run_id)
-    result = SkillCardSet(**output)
+    with tracing.span("validate.SkillCardSet", require_parent=True):
+        result = SkillCardSet(**output)
     ax_skill_repo.apply_skill_cards(job_run_id, result)
     return result
 
 
+@_stage_span("stage8_prompt_builder")
 def run_stage8_prompt_builder(
     job_run_id: int,
     agents_payload: Optional[List[dict]] = None,
@@ -204,6 +351,29 @@ def run_stage8_prompt_builder(
     skills = [SkillCard(**s) if not isinstance(s, SkillCard) else s for s in skills_payload]
     pb_input = PromptBuilderInput(job_meta=job_meta, agents=agents, skills=skills, global_policies=global_policies)
     output = llm_client.call_prompt_builder(pb_input, job_run_id=job_run_id)
-    result = AgentPromptSet(**output)
+    with tracing.span("validate.AgentPromptSet", require_parent=True):
+        result = AgentPromptSet(**output)
     ax_prompt_repo.apply_agent_prompts(job_run_id, result)
     return result
+
+
+def _research_agent_item(
+    job_run_id: int, payload: DeepSkillResearchInput, retries: Optional[int] = None
+) -> tuple[DeepSkillResearchResult, int]:
+    """Stage 6 item: one agent's research (with retries) in its own span, reported as a partial_result event."""
+    with tracing.span(
+        "stage.stage6_deep_skill_research.agent", job_run_id=job_run_id, agent_id=payload.agent.agent_id
+    ), metrics.track_stage("stage6_deep_skill_research.agent"):
+        result, attempts = _research_agent(
+            job_run_id, payload, retries=deep_research_retries() if retries is None else retries
+        )
+    events.emit(
+        "partial_result",
+        job_run_id=job_run_id,
+        stage_id="S6_DEEP_SKILL_RESEARCH",
+        item=payload.agent.agent_id,
+        attempts=attempts,
+        ok=not result.llm_error,
+        result=result,
+    )
+    return result, attempts
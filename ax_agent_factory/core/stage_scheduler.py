@@ -0,0 +1,264 @@
+"""Dependency-driven stage scheduler.
+
+Each StageMeta declares the result keys it consumes (`inputs`) and the one it
+produces (`output`); a stage depends on the producers of its inputs. For a set of
+targets the scheduler takes the targets plus all their ancestors, orders them
+into levels (every stage of a level only depends on earlier levels) and runs each
+stage on a thread pool as soon as its dependencies have finished, so independent
+stages overlap.
+
+A StageTask either runs a stage in one call (`run`) or fans it out: `fan_out`
+returns work items, `run_item` runs on the pool once per item, and `join` turns
+the item results (in item order) into the stage output.
+
+Worker threads start from a copy of the caller's contextvars, so trace spans opened
+inside a stage nest under the caller's span; current_stage() tells code running
+inside a task which stage it belongs to. The pool size comes from
+AX_STAGE_WORKERS (default 4).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from ax_agent_factory.models.stages import StageMeta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGE_WORKERS = 4
+
+_current_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("ax_scheduled_stage", default=None)
+
+
+def current_stage() -> Optional[str]:
+    """Id of the scheduled stage whose task is running in this context (None outside the scheduler)."""
+    return _current_stage.get()
+
+
+def stage_workers() -> int:
+    """Worker pool size for the scheduler (env AX_STAGE_WORKERS, at least 1)."""
+    value = os.environ.get("AX_STAGE_WORKERS")
+    return max(1, int(value)) if value not in (None, "") else DEFAULT_STAGE_WORKERS
+
+
+def stage_dependencies(stages: Iterable[StageMeta]) -> dict[str, tuple[str, ...]]:
+    """Upstream stage ids per stage, derived from declared inputs/outputs.
+
+    Inputs that no stage in `stages` produces are external (supplied by the caller).
+    """
+    stages = list(stages)
+    producers: dict[str, str] = {}
+    for stage in stages:
+        if stage.output in producers:
+            raise ValueError(f"Result key {stage.output!r} produced by {producers[stage.output]} and {stage.id}")
+        producers[stage.output] = stage.id
+    return {
+        stage.id: tuple(dict.fromkeys(producers[key] for key in stage.inputs if key in producers))
+        for stage in stages
+    }
+
+
+@dataclass
+class StageTask:
+    """How the scheduler executes one stage; every callable receives the stage's inputs."""
+
+    run: Optional[Callable[[dict], Any]] = None
+    fan_out: Optional[Callable[[dict], list]] = None
+    run_item: Optional[Callable[[Any, dict], Any]] = None
+    join: Optional[Callable[[dict, list], Any]] = None
+
+    def __post_init__(self) -> None:
+        if (self.run is None) == (self.fan_out is None):
+            raise ValueError("StageTask needs either run or fan_out")
+        if self.fan_out is not None and self.run_item is None:
+            raise ValueError("A fan-out StageTask needs run_item")
+
+
+@dataclass
+class ExecutionPlan:
+    """Stages needed for the targets, grouped into levels that may run concurrently."""
+
+    targets: list[str]
+    levels: list[list[str]]
+    depends_on: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    fan_out: list[str] = field(default_factory=list)
+
+    @property
+    def stage_ids(self) -> list[str]:
+        return [stage_id for level in self.levels for stage_id in level]
+
+    def to_dict(self) -> dict:
+        return {
+            "targets": list(self.targets),
+            "levels": [list(level) for level in self.levels],
+            "depends_on": {k: list(v) for k, v in self.depends_on.items()},
+            "fan_out": list(self.fan_out),
+        }
+
+    def format(self) -> str:
+        lines = []
+        for n, level in enumerate(self.levels):
+            stages = []
+            for stage_id in level:
+                deps = self.depends_on.get(stage_id) or ()
+                suffix = " [fan-out]" if stage_id in self.fan_out else ""
+                stages.append(f"{stage_id}{suffix}" + (f" <- {', '.join(deps)}" if deps else ""))
+            lines.append(f"L{n}: " + " | ".join(stages))
+        return "\n".join(lines)
+
+
+class StageScheduler:
+    """Run the stages a target needs, each as soon as its dependencies are done."""
+
+    def __init__(
+        self,
+        stages: Iterable[StageMeta],
+        tasks: dict[str, StageTask],
+        *,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.stages = {s.id: s for s in sorted(stages, key=lambda s: s.order)}
+        self.tasks = tasks
+        self.depends_on = stage_dependencies(self.stages.values())
+        self.max_workers = max_workers or stage_workers()
+
+    def resolve(self, stage: str) -> str:
+        """Stage id for a stage id or UI label."""
+        if stage in self.stages:
+            return stage
+        for meta in self.stages.values():
+            if meta.ui_label == stage:
+                return meta.id
+        raise ValueError(f"Unknown stage: {stage}")
+
+    def plan(self, targets: Iterable[str]) -> ExecutionPlan:
+        """Targets (ids or UI labels) plus their ancestors, in dependency levels."""
+        target_ids = [self.resolve(t) for t in targets]
+        needed: set[str] = set()
+        stack = list(target_ids)
+        while stack:
+            stage_id = stack.pop()
+            if stage_id not in needed:
+                needed.add(stage_id)
+                stack.extend(self.depends_on[stage_id])
+
+        levels: list[list[str]] = []
+        placed: set[str] = set()
+        remaining = [s for s in self.stages if s in needed]
+        while remaining:
+            level = [s for s in remaining if all(dep in placed for dep in self.depends_on[s])]
+            if not level:
+                raise ValueError(f"Dependency cycle among stages: {', '.join(remaining)}")
+            levels.append(level)
+            placed.update(level)
+            remaining = [s for s in remaining if s not in placed]
+        return ExecutionPlan(
+            targets=target_ids,
+            levels=levels,
+            depends_on={s: self.depends_on[s] for s in self.stages if s in needed},
+            fan_out=[s for s in self.stages if s in needed and s in self.tasks and self.tasks[s].fan_out is not None],
+        )
+
+    def run(
+        self,
+        targets: Iterable[str],
+        initial: Optional[dict] = None,
+        *,
+        on_stage_done: Optional[Callable[[str, Any], None]] = None,
+    ) -> dict:
+        """
+        Execute the plan for targets; returns `initial` plus every stage output keyed by StageMeta.output.
+
+        A planned stage whose output key is already in `initial` counts as complete and
+        is not run. on_stage_done(stage_id, output) is called from the calling thread as
+        each stage finishes.
+        """
+        plan = self.plan(targets)
+        results = dict(initial or {})
+        complete = {s for s in plan.stage_ids if self.stages[s].output in results}
+        missing = [s for s in plan.stage_ids if s not in complete and s not in self.tasks]
+        if missing:
+            raise ValueError(f"No task registered for stages: {', '.join(missing)}")
+        logger.info("Stage plan for %s:\n%s", ", ".join(plan.targets), plan.format())
+        waiting = {s: set(plan.depends_on[s]) - complete for s in plan.stage_ids if s not in complete}
+        item_results: dict[str, list] = {}
+        items_left: dict[str, int] = {}
+        running: dict[Future, tuple[str, str, int]] = {}
+        error: Optional[BaseException] = None
+
+        def inputs_of(stage_id: str) -> dict:
+            return {key: results.get(key) for key in self.stages[stage_id].inputs}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as pool:
+
+            def submit(stage_id: str, phase: str, fn: Callable, *args: Any, index: int = -1) -> None:
+                ctx = contextvars.copy_context()
+                ctx.run(_current_stage.set, stage_id)
+                future = pool.submit(ctx.run, fn, *args)
+                running[future] = (stage_id, phase, index)
+
+            def start(stage_id: str) -> None:
+                task = self.tasks[stage_id]
+                if task.fan_out is not None:
+                    submit(stage_id, "fan_out", task.fan_out, inputs_of(stage_id))
+                else:
+                    submit(stage_id, "run", task.run, inputs_of(stage_id))
+
+            def finish(stage_id: str, output: Any) -> None:
+                results[self.stages[stage_id].output] = output
+                if on_stage_done is not None:
+                    on_stage_done(stage_id, output)
+                for other, deps in waiting.items():
+                    if stage_id in deps:
+                        deps.discard(stage_id)
+                        if not deps:
+                            start(other)
+
+            def joined(stage_id: str) -> None:
+                task = self.tasks[stage_id]
+                if task.join is None:
+                    finish(stage_id, list(item_results[stage_id]))
+                else:
+                    submit(stage_id, "join", task.join, inputs_of(stage_id), list(item_results[stage_id]))
+
+            for stage_id in [s for s, deps in waiting.items() if not deps]:
+                start(stage_id)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage_id, phase, index = running.pop(future)
+                    try:
+                        value = future.result()
+                    except BaseException as exc:  # stop scheduling, let in-flight work finish
+                        if error is None:
+                            error = exc
+                            logger.exception("Stage %s failed (%s)", stage_id, phase)
+                        continue
+                    if error is not None:
+                        continue
+                    if phase == "fan_out":
+                        work = list(value)
+                        item_results[stage_id] = [None] * len(work)
+                        items_left[stage_id] = len(work)
+                        if not work:
+                            joined(stage_id)
+                        for n, item in enumerate(work):
+                            submit(stage_id, "item", self.tasks[stage_id].run_item, item, inputs_of(stage_id), index=n)
+                    elif phase == "item":
+                        item_results[stage_id][index] = value
+                        items_left[stage_id] -= 1
+                        if not items_left[stage_id]:
+                            joined(stage_id)
+                    else:
+                        finish(stage_id, value)
+                if error is not None:
+                    for future in running:
+                        future.cancel()
+        if error is not None:
+            raise error
+        return results
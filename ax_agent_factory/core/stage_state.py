@@ -0,0 +1,189 @@
+"""Rebuild stage results from the tables the stages write (resume mode, UI fallbacks).
+
+Each stage persists its output into domain tables (job_research_*, job_tasks,
+workflow_results, ax_*) before it is marked done in stage_runs.
+When a stage finished but left no readable stage artifact (stub fallback results
+are not stored, or the result schema changed since), restore_result() turns those
+rows back into the typed result the next stage expects.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter
+from typing import Any, Callable, Optional
+
+from ax_agent_factory.core.schemas.ax import DeepSkillResearchResult
+from ax_agent_factory.core.schemas.common import (
+    IVCAtomicTask,
+    IVCTask,
+    JobMeta,
+    PhaseClassificationResult,
+    PhaseSummary,
+    StaticClassificationResult,
+    TaskExtractionResult,
+    TaskStaticMeta,
+)
+from ax_agent_factory.infra import ax_skill_repo, db
+from ax_agent_factory.models.job_run import JobRun
+
+logger = logging.getLogger(__name__)
+
+_STATIC_FIELDS = (
+    "static_type_lv1",
+    "static_type_lv2",
+    "domain_lv1",
+    "domain_lv2",
+    "rag_required",
+    "recommended_execution_env",
+)
+
+
+def task_atoms_from_rows(rows: list[dict]) -> list[dict]:
+    """Convert job_tasks rows into task_atoms-like dicts."""
+    return [
+        {
+            "task_id": row.get("task_id"),
+            "task_original_sentence": row.get("task_original_sentence"),
+            "task_korean": row.get("task_korean"),
+            "task_english": row.get("task_english"),
+            "notes": row.get("notes"),
+        }
+        for row in rows or []
+    ]
+
+
+def ivc_tasks_from_rows(rows: list[dict]) -> list[dict]:
+    """Convert job_tasks rows into ivc_tasks-like dicts (classified rows only)."""
+    return [
+        {
+            "task_id": row.get("task_id"),
+            "task_korean": row.get("task_korean"),
+            "task_original_sentence": row.get("task_original_sentence"),
+            "ivc_phase": row.get("ivc_phase"),
+            "ivc_exec_subphase": row.get("ivc_exec_subphase"),
+            "primitive_lv1": row.get("primitive_lv1"),
+            "classification_reason": row.get("classification_reason"),
+        }
+        for row in rows or []
+        if row.get("ivc_phase")
+    ]
+
+
+def phase_summary_from_rows(rows: list[dict]) -> dict:
+    """Build a phase_summary-style dict from job_tasks rows."""
+    counter: Counter[str] = Counter(row["ivc_phase"] for row in rows or [] if row.get("ivc_phase"))
+    return {phase: {"count": count} for phase, count in counter.items()}
+
+
+def static_meta_from_rows(rows: list[dict]) -> list[dict]:
+    """Extract static classification style rows from job_tasks."""
+    return [
+        {
+            "task_id": row.get("task_id"),
+            "task_korean": row.get("task_korean"),
+            "static_type_lv1": row.get("static_type_lv1"),
+            "static_type_lv2": row.get("static_type_lv2"),
+            "domain_lv1": row.get("domain_lv1"),
+            "domain_lv2": row.get("domain_lv2"),
+            "rag_required": bool(row.get("rag_required")),
+            "rag_reason": row.get("rag_reason"),
+            "value_score": row.get("value_score"),
+            "complexity_score": row.get("complexity_score"),
+            "value_complexity_quadrant": row.get("value_complexity_quadrant"),
+            "recommended_execution_env": row.get("recommended_execution_env"),
+            "autoability_reason": row.get("autoability_reason"),
+            "data_entities": json.loads(row["data_entities_json"]) if row.get("data_entities_json") else [],
+            "tags": json.loads(row["tags_json"]) if row.get("tags_json") else [],
+        }
+        for row in rows or []
+        if any(row.get(field) for field in _STATIC_FIELDS)
+    ]
+
+
+def static_summary_from_rows(rows: list[dict]) -> dict:
+    """Summarize static meta counts."""
+    counter: Counter[str] = Counter(row["static_type_lv1"] for row in rows or [] if row.get("static_type_lv1"))
+    return {"static_type_lv1_counts": dict(counter)} if counter else {}
+
+
+def deep_research_from_rows(rows: list[dict]) -> list[DeepSkillResearchResult]:
+    """Convert current ax_deep_research_docs rows into Stage 6 results."""
+    return [
+        DeepSkillResearchResult(
+            agent_id=row["agent_id"],
+            research_focus=row.get("research_focus") or "skill",
+            sections=json.loads(row["sections_json"]) if row.get("sections_json") else {},
+        )
+        for row in rows or []
+    ]
+
+
+def _job_meta(job_run: JobRun) -> JobMeta:
+    return JobMeta(
+        company_name=job_run.company_name,
+        job_title=job_run.job_title,
+        industry_context=job_run.industry_context,
+        business_goal=job_run.business_goal,
+    )
+
+
+def _task_extraction(job_run: JobRun) -> Optional[TaskExtractionResult]:
+    atoms = task_atoms_from_rows(db.get_job_tasks(job_run.id))
+    if not atoms:
+        return None
+    return TaskExtractionResult(job_meta=_job_meta(job_run), task_atoms=[IVCAtomicTask(**a) for a in atoms])
+
+
+def _phase_classification(job_run: JobRun) -> Optional[PhaseClassificationResult]:
+    rows = db.get_job_tasks(job_run.id)
+    ivc_tasks = ivc_tasks_from_rows(rows)
+    if not ivc_tasks:
+        return None
+    research = db.get_job_research_result(job_run.id)
+    return PhaseClassificationResult(
+        job_meta=_job_meta(job_run),
+        raw_job_desc=research.raw_job_desc if research else None,
+        ivc_tasks=[IVCTask(**t) for t in ivc_tasks],
+        phase_summary=PhaseSummary(**phase_summary_from_rows(rows)),
+        task_atoms=[IVCAtomicTask(**a) for a in task_atoms_from_rows(rows)],
+    )
+
+
+def _static_classification(job_run: JobRun) -> Optional[StaticClassificationResult]:
+    rows = db.get_job_tasks(job_run.id)
+    static_meta = static_meta_from_rows(rows)
+    if not static_meta:
+        return None
+    return StaticClassificationResult(
+        job_meta=_job_meta(job_run),
+        task_static_meta=[TaskStaticMeta(**m) for m in static_meta],
+        static_summary=static_summary_from_rows(rows),
+    )
+
+
+_RESTORERS: dict[str, Callable[[JobRun], Any]] = {
+    "S0_1_COLLECT": lambda job_run: db.get_job_research_collect_result(job_run.id),
+    "S0_2_SUMMARIZE": lambda job_run: db.get_job_research_result(job_run.id),
+    "S1_1_TASK_EXTRACT": _task_extraction,
+    "S1_2_PHASE_CLASSIFY": _phase_classification,
+    "S1_3_STATIC_CLASSIFY": _static_classification,
+    "S2_1_WORKFLOW_STRUCT": lambda job_run: db.get_workflow_plan(job_run.id),
+    "S2_2_WORKFLOW_MERMAID": lambda job_run: db.get_workflow_mermaid_result(job_run.id),
+    "S6_DEEP_SKILL_RESEARCH": lambda job_run: (
+        deep_research_from_rows(ax_skill_repo.get_deep_research_results(job_run.id)) or None
+    ),
+}
+
+
+def restore_result(job_run: JobRun, stage_id: str) -> Optional[Any]:
+    """The stage's typed result rebuilt from the DB, or None if its rows are missing or incomplete."""
+    restorer = _RESTORERS.get(stage_id)
+    if restorer is None:
+        return None
+    try:
+        return restorer(job_run)
+    except (TypeError, ValueError):  # rows no longer satisfy the result schema: run the stage again
+        logger.warning("Cannot rebuild %s for job_run %s from the DB", stage_id, job_run.id, exc_info=True)
+        return None
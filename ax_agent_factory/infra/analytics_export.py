@@ -0,0 +1,234 @@
+"""Columnar export of job_tasks across all runs for cross-run analytics.
+
+Each task row is joined with its job run (company, job title, industry) and the
+JSON list columns are flattened into typed columns (`data_entities`, `tags` as
+list<string> in Parquet, '|'-joined text in CSV). Files are partitioned by the
+month the job run was created and written one file per job run:
+
+    <out>/month=2026-01/job_run_12.parquet
+    <out>/_watermark.json
+
+Exports are incremental: only job runs whose job_runs or job_tasks rows changed
+after the stored watermark are rewritten (their file is replaced, so re-running
+is idempotent). updated_at is stamped when a row is written, not when its
+transaction commits, so a stage unit of work that commits after an export can
+carry timestamps below that export's watermark; the changed-run query therefore
+looks back AX_EXPORT_WATERMARK_LAG_S seconds (default 1 hour, longer than a stage
+transaction) before the watermark and rewrites those runs again. Parquet needs
+pyarrow; without it the export falls back to CSV.
+
+    pyarrow.dataset.dataset("data/analytics/job_tasks", partitioning="hive")
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from ax_agent_factory.infra import db, storage, tracing
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - CSV fallback
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_FILE = "_watermark.json"
+DEFAULT_WATERMARK_LAG_S = 3600.0
+
+# (column, type) in output order; types: str, int, bool, list (JSON array of strings).
+TASK_EXPORT_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("job_run_id", "int"),
+    ("company_name", "str"),
+    ("job_title", "str"),
+    ("industry_context", "str"),
+    ("job_run_created_at", "str"),
+    ("task_id", "str"),
+    ("task_korean", "str"),
+    ("ivc_phase", "str"),
+    ("ivc_exec_subphase", "str"),
+    ("primitive_lv1", "str"),
+    ("static_type_lv1", "str"),
+    ("static_type_lv2", "str"),
+    ("domain_lv1", "str"),
+    ("domain_lv2", "str"),
+    ("rag_required", "bool"),
+    ("value_score", "int"),
+    ("complexity_score", "int"),
+    ("value_complexity_quadrant", "str"),
+    ("recommended_execution_env", "str"),
+    ("stage_id", "str"),
+    ("stream_id", "str"),
+    ("is_entry", "bool"),
+    ("is_exit", "bool"),
+    ("is_hub", "bool"),
+    ("data_entities", "list"),
+    ("tags", "list"),
+    ("updated_at", "str"),
+)
+_JSON_SOURCES = {"data_entities": "data_entities_json", "tags": "tags_json"}
+
+
+@dataclass
+class ExportResult:
+    """Summary of one incremental export run."""
+
+    format: str
+    job_runs: int = 0
+    rows: int = 0
+    files: list[str] = field(default_factory=list)
+    watermark: Optional[str] = None
+
+
+def _arrow_type(kind: str):
+    return {"str": pa.string(), "int": pa.int64(), "bool": pa.bool_(), "list": pa.list_(pa.string())}[kind]
+
+
+def _flatten(row) -> dict:
+    record: dict = {}
+    for name, kind in TASK_EXPORT_COLUMNS:
+        if kind == "list":
+            raw = row[_JSON_SOURCES[name]]
+            try:
+                values = json.loads(raw) if raw else []
+            except ValueError:
+                values = []
+            record[name] = [str(v) for v in values] if isinstance(values, list) else []
+        elif kind == "bool":
+            record[name] = None if row[name] is None else bool(row[name])
+        else:
+            record[name] = row[name]
+    return record
+
+
+def _read_watermark(out_dir: Path) -> Optional[str]:
+    path = out_dir / WATERMARK_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8")).get("updated_at")
+
+
+def _watermark_lag_s() -> float:
+    value = os.environ.get("AX_EXPORT_WATERMARK_LAG_S")
+    return float(value) if value not in (None, "") else DEFAULT_WATERMARK_LAG_S
+
+
+def _changed_since(watermark: str, lag_s: float) -> str:
+    """Lower bound of the changed-run query: the watermark minus the late-commit lag."""
+    return (datetime.fromisoformat(watermark) - timedelta(seconds=lag_s)).isoformat()
+
+
+def _write_watermark(out_dir: Path, watermark: str, fmt: str) -> None:
+    tmp = out_dir / (WATERMARK_FILE + ".tmp")
+    tmp.write_text(
+        json.dumps({"updated_at": watermark, "format": fmt, "exported_at": datetime.utcnow().isoformat()}),
+        encoding="utf-8",
+    )
+    os.replace(tmp, out_dir / WATERMARK_FILE)
+
+
+def _write_parquet(path: Path, records: list[dict]) -> None:
+    schema = pa.schema([(name, _arrow_type(kind)) for name, kind in TASK_EXPORT_COLUMNS])
+    table = pa.Table.from_pylist(records, schema=schema)
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+
+
+def _write_csv(path: Path, records: list[dict]) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in TASK_EXPORT_COLUMNS])
+        for record in records:
+            writer.writerow(
+                [
+                    "|".join(record[name]) if kind == "list" else ("" if record[name] is None else record[name])
+                    for name, kind in TASK_EXPORT_COLUMNS
+                ]
+            )
+    os.replace(tmp, path)
+
+
+@tracing.traced()
+def export_job_tasks(
+    out_dir: str, *, fmt: str = "auto", full: bool = False, lag_s: Optional[float] = None
+) -> ExportResult:
+    """
+    Write changed job runs' tasks under out_dir (month partitions, one file per run).
+
+    fmt: "parquet", "csv" or "auto" (parquet when pyarrow is installed). full=True
+    ignores the watermark and rewrites every run. lag_s overrides how far before the
+    watermark changes are looked for (AX_EXPORT_WATERMARK_LAG_S).
+    """
+    if storage.get_store() is not None:
+        raise RuntimeError("analytics export reads the native SQLite database (unset AX_DATABASE_URL)")
+    if fmt == "auto":
+        fmt = "parquet" if pa is not None else "csv"
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow) - use fmt='csv'")
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Unknown export format: {fmt}")
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    since = None if full else _read_watermark(out)
+    result = ExportResult(format=fmt, watermark=since)
+    if since is not None:
+        cutoff = _changed_since(since, _watermark_lag_s() if lag_s is None else lag_s)
+
+    with db.transaction(immediate=False) as conn:
+        conn.raw.execute("BEGIN")  # changed-run list and rows come from one snapshot
+        if since is None:
+            changed = conn.execute("SELECT id, created_at, updated_at FROM job_runs ORDER BY id").fetchall()
+        else:
+            changed = conn.execute(
+                """
+                SELECT id, created_at, updated_at FROM job_runs
+                WHERE updated_at > ?
+                   OR id IN (SELECT DISTINCT job_run_id FROM job_tasks WHERE updated_at > ?)
+                ORDER BY id
+                """,
+                (cutoff, cutoff),
+            ).fetchall()
+        select_columns = ", ".join(
+            f"t.{_JSON_SOURCES[name]}" if kind == "list" else f"t.{name}"
+            for name, kind in TASK_EXPORT_COLUMNS
+            if name not in ("company_name", "job_title", "industry_context", "job_run_created_at")
+        )
+        for run in changed:
+            rows = conn.execute(
+                f"""
+                SELECT {select_columns}, r.company_name, r.job_title, r.industry_context,
+                       r.created_at AS job_run_created_at
+                FROM job_tasks AS t JOIN job_runs AS r ON r.id = t.job_run_id
+                WHERE t.job_run_id = ?
+                ORDER BY t.task_id
+                """,
+                (run["id"],),
+            ).fetchall()
+            watermark_candidates = [run["updated_at"] or ""] + [r["updated_at"] or "" for r in rows]
+            result.watermark = max([result.watermark or "", *watermark_candidates])
+            if not rows:
+                continue
+            partition = out / f"month={(run['created_at'] or '')[:7] or 'unknown'}"
+            partition.mkdir(exist_ok=True)
+            path = partition / f"job_run_{run['id']}.{fmt}"
+            records = [_flatten(r) for r in rows]
+            (_write_parquet if fmt == "parquet" else _write_csv)(path, records)
+            result.files.append(str(path))
+            result.job_runs += 1
+            result.rows += len(records)
+
+    if result.watermark:
+        _write_watermark(out, result.watermark, fmt)
+    logger.info("Exported %s job_tasks rows from %s runs to %s (%s)", result.rows, result.job_runs, out_dir, fmt)
+    return result
@@ -0,0 +1,188 @@
+"""Input-hash keyed stage artifacts (incremental pipeline recomputation).
+
+Every completed stage stores its result as an immutable `stage_artifacts` row:
+
+    input_hash  = sha256(stage id, upstream output hashes, prompt template, model, LLM mode, config)
+    output_hash = sha256(serialized result)
+
+When a stage is about to run and the newest artifact for (job_run, stage) has the
+same input_hash, PipelineManager loads that result instead of calling the LLM.
+Only the newest artifact counts, so a hit always matches the rows the stage last
+wrote to job_tasks/workflow_results. A changed output hash propagates into the
+input hash of every downstream stage, which then recomputes.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import importlib
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ax_agent_factory.infra import db, llm_client, metrics
+from ax_agent_factory.infra.prompts import load_prompt
+
+logger = logging.getLogger(__name__)
+
+# Bump when result serialization changes so old artifacts stop matching.
+ARTIFACT_FORMAT_VERSION = 1
+
+ARTIFACT_LOOKUPS = metrics.REGISTRY.counter(
+    "ax_stage_artifact_lookups_total", "Stage artifact lookups by stage and result (hit/miss/forced).", ("stage", "result")
+)
+
+
+def fingerprint(value: Any) -> str:
+    """sha256 of the canonical JSON form of value."""
+    canonical = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def llm_mode(client: Any = None) -> str:
+    """Which backend would answer: an injected client, the live API, or the offline stub."""
+    if client is not None:
+        return f"client:{type(client).__module__}.{type(client).__qualname__}"
+    if llm_client.genai is None or os.environ.get("GOOGLE_API_KEY") is None:
+        return "stub"
+    return "live"
+
+
+def input_hash(
+    stage_id: str,
+    *,
+    upstream: dict[str, str],
+    prompt_name: Optional[str] = None,
+    config: Optional[dict] = None,
+    client: Any = None,
+) -> str:
+    """Hash of everything a stage's output depends on."""
+    return fingerprint(
+        {
+            "format": ARTIFACT_FORMAT_VERSION,
+            "stage": stage_id,
+            "upstream": upstream,
+            "prompt": fingerprint(load_prompt(prompt_name)) if prompt_name else None,
+            "model": llm_client.DEFAULT_GEMINI_MODEL,
+            "llm": llm_mode(client),
+            "config": config or {},
+        }
+    )
+
+
+def _type_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve(type_name: str) -> Any:
+    module_name, _, qualname = type_name.partition(":")
+    cls: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        cls = getattr(cls, part)
+    return cls
+
+
+def _dump(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError(f"Cannot store {type(value).__name__} as a stage artifact")
+
+
+def encode(result: Any) -> tuple[str, str]:
+    """
+    (result_type, payload_json) for a pydantic model or dataclass result, a plain dict
+    (Stage 5 raw output) or a list of one model type (Stage 6, one result per agent).
+    """
+    if isinstance(result, dict):
+        return _type_name(dict), json.dumps(result, ensure_ascii=False, default=str)
+    if isinstance(result, list):
+        item_types = {_type_name(type(item)) for item in result}
+        if len(item_types) > 1:
+            raise TypeError("Cannot store a list of mixed types as a stage artifact")
+        payload = [_dump(item) for item in result]
+        return f"list[{''.join(item_types)}]", json.dumps(payload, ensure_ascii=False, default=str)
+    return _type_name(type(result)), json.dumps(_dump(result), ensure_ascii=False, default=str)
+
+
+def decode(result_type: str, payload_json: str) -> Any:
+    payload = json.loads(payload_json)
+    if result_type.startswith("list["):
+        item_type = result_type[len("list[") : -1]
+        return [_resolve(item_type)(**item) for item in payload] if item_type else []
+    return _resolve(result_type)(**payload)
+
+
+def _has_llm_error(result: Any) -> bool:
+    """True for a stub fallback result (or a list containing one)."""
+    if isinstance(result, dict):
+        return bool(result.get("llm_error"))
+    if isinstance(result, list):
+        return any(_has_llm_error(item) for item in result)
+    return bool(getattr(result, "llm_error", None))
+
+
+@dataclass
+class StageArtifact:
+    """A stored (or freshly saved) stage result."""
+
+    stage_id: str
+    input_hash: str
+    output_hash: str
+    result: Any
+    hit: bool
+    artifact_id: Optional[int] = None
+
+
+def load(job_run_id: int, stage_id: str, key: str) -> Optional[StageArtifact]:
+    """The stage's current artifact if it was produced from the same inputs."""
+    row = db.get_latest_stage_artifact(job_run_id, stage_id)
+    if row is None or row["input_hash"] != key:
+        ARTIFACT_LOOKUPS.inc(stage=stage_id, result="miss")
+        return None
+    artifact = from_row(row)
+    ARTIFACT_LOOKUPS.inc(stage=stage_id, result="hit" if artifact is not None else "miss")
+    return artifact
+
+
+def from_row(row: dict) -> Optional[StageArtifact]:
+    """Decode a stage_artifacts row; None when the result schema drifted since it was written."""
+    try:
+        result = decode(row["result_type"], row["payload_json"])
+    except Exception:
+        return None
+    return StageArtifact(row["stage_id"], row["input_hash"], row["output_hash"], result, hit=True, artifact_id=row["id"])
+
+
+def describe(stage_id: str, key: str, result: Any) -> StageArtifact:
+    """An unsaved artifact for result (output hash as save() would compute it)."""
+    try:
+        _, payload_json = encode(result)
+    except TypeError:
+        return StageArtifact(stage_id, key, uuid.uuid4().hex, result, hit=False)
+    return StageArtifact(stage_id, key, fingerprint(payload_json), result, hit=False)
+
+
+def save(job_run_id: int, stage_id: str, key: str, result: Any) -> StageArtifact:
+    """
+    Store result as the stage's current artifact.
+
+    Results carrying an `llm_error` (stub fallback after a failed call) are returned
+    but not stored, so the next run retries the LLM. A result that cannot be
+    serialized gets a random output hash, so downstream stages never match on it.
+    """
+    try:
+        result_type, payload_json = encode(result)
+    except TypeError:
+        logger.debug("Stage %s result %s is not storable; not caching", stage_id, type(result).__name__)
+        return StageArtifact(stage_id, key, uuid.uuid4().hex, result, hit=False)
+    output_hash = fingerprint(payload_json)
+    artifact_id = None
+    if not _has_llm_error(result):
+        artifact_id = db.save_stage_artifact(job_run_id, stage_id, key, output_hash, result_type, payload_json)
+    return StageArtifact(stage_id, key, output_hash, result, hit=False, artifact_id=artifact_id)
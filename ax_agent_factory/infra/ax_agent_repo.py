@@ -7,9 +7,11 @@ from datetime import datetime
 from typing import List, Optional
 
 from ax_agent_factory.core.schemas.ax import AgentSpec
-from ax_agent_factory.infra import db
+from ax_agent_factory.infra import db, storage, tracing
 
 
+@tracing.traced()
+@storage.routed
 def apply_agent_specs(job_run_id: int, agent_specs: List[AgentSpec]) -> None:
     """Upsert ax_agents from AgentSpec list."""
     if not agent_specs:
@@ -61,8 +63,12 @@ def apply_agent_specs(job_run_id: int, agent_specs: List[AgentSpec]) -> None:
         )
     conn.commit()
     conn.close()
+    db.invalidate_cached("ax_agents", job_run_id)
 
 
+@tracing.traced()
+@db.read_cache.cached("ax_agents")
+@storage.routed
 def get_agents(job_run_id: int) -> List[dict]:
     """Fetch ax_agents rows for a job_run."""
     conn = db._get_conn()
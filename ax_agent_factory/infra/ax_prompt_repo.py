@@ -7,41 +7,77 @@ from datetime import datetime
 from typing import List
 
 from ax_agent_factory.core.schemas.ax import AgentPromptSet
-from ax_agent_factory.infra import db
+from ax_agent_factory.infra import db, storage, tracing
 
 
+@tracing.traced()
+@storage.routed
 def apply_agent_prompts(job_run_id: int, result: AgentPromptSet) -> None:
-    """Upsert AgentPrompt entries into ax_prompts."""
+    """Store each AgentPrompt as the agent's new current version in ax_prompts (old versions pruned)."""
     if not result.agent_prompts:
         return
     conn = db._get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
     for prompt in result.agent_prompts:
-        cur.execute(
-            """
-            INSERT INTO ax_prompts (
-                job_run_id, agent_id, execution_environment, prompt_version,
-                single_prompt, system_prompt, user_prompt_template,
-                logic_hint, human_checklist, examples_json, mode,
-                created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                job_run_id,
-                prompt.agent_id,
-                prompt.env,
-                prompt.prompt_version,
-                None,  # single_prompt optional; mapped below by env
-                prompt.system_prompt,
-                prompt.user_prompt_template,
-                prompt.logic_hint,
-                prompt.human_checklist,
-                json.dumps(prompt.examples_json, ensure_ascii=False) if prompt.examples_json else None,
-                prompt.mode,
-                now,
-                now,
-            ),
+        db._insert_version(
+            cur,
+            "ax_prompts",
+            {
+                "job_run_id": job_run_id,
+                "agent_id": prompt.agent_id,
+                "execution_environment": prompt.env,
+                "prompt_version": prompt.prompt_version,
+                "single_prompt": None,  # single_prompt optional; mapped below by env
+                "system_prompt": prompt.system_prompt,
+                "user_prompt_template": prompt.user_prompt_template,
+                "logic_hint": prompt.logic_hint,
+                "human_checklist": prompt.human_checklist,
+                "examples_json": json.dumps(prompt.examples_json, ensure_ascii=False) if prompt.examples_json else None,
+                "mode": prompt.mode,
+                "created_at": now,
+                "updated_at": now,
+            },
         )
     conn.commit()
     conn.close()
+    db.invalidate_cached("ax_prompts", job_run_id)
+
+
+@tracing.traced()
+@db.read_cache.cached("ax_prompts")
+@storage.routed
+def get_agent_prompts(job_run_id: int) -> List[dict]:
+    """Current prompt per agent for a job_run."""
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT * FROM ax_prompts
+        WHERE job_run_id = ? AND is_current = 1
+        ORDER BY agent_id
+        """,
+        (job_run_id,),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+@tracing.traced()
+@storage.routed
+def get_agent_prompt_history(job_run_id: int, agent_id: str) -> List[dict]:
+    """Retained prompt versions of one agent, newest first."""
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT * FROM ax_prompts
+        WHERE job_run_id = ? AND agent_id = ?
+        ORDER BY version DESC
+        """,
+        (job_run_id, agent_id),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
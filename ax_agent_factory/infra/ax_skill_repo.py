@@ -11,43 +11,45 @@ from ax_agent_factory.core.schemas.ax import (
     SkillCard,
     SkillCardSet,
 )
-from ax_agent_factory.infra import db
+from ax_agent_factory.infra import db, storage, tracing
 
 
+@tracing.traced()
+@storage.routed
 def save_deep_research_result(job_run_id: int, result: DeepSkillResearchResult) -> None:
-    """Insert one deep research doc row."""
+    """Store a deep research doc as the agent's new current version (old versions pruned)."""
     conn = db._get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
-    cur.execute(
-        """
-        INSERT INTO ax_deep_research_docs (
-            job_run_id, agent_id, research_focus, sections_json, created_at, updated_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            job_run_id,
-            result.agent_id,
-            result.research_focus,
-            json.dumps(result.sections.model_dump(), ensure_ascii=False),
-            now,
-            now,
-        ),
+    db._insert_version(
+        cur,
+        "ax_deep_research_docs",
+        {
+            "job_run_id": job_run_id,
+            "agent_id": result.agent_id,
+            "research_focus": result.research_focus,
+            "sections_json": json.dumps(result.sections.model_dump(), ensure_ascii=False),
+            "created_at": now,
+            "updated_at": now,
+        },
     )
     conn.commit()
     conn.close()
+    db.invalidate_cached("ax_deep_research_docs", job_run_id)
 
 
+@tracing.traced()
+@db.read_cache.cached("ax_deep_research_docs")
+@storage.routed
 def get_deep_research_results(job_run_id: int) -> List[dict]:
-    """Fetch deep research docs for a job_run."""
+    """Fetch the current deep research doc per agent for a job_run."""
     conn = db._get_conn()
     cur = conn.cursor()
     cur.execute(
         """
         SELECT * FROM ax_deep_research_docs
-        WHERE job_run_id = ?
-        ORDER BY id
+        WHERE job_run_id = ? AND is_current = 1
+        ORDER BY agent_id
         """,
         (job_run_id,),
     )
@@ -56,6 +58,28 @@ def get_deep_research_results(job_run_id: int) -> List[dict]:
     return [dict(row) for row in rows]
 
 
+@tracing.traced()
+@storage.routed
+def get_deep_research_history(job_run_id: int, agent_id: str) -> List[dict]:
+    """Retained deep research versions of one agent, newest first."""
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT * FROM ax_deep_research_docs
+        WHERE job_run_id = ? AND agent_id = ?
+        ORDER BY version DESC
+        """,
+        (job_run_id, agent_id),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+@tracing.traced()
+@db.read_cache.cached("ax_skills")
+@storage.routed
 def get_skill_cards(job_run_id: int) -> List[dict]:
     """Fetch skill cards for a job_run."""
     conn = db._get_conn()
@@ -73,6 +97,8 @@ def get_skill_cards(job_run_id: int) -> List[dict]:
     return [dict(row) for row in rows]
 
 
+@tracing.traced()
+@storage.routed
 def apply_skill_cards(job_run_id: int, result: SkillCardSet) -> None:
     """Upsert skill cards into ax_skills."""
     if not result.skill_cards:
@@ -118,3 +144,4 @@ def apply_skill_cards(job_run_id: int, result: SkillCardSet) -> None:
         )
     conn.commit()
     conn.close()
+    db.invalidate_cached("ax_skills", job_run_id)
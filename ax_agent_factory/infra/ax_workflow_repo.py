@@ -7,9 +7,11 @@ from datetime import datetime
 from typing import List
 
 from ax_agent_factory.core.schemas.ax import AgentTableRow, AXWorkflowResult
-from ax_agent_factory.infra import db
+from ax_agent_factory.infra import db, storage, tracing
 
 
+@tracing.traced()
+@storage.routed
 def upsert_ax_workflow(job_run_id: int, result: AXWorkflowResult) -> int:
     """Insert or update ax_workflows row. Returns ax_workflows.id."""
     conn = db._get_conn()
@@ -53,6 +55,7 @@ def upsert_ax_workflow(job_run_id: int, result: AXWorkflowResult) -> int:
         )
         conn.commit()
         conn.close()
+        db.invalidate_cached("ax_workflows", job_run_id)
         return row["id"]
 
     cur.execute(
@@ -84,9 +87,13 @@ def upsert_ax_workflow(job_run_id: int, result: AXWorkflowResult) -> int:
     conn.commit()
     workflow_id = cur.lastrowid
     conn.close()
+    db.invalidate_cached("ax_workflows", job_run_id)
     return workflow_id
 
 
+@tracing.traced()
+@db.read_cache.cached("ax_workflows")
+@storage.routed
 def get_latest_ax_workflow(job_run_id: int) -> dict | None:
     """Return latest ax_workflows row as dict (JSON fields parsed)."""
     conn = db._get_conn()
@@ -114,6 +121,8 @@ def get_latest_ax_workflow(job_run_id: int) -> dict | None:
     }
 
 
+@tracing.traced()
+@storage.routed
 def sync_ax_agents_from_agent_table(job_run_id: int, ax_workflow_id: int, agent_rows: List[AgentTableRow]) -> None:
     """Upsert ax_agents rows based on agent_table output."""
     conn = db._get_conn()
@@ -163,3 +172,4 @@ def sync_ax_agents_from_agent_table(job_run_id: int, ax_workflow_id: int, agent_
         )
     conn.commit()
     conn.close()
+    db.invalidate_cached("ax_agents", job_run_id)
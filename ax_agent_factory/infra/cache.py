@@ -0,0 +1,246 @@
+"""Read-through cache for per-job-run DB reads.
+
+Streamlit reruns the whole script on every widget interaction, and each rerun
+used to re-query and re-parse the same JSON columns (research result, job_tasks,
+workflow plan, AX workflow, ...). ReadThroughCache keeps those decoded results in
+memory, keyed by (table, job_run_id, function, args), with LRU eviction bounded
+by entry count and approximate size.
+
+Validity:
+- Writes through db/repo helpers call `invalidate(table, job_run_id)`, which
+  bumps a version counter for that scope and drops its entries. A load that
+  raced with an invalidation is not stored (its version snapshot is stale).
+- Commits from other processes (workers, a second Streamlit server) are detected
+  with `PRAGMA data_version` on a monitor connection (see `freshness`): a change
+  that this process did not commit itself clears the whole cache. An external
+  commit landing in the same interval as a local one is caught by the TTL.
+- Reads inside an open transaction bypass the cache (they may see uncommitted
+  rows that could still be rolled back).
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from ax_agent_factory.infra import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = metrics.REGISTRY.counter(
+    "ax_cache_requests_total", "Read-through cache lookups by table and result (hit/miss/bypass).", ("cache", "table", "result")
+)
+CACHE_EVICTIONS = metrics.REGISTRY.counter(
+    "ax_cache_evictions_total", "Cache entries dropped by reason (lru/invalidate/external/ttl).", ("cache", "reason")
+)
+CACHE_BYTES = metrics.REGISTRY.gauge("ax_cache_bytes", "Approximate size of cached values.", ("cache",))
+CACHE_ENTRIES = metrics.REGISTRY.gauge("ax_cache_entries", "Number of cached values.", ("cache",))
+
+# (data_version, local commit count) as returned by the freshness callback.
+Freshness = tuple[int, int]
+
+
+def approx_size(value: Any, _seen: Optional[set[int]] = None) -> int:
+    """Rough deep size in bytes of a decoded DB value (dicts/lists/models/str)."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(v, seen) for v in value)
+    elif hasattr(value, "__dict__"):
+        size += approx_size(vars(value), seen)
+    return size
+
+
+@dataclass
+class _Entry:
+    value: Any
+    version: tuple[int, int, int]
+    size: int
+    stored_at: float
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    bypasses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ReadThroughCache:
+    """LRU cache of decoded rows scoped by (table, job_run_id)."""
+
+    def __init__(
+        self,
+        name: str = "db",
+        *,
+        max_entries: int = 2048,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_s: Optional[float] = 300.0,
+        enabled: bool = True,
+        freshness: Optional[Callable[[], Optional[Freshness]]] = None,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.enabled = enabled
+        self.freshness = freshness
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._scope_versions: dict[tuple[str, Any], int] = {}
+        self._table_versions: dict[str, int] = {}
+        self._epoch = 0
+        self._bytes = 0
+        self._last_freshness: Optional[Freshness] = None
+        self._lock = threading.RLock()
+        self._hits = self._misses = self._bypasses = self._evictions = 0
+
+    @classmethod
+    def from_env(cls, name: str = "db", **kwargs) -> "ReadThroughCache":
+        """AX_CACHE=0 disables; AX_CACHE_MAX_ENTRIES / AX_CACHE_MAX_MB / AX_CACHE_TTL_S bound it."""
+        ttl = float(os.environ.get("AX_CACHE_TTL_S", "300"))
+        return cls(
+            name,
+            max_entries=int(os.environ.get("AX_CACHE_MAX_ENTRIES", "2048")),
+            max_bytes=int(float(os.environ.get("AX_CACHE_MAX_MB", "64")) * 1024 * 1024),
+            ttl_s=ttl if ttl > 0 else None,
+            enabled=os.environ.get("AX_CACHE", "1") != "0",
+            **kwargs,
+        )
+
+    # --- versions -------------------------------------------------------------------
+    def _version(self, table: str, job_run_id: Any) -> tuple[int, int, int]:
+        return (self._epoch, self._table_versions.get(table, 0), self._scope_versions.get((table, job_run_id), 0))
+
+    def invalidate(self, table: str, job_run_id: Any = None) -> None:
+        """Drop cached reads of `table` for one job run (or all runs when job_run_id is None)."""
+        with self._lock:
+            if job_run_id is None:
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+                stale = [k for k in self._entries if k[0] == table]
+            else:
+                scope = (table, job_run_id)
+                self._scope_versions[scope] = self._scope_versions.get(scope, 0) + 1
+                stale = [k for k in self._entries if k[0] == table and k[1] == job_run_id]
+            self._drop(stale, "invalidate")
+
+    def clear(self, reason: str = "invalidate") -> None:
+        with self._lock:
+            self._epoch += 1
+            self._drop(list(self._entries), reason)
+
+    def _drop(self, keys: list, reason: str) -> None:
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+                self._evictions += 1
+                CACHE_EVICTIONS.inc(cache=self.name, reason=reason)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        CACHE_BYTES.set(self._bytes, cache=self.name)
+        CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+
+    def _check_external_writes(self) -> bool:
+        """Return False when the cache must be bypassed for this read."""
+        if self.freshness is None:
+            return True
+        current = self.freshness()
+        if current is None:
+            return False
+        with self._lock:
+            last, self._last_freshness = self._last_freshness, current
+            if last is not None and current[0] != last[0] and current[1] == last[1]:
+                logger.debug("data_version changed without a local commit; clearing %s cache", self.name)
+                self.clear("external")
+        return True
+
+    # --- lookups --------------------------------------------------------------------
+    def get_or_load(self, table: str, job_run_id: Any, key: Hashable, loader: Callable[[], Any]) -> Any:
+        if not self.enabled or not self._check_external_writes():
+            self._bypasses += 1
+            CACHE_REQUESTS.inc(cache=self.name, table=table, result="bypass")
+            return loader()
+        full_key = (table, job_run_id, key)
+        with self._lock:
+            version = self._version(table, job_run_id)
+            entry = self._entries.get(full_key)
+            if entry is not None and self.ttl_s is not None and time.monotonic() - entry.stored_at > self.ttl_s:
+                self._drop([full_key], "ttl")
+                entry = None
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(full_key)
+                self._hits += 1
+                CACHE_REQUESTS.inc(cache=self.name, table=table, result="hit")
+                return entry.value
+            self._misses += 1
+        CACHE_REQUESTS.inc(cache=self.name, table=table, result="miss")
+        value = loader()
+        self._store(full_key, table, job_run_id, version, value)
+        return value
+
+    def _store(self, full_key: Hashable, table: str, job_run_id: Any, version: tuple[int, int, int], value: Any) -> None:
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if self._version(table, job_run_id) != version:  # invalidated while loading
+                return
+            previous = self._entries.pop(full_key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[full_key] = _Entry(value, version, size, time.monotonic())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+                CACHE_EVICTIONS.inc(cache=self.name, reason="lru")
+            self._update_gauges()
+
+    def cached(self, table: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator for read helpers whose first argument is job_run_id."""
+
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(fn)
+            def wrapper(job_run_id: Any, *args: Any, **kwargs: Any) -> Any:
+                key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+                return self.get_or_load(table, job_run_id, key, lambda: fn(job_run_id, *args, **kwargs))
+
+            wrapper.uncached = fn  # type: ignore[attr-defined]
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                bypasses=self._bypasses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
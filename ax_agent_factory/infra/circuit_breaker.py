@@ -0,0 +1,241 @@
+"""Circuit breaker per (LLM stage, model) on the recent failure rate in llm_call_logs.
+
+When Gemini degrades, each call catches the error and returns its `_stub_*` output
+(json_parse_error, or stub_fallback with an error_type). The pipeline keeps going,
+persists placeholder results (a single "T01" task, "GENERAL" static types) and spends
+calls on later stages that build on them. The breaker turns that into a fast failure:
+
+    closed    --(AX_BREAKER_MIN_CALLS+ of the last AX_BREAKER_WINDOW live calls within
+                 AX_BREAKER_WINDOW_S, and >= AX_BREAKER_ERROR_RATE of them failed)--> open
+    open      --(AX_BREAKER_COOLDOWN_S)--> half_open: the next call is let through as a probe
+    half_open --probe succeeded--> closed (the error window restarts at the probe)
+              --probe failed----> open
+
+While the circuit is open (or its probe is in flight) llm_client raises CircuitOpenError
+instead of calling the model: the stage fails in stage_runs with nothing persisted,
+queue workers defer the item without using an attempt and pause until retry_after_s,
+and batch runs wait that long before a retry.
+
+Each circuit reuses its error window for AX_BREAKER_CACHE_S seconds (a failure recorded in
+this process drops it), so Stage 6's concurrent per-agent calls share one query. If that
+query fails (e.g. "database is locked" under batch load) the circuit keeps its state and
+the call goes through: a busy database says nothing about the model.
+
+Only live calls count. Stub mode (no GOOGLE_API_KEY / SDK) never reaches the breaker, and
+its stub_fallback rows have no error_type, so they are not failures. Circuit state is per
+process; every process decides from the same llm_call_logs rows. AX_BREAKER=0 disables it.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from ax_agent_factory.infra import db, metrics
+
+logger = logging.getLogger(__name__)
+
+FAILURE_STATUSES = ("stub_fallback", "json_parse_error")
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+CIRCUIT_STATE = metrics.REGISTRY.gauge(
+    "ax_llm_circuit_state", "LLM circuit breaker state (0 closed, 1 half-open, 2 open).", ("stage", "model")
+)
+CIRCUIT_REJECTIONS = metrics.REGISTRY.counter(
+    "ax_llm_circuit_rejections_total", "LLM calls refused while the circuit was open.", ("stage", "model")
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """An LLM stage/model circuit is open: fail fast instead of returning a stub."""
+
+    def __init__(self, stage_name: str, model_name: str, retry_after_s: float) -> None:
+        super().__init__(
+            f"LLM circuit open for {stage_name} ({model_name}): recent calls keep failing; retry in {retry_after_s:.0f}s"
+        )
+        self.stage_name = stage_name
+        self.model_name = model_name
+        self.retry_after_s = retry_after_s
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window: int = 20
+    window_s: float = 300.0
+    min_calls: int = 5
+    error_rate: float = 0.5
+    cooldown_s: float = 60.0
+    cache_s: float = 5.0  # how long a closed circuit reuses its error window
+
+    @classmethod
+    def from_env(cls) -> "BreakerConfig":
+        return cls(
+            window=int(_env_float("AX_BREAKER_WINDOW", cls.window)),
+            window_s=_env_float("AX_BREAKER_WINDOW_S", cls.window_s),
+            min_calls=int(_env_float("AX_BREAKER_MIN_CALLS", cls.min_calls)),
+            error_rate=_env_float("AX_BREAKER_ERROR_RATE", cls.error_rate),
+            cooldown_s=_env_float("AX_BREAKER_COOLDOWN_S", cls.cooldown_s),
+            cache_s=_env_float("AX_BREAKER_CACHE_S", cls.cache_s),
+        )
+
+
+@dataclass
+class _Circuit:
+    state: str = "closed"
+    opened_at: float = 0.0  # clock() when the circuit opened (or its probe went out)
+    since: str = ""  # ISO timestamp the error window starts at (moved on when a probe closes the circuit)
+    probing: bool = False
+    last_rate: Optional[float] = field(default=None)
+    window: Optional[tuple[int, int]] = None  # cached (calls, errors) of the error window
+    window_read_at: float = 0.0  # clock() when `window` was read
+
+
+class CircuitBreaker:
+    """Per-process circuits keyed by (stage_name, model_name)."""
+
+    def __init__(self, config: Optional[BreakerConfig] = None, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.config = config or BreakerConfig.from_env()
+        self.clock = clock
+        self._circuits: dict[tuple[str, str], _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def check(self, stage_name: str, model_name: str) -> None:
+        """Before a live call: raise CircuitOpenError if the circuit is (or now trips) open."""
+        key = (stage_name, model_name)
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            if circuit.state != "closed":
+                self._admit(key, circuit)
+                return
+            cached = circuit.window if self.clock() - circuit.window_read_at < self.config.cache_s else None
+            since = max(circuit.since, (datetime.utcnow() - timedelta(seconds=self.config.window_s)).isoformat())
+        if cached is None:
+            try:
+                window = db.get_llm_error_window(stage_name, model_name, since=since, limit=self.config.window)
+            except Exception:
+                logger.warning(
+                    "LLM circuit check for %s (%s) could not read llm_call_logs; letting the call through",
+                    stage_name,
+                    model_name,
+                    exc_info=True,
+                )
+                return
+            cached = (window["calls"], window["errors"])
+            with self._lock:
+                circuit.window, circuit.window_read_at = cached, self.clock()
+        calls, errors = cached
+        with self._lock:
+            circuit.last_rate = errors / calls if calls else None
+            if circuit.state == "closed" and calls >= self.config.min_calls and errors / calls >= self.config.error_rate:
+                logger.warning(
+                    "LLM circuit opened for %s (%s): %d of the last %d calls failed", stage_name, model_name, errors, calls
+                )
+                self._set_state(key, circuit, "open")
+                circuit.opened_at = self.clock()
+            if circuit.state != "closed":
+                self._admit(key, circuit)
+
+    def record(self, stage_name: str, model_name: str, *, status: str, error_type: Optional[str]) -> None:
+        """After a logged call: settle a half-open circuit's probe; a failure drops a closed circuit's cached window."""
+        if status == "success":
+            ok = True
+        elif status in FAILURE_STATUSES and error_type:
+            ok = False
+        else:  # stub mode / overrides are not live calls
+            return
+        key = (stage_name, model_name)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None and not ok:
+                circuit.window = None  # the next check sees this failure
+            if circuit is None or circuit.state != "half_open" or not circuit.probing:
+                return
+            circuit.probing = False
+            if ok:
+                logger.info("LLM circuit closed for %s (%s) after a successful probe", stage_name, model_name)
+                circuit.since = datetime.utcnow().isoformat()
+                circuit.window = None
+                self._set_state(key, circuit, "closed")
+            else:
+                circuit.opened_at = self.clock()
+                self._set_state(key, circuit, "open")
+
+    def state(self, stage_name: str, model_name: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get((stage_name, model_name))
+            return circuit.state if circuit else "closed"
+
+    def snapshot(self) -> list[dict]:
+        """Circuits of this process (UI / diagnostics)."""
+        with self._lock:
+            return [
+                {"stage_name": s, "model_name": m, "state": c.state, "error_rate": c.last_rate}
+                for (s, m), c in sorted(self._circuits.items())
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            for stage_name, model_name in self._circuits:
+                CIRCUIT_STATE.set(0, stage=stage_name, model=model_name)
+            self._circuits.clear()
+
+    def _admit(self, key: tuple[str, str], circuit: _Circuit) -> None:
+        """Open / half-open circuit (lock held): let one probe through per cooldown, refuse the rest."""
+        remaining = self.config.cooldown_s - (self.clock() - circuit.opened_at)
+        if remaining <= 0:  # open: cooldown over; half-open: the last probe never reported back
+            self._set_state(key, circuit, "half_open")
+            circuit.probing = True
+            circuit.opened_at = self.clock()
+            return
+        CIRCUIT_REJECTIONS.inc(stage=key[0], model=key[1])
+        raise CircuitOpenError(key[0], key[1], max(remaining, 1.0))
+
+    @staticmethod
+    def _set_state(key: tuple[str, str], circuit: _Circuit, state: str) -> None:
+        circuit.state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], stage=key[0], model=key[1])
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
+
+
+def set_breaker(breaker: Optional[CircuitBreaker]) -> None:
+    """Replace the process breaker (tests, custom thresholds); None rebuilds it from the environment."""
+    global _breaker
+    with _breaker_lock:
+        _breaker = breaker
+
+
+def enabled() -> bool:
+    return os.environ.get("AX_BREAKER", "1") != "0"
+
+
+def check(stage_name: str, model_name: str) -> None:
+    """llm_client hook before every live call."""
+    if enabled():
+        get_breaker().check(stage_name, model_name)
+
+
+def record(stage_name: str, model_name: str, *, status: str, error_type: Optional[str]) -> None:
+    """llm_client hook after every logged call."""
+    if enabled() and _breaker is not None:
+        _breaker.record(stage_name, model_name, status=status, error_type=error_type)
@@ -2,30 +2,109 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import os
 import sqlite3
-from datetime import datetime
+import weakref
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from ax_agent_factory.core.schemas.common import IVCAtomicTask, IVCTask, TaskStaticMeta
 from ax_agent_factory.core.schemas.workflow import MermaidDiagram, WorkflowPlan
 from ax_agent_factory.models.job_run import JobResearchCollectResult, JobResearchResult, JobRun
 from ax_agent_factory.models.llm_log import LLMCallLog
+from ax_agent_factory.infra import storage, tracing
+from ax_agent_factory.infra.cache import ReadThroughCache
+from ax_agent_factory.infra.sqlite_conn import ConnectionManager, UnitOfWorkRolledBack  # noqa: F401 - re-exported
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = os.environ.get("AX_DB_PATH", "data/ax_factory.db")
+_connections: Optional[ConnectionManager] = None
 
 
 def _ensure_dir(path: str) -> None:
     Path(path).parent.mkdir(parents=True, exist_ok=True)
 
 
+def get_connection_manager() -> ConnectionManager:
+    """Return the ConnectionManager for DB_PATH (recreated when the path changes)."""
+    global _connections
+    if _connections is None or _connections.path != DB_PATH:
+        if _connections is not None:
+            _connections.close_all()
+        _connections = ConnectionManager(DB_PATH, persistent=os.environ.get("AX_SQLITE_PERSISTENT", "1") != "0")
+    return _connections
+
+
 def _get_conn() -> sqlite3.Connection:
-    _ensure_dir(DB_PATH)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return get_connection_manager().get()
+
+
+_cache_owner: Optional[ConnectionManager] = None
+
+
+def _cache_freshness() -> Optional[tuple[int, int]]:
+    """read_cache validity probe: bypass inside a transaction, reset when the DB file changes."""
+    global _cache_owner
+    if storage.get_store() is not None:
+        return None  # SQLAlchemy backend: writers elsewhere are not visible to data_version
+    manager = get_connection_manager()
+    if manager is not _cache_owner:
+        read_cache.clear()
+        _cache_owner = manager
+    if manager.in_transaction():
+        return None
+    return manager.data_version(), manager.commits
+
+
+# Decoded per-job-run reads (JSON columns parsed); see infra/cache.py for the validity rules.
+read_cache = ReadThroughCache.from_env("db", freshness=_cache_freshness)
+
+
+def invalidate_cached(table: str, job_run_id: Optional[int] = None) -> None:
+    """Drop read_cache entries for table/job_run_id once the current write commits."""
+    get_connection_manager().after_commit(lambda: read_cache.invalidate(table, job_run_id))
+
+
+def transaction(*, immediate: bool = True):
+    """
+    Unit of work: db/repo helpers called inside the block share one connection and
+    commit once when it exits (rolled back on exception). Nested blocks join; if one
+    of them fails, the unit rolls back and raises UnitOfWorkRolledBack on exit even
+    when the error was caught inside the block.
+
+        with db.transaction():
+            db.apply_workflow_plan(job_run_id, plan)
+            db.save_workflow_plan(job_run_id, plan)
+    """
+    store = storage.get_store()
+    if store is not None:
+        return store.transaction(immediate=immediate)
+    writer = storage.get_writer()
+    if writer is not None:  # writes are committed by the writer process (infra/db_writer.py)
+        return writer.transaction(immediate=immediate)
+    return get_connection_manager().transaction(immediate=immediate)
+
+
+def run_detached(fn: Callable[..., object], *args, **kwargs) -> None:
+    """
+    Call a write helper in a transaction of its own, outside the current unit of work, so
+    its rows are kept when the enclosing stage rolls back (LLM call logs and rollups).
+    It runs now on a second connection, or right after the unit ends if the unit already
+    holds the SQLite write lock (ConnectionManager.run_detached); the return value is dropped.
+    """
+    store = storage.get_store()
+    if store is not None:
+        store.run_detached(lambda: fn(*args, **kwargs))
+    elif storage.get_writer() is not None:  # every forwarded write already commits on its own
+        fn(*args, **kwargs)
+    else:
+        get_connection_manager().run_detached(lambda: fn(*args, **kwargs))
 
 
 def _table_has_column(cur: sqlite3.Cursor, table: str, column: str) -> bool:
@@ -38,9 +117,8 @@ def _add_column_if_missing(cur: sqlite3.Cursor, table: str, column: str, ddl: st
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
 
 
-def _ensure_tables() -> None:
-    conn = _get_conn()
-    cur = conn.cursor()
+def _m001_baseline(cur: sqlite3.Cursor) -> None:
+    """Original schema; also adopts pre-migration databases (all statements idempotent)."""
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS job_runs (
@@ -324,17 +402,395 @@ def _ensure_tables() -> None:
         )
         """
     )
-    conn.commit()
-    conn.close()
 
 
-_ensure_tables()
+def _m002_llm_call_rollups(cur: sqlite3.Cursor) -> None:
+    """Hourly LLM performance rollups (maintained by save_llm_call_log)."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_call_rollups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hour_bucket TEXT NOT NULL,
+            stage_name TEXT NOT NULL,
+            model_name TEXT NOT NULL,
+            prompt_version TEXT NOT NULL DEFAULT '',
+            call_count INTEGER NOT NULL DEFAULT 0,
+            latency_count INTEGER NOT NULL DEFAULT 0,
+            latency_sum_ms INTEGER NOT NULL DEFAULT 0,
+            latency_max_ms INTEGER NOT NULL DEFAULT 0,
+            tokens_prompt_sum INTEGER NOT NULL DEFAULT 0,
+            tokens_completion_sum INTEGER NOT NULL DEFAULT 0,
+            tokens_total_sum INTEGER NOT NULL DEFAULT 0,
+            stub_fallback_count INTEGER NOT NULL DEFAULT 0,
+            json_parse_error_count INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL,
+            UNIQUE(hour_bucket, stage_name, model_name, prompt_version)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_call_latency_buckets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hour_bucket TEXT NOT NULL,
+            stage_name TEXT NOT NULL,
+            model_name TEXT NOT NULL,
+            prompt_version TEXT NOT NULL DEFAULT '',
+            le_ms INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            UNIQUE(hour_bucket, stage_name, model_name, prompt_version, le_ms)
+        )
+        """
+    )
+
+
+def _m003_job_run_trace_id(cur: sqlite3.Cursor) -> None:
+    _add_column_if_missing(cur, "job_runs", "trace_id", "TEXT")
+
+
+def _m004_llm_call_latest_index(cur: sqlite3.Cursor) -> None:
+    """Latest-log-per-stage lookup (get_latest_llm_call): seek + one backward step, no sort."""
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_llm_call_logs_run_stage_created ON llm_call_logs (job_run_id, stage_name, created_at)"
+    )
+
+
+# Full-text search sources: (doc_type, rowid code, table, job_run_id column, title expr, body expr,
+# columns whose UPDATE re-indexes the row). `{r}` is the row alias (new/old in triggers).
+# search_index rowid = source id * 8 + code, so triggers address one FTS row directly.
+_SEARCH_SOURCES: tuple[tuple[str, int, str, str, str, str, tuple[str, ...]], ...] = (
+    (
+        "job_run", 0, "job_runs", "id",
+        "{r}.company_name || ' ' || {r}.job_title",
+        "COALESCE({r}.industry_context, '') || char(10) || COALESCE({r}.business_goal, '') || char(10) || "
+        "COALESCE({r}.manual_jd_text, '')",
+        ("company_name", "job_title", "industry_context", "business_goal", "manual_jd_text"),
+    ),
+    ("jd", 1, "job_research_results", "job_run_id", "''", "{r}.raw_job_desc", ("raw_job_desc",)),
+    (
+        "task", 2, "job_tasks", "job_run_id",
+        "{r}.task_korean",
+        "{r}.task_original_sentence || char(10) || COALESCE({r}.task_english, '') || char(10) || COALESCE({r}.notes, '')",
+        ("task_korean", "task_original_sentence", "task_english", "notes"),
+    ),
+    (
+        "skill", 3, "ax_skills", "job_run_id",
+        "{r}.skill_name",
+        "COALESCE({r}.purpose, '') || char(10) || COALESCE({r}.when_to_use, '') || char(10) || "
+        "COALESCE({r}.core_heuristics_json, '') || char(10) || COALESCE({r}.step_checklist_json, '')",
+        ("skill_name", "purpose", "when_to_use", "core_heuristics_json", "step_checklist_json"),
+    ),
+    (
+        "prompt", 4, "ax_prompts", "job_run_id",
+        "{r}.agent_id",
+        "COALESCE({r}.single_prompt, '') || char(10) || COALESCE({r}.system_prompt, '') || char(10) || "
+        "COALESCE({r}.user_prompt_template, '') || char(10) || COALESCE({r}.logic_hint, '')",
+        ("agent_id", "single_prompt", "system_prompt", "user_prompt_template", "logic_hint"),
+    ),
+)
+SEARCH_DOC_TYPES = tuple(source[0] for source in _SEARCH_SOURCES)
+# Which rows of a source are indexed (default: all): doc_type -> (condition, columns it reads).
+# ax_prompts keeps retired versions as history; only the current one is searchable (migration 11).
+_SEARCH_SOURCE_FILTERS: dict[str, tuple[str, tuple[str, ...]]] = {"prompt": ("{r}.is_current = 1", ("is_current",))}
+
+
+def _search_index_values(r: str, code: int, doc_type: str, job_run_col: str, title: str, body: str) -> str:
+    return (
+        f"{r}.id * 8 + {code}, '{doc_type}', {r}.{job_run_col}, {r}.id, "
+        f"{title.format(r=r)}, {body.format(r=r)}"
+    )
+
+
+def _backfill_search_index(cur: sqlite3.Cursor, filters: Optional[dict] = None) -> None:
+    """(Re)populate search_index from the source tables."""
+    filters = _SEARCH_SOURCE_FILTERS if filters is None else filters
+    cur.execute("DELETE FROM search_index")
+    for doc_type, code, table, job_run_col, title, body, _ in _SEARCH_SOURCES:
+        where = f" WHERE {filters[doc_type][0].format(r=table)}" if doc_type in filters else ""
+        cur.execute(
+            f"INSERT INTO search_index (rowid, doc_type, job_run_id, ref_id, title, body) "
+            f"SELECT {_search_index_values(table, code, doc_type, job_run_col, title, body)} FROM {table}{where}"
+        )
+
+
+def _create_search_triggers(cur: sqlite3.Cursor, filters: Optional[dict] = None) -> None:
+    """Triggers that keep search_index in step with the source tables (existing triggers are kept)."""
+    filters = _SEARCH_SOURCE_FILTERS if filters is None else filters
+    for doc_type, code, table, job_run_col, title, body, columns in _SEARCH_SOURCES:
+        insert = (
+            "INSERT INTO search_index (rowid, doc_type, job_run_id, ref_id, title, body) "
+            f"SELECT {_search_index_values('new', code, doc_type, job_run_col, title, body)}"
+        )
+        if doc_type in filters:  # the row enters or leaves the index when the condition's columns change
+            condition, condition_columns = filters[doc_type]
+            insert += f" WHERE {condition.format(r='new')}"
+            columns = (*columns, *condition_columns)
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS search_{doc_type}_ai AFTER INSERT ON {table} BEGIN {insert}; END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS search_{doc_type}_au AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"BEGIN DELETE FROM search_index WHERE rowid = old.id * 8 + {code}; {insert}; END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER IF NOT EXISTS search_{doc_type}_ad AFTER DELETE ON {table} "
+            f"BEGIN DELETE FROM search_index WHERE rowid = old.id * 8 + {code}; END"
+        )
+
+
+def _create_search_index(cur: sqlite3.Cursor) -> None:
+    """Create the search_index FTS5 table (OperationalError on SQLite without FTS5 / older than 3.34)."""
+    cur.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            doc_type UNINDEXED, job_run_id UNINDEXED, ref_id UNINDEXED, title, body,
+            tokenize = 'trigram'
+        )
+        """
+    )
+
+
+def _m005_search_index(cur: sqlite3.Cursor) -> None:
+    """FTS5 trigram index over runs, JDs, tasks, skills and prompts, kept current by triggers."""
+    try:
+        _create_search_index(cur)
+    except sqlite3.OperationalError as exc:
+        # The migration still counts as applied; search.rebuild_index() creates the index later.
+        logger.warning(
+            "search_index not created (%s); full-text search is unavailable until search.rebuild_index() "
+            "runs on an SQLite with FTS5 trigram support",
+            exc,
+        )
+        return
+    # ax_prompts.is_current only exists from migration 7 on; migration 11 adds the filters.
+    _create_search_triggers(cur, filters={})
+    _backfill_search_index(cur, filters={})
+
+
+def _m006_stage_artifacts(cur: sqlite3.Cursor) -> None:
+    """Immutable stage outputs keyed by input hash (incremental recomputation, see infra/artifacts.py)."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stage_artifacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_run_id INTEGER NOT NULL,
+            stage_id TEXT NOT NULL,
+            input_hash TEXT NOT NULL,
+            output_hash TEXT NOT NULL,
+            result_type TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY(job_run_id) REFERENCES job_runs(id)
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_stage_artifacts_run_stage ON stage_artifacts (job_run_id, stage_id, id)")
+
+
+# Agent-scoped artifacts kept as numbered versions with one current row per (job_run_id, agent_id).
+VERSIONED_AX_TABLES = ("ax_prompts", "ax_deep_research_docs")
+
+
+def _m007_ax_versions_and_indexes(cur: sqlite3.Cursor) -> None:
+    """Version ax_prompts/ax_deep_research_docs per agent and index the ax_* job_run read paths."""
+    for table in VERSIONED_AX_TABLES:
+        _add_column_if_missing(cur, table, "version", "INTEGER NOT NULL DEFAULT 1")
+        _add_column_if_missing(cur, table, "is_current", "INTEGER NOT NULL DEFAULT 1")
+        # Existing rows were appended per rerun: number them by id and keep only the newest current.
+        cur.execute(
+            f"""
+            UPDATE {table} SET
+                version = (
+                    SELECT COUNT(*) FROM {table} AS prev
+                    WHERE prev.job_run_id = {table}.job_run_id AND prev.agent_id = {table}.agent_id
+                      AND prev.id <= {table}.id
+                ),
+                is_current = id = (
+                    SELECT MAX(id) FROM {table} AS last
+                    WHERE last.job_run_id = {table}.job_run_id AND last.agent_id = {table}.agent_id
+                )
+            """
+        )
+        cur.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_run_agent_version ON {table} (job_run_id, agent_id, version)"
+        )
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_current ON {table} (job_run_id, agent_id) WHERE is_current = 1"
+        )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ax_workflows_run ON ax_workflows (job_run_id, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_ax_agent_task_links_run_agent ON ax_agent_task_links (job_run_id, agent_id)")
+
+
+def job_run_dedup_hash(company_name: str, job_title: str, manual_jd_text: Optional[str]) -> str:
+    """Fixed-width key for the create_or_get_job_run dedup lookup (the JD text can be many KB)."""
+    key = "\x1f".join((company_name, job_title, manual_jd_text or ""))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _m008_job_run_dedup_hash(cur: sqlite3.Cursor) -> None:
+    """Indexed hash of (company_name, job_title, manual_jd_text) so create_or_get_job_run seeks instead of scanning."""
+    _add_column_if_missing(cur, "job_runs", "dedup_hash", "TEXT")
+    rows = cur.execute(
+        "SELECT id, company_name, job_title, manual_jd_text FROM job_runs WHERE dedup_hash IS NULL"
+    ).fetchall()
+    cur.executemany(
+        "UPDATE job_runs SET dedup_hash = ? WHERE id = ?",
+        [(job_run_dedup_hash(r[1], r[2], r[3]), r[0]) for r in rows],
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_dedup_hash ON job_runs (dedup_hash)")
+
+
+def _m009_job_queue(cur: sqlite3.Cursor) -> None:
+    """Durable work queue for stage targets (leases, heartbeats, retries, dead letters; see infra/job_queue.py)."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_run_id INTEGER NOT NULL,
+            target TEXT NOT NULL,
+            ax_target TEXT,
+            manual_jd_text TEXT,
+            force_rerun_json TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            due_at TEXT NOT NULL,
+            lease_owner TEXT,
+            heartbeat_at TEXT,
+            progress_json TEXT,
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            finished_at TEXT,
+            FOREIGN KEY(job_run_id) REFERENCES job_runs(id)
+        )
+        """
+    )
+    # queued: due_at = not before (retry backoff); running: due_at = lease expiry.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_queue_due ON job_queue (status, due_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_queue_run ON job_queue (job_run_id, id)")
+
+
+def _m010_stage_runs(cur: sqlite3.Cursor) -> None:
+    """Per (job_run, stage) execution state for crash-safe resume (status, input hash, times, artifact pointer)."""
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS stage_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_run_id INTEGER NOT NULL,
+            stage_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            input_hash TEXT,
+            artifact_id INTEGER,
+            error TEXT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            UNIQUE(job_run_id, stage_id),
+            FOREIGN KEY(job_run_id) REFERENCES job_runs(id),
+            FOREIGN KEY(artifact_id) REFERENCES stage_artifacts(id)
+        )
+        """
+    )
+
+
+def _m011_search_current_prompts(cur: sqlite3.Cursor) -> None:
+    """Index only the current ax_prompts version (retired versions used to stay searchable)."""
+    if cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_index'").fetchone() is None:
+        return  # SQLite without FTS5: search.rebuild_index() creates the index with current triggers
+    for suffix in ("ai", "au", "ad"):
+        cur.execute(f"DROP TRIGGER IF EXISTS search_prompt_{suffix}")
+    _create_search_triggers(cur)
+    _backfill_search_index(cur)
+
+
+# Ordered, idempotent schema steps. Append new steps with the next number; never edit or
+# renumber a released step. PRAGMA user_version records the last applied number.
+SCHEMA_MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "baseline schema", _m001_baseline),
+    (2, "llm_call_rollups / llm_call_latency_buckets", _m002_llm_call_rollups),
+    (3, "job_runs.trace_id", _m003_job_run_trace_id),
+    (4, "llm_call_logs (job_run_id, stage_name, created_at) index", _m004_llm_call_latest_index),
+    (5, "search_index FTS5 table + triggers", _m005_search_index),
+    (6, "stage_artifacts", _m006_stage_artifacts),
+    (7, "ax_prompts/ax_deep_research_docs versions + ax_* job_run indexes", _m007_ax_versions_and_indexes),
+    (8, "job_runs.dedup_hash + index", _m008_job_run_dedup_hash),
+    (9, "job_queue", _m009_job_queue),
+    (10, "stage_runs", _m010_stage_runs),
+    (11, "search_index: current ax_prompts versions only", _m011_search_current_prompts),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+# Legacy-column capability map per raw connection (see _schema_capabilities).
+_capability_cache: "weakref.WeakKeyDictionary[sqlite3.Connection, dict[str, bool]]" = weakref.WeakKeyDictionary()
+
+
+def migrate() -> int:
+    """
+    Bring DB_PATH up to SCHEMA_VERSION and return the resulting user_version.
+
+    Up-to-date databases cost one `PRAGMA user_version` read. Pending steps run in a
+    single BEGIN IMMEDIATE transaction, so concurrent processes apply them only once.
+    """
+    conn = _get_conn()
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return version
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            cur = conn.cursor()
+            for number, description, step in SCHEMA_MIGRATIONS:
+                if number <= version:
+                    continue
+                logger.info("Applying schema migration %s (%s) to %s", number, description, DB_PATH)
+                step(cur)
+                cur.execute(f"PRAGMA user_version = {number}")
+                version = number
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        _capability_cache.clear()
+        return version
+    finally:
+        conn.close()
+
+
+def _ensure_tables() -> None:
+    migrate()
+
+
+def _schema_capabilities(conn: sqlite3.Connection) -> dict[str, bool]:
+    """Which optional/legacy columns exist, probed once per connection instead of per call."""
+    raw = getattr(conn, "raw", conn)
+    caps = _capability_cache.get(raw)
+    if caps is None:
+        cur = raw.cursor()
+        caps = {
+            "job_research_results.research_sources": _table_has_column(cur, "job_research_results", "research_sources"),
+            "job_research_collect_results.raw_sources": _table_has_column(cur, "job_research_collect_results", "raw_sources"),
+            "job_research_collect_results.job_meta_json": _table_has_column(
+                cur, "job_research_collect_results", "job_meta_json"
+            ),
+        }
+        _capability_cache[raw] = caps
+    return caps
+
+
+# AX_DATABASE_URL routes the helpers below to storage.SQLAlchemyStore (schema via metadata.create_all).
+if storage.configure_from_env() is None:
+    _ensure_tables()
 
 
 def set_db_path(path: str) -> None:
     """Override DB path (used for testing) and recreate tables."""
     global DB_PATH
     DB_PATH = path
+    get_connection_manager()
+    read_cache.clear()
     _ensure_tables()
 
 
@@ -350,9 +806,12 @@ def _row_to_job_run(row: sqlite3.Row) -> JobRun:
         status=row["status"],
         created_at=datetime.fromisoformat(row["created_at"]),
         updated_at=datetime.fromisoformat(updated_at_str),
+        trace_id=row["trace_id"] if "trace_id" in row.keys() else None,
     )
 
 
+@tracing.traced()
+@storage.routed
 def create_or_get_job_run(
     company_name: str,
     job_title: str,
@@ -363,16 +822,18 @@ def create_or_get_job_run(
     status: str | None = None,
 ) -> JobRun:
     """Return an existing JobRun for same company/job_title/manual_jd_text or create a new one."""
+    dedup_hash = job_run_dedup_hash(company_name, job_title, manual_jd_text)
     conn = _get_conn()
     cur = conn.cursor()
     cur.execute(
         """
         SELECT * FROM job_runs
-        WHERE company_name = ? AND job_title = ? AND IFNULL(manual_jd_text, '') = IFNULL(?, '')
+        WHERE dedup_hash = ?
+          AND company_name = ? AND job_title = ? AND IFNULL(manual_jd_text, '') = IFNULL(?, '')
         ORDER BY id DESC
         LIMIT 1
         """,
-        (company_name, job_title, manual_jd_text),
+        (dedup_hash, company_name, job_title, manual_jd_text),
     )
     row = cur.fetchone()
     if row:
@@ -382,10 +843,13 @@ def create_or_get_job_run(
     now = datetime.utcnow().isoformat()
     cur.execute(
         """
-        INSERT INTO job_runs (company_name, job_title, industry_context, business_goal, manual_jd_text, status, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO job_runs (
+            company_name, job_title, industry_context, business_goal, manual_jd_text, status, dedup_hash,
+            created_at, updated_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (company_name, job_title, industry_context, business_goal, manual_jd_text, status, now, now),
+        (company_name, job_title, industry_context, business_goal, manual_jd_text, status, dedup_hash, now, now),
     )
     conn.commit()
     job_run_id = cur.lastrowid
@@ -395,11 +859,15 @@ def create_or_get_job_run(
     return _row_to_job_run(row)
 
 
+@tracing.traced()
+@storage.routed
 def create_job_run(company_name: str, job_title: str) -> JobRun:
     """Insert a new JobRun and return it (legacy helper)."""
     return create_or_get_job_run(company_name, job_title)
 
 
+@tracing.traced()
+@storage.routed
 def update_job_run_meta(
     job_run_id: int,
     *,
@@ -426,6 +894,19 @@ def update_job_run_meta(
     conn.close()
 
 
+@tracing.traced()
+@storage.routed
+def set_job_run_trace_id(job_run_id: int, trace_id: str) -> None:
+    """Remember the latest pipeline trace for a job_run (UI waterfall lookup)."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("UPDATE job_runs SET trace_id = ? WHERE id = ?", (trace_id, job_run_id))
+    conn.commit()
+    conn.close()
+
+
+@tracing.traced()
+@storage.routed
 def get_latest_job_run() -> Optional[JobRun]:
     """Return the most recent JobRun if exists."""
     conn = _get_conn()
@@ -438,6 +919,8 @@ def get_latest_job_run() -> Optional[JobRun]:
     return _row_to_job_run(row)
 
 
+@tracing.traced()
+@storage.routed
 def get_job_run(job_run_id: int) -> Optional[JobRun]:
     """Fetch a JobRun by id."""
     conn = _get_conn()
@@ -450,12 +933,14 @@ def get_job_run(job_run_id: int) -> Optional[JobRun]:
     return _row_to_job_run(row)
 
 
+@tracing.traced()
+@storage.routed
 def save_job_research_result(result: JobResearchResult) -> None:
     """Insert or replace a JobResearchResult."""
     conn = _get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
-    has_legacy_column = _table_has_column(cur, "job_research_results", "research_sources")
+    has_legacy_column = _schema_capabilities(conn)["job_research_results.research_sources"]
     research_sources_json = json.dumps(result.research_sources, ensure_ascii=False)
     cur.execute(
         f"""
@@ -492,15 +977,18 @@ def save_job_research_result(result: JobResearchResult) -> None:
     )
     conn.commit()
     conn.close()
+    invalidate_cached("job_research_results", result.job_run_id)
 
 
+@tracing.traced()
+@storage.routed
 def save_job_research_collect_result(result: JobResearchCollectResult) -> None:
     """Insert or replace Stage 0.1 collect result."""
     conn = _get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
-    has_legacy_column = _table_has_column(cur, "job_research_collect_results", "raw_sources")
-    has_job_meta_column = _table_has_column(cur, "job_research_collect_results", "job_meta_json")
+    has_legacy_column = _schema_capabilities(conn)["job_research_collect_results.raw_sources"]
+    has_job_meta_column = _schema_capabilities(conn)["job_research_collect_results.job_meta_json"]
     raw_sources_json = json.dumps(result.raw_sources, ensure_ascii=False)
     job_meta_json = json.dumps(result.job_meta or {}, ensure_ascii=False)
 
@@ -538,13 +1026,17 @@ def save_job_research_collect_result(result: JobResearchCollectResult) -> None:
     )
     conn.commit()
     conn.close()
+    invalidate_cached("job_research_collect_results", result.job_run_id)
 
 
+@tracing.traced()
+@read_cache.cached("job_research_results")
+@storage.routed
 def get_job_research_result(job_run_id: int) -> Optional[JobResearchResult]:
     """Fetch JobResearchResult by job_run_id if exists."""
     conn = _get_conn()
     cur = conn.cursor()
-    has_legacy_column = _table_has_column(cur, "job_research_results", "research_sources")
+    has_legacy_column = _schema_capabilities(conn)["job_research_results.research_sources"]
     if has_legacy_column:
         cur.execute(
             """
@@ -575,12 +1067,15 @@ def get_job_research_result(job_run_id: int) -> Optional[JobResearchResult]:
     )
 
 
+@tracing.traced()
+@read_cache.cached("job_research_collect_results")
+@storage.routed
 def get_job_research_collect_result(job_run_id: int) -> Optional[JobResearchCollectResult]:
     """Fetch Stage 0.1 collect result by job_run_id if exists."""
     conn = _get_conn()
     cur = conn.cursor()
-    has_legacy_column = _table_has_column(cur, "job_research_collect_results", "raw_sources")
-    has_job_meta_column = _table_has_column(cur, "job_research_collect_results", "job_meta_json")
+    has_legacy_column = _schema_capabilities(conn)["job_research_collect_results.raw_sources"]
+    has_job_meta_column = _schema_capabilities(conn)["job_research_collect_results.job_meta_json"]
     if has_legacy_column:
         cur.execute(
             """
@@ -617,27 +1112,35 @@ def get_job_research_collect_result(job_run_id: int) -> Optional[JobResearchColl
     )
 
 
-def _ensure_task_row(job_run_id: int, task_id: str, *, conn: Optional[sqlite3.Connection] = None) -> None:
-    """Ensure a job_tasks row exists for the given task."""
-    owns_conn = conn is None
-    connection = conn or _get_conn()
-    cur = connection.cursor()
-    now = datetime.utcnow().isoformat()
-    cur.execute(
+def _field(obj, name: str):
+    """Read a field from a pydantic model or a plain dict (workflow nodes/edges come as either)."""
+    return getattr(obj, name) if hasattr(obj, name) else obj.get(name)
+
+
+# Upsert skeleton for job_tasks: creates a placeholder row (empty sentence/korean) when a
+# classification arrives for an unknown task_id, otherwise updates only the given columns.
+def _job_tasks_upsert_sql(columns: tuple[str, ...]) -> str:
+    return f"""
+        INSERT INTO job_tasks (
+            job_run_id, task_id, task_original_sentence, task_korean, {", ".join(columns)}, created_at, updated_at
+        ) VALUES (?, ?, '', '', {", ".join("?" for _ in columns)}, ?, ?)
+        ON CONFLICT(job_run_id, task_id) DO UPDATE SET
+            {", ".join(f"{c} = excluded.{c}" for c in columns)},
+            updated_at = excluded.updated_at
         """
-        INSERT OR IGNORE INTO job_tasks (
-            job_run_id, task_id, task_original_sentence, task_korean, task_english, notes,
-            created_at, updated_at
-        )
-        VALUES (?, ?, '', '', NULL, NULL, ?, ?)
-        """,
-        (job_run_id, task_id, now, now),
-    )
-    if owns_conn:
-        connection.commit()
-        connection.close()
 
 
+_IVC_COLUMNS = ("ivc_phase", "ivc_exec_subphase", "primitive_lv1", "classification_reason")
+_STATIC_COLUMNS = (
+    "static_type_lv1", "static_type_lv2", "domain_lv1", "domain_lv2", "rag_required", "rag_reason",
+    "value_score", "complexity_score", "value_complexity_quadrant", "recommended_execution_env",
+    "autoability_reason", "data_entities_json", "tags_json",
+)
+_WORKFLOW_NODE_COLUMNS = ("stage_id", "stream_id", "workflow_node_label", "is_entry", "is_exit", "is_hub")
+
+
+@tracing.traced()
+@storage.routed
 def save_task_atoms(job_run_id: int, task_atoms: list[IVCAtomicTask]) -> None:
     """Persist Stage 1-A task atoms into job_tasks (upsert)."""
     if not task_atoms:
@@ -645,20 +1148,20 @@ def save_task_atoms(job_run_id: int, task_atoms: list[IVCAtomicTask]) -> None:
     conn = _get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
-    for atom in task_atoms:
-        cur.execute(
-            """
-            INSERT INTO job_tasks (
-                job_run_id, task_id, task_original_sentence, task_korean,
-                task_english, notes, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(job_run_id, task_id) DO UPDATE SET
-                task_original_sentence = excluded.task_original_sentence,
-                task_korean = excluded.task_korean,
-                task_english = excluded.task_english,
-                notes = excluded.notes,
-                updated_at = excluded.updated_at
-            """,
+    cur.executemany(
+        """
+        INSERT INTO job_tasks (
+            job_run_id, task_id, task_original_sentence, task_korean,
+            task_english, notes, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(job_run_id, task_id) DO UPDATE SET
+            task_original_sentence = excluded.task_original_sentence,
+            task_korean = excluded.task_korean,
+            task_english = excluded.task_english,
+            notes = excluded.notes,
+            updated_at = excluded.updated_at
+        """,
+        [
             (
                 job_run_id,
                 atom.task_id,
@@ -668,12 +1171,17 @@ def save_task_atoms(job_run_id: int, task_atoms: list[IVCAtomicTask]) -> None:
                 atom.notes,
                 now,
                 now,
-            ),
-        )
+            )
+            for atom in task_atoms
+        ],
+    )
     conn.commit()
     conn.close()
+    invalidate_cached("job_tasks", job_run_id)
 
 
+@tracing.traced()
+@storage.routed
 def apply_ivc_classification(job_run_id: int, ivc_tasks: list[IVCTask]) -> None:
     """Update job_tasks with IVC classification columns."""
     if not ivc_tasks:
@@ -681,28 +1189,29 @@ def apply_ivc_classification(job_run_id: int, ivc_tasks: list[IVCTask]) -> None:
     conn = _get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
-    for task in ivc_tasks:
-        _ensure_task_row(job_run_id, task.task_id, conn=conn)
-        cur.execute(
-            """
-            UPDATE job_tasks
-            SET ivc_phase = ?, ivc_exec_subphase = ?, primitive_lv1 = ?, classification_reason = ?, updated_at = ?
-            WHERE job_run_id = ? AND task_id = ?
-            """,
+    cur.executemany(
+        _job_tasks_upsert_sql(_IVC_COLUMNS),
+        [
             (
+                job_run_id,
+                task.task_id,
                 task.ivc_phase,
                 task.ivc_exec_subphase,
                 task.primitive_lv1,
                 task.classification_reason,
                 now,
-                job_run_id,
-                task.task_id,
-            ),
-        )
+                now,
+            )
+            for task in ivc_tasks
+        ],
+    )
     conn.commit()
     conn.close()
+    invalidate_cached("job_tasks", job_run_id)
 
 
+@tracing.traced()
+@storage.routed
 def apply_static_classification(job_run_id: int, task_static_meta: list[TaskStaticMeta]) -> None:
     """Update job_tasks with static classification columns."""
     if not task_static_meta:
@@ -710,18 +1219,12 @@ def apply_static_classification(job_run_id: int, task_static_meta: list[TaskStat
     conn = _get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
-    for meta in task_static_meta:
-        _ensure_task_row(job_run_id, meta.task_id, conn=conn)
-        cur.execute(
-            """
-            UPDATE job_tasks
-            SET static_type_lv1 = ?, static_type_lv2 = ?, domain_lv1 = ?, domain_lv2 = ?,
-                rag_required = ?, rag_reason = ?, value_score = ?, complexity_score = ?,
-                value_complexity_quadrant = ?, recommended_execution_env = ?, autoability_reason = ?,
-                data_entities_json = ?, tags_json = ?, updated_at = ?
-            WHERE job_run_id = ? AND task_id = ?
-            """,
+    cur.executemany(
+        _job_tasks_upsert_sql(_STATIC_COLUMNS),
+        [
             (
+                job_run_id,
+                meta.task_id,
                 meta.static_type_lv1,
                 meta.static_type_lv2,
                 meta.domain_lv1,
@@ -736,65 +1239,85 @@ def apply_static_classification(job_run_id: int, task_static_meta: list[TaskStat
                 json.dumps(meta.data_entities, ensure_ascii=False),
                 json.dumps(meta.tags, ensure_ascii=False),
                 now,
-                job_run_id,
-                meta.task_id,
-            ),
-        )
+                now,
+            )
+            for meta in task_static_meta
+        ],
+    )
     conn.commit()
     conn.close()
+    invalidate_cached("job_tasks", job_run_id)
 
 
+@tracing.traced()
+@storage.routed
 def apply_workflow_plan(job_run_id: int, plan: WorkflowPlan) -> None:
-    """Update job_tasks and job_task_edges with workflow nodes/edges."""
+    """
+    Update job_tasks and job_task_edges with workflow nodes/edges.
+
+    Edges are diffed against the stored ones as a multiset of (source, target, label):
+    unchanged edges keep their rows, only removed edges are deleted and new ones inserted.
+    """
     conn = _get_conn()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
 
-    for node in plan.nodes:
-        node_id = node.node_id if hasattr(node, "node_id") else node.get("node_id")
-        label = node.label if hasattr(node, "label") else node.get("label")
-        stage_id = node.stage_id if hasattr(node, "stage_id") else node.get("stage_id")
-        stream_id = node.stream_id if hasattr(node, "stream_id") else node.get("stream_id")
-        is_entry = node.is_entry if hasattr(node, "is_entry") else node.get("is_entry")
-        is_exit = node.is_exit if hasattr(node, "is_exit") else node.get("is_exit")
-        is_hub = node.is_hub if hasattr(node, "is_hub") else node.get("is_hub")
-        _ensure_task_row(job_run_id, node_id, conn=conn)
-        cur.execute(
-            """
-            UPDATE job_tasks
-            SET stage_id = ?, stream_id = ?, workflow_node_label = ?, is_entry = ?, is_exit = ?, is_hub = ?, updated_at = ?
-            WHERE job_run_id = ? AND task_id = ?
-            """,
-            (
-                stage_id,
-                stream_id,
-                label,
-                1 if is_entry else 0,
-                1 if is_exit else 0,
-                1 if is_hub else 0,
-                now,
-                job_run_id,
-                node_id,
-            ),
+    if plan.nodes:
+        cur.executemany(
+            _job_tasks_upsert_sql(_WORKFLOW_NODE_COLUMNS),
+            [
+                (
+                    job_run_id,
+                    _field(node, "node_id"),
+                    _field(node, "stage_id"),
+                    _field(node, "stream_id"),
+                    _field(node, "label"),
+                    1 if _field(node, "is_entry") else 0,
+                    1 if _field(node, "is_exit") else 0,
+                    1 if _field(node, "is_hub") else 0,
+                    now,
+                    now,
+                )
+                for node in plan.nodes
+            ],
         )
 
-    cur.execute("DELETE FROM job_task_edges WHERE job_run_id = ?", (job_run_id,))
-    for edge in plan.edges:
-        source = edge.source if hasattr(edge, "source") else edge.get("source")
-        target = edge.target if hasattr(edge, "target") else edge.get("target")
-        label = edge.label if hasattr(edge, "label") else edge.get("label")
-        cur.execute(
+    wanted = Counter((_field(e, "source"), _field(e, "target"), _field(e, "label")) for e in plan.edges)
+    cur.execute(
+        "SELECT id, source_task_id, target_task_id, label FROM job_task_edges WHERE job_run_id = ? ORDER BY id",
+        (job_run_id,),
+    )
+    stale_ids: list[tuple[int]] = []
+    for row in cur.fetchall():
+        key = (row["source_task_id"], row["target_task_id"], row["label"])
+        if wanted[key] > 0:
+            wanted[key] -= 1
+        else:
+            stale_ids.append((row["id"],))
+    if stale_ids:
+        cur.executemany("DELETE FROM job_task_edges WHERE id = ?", stale_ids)
+    new_edges = [
+        (job_run_id, source, target, label, now, now)
+        for (source, target, label), count in wanted.items()
+        for _ in range(count)
+    ]
+    if new_edges:
+        cur.executemany(
             """
             INSERT INTO job_task_edges (job_run_id, source_task_id, target_task_id, label, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?)
             """,
-            (job_run_id, source, target, label, now, now),
+            new_edges,
         )
 
     conn.commit()
     conn.close()
+    invalidate_cached("job_tasks", job_run_id)
+    invalidate_cached("job_task_edges", job_run_id)
 
 
+@tracing.traced()
+@storage.routed
 def save_workflow_plan(job_run_id: int, plan: WorkflowPlan) -> None:
     """Persist workflow plan JSON for reuse across sessions."""
     conn = _get_conn()
@@ -813,8 +1336,11 @@ def save_workflow_plan(job_run_id: int, plan: WorkflowPlan) -> None:
     )
     conn.commit()
     conn.close()
+    invalidate_cached("workflow_results", job_run_id)
 
 
+@tracing.traced()
+@storage.routed
 def save_workflow_mermaid_result(job_run_id: int, plan: WorkflowPlan | None, mermaid: MermaidDiagram) -> None:
     """Persist mermaid_code and optional plan JSON."""
     conn = _get_conn()
@@ -836,8 +1362,12 @@ def save_workflow_mermaid_result(job_run_id: int, plan: WorkflowPlan | None, mer
     )
     conn.commit()
     conn.close()
+    invalidate_cached("workflow_results", job_run_id)
 
 
+@tracing.traced()
+@read_cache.cached("workflow_results")
+@storage.routed
 def get_workflow_plan(job_run_id: int) -> WorkflowPlan | None:
     """Fetch persisted workflow plan if available."""
     conn = _get_conn()
@@ -857,6 +1387,9 @@ def get_workflow_plan(job_run_id: int) -> WorkflowPlan | None:
         return None
 
 
+@tracing.traced()
+@read_cache.cached("workflow_results")
+@storage.routed
 def get_workflow_mermaid_result(job_run_id: int) -> MermaidDiagram | None:
     """Fetch persisted MermaidDiagram if available."""
     conn = _get_conn()
@@ -881,6 +1414,9 @@ def get_workflow_mermaid_result(job_run_id: int) -> MermaidDiagram | None:
     return diagram
 
 
+@tracing.traced()
+@read_cache.cached("job_tasks")
+@storage.routed
 def get_job_tasks(job_run_id: int) -> list[dict]:
     """Return all job_tasks rows for a job_run_id."""
     conn = _get_conn()
@@ -891,6 +1427,9 @@ def get_job_tasks(job_run_id: int) -> list[dict]:
     return [dict(row) for row in rows]
 
 
+@tracing.traced()
+@read_cache.cached("job_task_edges")
+@storage.routed
 def get_job_task_edges(job_run_id: int) -> list[dict]:
     """Return all job_task_edges rows for a job_run_id."""
     conn = _get_conn()
@@ -901,6 +1440,8 @@ def get_job_task_edges(job_run_id: int) -> list[dict]:
     return [dict(row) for row in rows]
 
 
+@tracing.traced()
+@storage.routed
 def save_llm_call_log(log: LLMCallLog | dict) -> Optional[int]:
     """Insert one LLM call log row."""
     if isinstance(log, dict):
@@ -940,12 +1481,15 @@ def save_llm_call_log(log: LLMCallLog | dict) -> Optional[int]:
             data.get("tokens_total"),
         ),
     )
-    conn.commit()
     row_id = cur.lastrowid
+    _upsert_llm_call_rollup(cur, data)
+    conn.commit()
     conn.close()
     return row_id
 
 
+@tracing.traced()
+@storage.routed
 def get_llm_calls_by_job_run(job_run_id: int) -> list[LLMCallLog]:
     """Return all LLM call logs for a job_run_id, newest first."""
     conn = _get_conn()
@@ -983,6 +1527,484 @@ def get_llm_calls_by_job_run(job_run_id: int) -> list[LLMCallLog]:
                 tokens_prompt=row["tokens_prompt"],
                 tokens_completion=row["tokens_completion"],
                 tokens_total=row["tokens_total"],
+                id=row["id"],
             )
         )
     return result
+
+
+# Small columns returned by default; the *_TEXT columns can be megabytes per row.
+LLM_CALL_META_COLUMNS: tuple[str, ...] = (
+    "id", "created_at", "job_run_id", "stage_name", "agent_name", "model_name", "prompt_version",
+    "temperature", "top_p", "status", "error_type", "error_message", "latency_ms",
+    "tokens_prompt", "tokens_completion", "tokens_total",
+)
+LLM_CALL_TEXT_COLUMNS: tuple[str, ...] = ("input_payload_json", "output_text_raw", "output_json_parsed")
+
+
+@tracing.traced()
+@storage.routed
+def get_latest_llm_call(job_run_id: int, stage_name: str, *, include_text: bool = False) -> Optional[dict]:
+    """
+    Return the newest llm_call_logs row for (job_run_id, stage_name) as a dict, or None.
+
+    Only metadata columns are read unless include_text=True; use get_llm_call_texts(id)
+    to fetch the large prompt/output columns on demand.
+    """
+    columns = LLM_CALL_META_COLUMNS + (LLM_CALL_TEXT_COLUMNS if include_text else ())
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT {", ".join(columns)}
+        FROM llm_call_logs
+        WHERE job_run_id = ? AND stage_name = ?
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1
+        """,
+        (job_run_id, stage_name),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+@tracing.traced()
+@storage.routed
+def get_llm_call_texts(log_id: int) -> Optional[dict]:
+    """Return input_payload_json/output_text_raw/output_json_parsed for one llm_call_logs row."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(LLM_CALL_TEXT_COLUMNS)} FROM llm_call_logs WHERE id = ?", (log_id,))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+@tracing.traced()
+@storage.routed
+def get_llm_call_totals(job_run_id: int, *, since: Optional[str] = None) -> dict:
+    """
+    Call count, token sums and failure counts of one job run's LLM calls.
+
+    since (ISO timestamp) limits the totals to calls logged at or after it.
+    """
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT COUNT(*) AS calls,
+               COALESCE(SUM(tokens_prompt), 0) AS tokens_prompt,
+               COALESCE(SUM(tokens_completion), 0) AS tokens_completion,
+               COALESCE(SUM(tokens_total), 0) AS tokens_total,
+               COALESCE(SUM(status = 'stub_fallback'), 0) AS stub_fallback,
+               COALESCE(SUM(status = 'json_parse_error'), 0) AS json_parse_error,
+               COALESCE(SUM(status NOT IN ('success', 'override', 'stub_fallback', 'json_parse_error')), 0) AS errors
+        FROM llm_call_logs
+        WHERE job_run_id = ? AND created_at >= ?
+        """,
+        (job_run_id, since or ""),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return dict(row)
+
+
+@tracing.traced()
+@storage.routed
+def get_llm_error_window(stage_name: str, model_name: str, *, since: str, limit: int) -> dict:
+    """
+    Live calls and failures among the latest `limit` calls of a stage/model logged at or after since.
+
+    Live calls are successes and failures with an error_type (json_parse_error, or a
+    stub_fallback after an API error); stub-mode stub_fallback rows and overrides are skipped.
+    Feeds the LLM circuit breaker (infra/circuit_breaker.py).
+    """
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT COUNT(*) AS calls, COALESCE(SUM(status != 'success'), 0) AS errors
+        FROM (
+            SELECT status FROM llm_call_logs
+            WHERE stage_name = ? AND created_at >= ? AND model_name = ?
+              AND (status = 'success' OR (status IN ('stub_fallback', 'json_parse_error') AND error_type IS NOT NULL))
+            ORDER BY created_at DESC
+            LIMIT ?
+        )
+        """,
+        (stage_name, since, model_name, limit),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return dict(row)
+
+
+# ---------------- LLM performance rollups ----------------
+
+# Upper bounds (ms) of the latency histogram kept per rollup key. The last bucket is +Inf.
+LATENCY_BUCKETS_MS: tuple[int, ...] = (
+    100, 250, 500, 1000, 2000, 3000, 5000, 7500, 10000, 15000,
+    20000, 30000, 45000, 60000, 90000, 120000, 180000, 300000,
+)
+LATENCY_BUCKET_INF = 2**31 - 1
+
+
+def _hour_bucket(created_at: str | None) -> str:
+    """Truncate an ISO timestamp to its hour (e.g. 2025-12-04T10:00:00)."""
+    created_at = created_at or datetime.utcnow().isoformat()
+    return f"{created_at[:13]}:00:00"
+
+
+def _hour_bucket_bound(moment: str, *, round_up: bool = False) -> str:
+    """
+    Hour bucket of a window bound given at any ISO precision ("2025-12-04", "2025-12-04T10",
+    "2025-12-04 10:30:15", "2025-12-04T10:00:00Z", ...). A bound with a zone is converted to
+    UTC first (buckets are naive UTC). round_up=True gives the first bucket starting at or after
+    the moment instead, so an exclusive mid-hour end still covers the hour it falls in.
+    """
+    parsed = datetime.fromisoformat(moment)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    bucket = parsed.replace(minute=0, second=0, microsecond=0)
+    if round_up and bucket != parsed:
+        bucket += timedelta(hours=1)
+    return bucket.isoformat()
+
+
+def _latency_bucket_le(latency_ms: int) -> int:
+    for le in LATENCY_BUCKETS_MS:
+        if latency_ms <= le:
+            return le
+    return LATENCY_BUCKET_INF
+
+
+def _upsert_llm_call_rollup(cur: sqlite3.Cursor, data: dict) -> None:
+    """Fold one llm_call_logs row into llm_call_rollups / llm_call_latency_buckets."""
+    key = (
+        _hour_bucket(data.get("created_at")),
+        data.get("stage_name"),
+        data.get("model_name"),
+        data.get("prompt_version") or "",
+    )
+    status = data.get("status")
+    latency_ms = data.get("latency_ms")
+    cur.execute(
+        """
+        INSERT INTO llm_call_rollups (
+            hour_bucket, stage_name, model_name, prompt_version,
+            call_count, latency_count, latency_sum_ms, latency_max_ms,
+            tokens_prompt_sum, tokens_completion_sum, tokens_total_sum,
+            stub_fallback_count, json_parse_error_count, error_count, updated_at
+        ) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(hour_bucket, stage_name, model_name, prompt_version) DO UPDATE SET
+            call_count = call_count + 1,
+            latency_count = latency_count + excluded.latency_count,
+            latency_sum_ms = latency_sum_ms + excluded.latency_sum_ms,
+            latency_max_ms = MAX(latency_max_ms, excluded.latency_max_ms),
+            tokens_prompt_sum = tokens_prompt_sum + excluded.tokens_prompt_sum,
+            tokens_completion_sum = tokens_completion_sum + excluded.tokens_completion_sum,
+            tokens_total_sum = tokens_total_sum + excluded.tokens_total_sum,
+            stub_fallback_count = stub_fallback_count + excluded.stub_fallback_count,
+            json_parse_error_count = json_parse_error_count + excluded.json_parse_error_count,
+            error_count = error_count + excluded.error_count,
+            updated_at = excluded.updated_at
+        """,
+        (
+            *key,
+            1 if latency_ms is not None else 0,
+            latency_ms or 0,
+            latency_ms or 0,
+            data.get("tokens_prompt") or 0,
+            data.get("tokens_completion") or 0,
+            data.get("tokens_total") or 0,
+            1 if status == "stub_fallback" else 0,
+            1 if status == "json_parse_error" else 0,
+            1 if status not in ("success", "override", "stub_fallback", "json_parse_error") else 0,
+            datetime.utcnow().isoformat(),
+        ),
+    )
+    if latency_ms is None:
+        return
+    cur.execute(
+        """
+        INSERT INTO llm_call_latency_buckets (hour_bucket, stage_name, model_name, prompt_version, le_ms, count)
+        VALUES (?, ?, ?, ?, ?, 1)
+        ON CONFLICT(hour_bucket, stage_name, model_name, prompt_version, le_ms) DO UPDATE SET
+            count = count + 1
+        """,
+        (*key, _latency_bucket_le(latency_ms)),
+    )
+
+
+@tracing.traced()
+@storage.routed
+def rebuild_llm_call_rollups() -> int:
+    """Recompute rollups from llm_call_logs (backfill for logs written before rollups existed)."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM llm_call_rollups")
+    cur.execute("DELETE FROM llm_call_latency_buckets")
+    cur.execute(
+        """
+        SELECT created_at, stage_name, model_name, prompt_version, status,
+               latency_ms, tokens_prompt, tokens_completion, tokens_total
+        FROM llm_call_logs
+        ORDER BY id
+        """
+    )
+    rows = cur.fetchall()
+    for row in rows:
+        _upsert_llm_call_rollup(cur, dict(row))
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def _rollup_filters(
+    since: str | None,
+    until: str | None,
+    prompt_version: str | None,
+    stage_name: str | None,
+) -> tuple[str, list]:
+    clauses = []
+    params: list = []
+    if since:
+        clauses.append("hour_bucket >= ?")
+        params.append(_hour_bucket_bound(since))
+    if until:
+        clauses.append("hour_bucket < ?")
+        params.append(_hour_bucket_bound(until, round_up=True))
+    if prompt_version is not None:
+        clauses.append("prompt_version = ?")
+        params.append(prompt_version)
+    if stage_name is not None:
+        clauses.append("stage_name = ?")
+        params.append(stage_name)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+@tracing.traced()
+@storage.routed
+def get_llm_call_rollups(
+    *,
+    since: str | None = None,
+    until: str | None = None,
+    prompt_version: str | None = None,
+    stage_name: str | None = None,
+) -> list[dict]:
+    """
+    Return rollups aggregated per (stage_name, model_name) for the given window.
+
+    Each row carries the summed counters plus `latency_buckets` ({le_ms: count}) from which
+    p50/p95/p99 are derived (see infra/perf_report.py). Both ends snap to hour buckets:
+    `since` to the hour it falls in, the exclusive `until` to the next hour start unless it
+    is one, so a mid-hour `until` keeps that hour.
+    """
+    where, params = _rollup_filters(since, until, prompt_version, stage_name)
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT stage_name, model_name,
+               SUM(call_count) AS call_count,
+               SUM(latency_count) AS latency_count,
+               SUM(latency_sum_ms) AS latency_sum_ms,
+               MAX(latency_max_ms) AS latency_max_ms,
+               SUM(tokens_prompt_sum) AS tokens_prompt_sum,
+               SUM(tokens_completion_sum) AS tokens_completion_sum,
+               SUM(tokens_total_sum) AS tokens_total_sum,
+               SUM(stub_fallback_count) AS stub_fallback_count,
+               SUM(json_parse_error_count) AS json_parse_error_count,
+               SUM(error_count) AS error_count
+        FROM llm_call_rollups{where}
+        GROUP BY stage_name, model_name
+        ORDER BY stage_name, model_name
+        """,
+        params,
+    )
+    rows = {(r["stage_name"], r["model_name"]): {**dict(r), "latency_buckets": {}} for r in cur.fetchall()}
+    cur.execute(
+        f"""
+        SELECT stage_name, model_name, le_ms, SUM(count) AS count
+        FROM llm_call_latency_buckets{where}
+        GROUP BY stage_name, model_name, le_ms
+        """,
+        params,
+    )
+    for bucket in cur.fetchall():
+        row = rows.get((bucket["stage_name"], bucket["model_name"]))
+        if row is not None:
+            row["latency_buckets"][bucket["le_ms"]] = bucket["count"]
+    conn.close()
+    return list(rows.values())
+
+
+@tracing.traced()
+@storage.routed
+def save_stage_artifact(
+    job_run_id: int,
+    stage_id: str,
+    input_hash: str,
+    output_hash: str,
+    result_type: str,
+    payload_json: str,
+) -> int:
+    """Append one immutable stage artifact; the newest row per (job_run_id, stage_id) is current."""
+    conn = _get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO stage_artifacts (
+            job_run_id, stage_id, input_hash, output_hash, result_type, payload_json, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (job_run_id, stage_id, input_hash, output_hash, result_type, payload_json, datetime.utcnow().isoformat()),
+    )
+    conn.commit()
+    artifact_id = cur.lastrowid
+    conn.close()
+    return artifact_id
+
+
+@tracing.traced()
+@storage.routed
+def get_latest_stage_artifact(job_run_id: int, stage_id: str) -> Optional[dict]:
+    """Current artifact of a stage for a job run (None when the stage never completed)."""
+    conn = _get_conn()
+    row = conn.execute(
+        """
+        SELECT * FROM stage_artifacts
+        WHERE job_run_id = ? AND stage_id = ?
+        ORDER BY id DESC
+        LIMIT 1
+        """,
+        (job_run_id, stage_id),
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+@tracing.traced()
+@storage.routed
+def get_stage_artifact(artifact_id: int) -> Optional[dict]:
+    """A stage artifact by id (the pointer stored in stage_runs)."""
+    conn = _get_conn()
+    row = conn.execute("SELECT * FROM stage_artifacts WHERE id = ?", (artifact_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+STAGE_RUN_STATUSES = ("done", "failed")
+
+
+@tracing.traced()
+@storage.routed
+def save_stage_run(
+    job_run_id: int,
+    stage_id: str,
+    status: str,
+    *,
+    started_at: str,
+    input_hash: Optional[str] = None,
+    artifact_id: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Record how a stage of a job run ended (one stage_runs row per job_run/stage).
+
+    PipelineManager writes "done" inside the stage's unit of work, so the marker
+    commits together with the stage's results; a crash mid-stage leaves the previous
+    state. input_hash is kept when not given.
+    """
+    if status not in STAGE_RUN_STATUSES:
+        raise ValueError(f"Unknown stage run status: {status}")
+    now = datetime.utcnow().isoformat()
+    conn = _get_conn()
+    conn.execute(
+        """
+        INSERT INTO stage_runs (
+            job_run_id, stage_id, status, input_hash, artifact_id, error, started_at, finished_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(job_run_id, stage_id) DO UPDATE SET
+            status = excluded.status,
+            input_hash = COALESCE(excluded.input_hash, stage_runs.input_hash),
+            artifact_id = excluded.artifact_id,
+            error = excluded.error,
+            started_at = excluded.started_at,
+            finished_at = excluded.finished_at,
+            updated_at = excluded.updated_at
+        """,
+        (job_run_id, stage_id, status, input_hash, artifact_id, error, started_at, now, now),
+    )
+    conn.commit()
+    conn.close()
+
+
+@tracing.traced()
+@storage.routed
+def get_stage_runs(job_run_id: int) -> dict[str, dict]:
+    """stage_runs rows of a job run keyed by stage_id."""
+    conn = _get_conn()
+    rows = conn.execute("SELECT * FROM stage_runs WHERE job_run_id = ?", (job_run_id,)).fetchall()
+    conn.close()
+    return {row["stage_id"]: dict(row) for row in rows}
+
+
+# ---------------- AX version history (ax_prompts / ax_deep_research_docs) ----------------
+
+DEFAULT_HISTORY_KEEP = 5
+
+
+def history_keep() -> int:
+    """Versions kept per (job_run_id, agent_id) in VERSIONED_AX_TABLES (AX_HISTORY_KEEP, minimum 1)."""
+    return max(1, int(os.environ.get("AX_HISTORY_KEEP", DEFAULT_HISTORY_KEEP)))
+
+
+def _insert_version(cur: sqlite3.Cursor, table: str, row: dict) -> int:
+    """
+    Insert row as the new current version of its (job_run_id, agent_id) and prune old versions.
+
+    The retiring UPDATE runs first so the write lock is held before the next version number is read.
+    """
+    key = (row["job_run_id"], row["agent_id"])
+    cur.execute(f"UPDATE {table} SET is_current = 0 WHERE job_run_id = ? AND agent_id = ? AND is_current = 1", key)
+    latest = cur.execute(f"SELECT MAX(version) FROM {table} WHERE job_run_id = ? AND agent_id = ?", key).fetchone()[0]
+    version = (latest or 0) + 1
+    values = {**row, "version": version, "is_current": 1}
+    cur.execute(
+        f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})",
+        tuple(values.values()),
+    )
+    cur.execute(
+        f"DELETE FROM {table} WHERE job_run_id = ? AND agent_id = ? AND version <= ?",
+        (*key, version - history_keep()),
+    )
+    return version
+
+
+@tracing.traced()
+@storage.routed
+def prune_ax_history(keep: Optional[int] = None) -> dict[str, int]:
+    """Delete all but the newest `keep` versions per agent in every versioned ax_* table; rows deleted per table."""
+    keep = history_keep() if keep is None else max(1, keep)
+    conn = _get_conn()
+    cur = conn.cursor()
+    deleted: dict[str, int] = {}
+    for table in VERSIONED_AX_TABLES:
+        cur.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE version <= (
+                SELECT MAX(newer.version) FROM {table} AS newer
+                WHERE newer.job_run_id = {table}.job_run_id AND newer.agent_id = {table}.agent_id
+            ) - ?
+            """,
+            (keep,),
+        )
+        deleted[table] = cur.rowcount
+    conn.commit()
+    conn.close()
+    for table in VERSIONED_AX_TABLES:
+        invalidate_cached(table)
+    return deleted
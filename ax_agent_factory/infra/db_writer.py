@@ -0,0 +1,182 @@
+"""Single-writer DB actor for multi-process runs (batch_runner process mode).
+
+With several worker processes on one SQLite file, every write transaction competes
+for the database lock and waits on busy_timeout. Instead, one DBWriter thread in the
+parent process owns all writes:
+
+    worker process                               parent process
+    db.save_stage_run(...) --(requests queue)--> DBWriter: native helper, group commit
+                           <--(reply queue)----- result / exception after the commit
+
+A WriterClient installed with storage.set_writer() forwards every routed helper that
+is not a read (name not starting with get_) and blocks until the writer replies, so
+return values (row ids) and errors behave as in a direct call, and a read after a
+write sees it. Reads stay in the worker (WAL readers do not block the writer).
+
+The writer drains whatever calls are waiting and commits them in one transaction
+(group commit); if one call fails, the group is rolled back and replayed call by call
+so only the failing call reports an error. db.transaction() in a worker does not
+group writes: each forwarded call commits on its own (PipelineManager records a stage
+as done after its results, so a crash between them only re-runs the stage).
+
+Only for the native sqlite3 path; with AX_DATABASE_URL the store handles concurrency.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import pickle
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from ax_agent_factory.infra import db, metrics, storage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_GROUP = 64
+
+WRITER_CALLS = metrics.REGISTRY.counter(
+    "ax_db_writer_calls_total", "Writes executed by the single-writer actor by result (ok/error).", ("result",)
+)
+WRITER_GROUP_SIZE = metrics.REGISTRY.histogram(
+    "ax_db_writer_group_size", "Writes committed per group commit.", buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+
+
+class WriterClient:
+    """Forwards routed writes of this process to a DBWriter and waits for the replies."""
+
+    def __init__(self, worker: str, requests: Any, replies: Any) -> None:
+        self.worker = worker
+        self.requests = requests
+        self.replies = replies
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_replies, name=f"db-writer-replies-{worker}", daemon=True)
+        self._reader.start()
+
+    def call(self, name: str, args: tuple, kwargs: dict) -> Any:
+        future: Future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        self.requests.put((self.worker, request_id, name, args, kwargs))
+        ok, value = future.result()
+        if ok:
+            return value
+        raise value
+
+    @contextmanager
+    def transaction(self, *, immediate: bool = True) -> Iterator[None]:
+        """db.transaction() in a worker: nothing to hold, every forwarded write commits in the writer."""
+        yield None
+
+    def _read_replies(self) -> None:
+        while True:
+            message = self.replies.get()
+            if message is None:
+                break
+            request_id, ok, value = message
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            if future is not None:
+                future.set_result((ok, value))
+
+
+@dataclass
+class WriterStats:
+    calls: int = 0
+    errors: int = 0
+    groups: int = 0
+
+    @property
+    def mean_group(self) -> float:
+        return self.calls / self.groups if self.groups else 0.0
+
+
+class DBWriter:
+    """Executes forwarded writes on the current DB_PATH from one thread (start() / stop())."""
+
+    def __init__(self, ctx: Any, *, max_group: int = DEFAULT_MAX_GROUP) -> None:
+        self.ctx = ctx
+        self.max_group = max_group
+        self.requests = ctx.Queue()
+        self.stats = WriterStats()
+        self._replies: dict[str, Any] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def reply_queue(self, worker: str) -> Any:
+        """The queue a worker's WriterClient reads its replies from (create before starting the worker)."""
+        if worker not in self._replies:
+            self._replies[worker] = self.ctx.Queue()
+        return self._replies[worker]
+
+    def start(self) -> "DBWriter":
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Finish the queued writes, then release the worker reply readers."""
+        if self._thread is None:
+            return
+        self.requests.put(None)
+        self._thread.join()
+        self._thread = None
+        for replies in self._replies.values():
+            replies.put(None)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            message = self.requests.get()
+            if message is None:
+                break
+            group = [message]
+            while len(group) < self.max_group:
+                try:
+                    message = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    stopping = True
+                    break
+                group.append(message)
+            self._commit(group)
+
+    def _commit(self, group: list[tuple]) -> None:
+        try:
+            with db.transaction():
+                values = [storage.native(name)(*args, **kwargs) for _, _, name, args, kwargs in group]
+        except Exception as exc:
+            if len(group) > 1:  # isolate the failing call: replay one per transaction
+                for message in group:
+                    self._commit([message])
+                return
+            worker, request_id, name, _, _ = group[0]
+            logger.debug("Forwarded write %s from %s failed: %s", name, worker, exc)
+            self.stats.calls += 1
+            self.stats.errors += 1
+            self.stats.groups += 1
+            WRITER_CALLS.inc(result="error")
+            self._reply(worker, request_id, False, exc)
+            return
+        self.stats.calls += len(group)
+        self.stats.groups += 1
+        WRITER_CALLS.inc(len(group), result="ok")
+        WRITER_GROUP_SIZE.observe(len(group))
+        for (worker, request_id, _, _, _), value in zip(group, values):
+            self._reply(worker, request_id, True, value)
+
+    def _reply(self, worker: str, request_id: int, ok: bool, value: Any) -> None:
+        try:
+            pickle.dumps(value)
+        except Exception:  # a result or exception that cannot cross the process boundary
+            ok, value = False, RuntimeError(f"{type(value).__name__}: {value}")
+        self._replies[worker].put((request_id, ok, value))
@@ -0,0 +1,260 @@
+"""Progress events from pipeline runs: stage_started, llm_call_started/finished, partial_result, stage_finished.
+
+Usage:
+    with events.subscribe(print):
+        pipeline.run_pipeline_until_stage(job_run, "8")
+
+Emitters: PipelineManager (every stage, executed or loaded from its artifact),
+stage_runner_ax (Stage 4~8 called directly; Stage 6 reports each agent as a
+partial_result) and llm_client (every LLM call, with latency and token counts).
+stage_finished carries the stage's elapsed time and the LLM calls/tokens made inside it.
+
+Subscribers live in a contextvar, like tracing spans: a subscription covers the
+StageScheduler and Stage 6 pool threads (they run in a copy of the caller's context),
+and concurrent runs (UI sessions, batch workers) only see their own events.
+add_listener() registers a process-wide listener (the metrics exporter).
+
+Listeners are called synchronously in the emitting thread, which may be a pool thread;
+keep them short (a UI that can only be updated from its own thread uses run_streaming()).
+Listener errors are logged and never reach the pipeline. With no listener, emit() and
+stage() return after one contextvar lookup, so runs that do not subscribe pay nothing
+measurable (see measure_overhead()).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+KINDS = ("stage_started", "llm_call_started", "llm_call_finished", "partial_result", "stage_finished")
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """One progress event; stage_id is the pipeline stage (S0_1_COLLECT...) it happened in, if any."""
+
+    kind: str
+    job_run_id: Optional[int]
+    stage_id: Optional[str]
+    ts: float  # time.time()
+    elapsed_ms: Optional[float] = None  # stage_finished / llm_call_finished
+    data: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "job_run_id": self.job_run_id,
+            "stage_id": self.stage_id,
+            "ts": self.ts,
+            "elapsed_ms": self.elapsed_ms,
+            **{k: v for k, v in self.data.items() if k != "result"},
+        }
+
+    def format(self) -> str:
+        """One log line, e.g. "job_run 3 S1_1_TASK_EXTRACT stage_finished 812ms status=ok llm_calls=1"."""
+        parts = [f"job_run {self.job_run_id}", self.stage_id or "-", self.kind]
+        if self.elapsed_ms is not None:
+            parts.append(f"{self.elapsed_ms:.0f}ms")
+        parts += [f"{k}={v}" for k, v in self.data.items() if k != "result" and v is not None]
+        return " ".join(parts)
+
+
+Listener = Callable[[ProgressEvent], None]
+
+
+@dataclass
+class StageProgress:
+    """Running totals of the current stage (shared with its pool threads)."""
+
+    stage_id: str
+    job_run_id: Optional[int]
+    started: float  # time.perf_counter()
+    llm_calls: int = 0
+    tokens_prompt: int = 0
+    tokens_completion: int = 0
+    tokens_total: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_llm_call(self, tokens_prompt: Optional[int], tokens_completion: Optional[int], tokens_total: Optional[int]) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.tokens_prompt += tokens_prompt or 0
+            self.tokens_completion += tokens_completion or 0
+            self.tokens_total += tokens_total or 0
+
+
+_subscribers: contextvars.ContextVar[tuple[Listener, ...]] = contextvars.ContextVar("ax_event_subscribers", default=())
+_current_stage: contextvars.ContextVar[Optional[StageProgress]] = contextvars.ContextVar("ax_event_stage", default=None)
+_listeners: list[Listener] = []
+
+
+def add_listener(listener: Listener) -> None:
+    """Receive every event of this process (idempotent)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Listener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+@contextmanager
+def subscribe(listener: Optional[Listener]) -> Iterator[None]:
+    """Receive the events emitted from this context (and work it hands to pool threads); None is a no-op."""
+    if listener is None:
+        yield
+        return
+    token = _subscribers.set(_subscribers.get() + (listener,))
+    try:
+        yield
+    finally:
+        _subscribers.reset(token)
+
+
+def enabled() -> bool:
+    return bool(_listeners or _subscribers.get())
+
+
+def current_stage() -> Optional[StageProgress]:
+    return _current_stage.get()
+
+
+def emit(
+    kind: str,
+    *,
+    job_run_id: Optional[int] = None,
+    stage_id: Optional[str] = None,
+    elapsed_ms: Optional[float] = None,
+    **data: Any,
+) -> None:
+    """Deliver an event to the context's subscribers and the process-wide listeners."""
+    subscribers = _subscribers.get()
+    if not subscribers and not _listeners:
+        return
+    stage = _current_stage.get()
+    if stage is not None:
+        job_run_id = stage.job_run_id if job_run_id is None else job_run_id
+        stage_id = stage_id or stage.stage_id
+    event = ProgressEvent(kind, job_run_id, stage_id, time.time(), elapsed_ms, data)
+    for listener in (*_listeners, *subscribers):
+        try:
+            listener(event)
+        except Exception:
+            logger.exception("Progress event listener failed on %s", kind)
+
+
+@contextmanager
+def stage(stage_id: str, *, job_run_id: Optional[int] = None) -> Iterator[Optional[StageProgress]]:
+    """
+    Report a stage: stage_started now, stage_finished (status, elapsed, LLM calls/tokens and
+    any attributes set on the yielded StageProgress) when the block exits. Yields None when
+    nobody listens, or when an enclosing stage already reports (PipelineManager running an
+    AX stage runner).
+    """
+    if _current_stage.get() is not None or not enabled():
+        yield None
+        return
+    progress = StageProgress(stage_id, job_run_id, time.perf_counter())
+    token = _current_stage.set(progress)
+    emit("stage_started")
+    status = "error"
+    try:
+        yield progress
+        status = "ok"
+    finally:
+        emit(
+            "stage_finished",
+            elapsed_ms=(time.perf_counter() - progress.started) * 1000,
+            status=status,
+            llm_calls=progress.llm_calls,
+            tokens_prompt=progress.tokens_prompt,
+            tokens_completion=progress.tokens_completion,
+            tokens_total=progress.tokens_total,
+            **progress.attributes,
+        )
+        _current_stage.reset(token)
+
+
+def llm_call_finished(
+    *,
+    llm_stage: str,
+    model_name: str,
+    status: str,
+    latency_ms: Optional[int],
+    job_run_id: Optional[int],
+    tokens_prompt: Optional[int],
+    tokens_completion: Optional[int],
+    tokens_total: Optional[int],
+) -> None:
+    """Count the call into the current stage's totals and emit llm_call_finished."""
+    stage = _current_stage.get()
+    if stage is not None:
+        stage.add_llm_call(tokens_prompt, tokens_completion, tokens_total)
+    emit(
+        "llm_call_finished",
+        job_run_id=job_run_id,
+        elapsed_ms=latency_ms,
+        llm_stage=llm_stage,
+        model=model_name,
+        status=status,
+        tokens_prompt=tokens_prompt,
+        tokens_completion=tokens_completion,
+        tokens_total=tokens_total,
+    )
+
+
+def run_streaming(fn: Callable[[], T], on_event: Listener, *, poll_s: float = 0.1) -> T:
+    """
+    Run fn() in a worker thread and call on_event in this thread for each event it emits
+    (for UIs that may only be updated from their own thread, e.g. Streamlit). Returns
+    fn's result or raises its exception once all its events were delivered.
+    """
+    events: queue.SimpleQueue[ProgressEvent] = queue.SimpleQueue()
+    outcome: dict[str, Any] = {}
+
+    def work() -> None:
+        with subscribe(events.put):
+            try:
+                outcome["result"] = fn()
+            except BaseException as exc:
+                outcome["error"] = exc
+
+    ctx = contextvars.copy_context()
+    worker = threading.Thread(target=ctx.run, args=(work,), name="events-run", daemon=True)
+    worker.start()
+    while worker.is_alive() or not events.empty():
+        try:
+            on_event(events.get(timeout=poll_s))
+        except queue.Empty:
+            continue
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def measure_overhead(iterations: int = 100_000) -> dict[str, float]:
+    """Microseconds per emit() with no listener and with one no-op subscriber."""
+
+    def per_call_us() -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            emit("llm_call_started", job_run_id=1, llm_stage="bench")
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    idle = per_call_us()
+    with subscribe(lambda event: None):
+        subscribed = per_call_us()
+    return {"idle_us": idle, "subscribed_us": subscribed}
@@ -0,0 +1,318 @@
+"""Durable SQLite work queue for pipeline stage targets (migration 9 `job_queue`).
+
+Clients (the UI, scripts) enqueue "run job_run X to target T" and poll the item;
+worker processes (core/queue_worker.py, `python -m ax_agent_factory.cli.worker`)
+claim items under a lease:
+
+    queued --claim--> running --complete--> done
+                         |--fail--> queued (backoff) ... --> dead (max_attempts reached)
+                         |--defer--> queued (attempt not counted: LLM circuit open)
+                         '--lease expired--> claimable again, or dead if out of attempts
+
+`due_at` is the not-before time of a queued item and the lease expiry of a running
+one, so one index (status, due_at) serves claims and expiry. A worker extends its
+lease with heartbeat_job(), which also stores progress (completed stage ids) and
+returns False once the lease was lost to another worker. Claims run in a BEGIN
+IMMEDIATE unit of work, so two workers never get the same item.
+
+Tuning: AX_QUEUE_LEASE_S (120), AX_QUEUE_MAX_ATTEMPTS (3), AX_QUEUE_RETRY_S (30,
+doubled per attempt).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from ax_agent_factory.infra import db, metrics, storage, tracing
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def lease_seconds() -> int:
+    return _env_int("AX_QUEUE_LEASE_S", 120)
+
+
+def default_max_attempts() -> int:
+    return max(1, _env_int("AX_QUEUE_MAX_ATTEMPTS", 3))
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    """Backoff before the next attempt after `attempts` failed ones."""
+    return _env_int("AX_QUEUE_RETRY_S", 30) * 2 ** max(0, attempts - 1)
+
+
+def _at(seconds: float = 0) -> str:
+    return (datetime.utcnow() + timedelta(seconds=seconds)).isoformat()
+
+
+@tracing.traced()
+@storage.routed
+def enqueue_job(
+    job_run_id: int,
+    target: str,
+    *,
+    ax_target: Optional[str] = None,
+    manual_jd_text: Optional[str] = None,
+    force_rerun: Iterable[str] = (),
+    max_attempts: Optional[int] = None,
+) -> int:
+    """Queue a run of job_run_id to target; returns the id of a matching queued/running item if one exists."""
+    with db.transaction():
+        conn = db._get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT id FROM job_queue
+            WHERE job_run_id = ? AND status IN ('queued', 'running') AND target = ? AND ax_target IS ?
+            ORDER BY id LIMIT 1
+            """,
+            (job_run_id, target, ax_target),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            conn.close()
+            return row["id"]
+        now = _at()
+        cur.execute(
+            """
+            INSERT INTO job_queue (
+                job_run_id, target, ax_target, manual_jd_text, force_rerun_json, status, attempts,
+                max_attempts, due_at, created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+            """,
+            (
+                job_run_id,
+                target,
+                ax_target,
+                manual_jd_text,
+                json.dumps(sorted(force_rerun)) if force_rerun else None,
+                max_attempts or default_max_attempts(),
+                now,
+                now,
+                now,
+            ),
+        )
+        item_id = cur.lastrowid
+        conn.commit()
+        conn.close()
+        return item_id
+
+
+@tracing.traced()
+@storage.routed
+def claim_job(worker_id: str, *, lease_s: Optional[int] = None) -> Optional[dict]:
+    """
+    Lease the oldest due item to worker_id (attempts + 1) and return it, or None.
+
+    Running items whose lease expired are claimable again; those already out of
+    attempts are moved to `dead` first.
+    """
+    now = _at()
+    with db.transaction():
+        conn = db._get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE job_queue
+            SET status = 'dead', last_error = COALESCE(last_error, 'lease expired'), finished_at = ?, updated_at = ?
+            WHERE status = 'running' AND due_at <= ? AND attempts >= max_attempts
+            """,
+            (now, now, now),
+        )
+        cur.execute(
+            """
+            SELECT id FROM job_queue
+            WHERE status IN ('queued', 'running') AND due_at <= ?
+            ORDER BY due_at, id LIMIT 1
+            """,
+            (now,),
+        )
+        row = cur.fetchone()
+        if row is None:
+            conn.close()
+            return None
+        cur.execute(
+            """
+            UPDATE job_queue
+            SET status = 'running', lease_owner = ?, attempts = attempts + 1, due_at = ?, heartbeat_at = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (worker_id, _at(lease_s or lease_seconds()), now, now, row["id"]),
+        )
+        cur.execute("SELECT * FROM job_queue WHERE id = ?", (row["id"],))
+        item = dict(cur.fetchone())
+        conn.commit()
+        conn.close()
+    return item
+
+
+@tracing.traced()
+@storage.routed
+def heartbeat_job(item_id: int, worker_id: str, *, lease_s: Optional[int] = None, progress: Optional[dict] = None) -> bool:
+    """Extend worker_id's lease (and store progress); False if the item is no longer leased to it."""
+    now = _at()
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        UPDATE job_queue
+        SET due_at = ?, heartbeat_at = ?, updated_at = ?, progress_json = COALESCE(?, progress_json)
+        WHERE id = ? AND status = 'running' AND lease_owner = ?
+        """,
+        (
+            _at(lease_s or lease_seconds()),
+            now,
+            now,
+            json.dumps(progress, ensure_ascii=False) if progress is not None else None,
+            item_id,
+            worker_id,
+        ),
+    )
+    updated = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return updated
+
+
+@tracing.traced()
+@storage.routed
+def complete_job(item_id: int, worker_id: str) -> bool:
+    """Mark worker_id's leased item done; False if the lease was lost meanwhile."""
+    now = _at()
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        UPDATE job_queue SET status = 'done', due_at = ?, finished_at = ?, updated_at = ?, last_error = NULL
+        WHERE id = ? AND status = 'running' AND lease_owner = ?
+        """,
+        (now, now, now, item_id, worker_id),
+    )
+    updated = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return updated
+
+
+@tracing.traced()
+@storage.routed
+def fail_job(item_id: int, worker_id: str, error: str) -> Optional[str]:
+    """Record a failed attempt: back to `queued` after a backoff, or `dead` when out of attempts.
+
+    Returns the new status, or None if the item is no longer leased to worker_id.
+    """
+    now = _at()
+    with db.transaction():
+        conn = db._get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT attempts, max_attempts FROM job_queue WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (item_id, worker_id),
+        )
+        row = cur.fetchone()
+        if row is None:
+            conn.close()
+            return None
+        dead = row["attempts"] >= row["max_attempts"]
+        status = "dead" if dead else "queued"
+        cur.execute(
+            """
+            UPDATE job_queue
+            SET status = ?, due_at = ?, lease_owner = NULL, last_error = ?, finished_at = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (
+                status,
+                now if dead else _at(retry_delay_seconds(row["attempts"])),
+                error,
+                now if dead else None,
+                now,
+                item_id,
+            ),
+        )
+        conn.commit()
+        conn.close()
+    return status
+
+
+@tracing.traced()
+@storage.routed
+def defer_job(item_id: int, worker_id: str, delay_s: float, error: str) -> bool:
+    """
+    Put worker_id's leased item back to `queued` in delay_s without using up the attempt
+    (the run could not start, e.g. the LLM circuit is open). False if the lease was lost.
+    """
+    now = _at()
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        UPDATE job_queue
+        SET status = 'queued', attempts = MAX(attempts - 1, 0), due_at = ?, lease_owner = NULL, last_error = ?,
+            updated_at = ?
+        WHERE id = ? AND status = 'running' AND lease_owner = ?
+        """,
+        (_at(delay_s), error, now, item_id, worker_id),
+    )
+    updated = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return updated
+
+
+@tracing.traced()
+@storage.routed
+def get_queue_item(item_id: int) -> Optional[dict]:
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM job_queue WHERE id = ?", (item_id,))
+    row = cur.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+@tracing.traced()
+@storage.routed
+def get_queue_items(job_run_id: int) -> list[dict]:
+    """Queue items of a job run, newest first (UI progress)."""
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM job_queue WHERE job_run_id = ? ORDER BY id DESC", (job_run_id,))
+    rows = cur.fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+@tracing.traced()
+@storage.routed
+def get_queue_depth() -> dict[str, int]:
+    """Number of queued and running items."""
+    conn = db._get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT status, COUNT(*) AS n FROM job_queue WHERE status IN ('queued', 'running') GROUP BY status"
+    )
+    depth = {status: 0 for status in ACTIVE_STATUSES}
+    depth.update({r["status"]: r["n"] for r in cur.fetchall()})
+    conn.close()
+    return depth
+
+
+def refresh_queue_depth() -> dict[str, int]:
+    """Read the queue depth and publish it as ax_queue_depth{queue="job_queue"} (queued items)."""
+    depth = get_queue_depth()
+    metrics.QUEUE_DEPTH.set(depth["queued"], queue="job_queue")
+    return depth
+
+
+def item_progress(item: dict) -> dict:
+    """Decoded progress_json of a queue item ({"stages": [...]} while running)."""
+    return json.loads(item["progress_json"]) if item.get("progress_json") else {"stages": []}
@@ -21,7 +21,7 @@ from ax_agent_factory.core.schemas.ax import (
     SkillCardSet,
 )
 from ax_agent_factory.infra.prompts import load_prompt
-from ax_agent_factory.infra import db
+from ax_agent_factory.infra import circuit_breaker, db, events, metrics, tracing
 from ax_agent_factory.models.llm_log import LLMCallLog
 
 try:  # Optional dependency for runtime; tests can monkeypatch this module.
@@ -159,6 +159,7 @@ def call_gemini_job_research(
         prompt = prompt.replace(f"{{{key}}}", str(val))
 
     started = time.time()
+    events.emit("llm_call_started", job_run_id=job_run_id, llm_stage=stage_name, model=model or DEFAULT_GEMINI_MODEL)
     input_payload = {
         "company_name": company_name,
         "job_title": job_title,
@@ -202,6 +203,7 @@ def call_gemini_job_research(
         )
         return stub
 
+    circuit_breaker.check(stage_name, model or DEFAULT_GEMINI_MODEL)
     client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
     grounding_tool = types.Tool(google_search=types.GoogleSearch())
     config = types.GenerateContentConfig(
@@ -296,6 +298,7 @@ def call_job_research_collect(
         prompt = prompt.replace(f"{{{key}}}", str(val))
 
     started = time.time()
+    events.emit("llm_call_started", job_run_id=job_run_id, llm_stage=stage_name, model=model or DEFAULT_GEMINI_MODEL)
     input_payload = {
         "company_name": company_name,
         "job_title": job_title,
@@ -332,6 +335,7 @@ def call_job_research_collect(
         )
         return stub
 
+    circuit_breaker.check(stage_name, model or DEFAULT_GEMINI_MODEL)
     client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
     grounding_tool = types.Tool(google_search=types.GoogleSearch())
     config = types.GenerateContentConfig(
@@ -456,6 +460,7 @@ def call_job_research_summarize(
         prompt = prompt.replace(f"{{{key}}}", str(val))
 
     started = time.time()
+    events.emit("llm_call_started", job_run_id=job_run_id, llm_stage=stage_name, model=model or DEFAULT_GEMINI_MODEL)
     input_payload = {
         "job_meta": job_meta,
         "raw_sources": raw_sources,
@@ -491,6 +496,7 @@ def call_job_research_summarize(
         )
         return stub
 
+    circuit_breaker.check(stage_name, model or DEFAULT_GEMINI_MODEL)
     client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
     config = types.GenerateContentConfig(max_output_tokens=max_tokens)
 
@@ -606,6 +612,7 @@ def call_task_extractor(
     prompt = prompt_template.replace("{input_json}", json.dumps(job_input, ensure_ascii=False))
 
     started = time.time()
+    events.emit("llm_call_started", job_run_id=job_run_id, llm_stage=stage_name, model=model or DEFAULT_GEMINI_MODEL)
     input_payload = {
         "job_input": job_input,
         "prompt": prompt,
@@ -668,6 +675,7 @@ def call_task_extractor(
         )
         return stub
 
+    circuit_breaker.check(stage_name, model or DEFAULT_GEMINI_MODEL)
     client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
     config = types.GenerateContentConfig(max_output_tokens=max_tokens)
 
@@ -767,6 +775,7 @@ def call_phase_classifier(
     prompt = prompt_template.replace("{input_json}", json.dumps(task_list_input, ensure_ascii=False))
 
     started = time.time()
+    events.emit("llm_call_started", job_run_id=job_run_id, llm_stage=stage_name, model=model or DEFAULT_GEMINI_MODEL)
     input_payload = {
         "task_list_input": task_list_input,
         "prompt": prompt,
@@ -828,6 +837,7 @@ def call_phase_classifier(
         )
         return stub
 
+    circuit_breaker.check(stage_name, model or DEFAULT_GEMINI_MODEL)
     client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
     config = types.GenerateContentConfig(max_output_tokens=max_tokens)
 
@@ -1412,6 +1422,7 @@ def _generic_llm_json_call(
 ) -> Dict[str, Any]:
     """Reusable LLM JSON call with sanitizer, stubs, logging."""
     started = time.time()
+    events.emit("llm_call_started", job_run_id=job_run_id, llm_stage=stage_name, model=model or DEFAULT_GEMINI_MODEL)
     raw_text = ""
     cleaned = ""
     usage = _extract_usage_tokens()
@@ -1477,6 +1488,7 @@ def _generic_llm_json_call(
         )
         return stub
 
+    circuit_breaker.check(stage_name, model or DEFAULT_GEMINI_MODEL)
     client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
     config = types.GenerateContentConfig(max_output_tokens=max_tokens)
 
@@ -1733,7 +1745,40 @@ def _safe_save_llm_log(
     tokens_completion: Optional[int] = None,
     tokens_total: Optional[int] = None,
 ) -> None:
-    """Persist LLM call log without interrupting main flow."""
+    """
+    Persist LLM call log without interrupting main flow.
+
+    The row (and its rollup) commits on its own, outside the calling stage's unit of work,
+    so calls made by a stage that fails afterwards still reach the logs, rollups and the
+    circuit breaker window.
+    """
+    tracing.record_span(
+        f"llm.{stage_name}",
+        duration_ms=latency_ms,
+        status="ok" if status in ("success", "override") else "error",
+        model_name=model_name,
+        llm_status=status,
+        tokens_total=tokens_total,
+    )
+    metrics.observe_llm_call(
+        stage_name=stage_name,
+        model_name=model_name,
+        status=status,
+        latency_ms=latency_ms,
+        tokens_prompt=tokens_prompt,
+        tokens_completion=tokens_completion,
+    )
+    circuit_breaker.record(stage_name, model_name, status=status, error_type=error_type)
+    events.llm_call_finished(
+        llm_stage=stage_name,
+        model_name=model_name,
+        status=status,
+        latency_ms=latency_ms,
+        job_run_id=job_run_id,
+        tokens_prompt=tokens_prompt,
+        tokens_completion=tokens_completion,
+        tokens_total=tokens_total,
+    )
     try:
         log = LLMCallLog(
             created_at=datetime.utcnow().isoformat(),
@@ -1755,7 +1800,7 @@ def _safe_save_llm_log(
             tokens_completion=tokens_completion,
             tokens_total=tokens_total,
         )
-        db.save_llm_call_log(log)
+        db.run_detached(db.save_llm_call_log, log)  # kept even if the calling stage rolls back
         logger.info(
             "LLM call logged stage=%s status=%s latency_ms=%s tokens_prompt=%s tokens_completion=%s tokens_total=%s",
             stage_name,
@@ -0,0 +1,377 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters/Gauges/Histograms are kept in memory per process and rendered in the
+Prometheus text format (version 0.0.4). Two ways to export them:
+
+- `start_http_server(port)`: tiny daemon-thread HTTP server serving `/metrics`.
+- `start_textfile_writer(path)`: periodically writes the exposition atomically for
+  node_exporter's textfile collector.
+
+`start_exporters_from_env()` starts either one from `AX_METRICS_PORT` /
+`AX_METRICS_TEXTFILE` (idempotent, safe to call on every Streamlit rerun).
+
+Feeds: `observe_llm_call` (from llm_client._safe_save_llm_log), `track_stage`
+(PipelineManager / AX stage runners), DB/repo write helpers (timed by storage.routed,
+traced or not) and, once an exporter runs, progress events (infra/events.py) via an
+event listener.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from ax_agent_factory.infra import events
+
+logger = logging.getLogger(__name__)
+
+# Seconds; LLM calls regularly take tens of seconds so the default buckets extend to 5 minutes.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300,
+)
+DB_BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> list[str]:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counter can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (in-flight runs, queue depth)."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Bucketed observations (cumulative buckets + sum + count on render)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def get_sum(self, **labels: str) -> float:
+        return self._sums.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v), self._sums[k]) for k, v in self._counts.items())
+        lines: list[str] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different type/labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        """Return the whole registry in Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "ax_stage_duration_seconds", "Pipeline stage wall time.", ("stage", "status")
+)
+PIPELINE_RUNS_IN_PROGRESS = REGISTRY.gauge(
+    "ax_pipeline_runs_in_progress", "Pipeline runs currently executing in this process."
+)
+LLM_CALLS = REGISTRY.counter(
+    "ax_llm_calls_total", "LLM calls by stage/model/status (stub_fallback rate = status ratio).", ("stage", "model", "status")
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "ax_llm_call_duration_seconds", "LLM call latency.", ("stage", "model", "status")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "ax_llm_tokens_total", "LLM tokens reported by the API.", ("stage", "model", "kind")
+)
+DB_WRITE_DURATION = REGISTRY.histogram(
+    "ax_db_write_duration_seconds", "Duration of DB/repo write helpers (timed by storage.routed).", ("operation",), DB_BUCKETS
+)
+QUEUE_DEPTH = REGISTRY.gauge("ax_queue_depth", "Items waiting in an internal queue.", ("queue",))
+PROGRESS_EVENTS = REGISTRY.counter(
+    "ax_progress_events_total", "Progress events (infra/events.py) by kind and stage.", ("kind", "stage")
+)
+STAGES_IN_PROGRESS = REGISTRY.gauge("ax_stages_in_progress", "Pipeline stages currently executing.", ("stage",))
+
+
+def observe_llm_call(
+    *,
+    stage_name: str,
+    model_name: str,
+    status: str,
+    latency_ms: Optional[int],
+    tokens_prompt: Optional[int] = None,
+    tokens_completion: Optional[int] = None,
+) -> None:
+    """Record one LLM call (called next to every llm_call_logs insert)."""
+    labels = {"stage": stage_name, "model": model_name or "", "status": status}
+    LLM_CALLS.inc(**labels)
+    if latency_ms is not None:
+        LLM_LATENCY.observe(latency_ms / 1000, **labels)
+    if tokens_prompt:
+        LLM_TOKENS.inc(tokens_prompt, stage=stage_name, model=model_name or "", kind="prompt")
+    if tokens_completion:
+        LLM_TOKENS.inc(tokens_completion, stage=stage_name, model=model_name or "", kind="completion")
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Time a pipeline stage; status label is ok/error depending on how the block exits."""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage, status=status)
+
+
+def _observe_event(event: events.ProgressEvent) -> None:
+    """Progress event listener (installed with an exporter): event counts and stages in flight."""
+    stage = event.stage_id or ""
+    PROGRESS_EVENTS.inc(kind=event.kind, stage=stage)
+    if event.kind == "stage_started":
+        STAGES_IN_PROGRESS.inc(stage=stage)
+    elif event.kind == "stage_finished":
+        STAGES_IN_PROGRESS.dec(stage=stage)
+
+
+# ---------------- exporters ----------------
+
+_exporters_lock = threading.Lock()
+_http_server: Optional[ThreadingHTTPServer] = None
+_textfile_thread: Optional[threading.Thread] = None
+
+
+def start_http_server(port: int, addr: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve `GET /metrics` from a daemon thread. Returns the running server."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002 - keep scrapes out of app.log
+            return
+
+    server = ThreadingHTTPServer((addr, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="ax-metrics-http", daemon=True).start()
+    logger.info("Metrics endpoint listening on http://%s:%s/metrics", addr, server.server_address[1])
+    return server
+
+
+def write_textfile(path: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """Atomically write the exposition to path (node_exporter textfile collector)."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def start_textfile_writer(path: str, interval_s: float = 15.0, registry: MetricsRegistry = REGISTRY) -> threading.Thread:
+    """Rewrite the textfile every interval_s seconds from a daemon thread."""
+
+    def _loop() -> None:
+        while True:
+            try:
+                write_textfile(path, registry)
+            except Exception:
+                logger.exception("Failed to write metrics textfile %s", path)
+            time.sleep(interval_s)
+
+    thread = threading.Thread(target=_loop, name="ax-metrics-textfile", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_exporters_from_env() -> None:
+    """Start the HTTP endpoint (AX_METRICS_PORT) and/or textfile writer (AX_METRICS_TEXTFILE) once per process."""
+    global _http_server, _textfile_thread
+    with _exporters_lock:
+        port = os.environ.get("AX_METRICS_PORT")
+        if port and _http_server is None:
+            try:
+                _http_server = start_http_server(int(port), os.environ.get("AX_METRICS_ADDR", "127.0.0.1"))
+            except OSError:
+                logger.exception("Could not bind metrics endpoint on port %s", port)
+        textfile = os.environ.get("AX_METRICS_TEXTFILE")
+        if textfile and _textfile_thread is None:
+            interval = float(os.environ.get("AX_METRICS_TEXTFILE_INTERVAL", "15"))
+            _textfile_thread = start_textfile_writer(textfile, interval)
+        if _http_server is not None or _textfile_thread is not None:
+            events.add_listener(_observe_event)
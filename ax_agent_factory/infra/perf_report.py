@@ -0,0 +1,163 @@
+"""Stage latency/token report built on the llm_call_rollups tables."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ax_agent_factory.infra import db
+
+
+@dataclass
+class StagePerfSummary:
+    """Aggregated LLM performance for one (stage_name, model_name) in a window."""
+
+    stage_name: str
+    model_name: str
+    call_count: int
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+    avg_latency_ms: Optional[float]
+    tokens_prompt_sum: int
+    tokens_completion_sum: int
+    tokens_total_sum: int
+    stub_fallback_rate: float
+    json_parse_error_rate: float
+    error_rate: float
+
+
+def histogram_quantile(q: float, buckets: dict[int, int], max_ms: Optional[int] = None) -> Optional[float]:
+    """
+    Estimate quantile q (0~1) from cumulative-free bucket counts {le_ms: count}.
+
+    Linear interpolation inside the matching bucket (Prometheus style). The +Inf bucket
+    resolves to the observed max latency.
+    """
+    total = sum(buckets.values())
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    lower = 0
+    for le in sorted(buckets):
+        count = buckets[le]
+        if count and cumulative + count >= rank:
+            upper = le
+            if le == db.LATENCY_BUCKET_INF:
+                return float(max_ms) if max_ms is not None else float(lower)
+            if max_ms is not None:
+                upper = min(upper, max(max_ms, lower))
+            return lower + (upper - lower) * ((rank - cumulative) / count)
+        cumulative += count
+        lower = le
+    return float(lower)
+
+
+def summarize_rollup(row: dict) -> StagePerfSummary:
+    """Convert one db.get_llm_call_rollups row into a StagePerfSummary."""
+    calls = row["call_count"] or 0
+    buckets = row.get("latency_buckets") or {}
+    max_ms = row.get("latency_max_ms")
+    latency_count = row.get("latency_count") or 0
+
+    def _rate(value: Optional[int]) -> float:
+        return (value or 0) / calls if calls else 0.0
+
+    return StagePerfSummary(
+        stage_name=row["stage_name"],
+        model_name=row["model_name"],
+        call_count=calls,
+        p50_ms=histogram_quantile(0.50, buckets, max_ms),
+        p95_ms=histogram_quantile(0.95, buckets, max_ms),
+        p99_ms=histogram_quantile(0.99, buckets, max_ms),
+        avg_latency_ms=(row["latency_sum_ms"] / latency_count) if latency_count else None,
+        tokens_prompt_sum=row.get("tokens_prompt_sum") or 0,
+        tokens_completion_sum=row.get("tokens_completion_sum") or 0,
+        tokens_total_sum=row.get("tokens_total_sum") or 0,
+        stub_fallback_rate=_rate(row.get("stub_fallback_count")),
+        json_parse_error_rate=_rate(row.get("json_parse_error_count")),
+        error_rate=_rate(row.get("error_count")),
+    )
+
+
+def load_stage_summaries(
+    *,
+    since: str | None = None,
+    until: str | None = None,
+    prompt_version: str | None = None,
+    stage_name: str | None = None,
+) -> list[StagePerfSummary]:
+    """Read rollups for a window (never touches llm_call_logs)."""
+    rows = db.get_llm_call_rollups(since=since, until=until, prompt_version=prompt_version, stage_name=stage_name)
+    return [summarize_rollup(row) for row in rows]
+
+
+def compare_summaries(
+    baseline: list[StagePerfSummary],
+    candidate: list[StagePerfSummary],
+) -> list[dict]:
+    """Join two windows on (stage_name, model_name) and compute p50/p95/p99 and rate deltas."""
+    base_map = {(s.stage_name, s.model_name): s for s in baseline}
+    cand_map = {(s.stage_name, s.model_name): s for s in candidate}
+    rows: list[dict] = []
+    for key in sorted(set(base_map) | set(cand_map)):
+        a = base_map.get(key)
+        b = cand_map.get(key)
+        row = {"stage_name": key[0], "model_name": key[1]}
+        for label, summary in (("a", a), ("b", b)):
+            row[f"{label}_calls"] = summary.call_count if summary else 0
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                row[f"{label}_{metric}"] = getattr(summary, metric) if summary else None
+            row[f"{label}_stub_fallback_rate"] = summary.stub_fallback_rate if summary else None
+            row[f"{label}_json_parse_error_rate"] = summary.json_parse_error_rate if summary else None
+            row[f"{label}_avg_tokens"] = (
+                summary.tokens_total_sum / summary.call_count if summary and summary.call_count else None
+            )
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "stub_fallback_rate", "json_parse_error_rate", "avg_tokens"):
+            a_val, b_val = row[f"a_{metric}"], row[f"b_{metric}"]
+            row[f"delta_{metric}"] = (b_val - a_val) if a_val is not None and b_val is not None else None
+        rows.append(row)
+    return rows
+
+
+def _fmt(value, pattern: str = "{:.0f}") -> str:
+    if value is None:
+        return "-"
+    return pattern.format(value)
+
+
+def format_summary_table(summaries: list[StagePerfSummary]) -> str:
+    """Render summaries as a fixed-width text table (CLI output)."""
+    header = f"{'stage':<32} {'model':<22} {'calls':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'tokens':>10} {'stub%':>6} {'parse%':>6}"
+    lines = [header, "-" * len(header)]
+    for s in summaries:
+        lines.append(
+            f"{s.stage_name:<32} {s.model_name:<22} {s.call_count:>6} {_fmt(s.p50_ms):>8} {_fmt(s.p95_ms):>8} "
+            f"{_fmt(s.p99_ms):>8} {s.tokens_total_sum:>10} {s.stub_fallback_rate * 100:>6.1f} "
+            f"{s.json_parse_error_rate * 100:>6.1f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison_table(rows: list[dict]) -> str:
+    """Render compare_summaries output (A → B with deltas) as a text table."""
+    header = (
+        f"{'stage':<32} {'model':<22} {'calls A/B':>11} {'p50 A→B':>15} {'p95 A→B':>15} "
+        f"{'p99 A→B':>15} {'Δp95':>8} {'stub% A→B':>13}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in rows:
+
+        def _pair(metric: str, pattern: str = "{:.0f}", scale: float = 1.0) -> str:
+            a_val, b_val = r[f"a_{metric}"], r[f"b_{metric}"]
+            a_txt = _fmt(a_val * scale if a_val is not None else None, pattern)
+            b_txt = _fmt(b_val * scale if b_val is not None else None, pattern)
+            return f"{a_txt}→{b_txt}"
+
+        lines.append(
+            f"{r['stage_name']:<32} {r['model_name']:<22} {str(r['a_calls']) + '/' + str(r['b_calls']):>11} "
+            f"{_pair('p50_ms'):>15} {_pair('p95_ms'):>15} {_pair('p99_ms'):>15} "
+            f"{_fmt(r['delta_p95_ms'], '{:+.0f}'):>8} {_pair('stub_fallback_rate', '{:.1f}', 100.0):>13}"
+        )
+    return "\n".join(lines)
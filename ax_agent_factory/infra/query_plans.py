@@ -0,0 +1,316 @@
+"""Registry of the production DB access paths and their SQLite query plans.
+
+Every `@storage.routed` db/repo helper is listed in HOT_PATHS as a call against a
+seeded job run. `check_plans` runs each call with a sqlite3 trace callback, so the
+plans are taken from the SQL the helper really issues (including the statements
+inside db.transaction blocks), and flags every `SCAN <table>` that is not an
+expected scan (allow_scan). The suite in tests/test_query_plans.py asserts there is
+none; `benchmarks/query_plans.py` times the same paths on 100k job runs.
+
+    for report in query_plans.check_plans(query_plans.seed_job_run()):
+        print(report.name, report.scans)
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from ax_agent_factory.core.schemas.ax import (
+    AgentIOField,
+    AgentPrompt,
+    AgentPromptSet,
+    AgentSpec,
+    AgentTableRow,
+    AXWorkflowResult,
+    DeepSkillResearchResult,
+    DeepSkillResearchSections,
+    SkillCard,
+    SkillCardSet,
+)
+from ax_agent_factory.core.schemas.common import IVCAtomicTask, IVCTask, TaskStaticMeta
+from ax_agent_factory.core.schemas.workflow import MermaidDiagram, WorkflowEdge, WorkflowNode, WorkflowPlan
+from ax_agent_factory.infra import ax_agent_repo, ax_prompt_repo, ax_skill_repo, ax_workflow_repo, db, job_queue
+from ax_agent_factory.models.job_run import JobResearchCollectResult, JobResearchResult
+from ax_agent_factory.models.llm_log import LLMCallLog
+
+# Routed helpers that deliberately read whole tables (maintenance, not request paths).
+MAINTENANCE_PATHS = {
+    "create_job_run": "legacy alias of create_or_get_job_run",
+    "rebuild_llm_call_rollups": "recomputes every rollup from llm_call_logs",
+    "prune_ax_history": "one pass over every versioned ax_* row",
+}
+
+_SKIP_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA", "--")
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@dataclass
+class QueryContext:
+    """Ids of the seeded job run the hot paths are called against."""
+
+    job_run_id: int
+    company_name: str
+    job_title: str
+    llm_call_id: int
+    agent_id: str = "A1"
+    stage_name: str = "stage1_task_extractor"
+    queue_item_id: int = 0
+
+
+@dataclass(frozen=True)
+class HotPath:
+    name: str
+    call: Callable[[QueryContext], Any]
+    # Tables a SCAN is expected on; each entry says why it is bounded.
+    allow_scan: tuple[str, ...] = ()
+
+
+@dataclass
+class PlanReport:
+    name: str
+    statements: list[tuple[str, list[str]]] = field(default_factory=list)
+    scans: list[str] = field(default_factory=list)
+
+
+def _plan() -> WorkflowPlan:
+    return WorkflowPlan(
+        workflow_name="WF",
+        nodes=[WorkflowNode(node_id="T01", label="과업 1", is_entry=True), WorkflowNode(node_id="T02", label="과업 2")],
+        edges=[WorkflowEdge(source="T01", target="T02")],
+    )
+
+
+def _agent_row() -> AgentTableRow:
+    return AgentTableRow(
+        stage="S1", agent_id="A1", agent_name="정리 에이전트", agent_type="llm", execution_environment="n8n",
+        rag_required=False, rag_pattern="none", role_and_goal="정리", inputs_summary="", outputs_summary="",
+    )
+
+
+def _agent_spec() -> AgentSpec:
+    return AgentSpec(
+        agent_id="A1", agent_name="정리 에이전트", stage="S1", agent_type="llm", execution_environment="n8n",
+        role_and_goal="정리", input_schema=[AgentIOField(name="in", type="str", required=True, description="")],
+        output_schema=[], success_metrics=[], error_policy=None, needs_review=False, validator_dependencies=[],
+    )
+
+
+def _skill_cards() -> SkillCardSet:
+    card = SkillCard(
+        skill_id="S1", skill_name="중복 제거", target_agent_ids=["A1"], related_task_ids=["T01"], purpose="p",
+        when_to_use="w", core_heuristics=["h"], step_checklist=["c"], bad_signs=[], good_signs=[],
+    )
+    return SkillCardSet(skill_cards=[card], agent_skill_map=[])
+
+
+def _prompts() -> AgentPromptSet:
+    return AgentPromptSet(agent_prompts=[AgentPrompt(agent_id="A1", env="n8n_gpt_node", prompt_version="v1", mode="poc")])
+
+
+def _deep_research() -> DeepSkillResearchResult:
+    return DeepSkillResearchResult(
+        agent_id="A1",
+        research_focus="skill",
+        sections=DeepSkillResearchSections(
+            core_skills="c", thinking_process="t", frameworks_and_questions="f", common_pitfalls="p",
+            good_vs_bad_examples="e",
+        ),
+    )
+
+
+def _llm_log(ctx: QueryContext) -> LLMCallLog:
+    return LLMCallLog(
+        created_at="2026-01-01T10:05:00", job_run_id=ctx.job_run_id, stage_name=ctx.stage_name, agent_name=None,
+        model_name="m", prompt_version="v1", temperature=None, top_p=None, input_payload_json="{}",
+        output_text_raw="{}", output_json_parsed=None, status="success", error_type=None, error_message=None,
+        latency_ms=100, tokens_prompt=10, tokens_completion=5, tokens_total=15,
+    )
+
+
+def _atoms() -> list[IVCAtomicTask]:
+    return [
+        IVCAtomicTask(task_id=t, task_original_sentence=f"문장 {t}", task_korean=f"과업 {t}", task_english=None, notes=None)
+        for t in ("T01", "T02")
+    ]
+
+
+def _ivc() -> list[IVCTask]:
+    return [
+        IVCTask(
+            task_id="T01", task_korean="과업 T01", task_original_sentence="문장 T01", ivc_phase="P1_SENSE",
+            ivc_exec_subphase=None, primitive_lv1="SENSE", classification_reason="r",
+        )
+    ]
+
+
+def _static() -> list[TaskStaticMeta]:
+    return [
+        TaskStaticMeta(
+            task_id="T02", task_korean="과업 T02", static_type_lv1="DATA", static_type_lv2=None, domain_lv1=None,
+            domain_lv2=None, rag_required=False, rag_reason=None, value_score=3, complexity_score=2,
+            value_complexity_quadrant="MID", recommended_execution_env="n8n", autoability_reason=None,
+            data_entities=["고객"], tags=["crm"],
+        )
+    ]
+
+
+def _ax_workflow() -> AXWorkflowResult:
+    return AXWorkflowResult(
+        ax_workflow_name="AX", ax_workflow_description="d", mode="poc", mermaid_arch_code="graph LR",
+        agent_table=[_agent_row()],
+    )
+
+
+HOT_PATHS: tuple[HotPath, ...] = (
+    # job_runs
+    HotPath("create_or_get_job_run", lambda c: db.create_or_get_job_run(c.company_name, c.job_title)),
+    HotPath("get_job_run", lambda c: db.get_job_run(c.job_run_id)),
+    # ORDER BY id DESC LIMIT 1 walks the rowid b-tree backwards: one row, shown as SCAN.
+    HotPath("get_latest_job_run", lambda c: db.get_latest_job_run(), allow_scan=("job_runs",)),
+    HotPath("update_job_run_meta", lambda c: db.update_job_run_meta(c.job_run_id, status="running")),
+    HotPath("set_job_run_trace_id", lambda c: db.set_job_run_trace_id(c.job_run_id, "0" * 32)),
+    # Stage 0
+    HotPath(
+        "save_job_research_collect_result",
+        lambda c: db.save_job_research_collect_result(JobResearchCollectResult(c.job_run_id, [{"url": "u"}])),
+    ),
+    HotPath("get_job_research_collect_result", lambda c: db.get_job_research_collect_result(c.job_run_id)),
+    HotPath(
+        "save_job_research_result",
+        lambda c: db.save_job_research_result(JobResearchResult(c.job_run_id, "JD", [{"url": "u"}])),
+    ),
+    HotPath("get_job_research_result", lambda c: db.get_job_research_result(c.job_run_id)),
+    # Stage 1~2
+    HotPath("save_task_atoms", lambda c: db.save_task_atoms(c.job_run_id, _atoms())),
+    HotPath("apply_ivc_classification", lambda c: db.apply_ivc_classification(c.job_run_id, _ivc())),
+    HotPath("apply_static_classification", lambda c: db.apply_static_classification(c.job_run_id, _static())),
+    HotPath("apply_workflow_plan", lambda c: db.apply_workflow_plan(c.job_run_id, _plan())),
+    HotPath("save_workflow_plan", lambda c: db.save_workflow_plan(c.job_run_id, _plan())),
+    HotPath(
+        "save_workflow_mermaid_result",
+        lambda c: db.save_workflow_mermaid_result(
+            c.job_run_id, None, MermaidDiagram(workflow_name="WF", mermaid_code="graph TD", warnings=[])
+        ),
+    ),
+    HotPath("get_job_tasks", lambda c: db.get_job_tasks(c.job_run_id)),
+    HotPath("get_job_task_edges", lambda c: db.get_job_task_edges(c.job_run_id)),
+    HotPath("get_workflow_plan", lambda c: db.get_workflow_plan(c.job_run_id)),
+    HotPath("get_workflow_mermaid_result", lambda c: db.get_workflow_mermaid_result(c.job_run_id)),
+    # LLM logs
+    HotPath("save_llm_call_log", lambda c: db.save_llm_call_log(_llm_log(c))),
+    HotPath("get_llm_calls_by_job_run", lambda c: db.get_llm_calls_by_job_run(c.job_run_id)),
+    HotPath("get_latest_llm_call", lambda c: db.get_latest_llm_call(c.job_run_id, c.stage_name)),
+    HotPath("get_llm_call_texts", lambda c: db.get_llm_call_texts(c.llm_call_id)),
+    HotPath("get_llm_call_totals", lambda c: db.get_llm_call_totals(c.job_run_id, since="2026-01-01")),
+    HotPath(
+        "get_llm_error_window",
+        lambda c: db.get_llm_error_window("stage1_task_extractor", "gemini", since="2026-01-01", limit=20),
+    ),
+    # Rollups hold one row per hour x stage x model x prompt version, not per call.
+    HotPath(
+        "get_llm_call_rollups",
+        lambda c: db.get_llm_call_rollups(),
+        allow_scan=("llm_call_rollups", "llm_call_latency_buckets"),
+    ),
+    # Stage artifacts
+    HotPath(
+        "save_stage_artifact",
+        lambda c: db.save_stage_artifact(c.job_run_id, "S0_1_COLLECT", "i" * 64, "o" * 64, "m:C", "{}"),
+    ),
+    HotPath("get_latest_stage_artifact", lambda c: db.get_latest_stage_artifact(c.job_run_id, "S0_1_COLLECT")),
+    HotPath("get_stage_artifact", lambda c: db.get_stage_artifact(1)),
+    HotPath(
+        "save_stage_run",
+        lambda c: db.save_stage_run(c.job_run_id, "S0_1_COLLECT", "done", started_at="2026-01-01T10:00:00", input_hash="i" * 64),
+    ),
+    HotPath("get_stage_runs", lambda c: db.get_stage_runs(c.job_run_id)),
+    # AX stages 4~8
+    HotPath("upsert_ax_workflow", lambda c: ax_workflow_repo.upsert_ax_workflow(c.job_run_id, _ax_workflow())),
+    HotPath("get_latest_ax_workflow", lambda c: ax_workflow_repo.get_latest_ax_workflow(c.job_run_id)),
+    HotPath(
+        "sync_ax_agents_from_agent_table",
+        lambda c: ax_workflow_repo.sync_ax_agents_from_agent_table(c.job_run_id, 1, [_agent_row()]),
+    ),
+    HotPath("apply_agent_specs", lambda c: ax_agent_repo.apply_agent_specs(c.job_run_id, [_agent_spec()])),
+    HotPath("get_agents", lambda c: ax_agent_repo.get_agents(c.job_run_id)),
+    HotPath("save_deep_research_result", lambda c: ax_skill_repo.save_deep_research_result(c.job_run_id, _deep_research())),
+    HotPath("get_deep_research_results", lambda c: ax_skill_repo.get_deep_research_results(c.job_run_id)),
+    HotPath("get_deep_research_history", lambda c: ax_skill_repo.get_deep_research_history(c.job_run_id, c.agent_id)),
+    HotPath("apply_skill_cards", lambda c: ax_skill_repo.apply_skill_cards(c.job_run_id, _skill_cards())),
+    HotPath("get_skill_cards", lambda c: ax_skill_repo.get_skill_cards(c.job_run_id)),
+    HotPath("apply_agent_prompts", lambda c: ax_prompt_repo.apply_agent_prompts(c.job_run_id, _prompts())),
+    HotPath("get_agent_prompts", lambda c: ax_prompt_repo.get_agent_prompts(c.job_run_id)),
+    HotPath("get_agent_prompt_history", lambda c: ax_prompt_repo.get_agent_prompt_history(c.job_run_id, c.agent_id)),
+    # job queue: claim -> heartbeat -> fail (requeued) -> complete/defer (lease already gone)
+    HotPath("enqueue_job", lambda c: job_queue.enqueue_job(c.job_run_id, "2.2")),
+    HotPath("claim_job", lambda c: job_queue.claim_job("w1")),
+    HotPath("heartbeat_job", lambda c: job_queue.heartbeat_job(c.queue_item_id, "w1", progress={"stages": []})),
+    HotPath("fail_job", lambda c: job_queue.fail_job(c.queue_item_id, "w1", "error")),
+    HotPath("complete_job", lambda c: job_queue.complete_job(c.queue_item_id, "w1")),
+    HotPath("defer_job", lambda c: job_queue.defer_job(c.queue_item_id, "w1", 60, "circuit open")),
+    HotPath("get_queue_item", lambda c: job_queue.get_queue_item(c.queue_item_id)),
+    HotPath("get_queue_items", lambda c: job_queue.get_queue_items(c.job_run_id)),
+    HotPath("get_queue_depth", lambda c: job_queue.get_queue_depth()),
+)
+
+
+def seed_job_run(company_name: str = "A사", job_title: str = "CRM 운영 담당자") -> QueryContext:
+    """Create one job run with a row in every table the hot paths touch (via the real helpers)."""
+    job_run = db.create_or_get_job_run(company_name, job_title)
+    ctx = QueryContext(job_run_id=job_run.id, company_name=company_name, job_title=job_title, llm_call_id=0)
+    ctx.llm_call_id = db.save_llm_call_log(_llm_log(ctx)) or 0
+    ctx.queue_item_id = job_queue.enqueue_job(ctx.job_run_id, "2.2")
+    for path in HOT_PATHS:
+        if not path.name.startswith("get_"):
+            path.call(ctx)
+    return ctx
+
+
+def explain(conn, sql: str) -> list[str]:
+    """EXPLAIN QUERY PLAN detail lines of sql (literal values inlined)."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def unexpected_scans(plan: list[str], allow_scan: tuple[str, ...] = ()) -> list[str]:
+    """Plan lines that read a whole table (or whole index) outside allow_scan."""
+    scans = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if match and match.group(1) != "CONSTANT" and "VIRTUAL TABLE" not in detail and match.group(1) not in allow_scan:
+            scans.append(detail)
+    return scans
+
+
+def capture_sql(call: Callable[[], Any]) -> list[str]:
+    """SQL statements (values expanded) that call() runs on this thread's connection, read cache bypassed."""
+    statements: list[str] = []
+    conn = db._get_conn()
+    cache_enabled, db.read_cache.enabled = db.read_cache.enabled, False
+    conn.raw.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.raw.set_trace_callback(None)
+        db.read_cache.enabled = cache_enabled
+        conn.close()
+    return [s for s in statements if not s.lstrip().upper().startswith(_SKIP_PREFIXES)]
+
+
+def check_plans(ctx: QueryContext, paths: tuple[HotPath, ...] = HOT_PATHS) -> list[PlanReport]:
+    """Run every path against ctx and report the query plan of each statement it issued."""
+    reports = []
+    for path in paths:
+        report = PlanReport(name=path.name)
+        statements = capture_sql(lambda: path.call(ctx))
+        conn = db._get_conn()
+        try:
+            for sql in statements:
+                plan = explain(conn, sql)
+                report.statements.append((sql, plan))
+                report.scans.extend(unexpected_scans(plan, path.allow_scan))
+        finally:
+            conn.close()
+        reports.append(report)
+    return reports
@@ -0,0 +1,157 @@
+"""Full-text search over job runs, JDs, tasks, skills and prompts.
+
+Backed by the `search_index` FTS5 table (trigram tokenizer, created by schema
+migration 5 and kept current by triggers on the source tables). Trigrams match
+Korean substrings without a morphological analyzer, but a term needs at least
+three characters to use the index; shorter terms (e.g. "정리") are applied as a
+LIKE filter over the matched rows instead.
+
+A database migrated on an SQLite without FTS5 has no index (migration 5 only logs
+a warning); `rebuild_index()` on an SQLite with FTS5 creates it and its triggers.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from ax_agent_factory.infra import db, storage, tracing
+
+# bm25 column weights: doc_type/job_run_id/ref_id are unindexed, title counts more than body.
+_BM25_WEIGHTS = "0.0, 0.0, 0.0, 4.0, 1.0"
+_SNIPPET_TOKENS = 12
+_MIN_TRIGRAM_CHARS = 3
+
+
+@dataclass
+class SearchHit:
+    """One ranked search result (score: higher is better)."""
+
+    doc_type: str
+    job_run_id: int
+    ref_id: int
+    title: str
+    snippet: str
+    score: float
+    company_name: Optional[str] = None
+    job_title: Optional[str] = None
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build_query(text: str) -> tuple[Optional[str], list[str]]:
+    """Split user input into an FTS5 MATCH expression (AND of quoted terms) and short LIKE terms."""
+    terms = [t for t in text.split() if t]
+    long_terms = [t for t in terms if len(t) >= _MIN_TRIGRAM_CHARS]
+    short_terms = [t for t in terms if len(t) < _MIN_TRIGRAM_CHARS]
+    match = " AND ".join(_quote(t) for t in long_terms) if long_terms else None
+    return match, short_terms
+
+
+@tracing.traced()
+def search(
+    query: str,
+    *,
+    doc_types: Optional[Sequence[str]] = None,
+    job_run_id: Optional[int] = None,
+    limit: int = 20,
+) -> list[SearchHit]:
+    """
+    Ranked search across the indexed tables.
+
+    All terms must match (title or body). With at least one term of 3+ characters the
+    results are ranked by bm25; a query made only of 1-2 character terms falls back to
+    a LIKE scan ordered by recency.
+    """
+    if storage.get_store() is not None:
+        raise RuntimeError("search_index is only maintained by the native SQLite backend (AX_DATABASE_URL is set)")
+    match, short_terms = build_query(query)
+    if match is None and not short_terms:
+        return []
+    where: list[str] = []
+    params: list = []
+    if match is not None:
+        where.append("search_index MATCH ?")
+        params.append(match)
+    for term in short_terms:
+        where.append("(s.title LIKE ? ESCAPE '\\' OR s.body LIKE ? ESCAPE '\\')")
+        params.extend([_like(term), _like(term)])
+    if doc_types:
+        unknown = set(doc_types) - set(db.SEARCH_DOC_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown doc_types: {sorted(unknown)}")
+        where.append(f"s.doc_type IN ({', '.join('?' for _ in doc_types)})")
+        params.extend(doc_types)
+    if job_run_id is not None:
+        where.append("s.job_run_id = ?")
+        params.append(job_run_id)
+    if match is not None:
+        score = f"-bm25(search_index, {_BM25_WEIGHTS})"
+        snippet = f"snippet(search_index, -1, '[', ']', '…', {_SNIPPET_TOKENS})"
+        order = "score DESC"
+    else:
+        score = "0.0"
+        snippet = "substr(s.body, 1, 120)"
+        order = "s.job_run_id DESC, s.rowid DESC"
+    sql = f"""
+        SELECT s.doc_type, s.job_run_id, s.ref_id, s.title, {snippet} AS snippet, {score} AS score,
+               jr.company_name, jr.job_title
+        FROM search_index AS s
+        LEFT JOIN job_runs AS jr ON jr.id = s.job_run_id
+        WHERE {" AND ".join(where)}
+        ORDER BY {order}
+        LIMIT ?
+    """
+    params.append(limit)
+    conn = db._get_conn()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as exc:
+        if "no such table" in str(exc):
+            raise RuntimeError("search_index is unavailable (SQLite without FTS5 trigram support)") from exc
+        raise
+    finally:
+        conn.close()
+    return [
+        SearchHit(
+            doc_type=row["doc_type"],
+            job_run_id=row["job_run_id"],
+            ref_id=row["ref_id"],
+            title=row["title"] or "",
+            snippet=row["snippet"] or "",
+            score=float(row["score"]),
+            company_name=row["company_name"],
+            job_title=row["job_title"],
+        )
+        for row in rows
+    ]
+
+
+@tracing.traced()
+def rebuild_index() -> None:
+    """
+    Repopulate search_index from the source tables (e.g. after rows were imported with triggers off).
+
+    Also the recovery path for a database migrated on an SQLite without FTS5: migration 5
+    skipped the index there, so a missing table and its triggers are created first.
+    """
+    conn = db._get_conn()
+    try:
+        cur = conn.cursor()
+        try:
+            db._create_search_index(cur)
+        except sqlite3.OperationalError as exc:
+            raise RuntimeError("search_index is unavailable (SQLite without FTS5 trigram support)") from exc
+        db._create_search_triggers(cur)
+        db._backfill_search_index(cur)
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,195 @@
+"""Job-run snapshots: one gzip JSONL archive with every artifact of a job run.
+
+Layout (one JSON document per line):
+
+    {"format": "ax-snapshot", "version": 1, "schema_version": 5, "job_run_id": 12, ...}   header
+    {"table": "job_tasks", "columns": ["id", "job_run_id", "task_id", ...]}                  table section
+    [41, 12, "T01", ...]                                                                   one row per line
+
+Rows are positional arrays in the section's column order, and TEXT columns are
+copied verbatim, so `*_json` blobs are written as the stored string instead of
+being parsed and re-encoded. Import inserts the job run under a new id, remaps
+`job_run_id` in every section, drops source row ids, and skips columns the target
+schema does not have. It runs as one unit of work with executemany batches; the
+search_index triggers and the LLM rollups are maintained as for normal writes.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import IO, Iterator, Optional
+
+from ax_agent_factory.infra import db, storage, tracing
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "ax-snapshot"
+SNAPSHOT_VERSION = 1
+_BATCH_ROWS = 1000
+
+# (table, column holding the job_run id); job_runs itself must come first.
+SNAPSHOT_TABLES: tuple[tuple[str, str], ...] = (
+    ("job_runs", "id"),
+    ("job_research_results", "job_run_id"),
+    ("job_research_collect_results", "job_run_id"),
+    ("job_tasks", "job_run_id"),
+    ("job_task_edges", "job_run_id"),
+    ("workflow_results", "job_run_id"),
+    ("ax_workflows", "job_run_id"),
+    ("ax_agents", "job_run_id"),
+    ("ax_agent_task_links", "job_run_id"),
+    ("ax_deep_research_docs", "job_run_id"),
+    ("ax_skills", "job_run_id"),
+    ("ax_prompts", "job_run_id"),
+    ("stage_artifacts", "job_run_id"),
+)
+LOG_TABLES: tuple[tuple[str, str], ...] = (("llm_call_logs", "job_run_id"),)
+
+
+@dataclass
+class SnapshotInfo:
+    """What an export wrote or an import restored."""
+
+    job_run_id: int
+    rows: dict[str, int] = field(default_factory=dict)
+    header: dict = field(default_factory=dict)
+
+
+def _require_native_backend() -> None:
+    if storage.get_store() is not None:
+        raise RuntimeError("Snapshots read and write the native SQLite database (unset AX_DATABASE_URL)")
+
+
+def _dump(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+@tracing.traced()
+def export_job_run(job_run_id: int, path: str, *, include_logs: bool = False) -> SnapshotInfo:
+    """Stream job_run_id and its rows into a gzip JSONL archive at path (read from one consistent snapshot)."""
+    _require_native_backend()
+    tables = SNAPSHOT_TABLES + (LOG_TABLES if include_logs else ())
+    info = SnapshotInfo(job_run_id=job_run_id)
+    with db.transaction(immediate=False) as conn:
+        conn.raw.execute("BEGIN")  # every table is read from the same WAL snapshot
+        if conn.execute("SELECT 1 FROM job_runs WHERE id = ?", (job_run_id,)).fetchone() is None:
+            raise ValueError(f"job_run {job_run_id} not found")
+        info.header = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "schema_version": conn.execute("PRAGMA user_version").fetchone()[0],
+            "job_run_id": job_run_id,
+            "exported_at": datetime.utcnow().isoformat(),
+            "include_logs": include_logs,
+            "tables": [table for table, _ in tables],
+        }
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as out:
+            out.write(_dump(info.header) + "\n")
+            for table, key in tables:
+                cur = conn.execute(f"SELECT * FROM {table} WHERE {key} = ? ORDER BY id", (job_run_id,))
+                out.write(_dump({"table": table, "columns": [d[0] for d in cur.description]}) + "\n")
+                count = 0
+                for row in cur:
+                    out.write(_dump(tuple(row)) + "\n")
+                    count += 1
+                info.rows[table] = count
+    logger.info("Exported job_run %s to %s: %s", job_run_id, path, info.rows)
+    return info
+
+
+def _read_sections(stream: IO[str]) -> Iterator[tuple[str, list[str], Iterator[list]]]:
+    """Yield (table, columns, rows) per section; rows must be consumed before the next section."""
+    pending: Optional[str] = None
+
+    def rows() -> Iterator[list]:
+        nonlocal pending
+        for line in stream:
+            if line.startswith("{"):
+                pending = line
+                return
+            yield json.loads(line)
+
+    line = stream.readline()
+    while line:
+        section = json.loads(line)
+        section_rows = rows()
+        yield section["table"], section["columns"], section_rows
+        for _ in section_rows:  # skip whatever the caller did not consume
+            pass
+        line, pending = pending or "", None
+
+
+def read_header(path: str) -> dict:
+    """Header of a snapshot archive (validated format/version)."""
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        return _check_header(json.loads(stream.readline() or "{}"))
+
+
+def _check_header(header: dict) -> dict:
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError("Not an AX job-run snapshot")
+    if header.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {header['version']} is newer than supported ({SNAPSHOT_VERSION})")
+    return header
+
+
+@tracing.traced()
+def import_job_run(path: str) -> SnapshotInfo:
+    """Restore a snapshot as a new job run in one transaction (the new id is in `job_run_id`)."""
+    _require_native_backend()
+    allowed = {table for table, _ in SNAPSHOT_TABLES + LOG_TABLES}
+    info = SnapshotInfo(job_run_id=0)
+    with gzip.open(path, "rt", encoding="utf-8") as stream, db.transaction() as conn:
+        info.header = _check_header(json.loads(stream.readline() or "{}"))
+        cur = conn.cursor()
+        for table, columns, rows in _read_sections(stream):
+            if table not in allowed:
+                raise ValueError(f"Unexpected table in snapshot: {table}")
+            target = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            keep = [i for i, c in enumerate(columns) if c in target and c != "id"]
+            names = [columns[i] for i in keep]
+            if table == "job_runs":
+                row = next(rows, None)
+                if row is None:
+                    raise ValueError("Snapshot has no job_runs row")
+                cur.execute(
+                    f"INSERT INTO job_runs ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                    [row[i] for i in keep],
+                )
+                info.job_run_id = cur.lastrowid
+                source = dict(zip(columns, row))
+                cur.execute(  # archives from before migration 8 carry no dedup_hash
+                    "UPDATE job_runs SET dedup_hash = ? WHERE id = ?",
+                    (
+                        db.job_run_dedup_hash(source["company_name"], source["job_title"], source.get("manual_jd_text")),
+                        info.job_run_id,
+                    ),
+                )
+                info.rows[table] = 1
+                continue
+            if not info.job_run_id:
+                raise ValueError("Snapshot sections must start with job_runs")
+            run_pos = names.index("job_run_id")
+            sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})"
+            count = 0
+            batch: list[list] = []
+            for row in rows:
+                values = [row[i] for i in keep]
+                values[run_pos] = info.job_run_id
+                batch.append(values)
+                if table == "llm_call_logs":
+                    db._upsert_llm_call_rollup(cur, dict(zip(names, values)))
+                if len(batch) >= _BATCH_ROWS:
+                    cur.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cur.executemany(sql, batch)
+                count += len(batch)
+            info.rows[table] = count
+    logger.info("Imported %s as job_run %s: %s", path, info.job_run_id, info.rows)
+    return info
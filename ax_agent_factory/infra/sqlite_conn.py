@@ -0,0 +1,356 @@
+"""Per-thread persistent SQLite connections with tuned pragmas.
+
+db._get_conn() used to open a fresh `sqlite3.connect` (rollback journal,
+synchronous=FULL, cold page cache) for every helper call. ConnectionManager keeps
+one connection per thread (and per process, so forked workers reconnect), applies
+the setup pragmas once when that connection is opened, and hands out lightweight
+PooledConnection handles. Calling `close()` on a handle only releases it: once the
+last handle of the thread is released, any transaction left open is rolled back,
+which is what closing a throwaway connection used to do.
+
+`ConnectionManager.transaction()` (exposed as `db.transaction()`) groups several
+helpers into one unit of work with a single commit; `run_detached()` (exposed as
+`db.run_detached()`) keeps a write out of it.
+
+Tuning comes from SQLiteTuning (defaults below, overridable with AX_SQLITE_* env
+vars). `AX_SQLITE_PERSISTENT=0` restores the old connect-per-call behaviour.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+@dataclass(frozen=True)
+class SQLiteTuning:
+    """Connection pragmas applied once per opened connection."""
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"  # WAL + NORMAL: durable across app crashes, may lose last txn on power loss
+    cache_size: int = -32768  # negative = KiB (32 MiB page cache)
+    mmap_size: int = 134_217_728  # 128 MiB
+    busy_timeout_ms: int = 5000
+    temp_store: str = "MEMORY"
+    foreign_keys: bool = False  # schema declares FKs but the code never relied on enforcement
+
+    @classmethod
+    def from_env(cls) -> "SQLiteTuning":
+        default = cls()
+        return cls(
+            journal_mode=os.environ.get("AX_SQLITE_JOURNAL_MODE", default.journal_mode),
+            synchronous=os.environ.get("AX_SQLITE_SYNCHRONOUS", default.synchronous),
+            cache_size=_env_int("AX_SQLITE_CACHE_SIZE", default.cache_size),
+            mmap_size=_env_int("AX_SQLITE_MMAP_SIZE", default.mmap_size),
+            busy_timeout_ms=_env_int("AX_SQLITE_BUSY_TIMEOUT_MS", default.busy_timeout_ms),
+            temp_store=os.environ.get("AX_SQLITE_TEMP_STORE", default.temp_store),
+        )
+
+    @classmethod
+    def legacy(cls) -> "SQLiteTuning":
+        """sqlite3 defaults as used before the connection manager (benchmark baseline)."""
+        return cls(journal_mode="DELETE", synchronous="FULL", cache_size=-2000, mmap_size=0, temp_store="DEFAULT")
+
+    def pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA cache_size={int(self.cache_size)}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            f"PRAGMA temp_store={self.temp_store}",
+            f"PRAGMA foreign_keys={'ON' if self.foreign_keys else 'OFF'}",
+        ]
+
+
+class UnitOfWorkRolledBack(RuntimeError):
+    """The outermost transaction() block rolled back because a nested block failed or called rollback()."""
+
+
+class _Connection(sqlite3.Connection):
+    """sqlite3.Connection subclass: weak-referenceable and counts commits that end a transaction."""
+
+    manager: Optional["ConnectionManager"] = None
+
+    def commit(self) -> None:
+        if self.in_transaction and self.manager is not None:
+            self.manager._count_commit()
+        super().commit()
+
+
+class PooledConnection:
+    """
+    Handle to the thread's shared connection; close() releases instead of closing.
+
+    Attribute access is forwarded to the underlying sqlite3.Connection (`raw`), so
+    existing `conn.cursor()/execute/commit/close` call sites keep working.
+    """
+
+    __slots__ = ("raw", "_manager", "_released", "__weakref__")
+
+    def __init__(self, raw: sqlite3.Connection, manager: "ConnectionManager") -> None:
+        object.__setattr__(self, "raw", raw)
+        object.__setattr__(self, "_manager", manager)
+        object.__setattr__(self, "_released", False)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.raw, name, value)
+
+    def __enter__(self) -> "PooledConnection":
+        self.raw.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return self.raw.__exit__(*exc)
+
+    def commit(self) -> None:
+        if self._manager._state.uow_depth:  # deferred to the enclosing transaction()
+            return
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        if self._manager._state.uow_depth:
+            self._manager._state.rollback_only = True
+        self.raw.rollback()
+
+    def close(self) -> None:
+        if self._released:
+            return
+        object.__setattr__(self, "_released", True)
+        self._manager._release(self.raw)
+
+    def __del__(self) -> None:  # handles dropped on an exception path still release
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _ThreadState(threading.local):
+    conn: Optional[sqlite3.Connection] = None
+    pid: int = 0
+    checkouts: int = 0
+    uow_depth: int = 0
+    rollback_only: bool = False
+    after_commit: Optional[list] = None
+    after_exit: Optional[list] = None
+    detached: bool = False
+
+
+class ConnectionManager:
+    """Hand out per-thread connections to one SQLite file."""
+
+    def __init__(self, path: str, tuning: Optional[SQLiteTuning] = None, *, persistent: bool = True) -> None:
+        self.path = path
+        self.tuning = tuning or SQLiteTuning.from_env()
+        self.persistent = persistent
+        self.connects = 0  # number of real sqlite3.connect calls (benchmarks/tests)
+        self.commits = 0  # number of commits that ended a write transaction
+        self._state = _ThreadState()
+        self._opened: "weakref.WeakSet[sqlite3.Connection]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._monitor: Optional[sqlite3.Connection] = None
+        self._side: Optional["ConnectionManager"] = None  # second connection per thread (run_detached)
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.tuning.busy_timeout_ms / 1000,
+            check_same_thread=False,  # only close_all() touches it from another thread
+            factory=_Connection,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.manager = self
+        for pragma in self.tuning.pragmas():
+            conn.execute(pragma)
+        with self._lock:
+            self.connects += 1
+            self._opened.add(conn)
+        return conn
+
+    def get(self) -> PooledConnection | sqlite3.Connection:
+        """Return a connection for the current thread (a fresh one when not persistent)."""
+        state = self._state
+        if state.detached:
+            return self._side_manager().get()
+        if not self.persistent and not state.uow_depth:
+            return self._connect()
+        if state.conn is None or state.pid != os.getpid():
+            state.conn = self._connect()
+            state.pid = os.getpid()
+            state.checkouts = 0
+        state.checkouts += 1
+        return PooledConnection(state.conn, self)
+
+    def in_transaction(self) -> bool:
+        """True while the current thread is inside transaction() or has uncommitted writes."""
+        state = self._state
+        if state.detached:
+            return self._side_manager().in_transaction()
+        return bool(state.uow_depth) or (state.conn is not None and state.conn.in_transaction)
+
+    def data_version(self) -> int:
+        """
+        `PRAGMA data_version` seen by a dedicated monitor connection.
+
+        The value changes whenever any other connection (other threads of this
+        process included) commits; compare with `commits` to tell local from
+        external writes.
+        """
+        with self._lock:
+            if self._monitor is None:
+                self._monitor = sqlite3.connect(self.path, check_same_thread=False)
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the current unit of work commits (immediately outside one)."""
+        if self._state.detached:
+            self._side_manager().after_commit(callback)
+        elif self._state.uow_depth:
+            self._state.after_commit.append(callback)
+        else:
+            callback()
+
+    def run_detached(self, callback: Callable[[], None]) -> None:
+        """
+        Run callback's writes in a transaction of their own that the current unit of work
+        cannot roll back (LLM call logs of a stage that fails afterwards).
+
+        Outside a unit of work callback simply runs. Inside one it runs on a second
+        connection of this thread, committed when it returns, as long as the unit has not
+        written yet; once the unit holds the write lock that connection would wait on it,
+        so callback runs right after the unit ends instead, whether it committed or rolled
+        back. Errors of a deferred callback are logged.
+        """
+        state = self._state
+        if not state.uow_depth or state.detached or self.path == ":memory:":  # no second connection to one :memory: DB
+            callback()
+        elif state.conn is not None and state.conn.in_transaction:
+            state.after_exit.append(callback)
+        else:
+            state.detached = True
+            try:
+                callback()
+            finally:
+                state.detached = False
+
+    def _side_manager(self) -> "ConnectionManager":
+        with self._lock:
+            if self._side is None:
+                self._side = ConnectionManager(self.path, self.tuning, persistent=self.persistent)
+            return self._side
+
+    def _count_commit(self) -> None:
+        with self._lock:
+            self.commits += 1
+
+    @contextmanager
+    def transaction(self, *, immediate: bool = True) -> Iterator[PooledConnection]:
+        """
+        Unit of work for the current thread.
+
+        Every get() inside the block returns the same connection, and handle commit()
+        calls are deferred: the work commits once when the outermost block exits, or
+        rolls back if it raises. Nested blocks join the outer one. A rollback or an
+        exception inside a nested block makes the whole unit roll back, and the
+        outermost block then raises UnitOfWorkRolledBack even when the caller caught
+        the nested error, so lost writes never pass for a commit.
+
+        immediate=True takes the write lock up front (BEGIN IMMEDIATE). With
+        immediate=False the transaction only begins at the first write, so a block
+        that spends most of its time elsewhere (an LLM call) does not hold the lock.
+        """
+        state = self._state
+        if state.detached:
+            with self._side_manager().transaction(immediate=immediate) as handle:
+                yield handle
+            return
+        outermost = state.uow_depth == 0
+        if outermost:
+            if not self.persistent:
+                state.conn, state.pid, state.checkouts = self._connect(), os.getpid(), 0
+            state.rollback_only = False
+            state.after_commit = []
+            state.after_exit = []
+        state.uow_depth += 1
+        handle = self.get()
+        raw = handle.raw
+        try:
+            if outermost and immediate and not raw.in_transaction:
+                raw.execute("BEGIN IMMEDIATE")
+            yield handle
+        except BaseException:
+            if outermost:
+                raw.rollback()
+            else:
+                state.rollback_only = True
+            raise
+        else:
+            if outermost:
+                if state.rollback_only:
+                    raw.rollback()
+                    raise UnitOfWorkRolledBack("Unit of work rolled back: a nested block failed or called rollback()")
+                else:
+                    raw.commit()
+                    for callback in state.after_commit or ():
+                        callback()
+        finally:
+            deferred = state.after_exit if outermost else None
+            if outermost:
+                state.after_commit = None
+                state.after_exit = None
+            state.uow_depth -= 1
+            handle.close()
+            if outermost and not self.persistent:
+                raw.close()
+                state.conn = None
+            for callback in deferred or ():
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Detached write deferred to the end of a unit of work failed")
+
+    def _release(self, raw: sqlite3.Connection) -> None:
+        state = self._state
+        if state.conn is not raw:  # released after close_all()/reset or from another thread
+            return
+        state.checkouts = max(state.checkouts - 1, 0)
+        if state.checkouts == 0 and raw.in_transaction:
+            raw.rollback()
+
+    def close_all(self) -> None:
+        """Close every connection opened by this manager (all threads)."""
+        with self._lock:
+            opened = list(self._opened)
+            self._opened = weakref.WeakSet()
+            if self._monitor is not None:
+                opened.append(self._monitor)
+                self._monitor = None
+            side, self._side = self._side, None
+        if side is not None:
+            side.close_all()
+        for conn in opened:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._state = _ThreadState()
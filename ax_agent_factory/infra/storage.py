@@ -0,0 +1,1471 @@
+"""SQLAlchemy Core storage backend (pooled engine, per-dialect upsert).
+
+The default persistence path is still raw sqlite3 through db._get_conn()
+(ConnectionManager, PRAGMA user_version migrations, FTS5 search). Setting
+`AX_DATABASE_URL` switches every db/repo helper marked with `@storage.routed` to
+SQLAlchemyStore, which runs the same operations as SQLAlchemy Core statements:
+
+    AX_DATABASE_URL=sqlite:///data/ax_factory.db           # SQLite through SQLAlchemy
+    AX_DATABASE_URL=postgresql+psycopg://ax:***@db/ax       # shared server database
+
+Engine/pool settings: AX_DB_POOL_SIZE (5), AX_DB_MAX_OVERFLOW (10),
+AX_DB_POOL_TIMEOUT_S (30), AX_DB_POOL_RECYCLE_S (1800). On SQLite the
+connections get the SQLiteTuning pragmas and write transactions start with
+BEGIN IMMEDIATE, so concurrent workers queue on busy_timeout instead of failing
+with "database is locked" when a deferred reader tries to upgrade.
+
+Not available on this backend: the FTS5 search index (infra/search.py) and the
+read cache (reads always go to the database).
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from ax_agent_factory.infra import metrics
+from ax_agent_factory.infra.sqlite_conn import SQLiteTuning, UnitOfWorkRolledBack
+from ax_agent_factory.models.job_run import JobResearchCollectResult, JobResearchResult, JobRun
+from ax_agent_factory.models.llm_log import LLMCallLog
+
+logger = logging.getLogger(__name__)
+
+metadata = sa.MetaData()
+_KEY = sa.String(255)  # unique-key text columns need a length on MySQL
+
+
+def _timestamps() -> list[sa.Column]:
+    return [sa.Column("created_at", sa.Text, nullable=False), sa.Column("updated_at", sa.Text, nullable=False)]
+
+
+def _job_run_fk(nullable: bool = False) -> sa.Column:
+    return sa.Column("job_run_id", sa.Integer, sa.ForeignKey("job_runs.id"), nullable=nullable)
+
+
+def _version_columns(table: str) -> list:
+    """version/is_current columns and indexes of a per-agent versioned table (db migration 7)."""
+    current = sa.text("is_current = 1")
+    return [
+        sa.Column("version", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("is_current", sa.Integer, nullable=False, server_default="1"),
+        sa.UniqueConstraint("job_run_id", "agent_id", "version", name=f"ux_{table}_run_agent_version"),
+        sa.Index(f"idx_{table}_current", "job_run_id", "agent_id", sqlite_where=current, postgresql_where=current),
+    ]
+
+
+job_runs = sa.Table(
+    "job_runs", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("company_name", sa.Text, nullable=False),
+    sa.Column("job_title", sa.Text, nullable=False),
+    sa.Column("industry_context", sa.Text),
+    sa.Column("business_goal", sa.Text),
+    sa.Column("manual_jd_text", sa.Text),
+    sa.Column("status", sa.Text),
+    sa.Column("trace_id", sa.Text),
+    sa.Column("dedup_hash", sa.String(64)),
+    *_timestamps(),
+    sa.Index("idx_job_runs_dedup_hash", "dedup_hash"),
+    sqlite_autoincrement=True,
+)
+job_research_results = sa.Table(
+    "job_research_results", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("raw_job_desc", sa.Text, nullable=False),
+    sa.Column("research_sources_json", sa.Text, nullable=False),
+    *_timestamps(),
+    sa.UniqueConstraint("job_run_id"),
+    sqlite_autoincrement=True,
+)
+job_research_collect_results = sa.Table(
+    "job_research_collect_results", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("raw_sources_json", sa.Text, nullable=False),
+    sa.Column("job_meta_json", sa.Text),
+    *_timestamps(),
+    sa.UniqueConstraint("job_run_id"),
+    sqlite_autoincrement=True,
+)
+job_tasks = sa.Table(
+    "job_tasks", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("task_id", _KEY, nullable=False),
+    sa.Column("task_original_sentence", sa.Text, nullable=False),
+    sa.Column("task_korean", sa.Text, nullable=False),
+    *[
+        sa.Column(name, sa.Text)
+        for name in (
+            "task_english", "notes", "ivc_phase", "ivc_exec_subphase", "primitive_lv1", "classification_reason",
+            "static_type_lv1", "static_type_lv2", "domain_lv1", "domain_lv2",
+        )
+    ],
+    sa.Column("rag_required", sa.Integer),
+    sa.Column("rag_reason", sa.Text),
+    sa.Column("value_score", sa.Integer),
+    sa.Column("complexity_score", sa.Integer),
+    *[
+        sa.Column(name, sa.Text)
+        for name in (
+            "value_complexity_quadrant", "recommended_execution_env", "autoability_reason", "data_entities_json",
+            "tags_json", "stage_id", "stream_id", "workflow_node_label",
+        )
+    ],
+    *[sa.Column(name, sa.Integer) for name in ("is_entry", "is_exit", "is_hub")],
+    sa.Column("review_status", sa.Text),
+    *_timestamps(),
+    sa.UniqueConstraint("job_run_id", "task_id"),
+    sa.Index("idx_job_tasks_run", "job_run_id"),
+    sqlite_autoincrement=True,
+)
+job_task_edges = sa.Table(
+    "job_task_edges", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("source_task_id", _KEY, nullable=False),
+    sa.Column("target_task_id", _KEY, nullable=False),
+    sa.Column("label", sa.Text),
+    *_timestamps(),
+    sa.Index("idx_job_task_edges_run_source_target", "job_run_id", "source_task_id", "target_task_id"),
+    sqlite_autoincrement=True,
+)
+workflow_results = sa.Table(
+    "workflow_results", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("job_run_id", sa.Integer, sa.ForeignKey("job_runs.id"), nullable=False, unique=True),
+    sa.Column("workflow_plan_json", sa.Text),
+    sa.Column("mermaid_code", sa.Text),
+    sa.Column("warnings_json", sa.Text),
+    *_timestamps(),
+    sqlite_autoincrement=True,
+)
+llm_call_logs = sa.Table(
+    "llm_call_logs", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("created_at", _KEY, nullable=False),
+    _job_run_fk(nullable=True),
+    sa.Column("stage_name", _KEY, nullable=False),
+    sa.Column("agent_name", sa.Text),
+    sa.Column("model_name", sa.Text, nullable=False),
+    sa.Column("prompt_version", sa.Text),
+    sa.Column("temperature", sa.Float),
+    sa.Column("top_p", sa.Float),
+    sa.Column("input_payload_json", sa.Text, nullable=False),
+    sa.Column("output_text_raw", sa.Text),
+    sa.Column("output_json_parsed", sa.Text),
+    sa.Column("status", sa.Text, nullable=False),
+    sa.Column("error_type", sa.Text),
+    sa.Column("error_message", sa.Text),
+    *[sa.Column(name, sa.Integer) for name in ("latency_ms", "tokens_prompt", "tokens_completion", "tokens_total")],
+    sa.Index("idx_llm_call_logs_job_run", "job_run_id"),
+    sa.Index("idx_llm_call_logs_stage", "stage_name", "created_at"),
+    sa.Index("idx_llm_call_logs_run_stage_created", "job_run_id", "stage_name", "created_at"),
+    sqlite_autoincrement=True,
+)
+_ROLLUP_KEY = ("hour_bucket", "stage_name", "model_name", "prompt_version")
+_ROLLUP_SUMS = (
+    "latency_count", "latency_sum_ms", "tokens_prompt_sum", "tokens_completion_sum", "tokens_total_sum",
+    "stub_fallback_count", "json_parse_error_count", "error_count",
+)
+llm_call_rollups = sa.Table(
+    "llm_call_rollups", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    *[sa.Column(name, _KEY, nullable=False, server_default="" if name == "prompt_version" else None) for name in _ROLLUP_KEY],
+    sa.Column("call_count", sa.Integer, nullable=False, server_default="0"),
+    *[sa.Column(name, sa.Integer, nullable=False, server_default="0") for name in _ROLLUP_SUMS],
+    sa.Column("latency_max_ms", sa.Integer, nullable=False, server_default="0"),
+    sa.Column("updated_at", sa.Text, nullable=False),
+    sa.UniqueConstraint(*_ROLLUP_KEY),
+    sqlite_autoincrement=True,
+)
+llm_call_latency_buckets = sa.Table(
+    "llm_call_latency_buckets", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    *[sa.Column(name, _KEY, nullable=False, server_default="" if name == "prompt_version" else None) for name in _ROLLUP_KEY],
+    sa.Column("le_ms", sa.Integer, nullable=False),
+    sa.Column("count", sa.Integer, nullable=False, server_default="0"),
+    sa.UniqueConstraint(*_ROLLUP_KEY, "le_ms"),
+    sqlite_autoincrement=True,
+)
+ax_workflows = sa.Table(
+    "ax_workflows", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("workflow_name", sa.Text, nullable=False),
+    *[
+        sa.Column(name, sa.Text)
+        for name in (
+            "workflow_summary", "ax_workflow_mermaid_code", "agent_table_json", "n8n_workflows_json",
+            "sheet_schemas_json", "validator_plan_json", "observability_plan_json", "mode",
+        )
+    ],
+    *_timestamps(),
+    sa.Index("idx_ax_workflows_run", "job_run_id", "id"),
+    sqlite_autoincrement=True,
+)
+ax_agents = sa.Table(
+    "ax_agents", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("agent_id", _KEY, nullable=False),
+    sa.Column("agent_name", sa.Text, nullable=False),
+    *[
+        sa.Column(name, sa.Integer if name == "rag_enabled" else sa.Text)
+        for name in (
+            "stage_stream_step", "agent_type", "execution_environment", "n8n_workflow_id", "n8n_node_name",
+            "primary_sheet", "rag_enabled", "file_search_corpus_hint", "domain_context", "role_and_goal",
+            "success_metrics_json", "error_policy", "validation_policy", "notes", "agent_spec_json",
+        )
+    ],
+    *_timestamps(),
+    sa.UniqueConstraint("job_run_id", "agent_id"),
+    sqlite_autoincrement=True,
+)
+ax_agent_task_links = sa.Table(
+    "ax_agent_task_links", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("agent_id", _KEY, nullable=False),
+    sa.Column("task_id", sa.Text, nullable=False),
+    sa.Column("link_type", sa.Text),
+    sa.Column("notes", sa.Text),
+    *_timestamps(),
+    sa.Index("idx_ax_agent_task_links_run_agent", "job_run_id", "agent_id"),
+    sqlite_autoincrement=True,
+)
+ax_deep_research_docs = sa.Table(
+    "ax_deep_research_docs", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("agent_id", _KEY, nullable=False),
+    sa.Column("research_focus", sa.Text),
+    sa.Column("sections_json", sa.Text),
+    *_timestamps(),
+    *_version_columns("ax_deep_research_docs"),
+    sqlite_autoincrement=True,
+)
+ax_skills = sa.Table(
+    "ax_skills", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("skill_public_id", _KEY, nullable=False),
+    sa.Column("skill_name", sa.Text, nullable=False),
+    *[
+        sa.Column(name, sa.Text)
+        for name in (
+            "target_agent_ids_json", "related_task_ids_json", "purpose", "when_to_use", "core_heuristics_json",
+            "step_checklist_json", "bad_signs_json", "good_signs_json",
+        )
+    ],
+    *_timestamps(),
+    sa.UniqueConstraint("job_run_id", "skill_public_id"),
+    sqlite_autoincrement=True,
+)
+ax_prompts = sa.Table(
+    "ax_prompts", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("agent_id", _KEY, nullable=False),
+    *[
+        sa.Column(name, sa.Text)
+        for name in (
+            "execution_environment", "prompt_version", "single_prompt", "system_prompt", "user_prompt_template",
+            "logic_hint", "human_checklist", "examples_json", "mode",
+        )
+    ],
+    *_timestamps(),
+    *_version_columns("ax_prompts"),
+    sqlite_autoincrement=True,
+)
+stage_artifacts = sa.Table(
+    "stage_artifacts", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("stage_id", _KEY, nullable=False),
+    sa.Column("input_hash", sa.String(64), nullable=False),
+    sa.Column("output_hash", sa.String(64), nullable=False),
+    sa.Column("result_type", sa.Text, nullable=False),
+    sa.Column("payload_json", sa.Text, nullable=False),
+    sa.Column("created_at", sa.Text, nullable=False),
+    sa.Index("idx_stage_artifacts_run_stage", "job_run_id", "stage_id", "id"),
+    sqlite_autoincrement=True,
+)
+
+stage_runs = sa.Table(
+    "stage_runs", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("stage_id", _KEY, nullable=False),
+    sa.Column("status", sa.String(16), nullable=False),
+    sa.Column("input_hash", sa.String(64)),
+    sa.Column("artifact_id", sa.Integer, sa.ForeignKey("stage_artifacts.id")),
+    sa.Column("error", sa.Text),
+    sa.Column("started_at", sa.Text, nullable=False),
+    sa.Column("finished_at", sa.Text, nullable=False),
+    sa.Column("updated_at", sa.Text, nullable=False),
+    sa.UniqueConstraint("job_run_id", "stage_id"),
+    sqlite_autoincrement=True,
+)
+
+job_queue = sa.Table(
+    "job_queue", metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    _job_run_fk(),
+    sa.Column("target", _KEY, nullable=False),
+    sa.Column("ax_target", _KEY),
+    sa.Column("manual_jd_text", sa.Text),
+    sa.Column("force_rerun_json", sa.Text),
+    sa.Column("status", sa.String(16), nullable=False),
+    sa.Column("attempts", sa.Integer, nullable=False, default=0),
+    sa.Column("max_attempts", sa.Integer, nullable=False),
+    sa.Column("due_at", sa.String(32), nullable=False),
+    sa.Column("lease_owner", sa.Text),
+    sa.Column("heartbeat_at", sa.Text),
+    sa.Column("progress_json", sa.Text),
+    sa.Column("last_error", sa.Text),
+    sa.Column("created_at", sa.Text, nullable=False),
+    sa.Column("updated_at", sa.Text, nullable=False),
+    sa.Column("finished_at", sa.Text),
+    sa.Index("idx_job_queue_due", "status", "due_at"),
+    sa.Index("idx_job_queue_run", "job_run_id", "id"),
+    sqlite_autoincrement=True,
+)
+
+
+# ---------------- engine / upsert ----------------
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def create_engine(url: str, tuning: Optional[SQLiteTuning] = None, **kwargs: Any) -> sa.Engine:
+    """Pooled engine for url; SQLite connections get the tuning pragmas and lazy BEGIN handling."""
+    sa_url = sa.make_url(url)
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,
+        "pool_size": _env_int("AX_DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("AX_DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("AX_DB_POOL_TIMEOUT_S", 30),
+        "pool_recycle": _env_int("AX_DB_POOL_RECYCLE_S", 1800),
+    }
+    is_sqlite = sa_url.get_backend_name() == "sqlite"
+    if is_sqlite:
+        tuning = tuning or SQLiteTuning.from_env()
+        options["connect_args"] = {"timeout": tuning.busy_timeout_ms / 1000, "check_same_thread": False}
+        if sa_url.database and sa_url.database != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(sa_url.database)), exist_ok=True)
+    options.update(kwargs)
+    engine = sa.create_engine(sa_url, **options)
+    if is_sqlite:
+        _install_sqlite_hooks(engine, tuning)
+    return engine
+
+
+def _install_sqlite_hooks(engine: sa.Engine, tuning: SQLiteTuning) -> None:
+    @sa.event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record) -> None:
+        dbapi_conn.isolation_level = None  # let the "begin" hook below emit BEGIN itself
+        for pragma in tuning.pragmas():
+            dbapi_conn.execute(pragma)
+
+    @sa.event.listens_for(engine, "begin")
+    def _on_begin(conn) -> None:
+        # Writers take the lock up front; a deferred transaction that later writes fails
+        # with SQLITE_BUSY immediately instead of waiting for busy_timeout.
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if conn.get_execution_options().get("ax_write") else "BEGIN")
+
+
+def upsert(
+    table: sa.Table,
+    dialect: str,
+    *,
+    conflict: tuple[str, ...],
+    update: tuple[str, ...] = (),
+    increment: tuple[str, ...] = (),
+    maximum: tuple[str, ...] = (),
+    keep_existing_if_null: tuple[str, ...] = (),
+):
+    """
+    INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE for sqlite, postgresql and mysql.
+
+    update: overwritten with the new value; increment: existing + new; maximum: larger
+    of both; keep_existing_if_null: new value unless it is NULL. No update columns
+    means "insert or ignore".
+    """
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(table)
+        new = stmt.excluded
+        greatest = sa.func.max if dialect == "sqlite" else sa.func.greatest
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        new = stmt.inserted
+        greatest = sa.func.greatest
+    else:  # pragma: no cover - depends on deployment
+        raise NotImplementedError(f"upsert is not implemented for dialect {dialect!r}")
+    values: dict[str, Any] = {c: new[c] for c in update}
+    values.update({c: table.c[c] + new[c] for c in increment})
+    values.update({c: greatest(table.c[c], new[c]) for c in maximum})
+    values.update({c: sa.func.coalesce(new[c], table.c[c]) for c in keep_existing_if_null})
+    if dialect in ("mysql", "mariadb"):
+        return stmt.on_duplicate_key_update(**values) if values else stmt.prefix_with("IGNORE")
+    if not values:
+        return stmt.on_conflict_do_nothing(index_elements=list(conflict))
+    return stmt.on_conflict_do_update(index_elements=list(conflict), set_=values)
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+# ---------------- store ----------------
+
+class SQLAlchemyStore:
+    """db/repo operations as SQLAlchemy Core statements on a pooled engine."""
+
+    def __init__(self, url: str, *, create_schema: bool = True, **engine_kwargs: Any) -> None:
+        self.url = url
+        self.engine = create_engine(url, **engine_kwargs)
+        self.dialect = self.engine.dialect.name
+        self._local = threading.local()
+        if create_schema:
+            metadata.create_all(self.engine)
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+    # --- connections / units of work ---
+    @contextmanager
+    def transaction(self, *, immediate: bool = True) -> Iterator[sa.Connection]:
+        """Same contract as db.transaction(): one commit at the outermost exit, nested blocks join."""
+        current = getattr(self._local, "conn", None)
+        if current is not None:
+            try:
+                yield current
+            except BaseException:
+                self._local.rollback_only = True
+                raise
+            return
+        engine = self.engine.execution_options(ax_write=True) if immediate else self.engine
+        self._local.after_exit = []
+        self._local.rollback_only = False
+        try:
+            with engine.begin() as conn:
+                self._local.conn = conn
+                try:
+                    yield conn
+                finally:
+                    self._local.conn = None
+                if self._local.rollback_only:  # a nested block failed and its caller caught the error
+                    raise UnitOfWorkRolledBack("Unit of work rolled back: a nested block failed")
+        finally:
+            deferred, self._local.after_exit = self._local.after_exit, None
+            for callback in deferred:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Detached write deferred to the end of a unit of work failed")
+
+    def run_detached(self, callback: Callable[[], None]) -> None:
+        """db.run_detached(): on another pooled connection now, or after the unit of work on SQLite (one writer)."""
+        current = getattr(self._local, "conn", None)
+        if current is None:
+            callback()
+        elif self.dialect == "sqlite":
+            self._local.after_exit.append(callback)
+        else:
+            self._local.conn = None
+            try:
+                callback()
+            finally:
+                self._local.conn = current
+
+    def _begin(self, *, write: bool = False):
+        # Every helper runs as (or joins) a unit of work, so helpers calling helpers share one connection.
+        return self.transaction(immediate=write)
+
+    def _upsert(self, conn: sa.Connection, table: sa.Table, rows: list[dict], **kwargs: Any) -> None:
+        if rows:
+            conn.execute(upsert(table, self.dialect, **kwargs), rows)
+
+    # --- job runs ---
+    def create_or_get_job_run(
+        self,
+        company_name: str,
+        job_title: str,
+        manual_jd_text: str | None = None,
+        *,
+        industry_context: str | None = None,
+        business_goal: str | None = None,
+        status: str | None = None,
+    ) -> JobRun:
+        t = job_runs
+        dedup_hash = db.job_run_dedup_hash(company_name, job_title, manual_jd_text)
+        with self._begin(write=True) as conn:
+            row = conn.execute(
+                sa.select(t)
+                .where(
+                    t.c.dedup_hash == dedup_hash,
+                    t.c.company_name == company_name,
+                    t.c.job_title == job_title,
+                    sa.func.coalesce(t.c.manual_jd_text, "") == (manual_jd_text or ""),
+                )
+                .order_by(t.c.id.desc())
+                .limit(1)
+            ).first()
+            if row is None:
+                now = _now()
+                job_run_id = conn.execute(
+                    t.insert().values(
+                        company_name=company_name, job_title=job_title, industry_context=industry_context,
+                        business_goal=business_goal, manual_jd_text=manual_jd_text, status=status,
+                        dedup_hash=dedup_hash, created_at=now, updated_at=now,
+                    )
+                ).inserted_primary_key[0]
+                row = conn.execute(sa.select(t).where(t.c.id == job_run_id)).first()
+        return db._row_to_job_run(row._mapping)
+
+    def create_job_run(self, company_name: str, job_title: str) -> JobRun:
+        return self.create_or_get_job_run(company_name, job_title)
+
+    def update_job_run_meta(
+        self,
+        job_run_id: int,
+        *,
+        industry_context: str | None = None,
+        business_goal: str | None = None,
+        status: str | None = None,
+    ) -> None:
+        t = job_runs
+        with self._begin(write=True) as conn:
+            conn.execute(
+                t.update()
+                .where(t.c.id == job_run_id)
+                .values(
+                    industry_context=sa.func.coalesce(industry_context, t.c.industry_context),
+                    business_goal=sa.func.coalesce(business_goal, t.c.business_goal),
+                    status=sa.func.coalesce(status, t.c.status),
+                    updated_at=_now(),
+                )
+            )
+
+    def set_job_run_trace_id(self, job_run_id: int, trace_id: str) -> None:
+        with self._begin(write=True) as conn:
+            conn.execute(job_runs.update().where(job_runs.c.id == job_run_id).values(trace_id=trace_id))
+
+    def get_latest_job_run(self) -> Optional[JobRun]:
+        with self._begin() as conn:
+            row = conn.execute(sa.select(job_runs).order_by(job_runs.c.id.desc()).limit(1)).first()
+        return db._row_to_job_run(row._mapping) if row else None
+
+    def get_job_run(self, job_run_id: int) -> Optional[JobRun]:
+        with self._begin() as conn:
+            row = conn.execute(sa.select(job_runs).where(job_runs.c.id == job_run_id)).first()
+        return db._row_to_job_run(row._mapping) if row else None
+
+    # --- Stage 0 results ---
+    def save_job_research_result(self, result: JobResearchResult) -> None:
+        now = _now()
+        with self._begin(write=True) as conn:
+            self._upsert(
+                conn, job_research_results,
+                [{
+                    "job_run_id": result.job_run_id, "raw_job_desc": result.raw_job_desc,
+                    "research_sources_json": _dumps(result.research_sources), "created_at": now, "updated_at": now,
+                }],
+                conflict=("job_run_id",), update=("raw_job_desc", "research_sources_json", "updated_at"),
+            )
+
+    def save_job_research_collect_result(self, result: JobResearchCollectResult) -> None:
+        now = _now()
+        with self._begin(write=True) as conn:
+            self._upsert(
+                conn, job_research_collect_results,
+                [{
+                    "job_run_id": result.job_run_id, "raw_sources_json": _dumps(result.raw_sources),
+                    "job_meta_json": _dumps(result.job_meta or {}), "created_at": now, "updated_at": now,
+                }],
+                conflict=("job_run_id",), update=("raw_sources_json", "job_meta_json", "updated_at"),
+            )
+
+    def get_job_research_result(self, job_run_id: int) -> Optional[JobResearchResult]:
+        t = job_research_results
+        with self._begin() as conn:
+            row = conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id)).first()
+        if row is None:
+            return None
+        return JobResearchResult(
+            job_run_id=row.job_run_id,
+            raw_job_desc=row.raw_job_desc,
+            research_sources=json.loads(row.research_sources_json),
+        )
+
+    def get_job_research_collect_result(self, job_run_id: int) -> Optional[JobResearchCollectResult]:
+        t = job_research_collect_results
+        with self._begin() as conn:
+            row = conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id)).first()
+        if row is None:
+            return None
+        return JobResearchCollectResult(
+            job_run_id=row.job_run_id,
+            job_meta=json.loads(row.job_meta_json) if row.job_meta_json else None,
+            raw_sources=json.loads(row.raw_sources_json),
+        )
+
+    # --- job_tasks / edges ---
+    def _upsert_task_columns(self, job_run_id: int, columns: tuple[str, ...], rows: list[dict]) -> None:
+        """Placeholder-row upsert mirroring db._job_tasks_upsert_sql."""
+        now = _now()
+        payload = [
+            {"job_run_id": job_run_id, "task_original_sentence": "", "task_korean": "", **row, "created_at": now, "updated_at": now}
+            for row in rows
+        ]
+        with self._begin(write=True) as conn:
+            self._upsert(conn, job_tasks, payload, conflict=("job_run_id", "task_id"), update=(*columns, "updated_at"))
+
+    def save_task_atoms(self, job_run_id: int, task_atoms: list) -> None:
+        if not task_atoms:
+            return
+        columns = ("task_original_sentence", "task_korean", "task_english", "notes")
+        self._upsert_task_columns(
+            job_run_id, columns, [{"task_id": a.task_id, **{c: getattr(a, c) for c in columns}} for a in task_atoms]
+        )
+
+    def apply_ivc_classification(self, job_run_id: int, ivc_tasks: list) -> None:
+        if not ivc_tasks:
+            return
+        self._upsert_task_columns(
+            job_run_id,
+            db._IVC_COLUMNS,
+            [{"task_id": t.task_id, **{c: getattr(t, c) for c in db._IVC_COLUMNS}} for t in ivc_tasks],
+        )
+
+    def apply_static_classification(self, job_run_id: int, task_static_meta: list) -> None:
+        if not task_static_meta:
+            return
+        rows = []
+        for meta in task_static_meta:
+            row = {c: getattr(meta, c) for c in db._STATIC_COLUMNS if c not in ("data_entities_json", "tags_json")}
+            row.update(
+                task_id=meta.task_id,
+                rag_required=1 if meta.rag_required else 0,
+                data_entities_json=json.dumps(meta.data_entities, ensure_ascii=False),
+                tags_json=json.dumps(meta.tags, ensure_ascii=False),
+            )
+            rows.append(row)
+        self._upsert_task_columns(job_run_id, db._STATIC_COLUMNS, rows)
+
+    def apply_workflow_plan(self, job_run_id: int, plan) -> None:
+        f = db._field
+        now = _now()
+        with self._begin(write=True) as conn:
+            if plan.nodes:
+                self._upsert_task_columns(
+                    job_run_id,
+                    db._WORKFLOW_NODE_COLUMNS,
+                    [
+                        {
+                            "task_id": f(node, "node_id"), "stage_id": f(node, "stage_id"),
+                            "stream_id": f(node, "stream_id"), "workflow_node_label": f(node, "label"),
+                            "is_entry": 1 if f(node, "is_entry") else 0, "is_exit": 1 if f(node, "is_exit") else 0,
+                            "is_hub": 1 if f(node, "is_hub") else 0,
+                        }
+                        for node in plan.nodes
+                    ],
+                )
+            t = job_task_edges
+            wanted = Counter((f(e, "source"), f(e, "target"), f(e, "label")) for e in plan.edges)
+            stale_ids = []
+            for row in conn.execute(
+                sa.select(t.c.id, t.c.source_task_id, t.c.target_task_id, t.c.label)
+                .where(t.c.job_run_id == job_run_id)
+                .order_by(t.c.id)
+            ):
+                key = (row.source_task_id, row.target_task_id, row.label)
+                if wanted[key] > 0:
+                    wanted[key] -= 1
+                else:
+                    stale_ids.append(row.id)
+            if stale_ids:
+                conn.execute(t.delete().where(t.c.id.in_(stale_ids)))
+            new_edges = [
+                {"job_run_id": job_run_id, "source_task_id": s, "target_task_id": tg, "label": label,
+                 "created_at": now, "updated_at": now}
+                for (s, tg, label), count in wanted.items()
+                for _ in range(count)
+            ]
+            if new_edges:
+                conn.execute(t.insert(), new_edges)
+
+    def get_job_tasks(self, job_run_id: int) -> list[dict]:
+        with self._begin() as conn:
+            rows = conn.execute(
+                sa.select(job_tasks).where(job_tasks.c.job_run_id == job_run_id).order_by(job_tasks.c.task_id)
+            )
+            return [dict(r._mapping) for r in rows]
+
+    def get_job_task_edges(self, job_run_id: int) -> list[dict]:
+        t = job_task_edges
+        with self._begin() as conn:
+            return [dict(r._mapping) for r in conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id).order_by(t.c.id))]
+
+    # --- workflow results ---
+    def save_workflow_plan(self, job_run_id: int, plan) -> None:
+        now = _now()
+        with self._begin(write=True) as conn:
+            self._upsert(
+                conn, workflow_results,
+                [{"job_run_id": job_run_id, "workflow_plan_json": _dumps(plan.model_dump()), "created_at": now, "updated_at": now}],
+                conflict=("job_run_id",), update=("workflow_plan_json", "updated_at"),
+            )
+
+    def save_workflow_mermaid_result(self, job_run_id: int, plan, mermaid) -> None:
+        now = _now()
+        with self._begin(write=True) as conn:
+            self._upsert(
+                conn, workflow_results,
+                [{
+                    "job_run_id": job_run_id,
+                    "workflow_plan_json": _dumps(plan.model_dump()) if plan is not None else None,
+                    "mermaid_code": mermaid.mermaid_code, "warnings_json": _dumps(mermaid.warnings),
+                    "created_at": now, "updated_at": now,
+                }],
+                conflict=("job_run_id",),
+                update=("mermaid_code", "warnings_json", "updated_at"),
+                keep_existing_if_null=("workflow_plan_json",),
+            )
+
+    def _workflow_row(self, job_run_id: int):
+        with self._begin() as conn:
+            return conn.execute(sa.select(workflow_results).where(workflow_results.c.job_run_id == job_run_id)).first()
+
+    def get_workflow_plan(self, job_run_id: int):
+        from ax_agent_factory.core.schemas.workflow import WorkflowPlan
+
+        row = self._workflow_row(job_run_id)
+        if row is None or not row.workflow_plan_json:
+            return None
+        try:
+            return WorkflowPlan(**json.loads(row.workflow_plan_json))
+        except Exception:
+            return None
+
+    def get_workflow_mermaid_result(self, job_run_id: int):
+        from ax_agent_factory.core.schemas.workflow import MermaidDiagram
+
+        row = self._workflow_row(job_run_id)
+        if row is None or not row.mermaid_code:
+            return None
+        warnings = json.loads(row.warnings_json) if row.warnings_json else None
+        diagram = MermaidDiagram(workflow_name="", mermaid_code=row.mermaid_code, warnings=warnings)
+        if row.workflow_plan_json:
+            try:
+                diagram.workflow_name = json.loads(row.workflow_plan_json).get("workflow_name", diagram.workflow_name)
+            except Exception:
+                pass
+        return diagram
+
+    # --- LLM call logs / rollups ---
+    def save_llm_call_log(self, log: LLMCallLog | dict) -> Optional[int]:
+        data = log if isinstance(log, dict) else log.__dict__
+        values = {c.name: data.get(c.name) for c in llm_call_logs.columns if c.name != "id"}
+        with self._begin(write=True) as conn:
+            row_id = conn.execute(llm_call_logs.insert().values(**values)).inserted_primary_key[0]
+            self._fold_rollup(conn, data)
+        return row_id
+
+    def _fold_rollup(self, conn: sa.Connection, data: dict) -> None:
+        key = {
+            "hour_bucket": db._hour_bucket(data.get("created_at")),
+            "stage_name": data.get("stage_name"),
+            "model_name": data.get("model_name"),
+            "prompt_version": data.get("prompt_version") or "",
+        }
+        status = data.get("status")
+        latency_ms = data.get("latency_ms")
+        self._upsert(
+            conn, llm_call_rollups,
+            [{
+                **key,
+                "call_count": 1,
+                "latency_count": 1 if latency_ms is not None else 0,
+                "latency_sum_ms": latency_ms or 0,
+                "latency_max_ms": latency_ms or 0,
+                "tokens_prompt_sum": data.get("tokens_prompt") or 0,
+                "tokens_completion_sum": data.get("tokens_completion") or 0,
+                "tokens_total_sum": data.get("tokens_total") or 0,
+                "stub_fallback_count": 1 if status == "stub_fallback" else 0,
+                "json_parse_error_count": 1 if status == "json_parse_error" else 0,
+                "error_count": 1 if status not in ("success", "override", "stub_fallback", "json_parse_error") else 0,
+                "updated_at": _now(),
+            }],
+            conflict=_ROLLUP_KEY, update=("updated_at",), increment=("call_count", *_ROLLUP_SUMS), maximum=("latency_max_ms",),
+        )
+        if latency_ms is not None:
+            self._upsert(
+                conn, llm_call_latency_buckets,
+                [{**key, "le_ms": db._latency_bucket_le(latency_ms), "count": 1}],
+                conflict=(*_ROLLUP_KEY, "le_ms"), increment=("count",),
+            )
+
+    def get_llm_calls_by_job_run(self, job_run_id: int) -> list[LLMCallLog]:
+        t = llm_call_logs
+        with self._begin() as conn:
+            rows = conn.execute(
+                sa.select(t).where(t.c.job_run_id == job_run_id).order_by(t.c.created_at.desc(), t.c.id.desc())
+            ).all()
+        return [LLMCallLog(**dict(r._mapping)) for r in rows]
+
+    def get_latest_llm_call(self, job_run_id: int, stage_name: str, *, include_text: bool = False) -> Optional[dict]:
+        t = llm_call_logs
+        columns = db.LLM_CALL_META_COLUMNS + (db.LLM_CALL_TEXT_COLUMNS if include_text else ())
+        with self._begin() as conn:
+            row = conn.execute(
+                sa.select(*[t.c[c] for c in columns])
+                .where(t.c.job_run_id == job_run_id, t.c.stage_name == stage_name)
+                .order_by(t.c.created_at.desc(), t.c.id.desc())
+                .limit(1)
+            ).first()
+        return dict(row._mapping) if row else None
+
+    def get_llm_call_texts(self, log_id: int) -> Optional[dict]:
+        t = llm_call_logs
+        with self._begin() as conn:
+            row = conn.execute(sa.select(*[t.c[c] for c in db.LLM_CALL_TEXT_COLUMNS]).where(t.c.id == log_id)).first()
+        return dict(row._mapping) if row else None
+
+    def get_llm_call_totals(self, job_run_id: int, *, since: Optional[str] = None) -> dict:
+        t = llm_call_logs
+        ok = ("success", "override", "stub_fallback", "json_parse_error")
+
+        def _count(condition):
+            return sa.func.coalesce(sa.func.sum(sa.case((condition, 1), else_=0)), 0)
+
+        with self._begin() as conn:
+            row = conn.execute(
+                sa.select(
+                    sa.func.count().label("calls"),
+                    sa.func.coalesce(sa.func.sum(t.c.tokens_prompt), 0).label("tokens_prompt"),
+                    sa.func.coalesce(sa.func.sum(t.c.tokens_completion), 0).label("tokens_completion"),
+                    sa.func.coalesce(sa.func.sum(t.c.tokens_total), 0).label("tokens_total"),
+                    _count(t.c.status == "stub_fallback").label("stub_fallback"),
+                    _count(t.c.status == "json_parse_error").label("json_parse_error"),
+                    _count(t.c.status.notin_(ok)).label("errors"),
+                ).where(t.c.job_run_id == job_run_id, t.c.created_at >= (since or ""))
+            ).one()
+        return {k: int(v) for k, v in row._mapping.items()}
+
+    def get_llm_error_window(self, stage_name: str, model_name: str, *, since: str, limit: int) -> dict:
+        t = llm_call_logs
+        live = sa.or_(
+            t.c.status == "success",
+            sa.and_(t.c.status.in_(("stub_fallback", "json_parse_error")), t.c.error_type.isnot(None)),
+        )
+        recent = (
+            sa.select(t.c.status)
+            .where(t.c.stage_name == stage_name, t.c.created_at >= since, t.c.model_name == model_name, live)
+            .order_by(t.c.created_at.desc())
+            .limit(limit)
+            .subquery()
+        )
+        with self._begin() as conn:
+            row = conn.execute(
+                sa.select(
+                    sa.func.count().label("calls"),
+                    sa.func.coalesce(sa.func.sum(sa.case((recent.c.status != "success", 1), else_=0)), 0).label("errors"),
+                )
+            ).one()
+        return {k: int(v) for k, v in row._mapping.items()}
+
+    def rebuild_llm_call_rollups(self) -> int:
+        t = llm_call_logs
+        with self._begin(write=True) as conn:
+            conn.execute(llm_call_rollups.delete())
+            conn.execute(llm_call_latency_buckets.delete())
+            rows = conn.execute(
+                sa.select(
+                    t.c.created_at, t.c.stage_name, t.c.model_name, t.c.prompt_version, t.c.status,
+                    t.c.latency_ms, t.c.tokens_prompt, t.c.tokens_completion, t.c.tokens_total,
+                ).order_by(t.c.id)
+            ).all()
+            for row in rows:
+                self._fold_rollup(conn, dict(row._mapping))
+        return len(rows)
+
+    def get_llm_call_rollups(
+        self,
+        *,
+        since: str | None = None,
+        until: str | None = None,
+        prompt_version: str | None = None,
+        stage_name: str | None = None,
+    ) -> list[dict]:
+        def _filters(t: sa.Table) -> list:
+            clauses = []
+            if since:
+                clauses.append(t.c.hour_bucket >= db._hour_bucket_bound(since))
+            if until:
+                clauses.append(t.c.hour_bucket < db._hour_bucket_bound(until, round_up=True))
+            if prompt_version is not None:
+                clauses.append(t.c.prompt_version == prompt_version)
+            if stage_name is not None:
+                clauses.append(t.c.stage_name == stage_name)
+            return clauses
+
+        r, b = llm_call_rollups, llm_call_latency_buckets
+        with self._begin() as conn:
+            sums = [sa.func.sum(r.c[c]).label(c) for c in ("call_count", *_ROLLUP_SUMS)]
+            rows = {
+                (row.stage_name, row.model_name): {**dict(row._mapping), "latency_buckets": {}}
+                for row in conn.execute(
+                    sa.select(r.c.stage_name, r.c.model_name, *sums, sa.func.max(r.c.latency_max_ms).label("latency_max_ms"))
+                    .where(*_filters(r))
+                    .group_by(r.c.stage_name, r.c.model_name)
+                    .order_by(r.c.stage_name, r.c.model_name)
+                )
+            }
+            for bucket in conn.execute(
+                sa.select(b.c.stage_name, b.c.model_name, b.c.le_ms, sa.func.sum(b.c.count).label("count"))
+                .where(*_filters(b))
+                .group_by(b.c.stage_name, b.c.model_name, b.c.le_ms)
+            ):
+                row = rows.get((bucket.stage_name, bucket.model_name))
+                if row is not None:
+                    row["latency_buckets"][bucket.le_ms] = bucket.count
+        return list(rows.values())
+
+    # --- AX repos ---
+    def upsert_ax_workflow(self, job_run_id: int, result) -> int:
+        t = ax_workflows
+        now = _now()
+        values = {
+            "workflow_name": result.ax_workflow_name,
+            "workflow_summary": result.ax_workflow_description,
+            "ax_workflow_mermaid_code": result.mermaid_arch_code,
+            "agent_table_json": _dumps([row.model_dump() for row in result.agent_table]),
+            "validator_plan_json": _dumps(result.validator_layer_json),
+            "observability_plan_json": _dumps(result.metrics_plan_json),
+            "mode": result.mode,
+            "updated_at": now,
+        }
+        with self._begin(write=True) as conn:
+            existing = conn.execute(
+                sa.select(t.c.id).where(t.c.job_run_id == job_run_id).order_by(t.c.id.desc()).limit(1)
+            ).scalar()
+            if existing is not None:
+                conn.execute(t.update().where(t.c.id == existing).values(**values))
+                return existing
+            return conn.execute(t.insert().values(job_run_id=job_run_id, created_at=now, **values)).inserted_primary_key[0]
+
+    def get_latest_ax_workflow(self, job_run_id: int) -> dict | None:
+        t = ax_workflows
+        with self._begin() as conn:
+            row = conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id).order_by(t.c.id.desc()).limit(1)).first()
+        if row is None:
+            return None
+        data = dict(row._mapping)
+        return {
+            **data,
+            "agent_table": json.loads(data["agent_table_json"]) if data["agent_table_json"] else [],
+            "validator_plan": json.loads(data["validator_plan_json"]) if data["validator_plan_json"] else None,
+            "observability_plan": json.loads(data["observability_plan_json"]) if data["observability_plan_json"] else None,
+            "n8n_workflows": json.loads(data["n8n_workflows_json"]) if data["n8n_workflows_json"] else None,
+            "sheet_schemas": json.loads(data["sheet_schemas_json"]) if data["sheet_schemas_json"] else None,
+        }
+
+    def _upsert_agents(self, rows: list[dict]) -> None:
+        columns = tuple(c for c in rows[0] if c not in ("job_run_id", "agent_id", "created_at"))
+        with self._begin(write=True) as conn:
+            self._upsert(conn, ax_agents, rows, conflict=("job_run_id", "agent_id"), update=columns)
+
+    def sync_ax_agents_from_agent_table(self, job_run_id: int, ax_workflow_id: int, agent_rows: list) -> None:
+        if not agent_rows:
+            return
+        now = _now()
+        self._upsert_agents(
+            [
+                {
+                    "job_run_id": job_run_id, "agent_id": row.agent_id, "agent_name": row.agent_name,
+                    "stage_stream_step": "/".join([v for v in [row.stage, row.stream, row.step] if v]),
+                    "agent_type": row.agent_type, "execution_environment": row.execution_environment,
+                    "n8n_workflow_id": row.n8n_workflow_id, "n8n_node_name": row.n8n_node_name,
+                    "primary_sheet": row.primary_sheet, "rag_enabled": 1 if row.rag_required else 0,
+                    "file_search_corpus_hint": row.rag_pattern, "role_and_goal": row.role_and_goal,
+                    "success_metrics_json": json.dumps([], ensure_ascii=False), "created_at": now, "updated_at": now,
+                }
+                for row in agent_rows
+            ]
+        )
+
+    def apply_agent_specs(self, job_run_id: int, agent_specs: list) -> None:
+        if not agent_specs:
+            return
+        now = _now()
+        self._upsert_agents(
+            [
+                {
+                    "job_run_id": job_run_id, "agent_id": spec.agent_id, "agent_name": spec.agent_name,
+                    "stage_stream_step": "/".join([v for v in [spec.stage, spec.stream, spec.step] if v]),
+                    "agent_type": spec.agent_type, "execution_environment": spec.execution_environment,
+                    "role_and_goal": spec.role_and_goal, "domain_context": "",
+                    "success_metrics_json": json.dumps(spec.success_metrics, ensure_ascii=False),
+                    "error_policy": _dumps(spec.error_policy),
+                    "validation_policy": json.dumps(spec.validator_dependencies, ensure_ascii=False),
+                    "notes": spec.notes, "agent_spec_json": json.dumps(spec.model_dump(), ensure_ascii=False),
+                    "created_at": now, "updated_at": now,
+                }
+                for spec in agent_specs
+            ]
+        )
+
+    def get_agents(self, job_run_id: int) -> list[dict]:
+        t = ax_agents
+        with self._begin() as conn:
+            return [dict(r._mapping) for r in conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id).order_by(t.c.agent_id))]
+
+    def _insert_version(self, conn, table: sa.Table, row: dict) -> int:
+        t = table
+        key = (t.c.job_run_id == row["job_run_id"]) & (t.c.agent_id == row["agent_id"])
+        conn.execute(t.update().where(key & (t.c.is_current == 1)).values(is_current=0))
+        latest = conn.execute(sa.select(sa.func.max(t.c.version)).where(key)).scalar()
+        version = (latest or 0) + 1
+        conn.execute(t.insert().values(**row, version=version, is_current=1))
+        conn.execute(t.delete().where(key & (t.c.version <= version - db.history_keep())))
+        return version
+
+    def _current_rows(self, table: sa.Table, job_run_id: int) -> list[dict]:
+        t = table
+        query = sa.select(t).where((t.c.job_run_id == job_run_id) & (t.c.is_current == 1)).order_by(t.c.agent_id)
+        with self._begin() as conn:
+            return [dict(r._mapping) for r in conn.execute(query)]
+
+    def _version_history(self, table: sa.Table, job_run_id: int, agent_id: str) -> list[dict]:
+        t = table
+        query = sa.select(t).where((t.c.job_run_id == job_run_id) & (t.c.agent_id == agent_id)).order_by(t.c.version.desc())
+        with self._begin() as conn:
+            return [dict(r._mapping) for r in conn.execute(query)]
+
+    def apply_agent_prompts(self, job_run_id: int, result) -> None:
+        if not result.agent_prompts:
+            return
+        now = _now()
+        with self._begin(write=True) as conn:
+            for p in result.agent_prompts:
+                self._insert_version(
+                    conn,
+                    ax_prompts,
+                    {
+                        "job_run_id": job_run_id, "agent_id": p.agent_id, "execution_environment": p.env,
+                        "prompt_version": p.prompt_version, "single_prompt": None, "system_prompt": p.system_prompt,
+                        "user_prompt_template": p.user_prompt_template, "logic_hint": p.logic_hint,
+                        "human_checklist": p.human_checklist,
+                        "examples_json": json.dumps(p.examples_json, ensure_ascii=False) if p.examples_json else None,
+                        "mode": p.mode, "created_at": now, "updated_at": now,
+                    },
+                )
+
+    def get_agent_prompts(self, job_run_id: int) -> list[dict]:
+        return self._current_rows(ax_prompts, job_run_id)
+
+    def get_agent_prompt_history(self, job_run_id: int, agent_id: str) -> list[dict]:
+        return self._version_history(ax_prompts, job_run_id, agent_id)
+
+    def save_deep_research_result(self, job_run_id: int, result) -> None:
+        now = _now()
+        with self._begin(write=True) as conn:
+            self._insert_version(
+                conn,
+                ax_deep_research_docs,
+                {
+                    "job_run_id": job_run_id, "agent_id": result.agent_id, "research_focus": result.research_focus,
+                    "sections_json": json.dumps(result.sections.model_dump(), ensure_ascii=False),
+                    "created_at": now, "updated_at": now,
+                },
+            )
+
+    def get_deep_research_results(self, job_run_id: int) -> list[dict]:
+        return self._current_rows(ax_deep_research_docs, job_run_id)
+
+    def get_deep_research_history(self, job_run_id: int, agent_id: str) -> list[dict]:
+        return self._version_history(ax_deep_research_docs, job_run_id, agent_id)
+
+    def prune_ax_history(self, keep: Optional[int] = None) -> dict[str, int]:
+        keep = db.history_keep() if keep is None else max(1, keep)
+        deleted: dict[str, int] = {}
+        with self._begin(write=True) as conn:
+            for table in (ax_prompts, ax_deep_research_docs):
+                t = table
+                # Per-agent deletes: MySQL cannot DELETE from a table its own subquery reads.
+                newest = conn.execute(
+                    sa.select(t.c.job_run_id, t.c.agent_id, sa.func.max(t.c.version)).group_by(t.c.job_run_id, t.c.agent_id)
+                ).all()
+                deleted[t.name] = sum(
+                    conn.execute(
+                        t.delete().where(
+                            (t.c.job_run_id == job_run_id) & (t.c.agent_id == agent_id) & (t.c.version <= latest - keep)
+                        )
+                    ).rowcount
+                    for job_run_id, agent_id, latest in newest
+                    if latest > keep
+                )
+        return deleted
+
+    def apply_skill_cards(self, job_run_id: int, result) -> None:
+        if not result.skill_cards:
+            return
+        now = _now()
+        rows = [
+            {
+                "job_run_id": job_run_id, "skill_public_id": card.skill_id, "skill_name": card.skill_name,
+                "target_agent_ids_json": json.dumps(card.target_agent_ids, ensure_ascii=False),
+                "related_task_ids_json": json.dumps(card.related_task_ids, ensure_ascii=False),
+                "purpose": card.purpose, "when_to_use": card.when_to_use,
+                "core_heuristics_json": json.dumps(card.core_heuristics, ensure_ascii=False),
+                "step_checklist_json": json.dumps(card.step_checklist, ensure_ascii=False),
+                "bad_signs_json": json.dumps(card.bad_signs, ensure_ascii=False),
+                "good_signs_json": json.dumps(card.good_signs, ensure_ascii=False),
+                "created_at": now, "updated_at": now,
+            }
+            for card in result.skill_cards
+        ]
+        columns = tuple(c for c in rows[0] if c not in ("job_run_id", "skill_public_id", "created_at"))
+        with self._begin(write=True) as conn:
+            self._upsert(conn, ax_skills, rows, conflict=("job_run_id", "skill_public_id"), update=columns)
+
+    def get_skill_cards(self, job_run_id: int) -> list[dict]:
+        t = ax_skills
+        with self._begin() as conn:
+            return [
+                dict(r._mapping)
+                for r in conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id).order_by(t.c.skill_public_id))
+            ]
+
+    # --- stage artifacts ---
+    def save_stage_artifact(
+        self,
+        job_run_id: int,
+        stage_id: str,
+        input_hash: str,
+        output_hash: str,
+        result_type: str,
+        payload_json: str,
+    ) -> int:
+        with self._begin(write=True) as conn:
+            return conn.execute(
+                stage_artifacts.insert().values(
+                    job_run_id=job_run_id, stage_id=stage_id, input_hash=input_hash, output_hash=output_hash,
+                    result_type=result_type, payload_json=payload_json, created_at=_now(),
+                )
+            ).inserted_primary_key[0]
+
+    def get_latest_stage_artifact(self, job_run_id: int, stage_id: str) -> Optional[dict]:
+        t = stage_artifacts
+        with self._begin() as conn:
+            row = conn.execute(
+                sa.select(t).where(t.c.job_run_id == job_run_id, t.c.stage_id == stage_id).order_by(t.c.id.desc()).limit(1)
+            ).first()
+        return dict(row._mapping) if row else None
+
+    def get_stage_artifact(self, artifact_id: int) -> Optional[dict]:
+        with self._begin() as conn:
+            row = conn.execute(sa.select(stage_artifacts).where(stage_artifacts.c.id == artifact_id)).first()
+        return dict(row._mapping) if row else None
+
+    def save_stage_run(
+        self,
+        job_run_id: int,
+        stage_id: str,
+        status: str,
+        *,
+        started_at: str,
+        input_hash: str | None = None,
+        artifact_id: int | None = None,
+        error: str | None = None,
+    ) -> None:
+        if status not in db.STAGE_RUN_STATUSES:
+            raise ValueError(f"Unknown stage run status: {status}")
+        t = stage_runs
+        now = _now()
+        values = {
+            "status": status, "artifact_id": artifact_id, "error": error, "started_at": started_at,
+            "finished_at": now, "updated_at": now,
+        }
+        if input_hash is not None:
+            values["input_hash"] = input_hash
+        with self._begin(write=True) as conn:
+            existing = conn.execute(
+                sa.select(t.c.id).where(t.c.job_run_id == job_run_id, t.c.stage_id == stage_id)
+            ).scalar()
+            if existing is None:
+                conn.execute(t.insert().values(job_run_id=job_run_id, stage_id=stage_id, **values))
+            else:
+                conn.execute(t.update().where(t.c.id == existing).values(**values))
+
+    def get_stage_runs(self, job_run_id: int) -> dict[str, dict]:
+        with self._begin() as conn:
+            rows = conn.execute(sa.select(stage_runs).where(stage_runs.c.job_run_id == job_run_id)).all()
+        return {row.stage_id: dict(row._mapping) for row in rows}
+
+    # --- job queue (infra/job_queue.py) ---
+    def enqueue_job(
+        self,
+        job_run_id: int,
+        target: str,
+        *,
+        ax_target: str | None = None,
+        manual_jd_text: str | None = None,
+        force_rerun=(),
+        max_attempts: int | None = None,
+    ) -> int:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        with self._begin(write=True) as conn:
+            existing = conn.execute(
+                sa.select(t.c.id)
+                .where(
+                    t.c.job_run_id == job_run_id,
+                    t.c.status.in_(q.ACTIVE_STATUSES),
+                    t.c.target == target,
+                    t.c.ax_target.is_not_distinct_from(ax_target),
+                )
+                .order_by(t.c.id)
+                .limit(1)
+            ).scalar()
+            if existing is not None:
+                return existing
+            now = q._at()
+            return conn.execute(
+                t.insert().values(
+                    job_run_id=job_run_id, target=target, ax_target=ax_target, manual_jd_text=manual_jd_text,
+                    force_rerun_json=json.dumps(sorted(force_rerun)) if force_rerun else None, status="queued",
+                    attempts=0, max_attempts=max_attempts or q.default_max_attempts(), due_at=now,
+                    created_at=now, updated_at=now,
+                )
+            ).inserted_primary_key[0]
+
+    def claim_job(self, worker_id: str, *, lease_s: int | None = None) -> Optional[dict]:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        now = q._at()
+        with self._begin(write=True) as conn:
+            conn.execute(
+                t.update()
+                .where(t.c.status == "running", t.c.due_at <= now, t.c.attempts >= t.c.max_attempts)
+                .values(
+                    status="dead", last_error=sa.func.coalesce(t.c.last_error, "lease expired"),
+                    finished_at=now, updated_at=now,
+                )
+            )
+            item_id = conn.execute(
+                sa.select(t.c.id)
+                .where(t.c.status.in_(q.ACTIVE_STATUSES), t.c.due_at <= now)
+                .order_by(t.c.due_at, t.c.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).scalar()
+            if item_id is None:
+                return None
+            conn.execute(
+                t.update()
+                .where(t.c.id == item_id)
+                .values(
+                    status="running", lease_owner=worker_id, attempts=t.c.attempts + 1,
+                    due_at=q._at(lease_s or q.lease_seconds()), heartbeat_at=now, updated_at=now,
+                )
+            )
+            return dict(conn.execute(sa.select(t).where(t.c.id == item_id)).one()._mapping)
+
+    def heartbeat_job(
+        self, item_id: int, worker_id: str, *, lease_s: int | None = None, progress: dict | None = None
+    ) -> bool:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        now = q._at()
+        values = {"due_at": q._at(lease_s or q.lease_seconds()), "heartbeat_at": now, "updated_at": now}
+        if progress is not None:
+            values["progress_json"] = json.dumps(progress, ensure_ascii=False)
+        with self._begin(write=True) as conn:
+            result = conn.execute(
+                t.update()
+                .where(t.c.id == item_id, t.c.status == "running", t.c.lease_owner == worker_id)
+                .values(**values)
+            )
+        return result.rowcount == 1
+
+    def complete_job(self, item_id: int, worker_id: str) -> bool:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        now = q._at()
+        with self._begin(write=True) as conn:
+            result = conn.execute(
+                t.update()
+                .where(t.c.id == item_id, t.c.status == "running", t.c.lease_owner == worker_id)
+                .values(status="done", due_at=now, finished_at=now, updated_at=now, last_error=None)
+            )
+        return result.rowcount == 1
+
+    def fail_job(self, item_id: int, worker_id: str, error: str) -> Optional[str]:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        now = q._at()
+        with self._begin(write=True) as conn:
+            row = conn.execute(
+                sa.select(t.c.attempts, t.c.max_attempts).where(
+                    t.c.id == item_id, t.c.status == "running", t.c.lease_owner == worker_id
+                )
+            ).first()
+            if row is None:
+                return None
+            dead = row.attempts >= row.max_attempts
+            status = "dead" if dead else "queued"
+            conn.execute(
+                t.update()
+                .where(t.c.id == item_id)
+                .values(
+                    status=status, due_at=now if dead else q._at(q.retry_delay_seconds(row.attempts)),
+                    lease_owner=None, last_error=error, finished_at=now if dead else None, updated_at=now,
+                )
+            )
+        return status
+
+    def defer_job(self, item_id: int, worker_id: str, delay_s: float, error: str) -> bool:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        now = q._at()
+        with self._begin(write=True) as conn:
+            result = conn.execute(
+                t.update()
+                .where(t.c.id == item_id, t.c.status == "running", t.c.lease_owner == worker_id)
+                .values(
+                    status="queued", attempts=sa.case((t.c.attempts > 0, t.c.attempts - 1), else_=0),
+                    due_at=q._at(delay_s), lease_owner=None, last_error=error, updated_at=now,
+                )
+            )
+        return result.rowcount == 1
+
+    def get_queue_item(self, item_id: int) -> Optional[dict]:
+        with self._begin() as conn:
+            row = conn.execute(sa.select(job_queue).where(job_queue.c.id == item_id)).first()
+        return dict(row._mapping) if row else None
+
+    def get_queue_items(self, job_run_id: int) -> list[dict]:
+        t = job_queue
+        with self._begin() as conn:
+            rows = conn.execute(sa.select(t).where(t.c.job_run_id == job_run_id).order_by(t.c.id.desc())).all()
+        return [dict(r._mapping) for r in rows]
+
+    def get_queue_depth(self) -> dict[str, int]:
+        from ax_agent_factory.infra import job_queue as q
+
+        t = job_queue
+        with self._begin() as conn:
+            rows = conn.execute(
+                sa.select(t.c.status, sa.func.count()).where(t.c.status.in_(q.ACTIVE_STATUSES)).group_by(t.c.status)
+            ).all()
+        depth = {status: 0 for status in q.ACTIVE_STATUSES}
+        depth.update({status: n for status, n in rows})
+        return depth
+
+
+# ---------------- routing ----------------
+
+_store: Optional[SQLAlchemyStore] = None
+
+
+def get_store() -> Optional[SQLAlchemyStore]:
+    """The configured SQLAlchemyStore, or None when the native sqlite3 path is in use."""
+    return _store
+
+
+def configure(url: Optional[str], **kwargs: Any) -> Optional[SQLAlchemyStore]:
+    """Route db/repo helpers to a SQLAlchemyStore for url (None restores the native sqlite3 path)."""
+    global _store
+    if _store is not None:
+        _store.dispose()
+    _store = SQLAlchemyStore(url, **kwargs) if url else None
+    if _store is not None:
+        logger.info("Storage backend: SQLAlchemy (%s)", _store.engine.url.render_as_string(hide_password=True))
+    return _store
+
+
+def configure_from_env() -> Optional[SQLAlchemyStore]:
+    return configure(os.environ.get("AX_DATABASE_URL") or None)
+
+
+# Native (sqlite3) implementation of every routed helper, by name; the single-writer actor
+# (infra/db_writer.py) executes forwarded writes through these.
+_native: dict[str, Callable[..., Any]] = {}
+_writer: Any = None
+
+
+def set_writer(writer: Any) -> None:
+    """Forward routed writes (every helper not named get_*) to writer.call(); None restores direct writes."""
+    global _writer
+    _writer = writer
+
+
+def get_writer() -> Any:
+    """The write forwarder installed in this process (db_writer.WriterClient), or None."""
+    return _writer
+
+
+def native(name: str) -> Callable[..., Any]:
+    """The sqlite3 implementation of the routed helper `name`."""
+    return _native[name]
+
+
+def routed(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Send calls to the same-named SQLAlchemyStore method when a store is configured;
+    otherwise writes go to the process's write forwarder when one is installed.
+
+    Writes are timed into metrics.DB_WRITE_DURATION whichever backend runs them.
+    """
+    name = fn.__name__
+    _native[name] = fn  # names are unique: SQLAlchemyStore has one method per helper
+    is_read = name.startswith("get_")
+    operation = f"{fn.__module__.rsplit('.', 1)[-1]}.{name}"
+
+    def dispatch(*args: Any, **kwargs: Any) -> Any:
+        if _store is not None:
+            return getattr(_store, name)(*args, **kwargs)
+        if _writer is not None and not is_read:
+            return _writer.call(name, args, kwargs)
+        return fn(*args, **kwargs)
+
+    if is_read:
+        return functools.wraps(fn)(dispatch)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with metrics.DB_WRITE_DURATION.time(operation=operation):
+            return dispatch(*args, **kwargs)
+
+    return wrapper
+
+
+# db decorates its helpers with `routed` at import time, so it is imported only after
+# everything above exists (the store methods reuse its row mappers and column lists).
+from ax_agent_factory.infra import db  # noqa: E402
@@ -0,0 +1,305 @@
+"""Lightweight span tracing with an OTLP-compatible JSON file exporter.
+
+Usage:
+    with tracing.span("pipeline.run_until_stage", job_run_id=1) as root:
+        with tracing.span("stage.S0_1_COLLECT"):
+            ...
+
+Spans nest through a contextvar, so DB/LLM helpers can open child spans without any
+arguments being threaded through. Helpers that should only appear inside an existing
+trace (DB functions, LLM calls) use `require_parent=True` / `@traced(...)`, which makes
+them no-ops outside a pipeline run or UI rerender.
+
+Finished spans are buffered per process and flushed as JSON lines to `AX_TRACE_FILE`
+(default logs/traces.jsonl) whenever a root span ends. Each line is an OTLP
+`ExportTraceServiceRequest` (resourceSpans → scopeSpans → spans) so the file can be
+replayed into any OTLP/JSON collector. Set `AX_TRACING=0` to disable.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+SERVICE_NAME = "ax_agent_factory"
+DEFAULT_TRACE_FILE = os.environ.get("AX_TRACE_FILE", "logs/traces.jsonl")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("ax_current_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed operation inside a trace."""
+
+    trace_id: str
+    span_id: str
+    name: str
+    start_ns: int
+    parent_span_id: Optional[str] = None
+    end_ns: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error_message: Optional[str] = None
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_span_id is None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict:
+        """Serialize as an OTLP/JSON span object."""
+        otlp = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": 2, "message": self.error_message or ""} if self.status == "error" else {"code": 1},
+        }
+        if self.parent_span_id:
+            otlp["parentSpanId"] = self.parent_span_id
+        return otlp
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _attribute_value(attr: dict) -> Any:
+    value = attr.get("value", {})
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return value["doubleValue"]
+    if "boolValue" in value:
+        return value["boolValue"]
+    return value.get("stringValue")
+
+
+class FileSpanExporter:
+    """Append spans as OTLP/JSON lines (one ExportTraceServiceRequest per flush)."""
+
+    def __init__(self, path: str = DEFAULT_TRACE_FILE) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        if not spans:
+            return
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [s.to_otlp() for s in spans]}],
+                }
+            ]
+        }
+        line = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class Tracer:
+    """Collect finished spans and hand them to the exporter when a root span closes."""
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None, *, enabled: bool = True) -> None:
+        self.exporter = exporter or FileSpanExporter()
+        self.enabled = enabled
+        self._pending: list[Span] = []
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[Span], None]] = []
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        """Register a callback invoked with every finished span (e.g. metrics)."""
+        self._listeners.append(listener)
+
+    def finish(self, finished: Span) -> None:
+        for listener in self._listeners:
+            try:
+                listener(finished)
+            except Exception:  # pragma: no cover - listeners must not break tracing
+                pass
+        with self._lock:
+            self._pending.append(finished)
+            if not finished.is_root and len(self._pending) < 512:
+                return
+            batch, self._pending = self._pending, []
+        try:
+            self.exporter.export(batch)
+        except Exception:  # pragma: no cover - exporting must not break the pipeline
+            pass
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        self.exporter.export(batch)
+
+
+_tracer = Tracer(enabled=os.environ.get("AX_TRACING", "1") != "0")
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    """Replace the process tracer (tests / custom exporters). Returns the previous one."""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def _new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    active = _current_span.get()
+    return active.trace_id if active else None
+
+
+@contextmanager
+def span(name: str, *, require_parent: bool = False, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Open a span as a child of the current one (or as a new root trace).
+
+    With require_parent=True nothing is recorded unless a trace is already active.
+    """
+    parent = _current_span.get()
+    if not _tracer.enabled or (require_parent and parent is None):
+        yield None
+        return
+    opened = Span(
+        trace_id=parent.trace_id if parent else (trace_id or new_trace_id()),
+        span_id=_new_span_id(),
+        parent_span_id=parent.span_id if parent else None,
+        name=name,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(opened)
+    try:
+        yield opened
+    except BaseException as exc:
+        opened.status = "error"
+        opened.error_message = f"{exc.__class__.__name__}: {exc}"
+        raise
+    finally:
+        _current_span.reset(token)
+        opened.end_ns = time.time_ns()
+        _tracer.finish(opened)
+
+
+def record_span(name: str, *, duration_ms: Optional[float], status: str = "ok", **attributes: Any) -> None:
+    """Record an already-finished child span ending now (e.g. an LLM call timed by its caller)."""
+    parent = _current_span.get()
+    if not _tracer.enabled or parent is None:
+        return
+    end_ns = time.time_ns()
+    _tracer.finish(
+        Span(
+            trace_id=parent.trace_id,
+            span_id=_new_span_id(),
+            parent_span_id=parent.span_id,
+            name=name,
+            start_ns=end_ns - int((duration_ms or 0) * 1_000_000),
+            end_ns=end_ns,
+            attributes=dict(attributes),
+            status=status,
+        )
+    )
+
+
+def traced(name: Optional[str] = None, *, require_parent: bool = True) -> Callable:
+    """Decorator wrapping a function call in a span (child-only by default)."""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None and require_parent:
+                return fn(*args, **kwargs)
+            with span(span_name, require_parent=require_parent):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def load_trace(trace_id: str, path: Optional[str] = None) -> list[dict]:
+    """
+    Read spans of one trace back from the exporter file, ordered by start time.
+
+    Returns plain dicts (name, span_id, parent_span_id, start_ns, end_ns, duration_ms,
+    status, attributes) for the UI waterfall.
+    """
+    trace_path = Path(path or _tracer.exporter.path)
+    if not trace_id or not trace_path.exists():
+        return []
+    spans: list[dict] = []
+    with trace_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if trace_id not in line:
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            for resource in payload.get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for raw in scope.get("spans", []):
+                        if raw.get("traceId") != trace_id:
+                            continue
+                        start_ns = int(raw["startTimeUnixNano"])
+                        end_ns = int(raw["endTimeUnixNano"])
+                        spans.append(
+                            {
+                                "name": raw["name"],
+                                "span_id": raw["spanId"],
+                                "parent_span_id": raw.get("parentSpanId"),
+                                "start_ns": start_ns,
+                                "end_ns": end_ns,
+                                "duration_ms": (end_ns - start_ns) / 1_000_000,
+                                "status": "error" if raw.get("status", {}).get("code") == 2 else "ok",
+                                "attributes": {a["key"]: _attribute_value(a) for a in raw.get("attributes", [])},
+                            }
+                        )
+    spans.sort(key=lambda s: s["start_ns"])
+    return spans
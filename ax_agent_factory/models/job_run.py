@@ -20,6 +20,7 @@ class JobRun:
     status: str | None
     created_at: datetime
     updated_at: datetime
+    trace_id: str | None = None
 
 
 @dataclass
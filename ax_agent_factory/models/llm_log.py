@@ -28,3 +28,4 @@ class LLMCallLog:
     tokens_prompt: Optional[int] = None
     tokens_completion: Optional[int] = None
     tokens_total: Optional[int] = None
+    id: Optional[int] = None
@@ -1,7 +1,7 @@
 """Stage metadata definitions for AX Agent Factory pipeline."""
 
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, Optional
 
 StageId = Literal[
     "S0_1_COLLECT",
@@ -11,6 +11,11 @@ StageId = Literal[
     "S1_3_STATIC_CLASSIFY",
     "S2_1_WORKFLOW_STRUCT",
     "S2_2_WORKFLOW_MERMAID",
+    "S4_AX_WORKFLOW",
+    "S5_AGENT_ARCHITECT",
+    "S6_DEEP_SKILL_RESEARCH",
+    "S7_SKILL_EXTRACT",
+    "S8_PROMPT_BUILD",
 ]
 
 
@@ -28,9 +33,13 @@ class StageMeta:
     ui_step: int
     ui_label: str
     tab_title: str
+    prompt_name: Optional[str] = None  # prompts/<name>.txt, part of the stage artifact input hash
+    inputs: tuple[str, ...] = ()  # result keys this stage consumes; their producers are its dependencies
+    output: str = ""  # result key this stage produces (run_pipeline_until_stage results / stage artifact)
 
 
-PIPELINE_STAGES: list[StageMeta] = [
+# Stage 0~2: job research → IVC → workflow.
+CORE_STAGES: list[StageMeta] = [
     StageMeta(
         id="S0_1_COLLECT",
         order=0,
@@ -42,6 +51,9 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=1,
         ui_label="0.1",
         tab_title="0.1 Job Research Collect",
+        prompt_name="job_research_collect",
+        inputs=(),
+        output="stage0_collect",
     ),
     StageMeta(
         id="S0_2_SUMMARIZE",
@@ -54,6 +66,9 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=2,
         ui_label="0.2",
         tab_title="0.2 Job Research Summarize",
+        prompt_name="job_research_summarize",
+        inputs=("stage0_collect",),
+        output="stage0_summarize",
     ),
     StageMeta(
         id="S1_1_TASK_EXTRACT",
@@ -66,6 +81,9 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=1,
         ui_label="1.1",
         tab_title="1.1 Task Extractor",
+        prompt_name="ivc_task_extractor",
+        inputs=("stage0_summarize",),
+        output="stage1_task_extract",
     ),
     StageMeta(
         id="S1_2_PHASE_CLASSIFY",
@@ -78,6 +96,9 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=2,
         ui_label="1.2",
         tab_title="1.2 Phase Classifier",
+        prompt_name="ivc_phase_classifier",
+        inputs=("stage0_summarize", "stage1_task_extract"),
+        output="stage1_phase",
     ),
     StageMeta(
         id="S1_3_STATIC_CLASSIFY",
@@ -90,6 +111,9 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=3,
         ui_label="1.3",
         tab_title="1.3 Static Task Classifier",
+        prompt_name="static_task_classifier",
+        inputs=("stage1_phase",),
+        output="stage1_static",
     ),
     StageMeta(
         id="S2_1_WORKFLOW_STRUCT",
@@ -102,6 +126,9 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=1,
         ui_label="2.1",
         tab_title="2.1 Workflow Struct",
+        prompt_name="workflow_struct",
+        inputs=("stage1_phase", "stage1_static"),
+        output="stage2_plan",
     ),
     StageMeta(
         id="S2_2_WORKFLOW_MERMAID",
@@ -114,5 +141,97 @@ PIPELINE_STAGES: list[StageMeta] = [
         ui_step=2,
         ui_label="2.2",
         tab_title="2.2 Workflow Mermaid",
+        prompt_name="workflow_mermaid",
+        inputs=("stage2_plan",),
+        output="stage2_mermaid",
     ),
 ]
+
+
+# Stages 4, 6 and 7 read job_tasks as task cards (title/phase from 1.1-1.2, static meta
+# from 1.3), so those results are part of their inputs and of their artifact input hash.
+TASK_CARD_INPUTS: tuple[str, ...] = ("stage1_phase", "stage1_static")
+
+# AX layer (stage 4~8) on top of the Stage 2.2 result. Stage 6 runs one Deep Skill
+# Research call per agent concurrently.
+AX_STAGES: list[StageMeta] = [
+    StageMeta(
+        id="S4_AX_WORKFLOW",
+        order=7,
+        label="4. AX Workflow",
+        description="Mermaid 워크플로우와 Task Card로 AX 워크플로우/Agent Table 설계",
+        implemented=True,
+        run_fn_name="run_stage4_ax_workflow",
+        ui_group=4,
+        ui_step=0,
+        ui_label="4",
+        tab_title="4. AX Workflow",
+        prompt_name="ax_workflow_architect",
+        inputs=("stage2_mermaid", *TASK_CARD_INPUTS),
+        output="stage4_ax_workflow",
+    ),
+    StageMeta(
+        id="S5_AGENT_ARCHITECT",
+        order=8,
+        label="5. Agent Architect",
+        description="Agent Table을 Agent Spec으로 상세화",
+        implemented=True,
+        run_fn_name="run_stage5_agent_architect",
+        ui_group=5,
+        ui_step=0,
+        ui_label="5",
+        tab_title="5. Agent Architect",
+        prompt_name="ax_agent_architect",
+        inputs=("stage4_ax_workflow",),
+        output="stage5_agent_specs",
+    ),
+    StageMeta(
+        id="S6_DEEP_SKILL_RESEARCH",
+        order=9,
+        label="6. Deep Skill Research",
+        description="에이전트별 스킬 심층 리서치 (에이전트 단위 병렬 실행)",
+        implemented=True,
+        run_fn_name="run_stage6_deep_skill_research",
+        ui_group=6,
+        ui_step=0,
+        ui_label="6",
+        tab_title="6. Deep Skill Research",
+        prompt_name="ax_deep_skill_research",
+        inputs=("stage5_agent_specs", *TASK_CARD_INPUTS),
+        output="stage6_deep_research",
+    ),
+    StageMeta(
+        id="S7_SKILL_EXTRACT",
+        order=10,
+        label="7. Skill Extractor",
+        description="딥리서치 결과에서 Skill Card 추출",
+        implemented=True,
+        run_fn_name="run_stage7_skill_extractor",
+        ui_group=7,
+        ui_step=0,
+        ui_label="7",
+        tab_title="7. Skill Extractor",
+        prompt_name="ax_skill_extractor",
+        inputs=("stage5_agent_specs", "stage6_deep_research", *TASK_CARD_INPUTS),
+        output="stage7_skill_cards",
+    ),
+    StageMeta(
+        id="S8_PROMPT_BUILD",
+        order=11,
+        label="8. Prompt Builder",
+        description="Agent Spec과 Skill Card로 에이전트 프롬프트 생성",
+        implemented=True,
+        run_fn_name="run_stage8_prompt_builder",
+        ui_group=8,
+        ui_step=0,
+        ui_label="8",
+        tab_title="8. Prompt Builder",
+        prompt_name="ax_prompt_builder",
+        inputs=("stage5_agent_specs", "stage7_skill_cards"),
+        output="stage8_prompts",
+    ),
+]
+
+
+# Every stage PipelineManager runs (with artifact reuse, stage_runs state and resume).
+PIPELINE_STAGES: list[StageMeta] = CORE_STAGES + AX_STAGES
@@ -0,0 +1,89 @@
+import csv
+from datetime import datetime, timedelta
+
+import pytest
+
+from ax_agent_factory.core.schemas.common import IVCAtomicTask, TaskStaticMeta
+from ax_agent_factory.infra import analytics_export, db
+
+
+def _task(job_run_id: int, task_id: str, domain: str) -> None:
+    db.save_task_atoms(
+        job_run_id,
+        [IVCAtomicTask(task_id=task_id, task_original_sentence="s", task_korean=f"과업 {task_id}", task_english=None, notes=None)],
+    )
+    db.apply_static_classification(
+        job_run_id,
+        [
+            TaskStaticMeta(
+                task_id=task_id, task_korean=f"과업 {task_id}", static_type_lv1="DATA", static_type_lv2=None,
+                domain_lv1=domain, domain_lv2=None, rag_required=True, rag_reason=None, value_score=4,
+                complexity_score=2, value_complexity_quadrant="QUICK_WIN", recommended_execution_env="n8n",
+                autoability_reason=None, data_entities=["고객", "주문"], tags=["crm"],
+            )
+        ],
+    )
+
+
+@pytest.fixture
+def runs(tmp_path):
+    db.set_db_path(str(tmp_path / "analytics.db"))
+    first = db.create_or_get_job_run("A사", "CRM 담당자", industry_context="유통").id
+    second = db.create_or_get_job_run("B사", "회계 담당자", industry_context="제조").id
+    _task(first, "T1", "SALES")
+    _task(second, "T1", "FINANCE")
+    return first, second
+
+
+def _read_csv(path: str) -> list[dict]:
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_export_flattens_json_and_appends_only_changed_runs(tmp_path, runs):
+    first, second = runs
+    out = tmp_path / "export"
+    result = analytics_export.export_job_tasks(str(out), fmt="csv")
+    assert (result.job_runs, result.rows) == (2, 2)
+    rows = _read_csv(result.files[0])
+    assert rows[0]["data_entities"] == "고객|주문" and rows[0]["rag_required"] == "True"
+    assert rows[0]["industry_context"] == "유통" and "/month=" in result.files[0]
+
+    assert analytics_export.export_job_tasks(str(out), fmt="csv", lag_s=0).job_runs == 0
+
+    _task(second, "T2", "FINANCE")
+    result = analytics_export.export_job_tasks(str(out), fmt="csv", lag_s=0)
+    assert result.job_runs == 1 and result.files[0].endswith(f"job_run_{second}.csv")
+    assert [r["task_id"] for r in _read_csv(result.files[0])] == ["T1", "T2"]
+
+
+def test_rows_committed_after_the_watermark_with_older_timestamps_are_exported(tmp_path, runs):
+    first, _ = runs
+    out = tmp_path / "export"
+    watermark = analytics_export.export_job_tasks(str(out), fmt="csv").watermark
+
+    # a stage unit of work stamped this row before the export ran but committed after it
+    stamped = (datetime.fromisoformat(watermark) - timedelta(seconds=30)).isoformat()
+    conn = db._get_conn()
+    conn.execute("UPDATE job_tasks SET domain_lv1 = 'MARKETING', updated_at = ? WHERE job_run_id = ?", (stamped, first))
+    conn.commit()
+    conn.close()
+
+    assert analytics_export.export_job_tasks(str(out), fmt="csv", lag_s=0).job_runs == 0
+    result = analytics_export.export_job_tasks(str(out), fmt="csv")
+    exported = {path.rsplit("/", 1)[-1]: _read_csv(path) for path in result.files}
+    assert exported[f"job_run_{first}.csv"][0]["domain_lv1"] == "MARKETING"
+    assert result.watermark == watermark
+
+
+def test_parquet_export_has_typed_columns(tmp_path, runs):
+    pytest.importorskip("pyarrow")
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    analytics_export.export_job_tasks(str(tmp_path / "pq"), fmt="parquet")
+    table = ds.dataset(str(tmp_path / "pq"), format="parquet", partitioning="hive").to_table()
+    assert table.num_rows == 2
+    assert pa.types.is_list(table.schema.field("tags").type)
+    assert table.schema.field("value_score").type == pa.int64()
+    assert table.column("data_entities").to_pylist()[0] == ["고객", "주문"]
@@ -0,0 +1,60 @@
+from ax_agent_factory.core.schemas.ax import AgentPrompt, AgentPromptSet
+from ax_agent_factory.infra import ax_prompt_repo, db
+
+
+def _prompts(agent_id: str, version: str) -> AgentPromptSet:
+    return AgentPromptSet(
+        agent_prompts=[AgentPrompt(agent_id=agent_id, env="n8n_gpt_node", prompt_version=version, mode="poc")]
+    )
+
+
+def test_rerun_adds_current_version_and_prunes_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("AX_HISTORY_KEEP", "2")
+    db.set_db_path(str(tmp_path / "versions.db"))
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+
+    for n in range(4):
+        ax_prompt_repo.apply_agent_prompts(job_run.id, _prompts("A1", f"v{n}"))
+    ax_prompt_repo.apply_agent_prompts(job_run.id, _prompts("A2", "v0"))
+
+    current = ax_prompt_repo.get_agent_prompts(job_run.id)
+    assert [(r["agent_id"], r["version"], r["prompt_version"]) for r in current] == [("A1", 4, "v3"), ("A2", 1, "v0")]
+    history = ax_prompt_repo.get_agent_prompt_history(job_run.id, "A1")
+    assert [(r["version"], r["is_current"]) for r in history] == [(4, 1), (3, 0)]
+
+
+def test_migration_numbers_existing_reruns(tmp_path):
+    db.set_db_path(str(tmp_path / "legacy.db"))
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+    conn = db._get_conn()
+    conn.execute("DROP INDEX ux_ax_prompts_run_agent_version")
+    for agent_id in ("A1", "A1", "A2", "A1"):
+        conn.execute(
+            "INSERT INTO ax_prompts (job_run_id, agent_id, created_at, updated_at) VALUES (?, ?, 'x', 'x')",
+            (job_run.id, agent_id),
+        )
+    conn.execute("PRAGMA user_version = 6")
+    conn.commit()
+    conn.close()
+
+    assert db.migrate() == db.SCHEMA_VERSION
+    conn = db._get_conn()
+    rows = conn.execute("SELECT agent_id, version, is_current FROM ax_prompts ORDER BY id").fetchall()
+    conn.close()
+    assert [tuple(r) for r in rows] == [("A1", 1, 0), ("A1", 2, 0), ("A2", 1, 1), ("A1", 3, 1)]
+    assert db.prune_ax_history(keep=1) == {"ax_prompts": 2, "ax_deep_research_docs": 0}
+
+
+def test_current_reads_use_partial_index(tmp_path):
+    db.set_db_path(str(tmp_path / "plan.db"))
+    conn = db._get_conn()
+    for table in db.VERSIONED_AX_TABLES:
+        plan = " ".join(
+            row[3]
+            for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE job_run_id = ? AND is_current = 1 ORDER BY agent_id",
+                (1,),
+            )
+        )
+        assert f"idx_{table}_current" in plan and "TEMP B-TREE" not in plan
+    conn.close()
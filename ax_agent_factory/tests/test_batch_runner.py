@@ -0,0 +1,125 @@
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ax_agent_factory.cli import batch_run
+from ax_agent_factory.core import batch_runner, stage_runner_ax
+from ax_agent_factory.infra import db, db_writer
+
+
+def _stage_calls() -> dict[str, int]:
+    conn = db._get_conn()
+    try:
+        rows = conn.execute("SELECT stage_name, COUNT(*) FROM llm_call_logs GROUP BY stage_name").fetchall()
+    finally:
+        conn.close()
+    return {r[0]: r[1] for r in rows}
+
+
+def test_batch_cli_runs_once_per_request_and_skips_finished(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    requests = tmp_path / "jobs.csv"
+    requests.write_text(
+        "company_name,job_title,manual_jd_text\nA사,컨설턴트,\nB사,분석가,JD 본문\nA사,컨설턴트,\n", encoding="utf-8"
+    )
+    args = [str(requests), "--out", str(tmp_path / "out"), "--db", str(tmp_path / "batch.db"), "--ax", "8", "--workers", "2"]
+
+    assert batch_run.main(args) == 0
+    summary = json.loads((tmp_path / "out" / "summary.json").read_text(encoding="utf-8"))
+    assert (summary["succeeded"], summary["duplicates"], summary["failed"]) == (2, 1, 0)
+    assert summary["llm_calls"] == sum(_stage_calls().values())
+    assert _stage_calls()["stage8_prompt_builder"] == 2
+
+    calls = _stage_calls()
+    assert batch_run.main(args) == 0
+    assert json.loads((tmp_path / "out" / "summary.json").read_text(encoding="utf-8"))["skipped"] == 2
+    assert _stage_calls() == calls
+
+
+def test_failed_request_resumes_after_completed_stages(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "resume.db"))
+    requests = [batch_runner.BatchRequest("A사", "컨설턴트")]
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    real_stage7 = stage_runner_ax.run_stage7_skill_extractor
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(stage_runner_ax, "run_stage7_skill_extractor", crash)
+    first = batch_runner.run_batch(requests, checkpoint_path=checkpoint, ax_target="8")
+    assert first.failed == 1 and "worker died" in first.failures[0]["error"]
+    state = batch_runner.BatchCheckpoint(checkpoint).state()[requests[0].key]
+    assert state["status"] == "failed" and "S5_AGENT_ARCHITECT" in state["stages"]
+
+    calls = _stage_calls()
+    monkeypatch.setattr(stage_runner_ax, "run_stage7_skill_extractor", real_stage7)
+    second = batch_runner.run_batch(requests, checkpoint_path=checkpoint, ax_target="8")
+    assert second.succeeded == 1
+    new_calls = {k: v - calls.get(k, 0) for k, v in _stage_calls().items() if v != calls.get(k, 0)}
+    assert new_calls == {"stage7_skill_extractor": 1, "stage8_prompt_builder": 1}
+
+
+def test_process_mode_shards_requests_and_reports_scaling(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "main.db"))
+    requests = [batch_runner.BatchRequest(f"{c}사", "분석가") for c in "ABCD"]
+
+    summary = batch_runner.run_scaling(requests, out_dir=str(tmp_path / "scaling"), process_counts=(1, 2), target="1.1")
+    assert db.DB_PATH == str(tmp_path / "main.db")
+    assert [row["processes"] for row in summary.scaling] == [1, 2]
+    assert all(row["succeeded"] == 4 and row["efficiency"] > 0 for row in summary.scaling)
+    assert summary.processes == 2 and summary.db_writes >= summary.db_write_groups > 0
+    assert "efficiency" in summary.format()
+
+    db.set_db_path(str(tmp_path / "scaling" / "scaling-p2.db"))
+    conn = db._get_conn()
+    try:
+        rows = conn.execute("SELECT stage_id, COUNT(*) FROM stage_runs WHERE status = 'done' GROUP BY stage_id").fetchall()
+    finally:
+        conn.close()
+    assert {r[0]: r[1] for r in rows} == {"S0_1_COLLECT": 4, "S0_2_SUMMARIZE": 4, "S1_1_TASK_EXTRACT": 4}
+
+
+def test_db_writer_isolates_a_failing_write_in_a_group(tmp_path):
+    db.set_db_path(str(tmp_path / "writer.db"))
+    job_run_id = db.create_job_run("A사", "분석가").id
+    writer = db_writer.DBWriter(multiprocessing.get_context("spawn"))
+    client = db_writer.WriterClient("w0", writer.requests, writer.reply_queue("w0"))
+    calls = [("S0_1_COLLECT", "done"), ("S0_2_SUMMARIZE", "bogus"), ("S1_1_TASK_EXTRACT", "failed")]
+
+    with ThreadPoolExecutor(len(calls)) as pool:
+        futures = [
+            pool.submit(client.call, "save_stage_run", (job_run_id, stage, status), {"started_at": "t0"})
+            for stage, status in calls
+        ]
+        while writer.requests.qsize() < len(calls):  # start the writer once all three are queued: one group
+            time.sleep(0.01)
+        writer.start()
+        with pytest.raises(ValueError):
+            futures[1].result(timeout=10)
+        assert futures[0].result(timeout=10) is None and futures[2].result(timeout=10) is None
+    writer.stop()
+
+    assert {k: v["status"] for k, v in db.get_stage_runs(job_run_id).items()} == {
+        "S0_1_COLLECT": "done",
+        "S1_1_TASK_EXTRACT": "failed",
+    }
+    assert (writer.stats.calls, writer.stats.errors) == (3, 1)
+
+
+def test_load_requests_rejects_missing_fields(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text('{"company_name": "A사", "job_title": "컨설턴트"}\n\n{"company_name": "B사"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="request 2"):
+        batch_runner.load_requests(str(path))
+
+
+def test_batch_cli_does_not_import_streamlit():
+    code = "import sys, ax_agent_factory.cli.batch_run; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
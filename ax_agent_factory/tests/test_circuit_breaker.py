@@ -0,0 +1,121 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from ax_agent_factory.core.queue_worker import QueueWorker
+from ax_agent_factory.infra import circuit_breaker, db, job_queue, llm_client
+
+STAGE = "stage1_static_classifier"
+
+
+class FlakyGemini:
+    """Fake genai: generate_content fails while `down`, else returns a parseable JSON reply."""
+
+    def __init__(self) -> None:
+        self.down = True
+        self.calls = 0
+
+    def Client(self, api_key):  # noqa: N802 - mirrors genai.Client
+        return SimpleNamespace(models=SimpleNamespace(generate_content=self._generate))
+
+    def _generate(self, *args, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("503 UNAVAILABLE")
+        return SimpleNamespace(text='{"task_static_meta": []}', usage_metadata=None)
+
+
+@pytest.fixture
+def breaker(tmp_path, monkeypatch):
+    db.set_db_path(str(tmp_path / "breaker.db"))
+    now = [0.0]
+    breaker = circuit_breaker.CircuitBreaker(
+        circuit_breaker.BreakerConfig(window=10, min_calls=3, error_rate=0.5, cooldown_s=30), clock=lambda: now[0]
+    )
+    breaker.now = now
+    circuit_breaker.set_breaker(breaker)
+    yield breaker
+    circuit_breaker.set_breaker(None)
+
+
+def _classify() -> dict:
+    return llm_client.call_static_task_classifier({"task_atoms": []}, job_run_id=1, model="gemini-test")
+
+
+def test_failure_storm_opens_the_circuit_and_a_probe_closes_it(breaker, monkeypatch):
+    gemini = FlakyGemini()
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setattr(llm_client, "genai", gemini)
+    monkeypatch.setattr(llm_client, "types", SimpleNamespace(GenerateContentConfig=lambda **kwargs: kwargs))
+
+    for _ in range(3):  # below min_calls the failures still come back as stubs
+        assert _classify()["llm_error"]
+    with pytest.raises(circuit_breaker.CircuitOpenError) as excinfo:
+        _classify()
+    assert excinfo.value.retry_after_s == 30 and gemini.calls == 3
+    assert breaker.state(STAGE, "gemini-test") == "open"
+    assert breaker.state("stage2_workflow_struct", "gemini-test") == "closed"
+
+    breaker.now[0] = 31
+    assert _classify()["llm_error"]  # half-open probe goes out and fails: open again
+    assert breaker.state(STAGE, "gemini-test") == "open" and gemini.calls == 4
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        _classify()
+
+    gemini.down = False
+    breaker.now[0] = 62
+    assert "llm_error" not in _classify()
+    assert breaker.state(STAGE, "gemini-test") == "closed"
+    _classify()  # the failures before the probe no longer count
+    assert gemini.calls == 6
+
+
+def test_stub_mode_never_trips(breaker, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    for _ in range(5):
+        _classify()
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    assert db.get_llm_error_window(STAGE, "gemini-test", since="", limit=10) == {"calls": 0, "errors": 0}
+    breaker.check(STAGE, "gemini-test")
+
+
+def test_db_errors_fail_open_and_the_window_is_cached(breaker, monkeypatch):
+    reads = []
+    window = db.get_llm_error_window
+
+    def counted(*args, **kwargs):
+        reads.append(args)
+        return window(*args, **kwargs)
+
+    monkeypatch.setattr(db, "get_llm_error_window", counted)
+    for _ in range(5):  # Stage 6 agents checking at once share one query
+        breaker.check(STAGE, "gemini-test")
+    assert len(reads) == 1
+    breaker.now[0] = breaker.config.cache_s
+    breaker.check(STAGE, "gemini-test")
+    assert len(reads) == 2
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "get_llm_error_window", locked)
+    breaker.now[0] = 2 * breaker.config.cache_s
+    breaker.check(STAGE, "gemini-test")  # the model may be fine: the call goes through
+    assert breaker.state(STAGE, "gemini-test") == "closed"
+
+
+def test_queue_worker_defers_item_without_using_an_attempt(tmp_path):
+    db.set_db_path(str(tmp_path / "queue.db"))
+    job_run_id = db.create_or_get_job_run("A사", "컨설턴트").id
+    item_id = job_queue.enqueue_job(job_run_id, "1.3")
+
+    def open_circuit(*args, **kwargs):
+        raise circuit_breaker.CircuitOpenError(STAGE, "gemini-test", 120)
+
+    worker = QueueWorker("w1", pipeline=SimpleNamespace(run_pipeline_until_stage=open_circuit))
+    assert worker.run_once()
+    item = job_queue.get_queue_item(item_id)
+    assert (item["status"], item["attempts"]) == ("queued", 0) and "CircuitOpenError" in item["last_error"]
+    assert item["due_at"] > job_queue._at(100)
+    assert not worker.run_once()  # paused until the circuit may close
@@ -112,3 +112,35 @@ def test_job_tasks_lifecycle(tmp_path):
     edges = db.get_job_task_edges(job_run.id)
     assert len(edges) == 1
     assert edges[0]["source_task_id"] == "T01"
+
+
+def test_apply_workflow_plan_diffs_edges(tmp_path):
+    db.set_db_path(str(tmp_path / "edges.db"))
+    job_run = db.create_or_get_job_run("Acme", "Analyst")
+    nodes = [WorkflowNode(node_id=t, label=t) for t in ("T01", "T02", "T03")]
+
+    db.apply_workflow_plan(
+        job_run.id,
+        WorkflowPlan(
+            workflow_name="v1",
+            nodes=nodes,
+            edges=[WorkflowEdge(source="T01", target="T02"), WorkflowEdge(source="T02", target="T03")],
+        ),
+    )
+    kept_id = db.get_job_task_edges(job_run.id)[0]["id"]
+    assert {r["task_id"] for r in db.get_job_tasks(job_run.id)} == {"T01", "T02", "T03"}
+
+    db.apply_workflow_plan(
+        job_run.id,
+        WorkflowPlan(
+            workflow_name="v2",
+            nodes=nodes,
+            edges=[WorkflowEdge(source="T01", target="T02"), WorkflowEdge(source="T01", target="T03", label="skip")],
+        ),
+    )
+    edges = db.get_job_task_edges(job_run.id)
+    assert [(e["source_task_id"], e["target_task_id"], e["label"]) for e in edges] == [
+        ("T01", "T02", None),
+        ("T01", "T03", "skip"),
+    ]
+    assert edges[0]["id"] == kept_id
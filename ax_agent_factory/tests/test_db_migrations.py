@@ -0,0 +1,50 @@
+import sqlite3
+
+from ax_agent_factory.infra import db
+from ax_agent_factory.models.job_run import JobResearchResult
+
+
+def _statements(conn) -> list[str]:
+    seen: list[str] = []
+    conn.raw.set_trace_callback(seen.append)
+    return seen
+
+
+def test_fresh_db_reaches_latest_version_and_skips_introspection(tmp_path):
+    db.set_db_path(str(tmp_path / "fresh.db"))
+    conn = db._get_conn()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+    seen = _statements(conn)
+    conn.close()
+
+    assert db.migrate() == db.SCHEMA_VERSION
+    assert seen == ["PRAGMA user_version"]
+
+
+def test_legacy_db_is_upgraded_in_place(tmp_path):
+    path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute(
+        "CREATE TABLE job_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, company_name TEXT NOT NULL, "
+        "job_title TEXT NOT NULL, created_at TEXT NOT NULL)"
+    )
+    legacy.execute(
+        "CREATE TABLE job_research_results (id INTEGER PRIMARY KEY AUTOINCREMENT, job_run_id INTEGER NOT NULL, "
+        "raw_job_desc TEXT NOT NULL, research_sources TEXT, UNIQUE(job_run_id))"
+    )
+    legacy.execute("INSERT INTO job_runs (company_name, job_title, created_at) VALUES ('A', 'B', '2025-01-01')")
+    legacy.commit()
+    legacy.close()
+
+    db.set_db_path(str(path))
+    job_run = db.get_job_run(1)
+    assert job_run.company_name == "A" and job_run.trace_id is None
+
+    conn = db._get_conn()
+    seen = _statements(conn)
+    for desc in ("첫 번째", "두 번째"):
+        db.save_job_research_result(JobResearchResult(job_run_id=1, raw_job_desc=desc, research_sources=[{"url": "x"}]))
+    conn.close()
+    assert db.get_job_research_result(1).raw_job_desc == "두 번째"
+    # one probe per capability for the connection, not one per save/get
+    assert len([s for s in seen if "table_info" in s]) == 3
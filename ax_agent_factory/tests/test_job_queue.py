@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+from ax_agent_factory.cli import worker as worker_cli
+from ax_agent_factory.core import stage_runner_ax
+from ax_agent_factory.core.queue_worker import QueueWorker
+from ax_agent_factory.infra import db, job_queue
+
+
+def _job_run_id(tmp_path, name: str = "queue.db") -> int:
+    db.set_db_path(str(tmp_path / name))
+    return db.create_or_get_job_run("A사", "컨설턴트").id
+
+
+def _expire_lease(item_id: int) -> None:
+    conn = db._get_conn()
+    conn.execute("UPDATE job_queue SET due_at = '2000-01-01T00:00:00' WHERE id = ?", (item_id,))
+    conn.commit()
+    conn.close()
+
+
+def test_enqueue_dedups_and_claims_are_exclusive(tmp_path):
+    job_run_id = _job_run_id(tmp_path)
+    first = job_queue.enqueue_job(job_run_id, "1.2")
+    assert job_queue.enqueue_job(job_run_id, "1.2") == first
+    second = job_queue.enqueue_job(job_run_id, "1.2", ax_target="8")
+    assert second != first
+
+    claimed: list[int] = []
+    lock = threading.Lock()
+
+    def claim(n: int) -> None:
+        item = job_queue.claim_job(f"w{n}")
+        if item is not None:
+            with lock:
+                claimed.append(item["id"])
+
+    threads = [threading.Thread(target=claim, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == [first, second]
+    assert job_queue.get_queue_depth() == {"queued": 0, "running": 2}
+    assert job_queue.claim_job("late") is None
+
+
+def test_failures_retry_with_backoff_then_dead_letter(tmp_path, monkeypatch):
+    monkeypatch.setenv("AX_QUEUE_RETRY_S", "0")
+    item_id = job_queue.enqueue_job(_job_run_id(tmp_path), "0.2", max_attempts=2)
+
+    assert job_queue.claim_job("w1")["attempts"] == 1
+    assert job_queue.fail_job(item_id, "other", "boom") is None  # not the lease owner
+    assert job_queue.fail_job(item_id, "w1", "boom") == "queued"
+    assert job_queue.claim_job("w2")["attempts"] == 2
+    assert job_queue.heartbeat_job(item_id, "w1") is False
+    assert job_queue.fail_job(item_id, "w2", "boom again") == "dead"
+
+    item = job_queue.get_queue_item(item_id)
+    assert (item["status"], item["last_error"]) == ("dead", "boom again")
+    assert job_queue.claim_job("w3") is None
+
+
+def test_expired_lease_is_reclaimed_and_stale_owner_rejected(tmp_path):
+    item_id = job_queue.enqueue_job(_job_run_id(tmp_path), "0.2", max_attempts=2)
+    job_queue.claim_job("crashed")
+    _expire_lease(item_id)
+
+    assert job_queue.claim_job("w2")["lease_owner"] == "w2"
+    assert job_queue.complete_job(item_id, "crashed") is False
+    assert job_queue.complete_job(item_id, "w2") is True
+
+    other = job_queue.enqueue_job(db.create_or_get_job_run("B사", "분석가").id, "0.2", max_attempts=1)
+    job_queue.claim_job("crashed")
+    _expire_lease(other)
+    assert job_queue.claim_job("w2") is None
+    assert job_queue.get_queue_item(other)["status"] == "dead"
+
+
+def test_worker_runs_queued_targets_and_resumes_ax_stages(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    job_run_id = _job_run_id(tmp_path)
+    item_id = job_queue.enqueue_job(job_run_id, "2.2", ax_target="8")
+    real_stage7 = stage_runner_ax.run_stage7_skill_extractor
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(stage_runner_ax, "run_stage7_skill_extractor", crash)
+    monkeypatch.setenv("AX_QUEUE_RETRY_S", "0")
+    worker = QueueWorker("w1", poll_s=0.01)
+    assert worker.run(max_items=1) == 1
+    item = job_queue.get_queue_item(item_id)
+    assert item["status"] == "queued" and "worker died" in item["last_error"]
+    assert "S6_DEEP_SKILL_RESEARCH" in job_queue.item_progress(item)["stages"]
+
+    calls = []
+    monkeypatch.setattr(stage_runner_ax, "_research_agent", lambda *a, **k: calls.append(a))
+    monkeypatch.setattr(stage_runner_ax, "run_stage7_skill_extractor", real_stage7)
+    assert worker_cli.main(["--once"]) == 0
+    item = job_queue.get_queue_item(item_id)
+    assert (item["status"], item["attempts"]) == ("done", 2)
+    assert calls == []
+    assert job_queue.item_progress(item)["stages"][-1] == "S8_PROMPT_BUILD"
+    assert job_queue.get_queue_depth() == {"queued": 0, "running": 0}
+
+
+def test_heartbeat_survives_transient_errors(tmp_path, monkeypatch):
+    item_id = job_queue.enqueue_job(_job_run_id(tmp_path), "0.2")
+    real_heartbeat = job_queue.heartbeat_job
+    beats: list[str] = []
+
+    def flaky(*args, **kwargs):
+        if len(beats) < 2:
+            beats.append("locked")
+            raise sqlite3.OperationalError("database is locked")
+        beats.append("ok")
+        return real_heartbeat(*args, **kwargs)
+
+    def slow_pipeline(job_run, target, on_stage_done, **kwargs):
+        deadline = time.monotonic() + 2
+        while "ok" not in beats and time.monotonic() < deadline:
+            time.sleep(0.01)
+        on_stage_done("S0_1_COLLECT", None)  # raises LeaseLost if the heartbeat thread had given up
+
+    monkeypatch.setattr(job_queue, "heartbeat_job", flaky)
+    worker = QueueWorker("w1", lease_s=0.06, pipeline=SimpleNamespace(run_pipeline_until_stage=slow_pipeline))
+    assert worker.run_once()
+    assert beats[:3] == ["locked", "locked", "ok"]
+    assert job_queue.get_queue_item(item_id)["status"] == "done"
@@ -113,3 +113,43 @@ def test_llm_call_log_tokens_none_when_usage_missing(tmp_path, monkeypatch):
     assert log.tokens_prompt is None
     assert log.tokens_completion is None
     assert log.tokens_total is None
+
+
+def test_latest_llm_call_projects_metadata_and_uses_index(tmp_path):
+    db.set_db_path(str(tmp_path / "test_latest.db"))
+    for created_at, stage, raw in (
+        ("2025-12-04T10:00:00", "stage1_static_classifier", "old"),
+        ("2025-12-04T11:00:00", "stage1_static_classifier", "new"),
+        ("2025-12-04T12:00:00", "stage2_workflow_mermaid", "other"),
+    ):
+        db.save_llm_call_log(
+            {
+                "created_at": created_at,
+                "job_run_id": 3,
+                "stage_name": stage,
+                "model_name": "m",
+                "input_payload_json": "{}",
+                "output_text_raw": raw * 1000,
+                "status": "success",
+            }
+        )
+
+    latest = db.get_latest_llm_call(3, "stage1_static_classifier")
+    assert latest["created_at"] == "2025-12-04T11:00:00"
+    assert "output_text_raw" not in latest
+    assert db.get_llm_call_texts(latest["id"])["output_text_raw"].startswith("new")
+    assert db.get_latest_llm_call(3, "stage1_static_classifier", include_text=True)["output_text_raw"].startswith("new")
+    assert db.get_latest_llm_call(4, "stage1_static_classifier") is None
+
+    conn = db._get_conn()
+    plan = " ".join(
+        row["detail"]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM llm_call_logs WHERE job_run_id = ? AND stage_name = ? "
+            "ORDER BY created_at DESC, id DESC LIMIT 1",
+            (3, "x"),
+        )
+    )
+    conn.close()
+    assert "idx_llm_call_logs_run_stage_created" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,102 @@
+from ax_agent_factory.cli import perf_report as perf_report_cli
+from ax_agent_factory.infra import db, perf_report
+
+
+def _log(created_at: str, latency_ms: int, *, status: str = "success", prompt_version=None, stage="stage1_task_extractor"):
+    db.save_llm_call_log(
+        {
+            "created_at": created_at,
+            "job_run_id": 1,
+            "stage_name": stage,
+            "model_name": "gemini-test",
+            "prompt_version": prompt_version,
+            "input_payload_json": "{}",
+            "status": status,
+            "latency_ms": latency_ms,
+            "tokens_prompt": 10,
+            "tokens_completion": 5,
+            "tokens_total": 15,
+        }
+    )
+
+
+def test_rollups_maintained_incrementally(tmp_path):
+    db.set_db_path(str(tmp_path / "rollup.db"))
+    for latency in (100, 200, 300, 400, 5000):
+        _log("2025-12-04T10:15:00", latency)
+    _log("2025-12-04T10:45:00", 800, status="stub_fallback")
+    _log("2025-12-04T11:05:00", 900, status="json_parse_error")
+
+    rows = db.get_llm_call_rollups()
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["call_count"] == 7
+    assert row["tokens_total_sum"] == 105
+    assert row["stub_fallback_count"] == 1
+    assert row["json_parse_error_count"] == 1
+    assert sum(row["latency_buckets"].values()) == 7
+
+    summary = perf_report.summarize_rollup(row)
+    assert summary.stub_fallback_rate == 1 / 7
+    assert summary.p50_ms is not None and 250 <= summary.p50_ms <= 1000
+    assert summary.p99_ms <= 5000
+
+    hour_10 = db.get_llm_call_rollups(since="2025-12-04T10:00:00", until="2025-12-04T11")
+    assert hour_10[0]["call_count"] == 6
+
+
+def test_rollup_window_snaps_both_ends_to_hour_buckets(tmp_path):
+    db.set_db_path(str(tmp_path / "rollup.db"))
+    _log("2025-12-04T09:50:00", 100)
+    _log("2025-12-04T10:15:00", 200)
+    _log("2025-12-04T10:45:00", 300)
+    _log("2025-12-04T11:05:00", 400)
+
+    def calls(**window) -> int:
+        return sum(r["call_count"] for r in db.get_llm_call_rollups(**window))
+
+    assert calls(since="2025-12-04T10:30:00", until="2025-12-04T10:30:00") == 2  # mid-hour until keeps its hour
+    assert calls(until="2025-12-04T11:00:00") == 3
+    assert calls(until="2025-12-04T11:00:00.000001") == 4
+    assert calls(since="2025-12-04 10:59", until="2025-12-04 11:30") == 3
+    assert calls(since="2025-12-04", until="2025-12-05") == 4
+    assert calls(since="2025-12-04T00:00:00Z", until="2025-12-04T11:00:00Z") == 3  # "Z" is not past the hour
+    assert calls(since="2025-12-04T05:30:00-05:00", until="2025-12-04T06:00:00-05:00") == 2  # 10:30Z..11:00Z
+
+
+def test_rebuild_matches_incremental(tmp_path):
+    db.set_db_path(str(tmp_path / "rollup.db"))
+    for latency in (120, 450, 2500):
+        _log("2025-12-04T09:00:00", latency, prompt_version="v1")
+    before = db.get_llm_call_rollups()
+    assert db.rebuild_llm_call_rollups() == 3
+    after = db.get_llm_call_rollups()
+    assert before == after
+
+
+def test_histogram_quantile_interpolates():
+    buckets = {100: 50, 250: 50}
+    assert perf_report.histogram_quantile(0.5, buckets) == 100
+    assert perf_report.histogram_quantile(0.75, buckets) == 175
+    assert perf_report.histogram_quantile(0.5, {}) is None
+    assert perf_report.histogram_quantile(0.99, {db.LATENCY_BUCKET_INF: 1}, max_ms=400_000) == 400_000
+
+
+def test_compare_prompt_versions_cli(tmp_path, capsys):
+    db.set_db_path(str(tmp_path / "rollup.db"))
+    for latency in (100, 150, 200):
+        _log("2025-12-04T09:00:00", latency, prompt_version="v1")
+    for latency in (2000, 2500, 3000):
+        _log("2025-12-05T09:00:00", latency, prompt_version="v2")
+
+    rows = perf_report.compare_summaries(
+        perf_report.load_stage_summaries(prompt_version="v1"),
+        perf_report.load_stage_summaries(prompt_version="v2"),
+    )
+    assert rows[0]["delta_p95_ms"] > 0
+
+    assert perf_report_cli.main(["--prompt-version-a", "v1", "--prompt-version-b", "v2"]) == 0
+    out = capsys.readouterr().out
+    assert "stage1_task_extractor" in out
+    assert perf_report_cli.main(["--window-a", "2025-12-04T00:2025-12-05T00", "--window-b", "2025-12-05T00:"]) == 0
+    assert "3/3" in capsys.readouterr().out
@@ -0,0 +1,62 @@
+import urllib.request
+
+from ax_agent_factory.infra import db, metrics, tracing
+
+
+def test_registry_renders_prometheus_text():
+    registry = metrics.MetricsRegistry()
+    calls = registry.counter("t_calls_total", "calls", ("stage",))
+    latency = registry.histogram("t_latency_seconds", "latency", ("stage",), buckets=(0.1, 1))
+    calls.inc(stage='a"b')
+    latency.observe(0.05, stage="a")
+    latency.observe(5, stage="a")
+
+    text = registry.render()
+    assert 't_calls_total{stage="a\\"b"} 1' in text
+    assert 't_latency_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{stage="a",le="1"} 1' in text
+    assert 't_latency_seconds_bucket{stage="a",le="+Inf"} 2' in text
+    assert 't_latency_seconds_count{stage="a"} 2' in text
+    assert "# TYPE t_latency_seconds histogram" in text
+
+
+def test_llm_and_db_write_hooks(tmp_path):
+    db.set_db_path(str(tmp_path / "metrics.db"))
+    labels = {"stage": "stage_metrics_test", "model": "m", "status": "stub_fallback"}
+    before = metrics.LLM_CALLS.get(**labels)
+    metrics.observe_llm_call(
+        stage_name="stage_metrics_test", model_name="m", status="stub_fallback", latency_ms=1500, tokens_prompt=7
+    )
+    assert metrics.LLM_CALLS.get(**labels) == before + 1
+    assert metrics.LLM_TOKENS.get(stage="stage_metrics_test", model="m", kind="prompt") >= 7
+
+    writes_before = metrics.DB_WRITE_DURATION.get_count(operation="db.create_or_get_job_run")
+    with tracing.span("pipeline.run_until_stage"):
+        db.create_or_get_job_run("A", "B")
+        db.get_latest_job_run()
+    assert metrics.DB_WRITE_DURATION.get_count(operation="db.create_or_get_job_run") == writes_before + 1
+    assert metrics.DB_WRITE_DURATION.get_count(operation="db.get_latest_job_run") == 0
+
+    # writes are timed without a trace, with tracing disabled and after the tracer is replaced
+    previous = tracing.set_tracer(tracing.Tracer(enabled=False))
+    try:
+        db.create_or_get_job_run("A", "C")
+    finally:
+        tracing.set_tracer(previous)
+    db.update_job_run_meta(1, status="running")
+    assert metrics.DB_WRITE_DURATION.get_count(operation="db.create_or_get_job_run") == writes_before + 2
+    assert metrics.DB_WRITE_DURATION.get_count(operation="db.update_job_run_meta") >= 1
+
+
+def test_http_endpoint_and_textfile(tmp_path):
+    server = metrics.start_http_server(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+    finally:
+        server.shutdown()
+    assert "# TYPE ax_llm_calls_total counter" in body
+
+    target = tmp_path / "ax.prom"
+    metrics.write_textfile(str(target))
+    assert "ax_stage_duration_seconds" in target.read_text(encoding="utf-8")
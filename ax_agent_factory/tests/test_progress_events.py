@@ -0,0 +1,82 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from ax_agent_factory.core import stage_runner_ax
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.infra import db, events
+from ax_agent_factory.models.stages import PIPELINE_STAGES
+
+
+def test_pipeline_emits_stage_and_llm_events_with_totals(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "events.db"))
+    agents = [
+        stage_runner_ax.AgentSpecLite(
+            agent_id=f"A{n}", agent_name=f"에이전트{n}", role_and_goal="", agent_type="", execution_environment=""
+        )
+        for n in range(1, 4)
+    ]
+    monkeypatch.setattr(stage_runner_ax, "_load_agents_lite", lambda job_run_id: agents)
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+    received: list[events.ProgressEvent] = []
+
+    with events.subscribe(received.append):
+        pipeline.run_pipeline_until_stage(job_run, "8")
+    pipeline.run_pipeline_until_stage(job_run, "2.2", force_rerun=True)  # not subscribed: nothing arrives
+
+    stage_ids = {s.id for s in PIPELINE_STAGES}
+    kinds = Counter((e.kind, e.stage_id) for e in received)
+    assert {sid for kind, sid in kinds if kind == "stage_started"} == stage_ids
+    assert all(kinds[("stage_finished", sid)] == 1 for sid in stage_ids)
+    assert all(e.job_run_id == job_run.id for e in received)
+    finished = {e.stage_id: e for e in received if e.kind == "stage_finished"}
+    llm_done = Counter(e.stage_id for e in received if e.kind == "llm_call_finished")
+    assert all(finished[sid].data["llm_calls"] == llm_done[sid] for sid in stage_ids)
+    assert finished["S1_1_TASK_EXTRACT"].data["status"] == "ok" and finished["S1_1_TASK_EXTRACT"].elapsed_ms >= 0
+    partial = [e for e in received if e.kind == "partial_result"]
+    assert sorted(e.data["item"] for e in partial) == ["A1", "A2", "A3"]
+    assert all(e.stage_id == "S6_DEEP_SKILL_RESEARCH" for e in partial)
+    assert finished["S6_DEEP_SKILL_RESEARCH"].data["llm_calls"] == 3
+
+    received.clear()
+    with events.subscribe(received.append):
+        pipeline.run_pipeline_until_stage(job_run, "1.1")
+    assert [(e.kind, e.data.get("artifact")) for e in received if e.stage_id == "S1_1_TASK_EXTRACT"] == [
+        ("stage_started", None),
+        ("stage_finished", "hit"),
+    ]
+
+
+def test_run_streaming_delivers_in_caller_thread_and_reraises():
+    threads: set[str] = set()
+
+    def work() -> int:
+        worker = threading.Thread(target=events.emit, args=("partial_result",))  # not in the subscribed context
+        worker.start()
+        worker.join()
+        events.emit("partial_result", item="a")
+        return 7
+
+    assert events.run_streaming(work, lambda e: threads.add(threading.current_thread().name)) == 7
+    assert threads == {threading.current_thread().name}
+
+    def fail() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        events.run_streaming(fail, lambda e: None)
+
+
+def test_listener_errors_are_contained_and_emission_is_cheap():
+    def broken(event):
+        raise RuntimeError("listener bug")
+
+    with events.subscribe(broken):
+        events.emit("stage_started", stage_id="S0_1_COLLECT")
+
+    overhead = events.measure_overhead(20_000)
+    assert overhead["idle_us"] < overhead["subscribed_us"]
+    assert overhead["subscribed_us"] < 50  # an LLM call takes seconds
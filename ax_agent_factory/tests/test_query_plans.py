@@ -0,0 +1,46 @@
+import pytest
+
+from ax_agent_factory.benchmarks import query_plans as query_plans_bench
+from ax_agent_factory.infra import db, query_plans, storage
+
+
+def test_hot_paths_use_indexes(tmp_path):
+    db.set_db_path(str(tmp_path / "plans.db"))
+    ctx = query_plans.seed_job_run()
+
+    reports = query_plans.check_plans(ctx)
+
+    assert {r.name: r.scans for r in reports if r.scans} == {}
+    assert all(r.statements for r in reports)
+
+
+def test_dropped_index_is_reported(tmp_path):
+    db.set_db_path(str(tmp_path / "plans.db"))
+    ctx = query_plans.seed_job_run()
+    conn = db._get_conn()
+    conn.execute("DROP INDEX idx_job_runs_dedup_hash")
+    conn.commit()
+    conn.close()
+
+    paths = tuple(p for p in query_plans.HOT_PATHS if p.name == "create_or_get_job_run")
+    [report] = query_plans.check_plans(ctx, paths)
+    assert report.scans == ["SCAN job_runs"]
+
+
+def test_registry_covers_every_routed_helper():
+    pytest.importorskip("sqlalchemy")
+    routed = {
+        name
+        for name in vars(storage.SQLAlchemyStore)
+        if not name.startswith("_") and callable(getattr(storage.SQLAlchemyStore, name))
+    } - {"transaction", "run_detached", "dispose"}
+
+    registered = {p.name for p in query_plans.HOT_PATHS}
+    assert routed - registered == set(query_plans.MAINTENANCE_PATHS)
+
+
+def test_benchmark_smoke(tmp_path):
+    rows = query_plans_bench.run_benchmark(runs=50, tasks_per_run=2, repeat=1, workdir=str(tmp_path))
+    assert {r["path"] for r in rows} == {p.name for p in query_plans.HOT_PATHS}
+    assert all(r["scans"] == 0 for r in rows)
+    assert "indexed ms" in query_plans_bench.format_results(rows)
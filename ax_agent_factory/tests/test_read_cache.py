@@ -0,0 +1,96 @@
+import sqlite3
+
+import pytest
+
+from ax_agent_factory.core.schemas.common import IVCAtomicTask
+from ax_agent_factory.infra import db
+from ax_agent_factory.infra.cache import CACHE_REQUESTS, ReadThroughCache
+
+
+def _atoms(*ids: str) -> list[IVCAtomicTask]:
+    return [
+        IVCAtomicTask(task_id=t, task_original_sentence=f"s {t}", task_korean=f"과업 {t}", task_english=None, notes=None)
+        for t in ids
+    ]
+
+
+@pytest.fixture
+def job_run_id(tmp_path):
+    db.set_db_path(str(tmp_path / "cache.db"))
+    return db.create_or_get_job_run("A사", "컨설턴트").id
+
+
+def _count_selects(fn):
+    statements: list[str] = []
+    conn = db._get_conn()
+    conn.raw.set_trace_callback(statements.append)
+    try:
+        result = fn()
+    finally:
+        conn.raw.set_trace_callback(None)
+        conn.close()
+    return result, sum(1 for s in statements if s.lstrip().upper().startswith("SELECT"))
+
+
+def test_reads_hit_cache_until_write_invalidates(job_run_id):
+    db.save_task_atoms(job_run_id, _atoms("T1"))
+    hits_before = CACHE_REQUESTS.get(cache="db", table="job_tasks", result="hit")
+
+    first, selects = _count_selects(lambda: db.get_job_tasks(job_run_id))
+    assert [r["task_id"] for r in first] == ["T1"] and selects == 1
+    second, selects = _count_selects(lambda: db.get_job_tasks(job_run_id))
+    assert second is first and selects == 0
+    assert CACHE_REQUESTS.get(cache="db", table="job_tasks", result="hit") == hits_before + 1
+
+    db.save_task_atoms(job_run_id, _atoms("T1", "T2"))
+    assert [r["task_id"] for r in db.get_job_tasks(job_run_id)] == ["T1", "T2"]
+    assert db.read_cache.stats().hit_rate > 0
+
+
+def test_uow_writes_invalidate_on_commit_and_rollback_keeps_cache(job_run_id):
+    db.save_task_atoms(job_run_id, _atoms("T1"))
+    db.get_job_tasks(job_run_id)
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.save_task_atoms(job_run_id, _atoms("T1", "T9"))
+            # reads inside an open transaction bypass the cache and see the pending row
+            assert len(db.get_job_tasks(job_run_id)) == 2
+            raise RuntimeError("abort")
+    assert [r["task_id"] for r in db.get_job_tasks(job_run_id)] == ["T1"]
+
+    with db.transaction():
+        db.save_task_atoms(job_run_id, _atoms("T1", "T2"))
+    assert [r["task_id"] for r in db.get_job_tasks(job_run_id)] == ["T1", "T2"]
+
+
+def test_commit_from_another_connection_clears_cache(job_run_id):
+    db.save_task_atoms(job_run_id, _atoms("T1"))
+    db.get_job_tasks(job_run_id)
+
+    external = sqlite3.connect(db.DB_PATH)  # e.g. a worker process
+    external.execute("UPDATE job_tasks SET task_korean = '변경' WHERE job_run_id = ?", (job_run_id,))
+    external.commit()
+    external.close()
+
+    assert db.get_job_tasks(job_run_id)[0]["task_korean"] == "변경"
+
+
+def test_lru_bounds_and_racing_invalidation():
+    cache = ReadThroughCache("test", max_entries=2)
+    for jid in (1, 2, 3):
+        cache.get_or_load("t", jid, "k", lambda jid=jid: {"v": jid})
+    assert cache.stats().entries == 2
+    cache.get_or_load("t", 1, "k", lambda: {"v": "reloaded"})
+    assert cache.stats().misses == 4  # job 1 was the least recently used entry
+
+    def load_and_invalidate():
+        cache.invalidate("t", 5)  # a write committed while this read was running
+        return {"v": "stale"}
+
+    cache.get_or_load("t", 5, "k", load_and_invalidate)
+    assert cache.get_or_load("t", 5, "k", lambda: {"v": "fresh"}) == {"v": "fresh"}
+
+    small = ReadThroughCache("test", max_bytes=2048)
+    small.get_or_load("t", 1, "k", lambda: "x" * 4096)
+    assert small.stats().entries == 0
@@ -0,0 +1,94 @@
+import pytest
+
+from ax_agent_factory.core.schemas.ax import AgentPrompt, AgentPromptSet
+from ax_agent_factory.core.schemas.common import IVCAtomicTask
+from ax_agent_factory.infra import ax_prompt_repo, db, search
+
+
+def _atom(task_id: str, korean: str, sentence: str) -> IVCAtomicTask:
+    return IVCAtomicTask(task_id=task_id, task_original_sentence=sentence, task_korean=korean, task_english=None, notes=None)
+
+
+@pytest.fixture
+def job_run_id(tmp_path):
+    db.set_db_path(str(tmp_path / "search.db"))
+    job_run = db.create_or_get_job_run("A사", "CRM 운영 담당자")
+    db.save_task_atoms(
+        job_run.id,
+        [
+            _atom("T1", "CRM 데이터 정리", "고객 CRM 데이터 정리 및 중복 제거"),
+            _atom("T2", "주간 보고서 작성", "영업 파이프라인 현황을 정리해 CRM 데이터 기반 보고서 작성"),
+        ],
+    )
+    return job_run.id
+
+
+def test_search_ranks_title_matches_and_handles_short_korean_terms(job_run_id):
+    hits = search.search("CRM 데이터 정리", doc_types=["task"])
+    assert [h.title for h in hits] == ["CRM 데이터 정리", "주간 보고서 작성"]
+    assert hits[0].score > hits[1].score
+    assert hits[0].company_name == "A사" and hits[0].job_run_id == job_run_id
+    assert "[데이터]" in hits[0].snippet
+
+    # 2-character terms are below the trigram size and go through the LIKE filter
+    assert [h.title for h in search.search("중복 제거")] == ["CRM 데이터 정리"]
+    assert {h.doc_type for h in search.search("운영 담당자")} == {"job_run"}
+    with pytest.raises(ValueError):
+        search.search("CRM", doc_types=["unknown"])
+
+
+def test_triggers_keep_index_current(job_run_id):
+    db.save_task_atoms(job_run_id, [_atom("T1", "계약서 검토", "공급 계약서 조항 검토")])
+    assert [h.title for h in search.search("계약서")] == ["계약서 검토"]
+    assert [h.title for h in search.search("중복 제거")] == []
+
+    # classification-only updates do not touch the indexed columns
+    conn = db._get_conn()
+    conn.execute("UPDATE job_tasks SET ivc_phase = 'P2_DECIDE' WHERE job_run_id = ?", (job_run_id,))
+    conn.execute("DELETE FROM job_tasks WHERE task_id = 'T2'")
+    conn.commit()
+    conn.close()
+    assert search.search("보고서") == []
+
+    search.rebuild_index()
+    assert [h.title for h in search.search("계약서")] == ["계약서 검토"]
+
+
+def test_only_current_prompt_versions_are_searchable(job_run_id):
+    for n in range(3):
+        prompt = AgentPrompt(agent_id="A1", env="n8n_gpt_node", prompt_version=f"v{n}", system_prompt=f"고객 이탈 분석 v{n}", mode="poc")
+        ax_prompt_repo.apply_agent_prompts(job_run_id, AgentPromptSet(agent_prompts=[prompt]))
+    assert len(ax_prompt_repo.get_agent_prompts(job_run_id)) == 1
+    hits = search.search("고객 이탈", doc_types=["prompt"])
+    assert len(hits) == 1 and "v2" in hits[0].snippet
+
+    # an index built before migration 11 still holds the retired versions; the upgrade drops them
+    conn = db._get_conn()
+    conn.execute(
+        "INSERT INTO search_index (rowid, doc_type, job_run_id, ref_id, title, body) "
+        "SELECT id * 8 + 4, 'prompt', job_run_id, id, agent_id, system_prompt FROM ax_prompts WHERE is_current = 0"
+    )
+    conn.execute("PRAGMA user_version = 10")
+    conn.commit()
+    conn.close()
+    assert len(search.search("고객 이탈", doc_types=["prompt"])) == 3
+    assert db.migrate() == db.SCHEMA_VERSION
+    assert len(search.search("고객 이탈", doc_types=["prompt"])) == 1
+
+
+def test_rebuild_index_creates_an_index_skipped_by_migration(job_run_id):
+    # what migration 5 leaves behind on an SQLite without FTS5: no table, no triggers, user_version current
+    conn = db._get_conn()
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search_%'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP TABLE search_index")
+    conn.commit()
+    conn.close()
+    assert db.migrate() == db.SCHEMA_VERSION
+    with pytest.raises(RuntimeError):
+        search.search("CRM")
+
+    search.rebuild_index()
+    assert [h.title for h in search.search("중복 제거")] == ["CRM 데이터 정리"]
+    db.save_task_atoms(job_run_id, [_atom("T3", "계약서 검토", "공급 계약서 조항 검토")])
+    assert [h.title for h in search.search("계약서")] == ["계약서 검토"]
@@ -0,0 +1,78 @@
+import gzip
+import json
+
+import pytest
+
+from ax_agent_factory.core.schemas.common import IVCAtomicTask
+from ax_agent_factory.core.schemas.workflow import WorkflowEdge, WorkflowNode, WorkflowPlan
+from ax_agent_factory.infra import db, search, snapshot
+from ax_agent_factory.models.job_run import JobResearchResult
+
+
+def _seed(tasks: int = 3) -> int:
+    job_run = db.create_or_get_job_run("A사", "CRM 운영 담당자", industry_context="유통")
+    db.save_job_research_result(
+        JobResearchResult(job_run_id=job_run.id, raw_job_desc="CRM 데이터 정리", research_sources=[{"url": "https://x", "제목": "공고"}])
+    )
+    ids = [f"T{i:04d}" for i in range(tasks)]
+    db.save_task_atoms(
+        job_run.id,
+        [IVCAtomicTask(task_id=t, task_original_sentence=f"문장 {t}", task_korean=f"과업 {t}", task_english=None, notes=None) for t in ids],
+    )
+    plan = WorkflowPlan(
+        workflow_name="WF",
+        nodes=[WorkflowNode(node_id=t, label=t) for t in ids],
+        edges=[WorkflowEdge(source=a, target=b) for a, b in zip(ids, ids[1:])],
+    )
+    db.apply_workflow_plan(job_run.id, plan)
+    db.save_workflow_plan(job_run.id, plan)
+    db.save_llm_call_log(
+        {
+            "created_at": "2026-01-01T10:00:00", "job_run_id": job_run.id, "stage_name": "stage1", "model_name": "m",
+            "input_payload_json": "{}", "status": "success", "latency_ms": 300,
+        }
+    )
+    return job_run.id
+
+
+def _raw(table: str, job_run_id: int) -> list[tuple]:
+    conn = db._get_conn()
+    cur = conn.execute(f"SELECT * FROM {table} WHERE job_run_id = ? ORDER BY id", (job_run_id,))
+    names = [d[0] for d in cur.description]
+    rows = [tuple(v for n, v in zip(names, row) if n not in ("id", "job_run_id")) for row in cur]
+    conn.close()
+    return rows
+
+
+def test_export_import_roundtrip_into_another_db(tmp_path):
+    db.set_db_path(str(tmp_path / "source.db"))
+    source_id = _seed()
+    archive = str(tmp_path / "run.jsonl.gz")
+    exported = snapshot.export_job_run(source_id, archive, include_logs=True)
+    assert exported.rows["job_tasks"] == 3 and exported.rows["job_task_edges"] == 2
+    before = {t: _raw(t, source_id) for t, _ in snapshot.SNAPSHOT_TABLES[1:] + snapshot.LOG_TABLES}
+
+    # JSON columns are stored as the original string, not re-encoded
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        assert '"[{\\"url\\": \\"https://x\\", \\"제목\\": \\"공고\\"}]"' in f.read()
+
+    db.set_db_path(str(tmp_path / "target.db"))
+    db.create_or_get_job_run("B사", "다른 직무")  # occupy id 1 so the import gets remapped
+    imported = snapshot.import_job_run(archive)
+    assert imported.job_run_id != source_id and imported.rows == exported.rows
+    assert {t: _raw(t, imported.job_run_id) for t in before} == before
+    assert db.get_job_run(imported.job_run_id).industry_context == "유통"
+    assert db.get_workflow_plan(imported.job_run_id).workflow_name == "WF"
+    assert db.get_llm_call_rollups()[0]["call_count"] == 1
+    assert [h.job_run_id for h in search.search("CRM 데이터", doc_types=["jd"])] == [imported.job_run_id]
+
+
+def test_import_rejects_foreign_or_newer_archives(tmp_path):
+    db.set_db_path(str(tmp_path / "snap.db"))
+    path = tmp_path / "bad.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": "ax-snapshot", "version": snapshot.SNAPSHOT_VERSION + 1}) + "\n")
+    with pytest.raises(ValueError, match="newer"):
+        snapshot.import_job_run(str(path))
+    with pytest.raises(ValueError):
+        snapshot.export_job_run(999, str(tmp_path / "missing.jsonl.gz"))
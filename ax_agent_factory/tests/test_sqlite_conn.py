@@ -0,0 +1,184 @@
+import sqlite3
+import threading
+
+import pytest
+
+from ax_agent_factory.benchmarks import db_connections
+from ax_agent_factory.core.ivc.task_extractor import IVCTaskExtractor
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.core.schemas.workflow import WorkflowPlan
+from ax_agent_factory.infra import ax_agent_repo, db
+from ax_agent_factory.infra.sqlite_conn import ConnectionManager, SQLiteTuning
+
+
+def test_one_tuned_connection_per_thread(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "pool.db"), SQLiteTuning(synchronous="OFF", busy_timeout_ms=1234))
+    first = manager.get()
+    assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert first.execute("PRAGMA synchronous").fetchone()[0] == 0
+    assert first.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    first.close()
+    second = manager.get()
+    assert second.raw is first.raw
+    second.close()
+
+    other: list = []
+    thread = threading.Thread(target=lambda: other.append(manager.get().raw))
+    thread.start()
+    thread.join()
+    assert other[0] is not first.raw
+    assert manager.connects == 2
+    manager.close_all()
+
+
+def test_release_rolls_back_uncommitted_work(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "pool.db"))
+    conn = manager.get()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    outer = manager.get()
+    outer.execute("INSERT INTO t VALUES (1)")
+    nested = manager.get()
+    nested.execute("SELECT COUNT(*) FROM t").fetchone()
+    nested.close()  # nested reader must not discard the outer writer's transaction
+    assert outer.in_transaction
+    outer.close()
+    conn.close()
+    check = manager.get()
+    assert check.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    check.close()
+    manager.close_all()
+
+
+def test_db_helpers_reuse_connection(tmp_path):
+    db.set_db_path(str(tmp_path / "reuse.db"))
+    manager = db.get_connection_manager()
+    job_run = db.create_or_get_job_run("A", "B")
+    for _ in range(5):
+        assert db.get_job_run(job_run.id).id == job_run.id
+    assert manager.connects == 1
+
+
+def test_benchmark_smoke(tmp_path):
+    rows = db_connections.run_benchmark(writes=5, reads=5, workdir=str(tmp_path))
+    assert [r["mode"] for r in rows] == ["legacy", "pooled"]
+    assert rows[1]["connects"] == 1
+    assert "speedup" in db_connections.format_results(rows)
+
+
+def test_transaction_commits_once_and_rolls_back_on_error(tmp_path):
+    db.set_db_path(str(tmp_path / "uow.db"))
+    manager = db.get_connection_manager()
+    job_run = db.create_or_get_job_run("A", "B")
+
+    before = manager.commits
+    with db.transaction():
+        db.set_job_run_trace_id(job_run.id, "t1")
+        with db.transaction():  # nested helpers join the outer unit
+            db.save_workflow_plan(job_run.id, WorkflowPlan(workflow_name="wf"))
+    assert manager.commits == before + 1
+    assert db.get_job_run(job_run.id).trace_id == "t1"
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.set_job_run_trace_id(job_run.id, "t2")
+            raise RuntimeError("crash between writes")
+    assert db.get_job_run(job_run.id).trace_id == "t1"
+
+
+def test_caught_nested_failure_still_fails_the_unit(tmp_path):
+    db.set_db_path(str(tmp_path / "nested.db"))
+    job_run = db.create_or_get_job_run("A", "B")
+    with pytest.raises(db.UnitOfWorkRolledBack):
+        with db.transaction(immediate=False):
+            db.save_stage_run(job_run.id, "S1_1_TASK_EXTRACT", "done", started_at="2026-01-01T10:00:00")
+            try:
+                with db.transaction():
+                    raise sqlite3.OperationalError("database is locked")
+            except sqlite3.OperationalError:
+                pass  # the caller moves on, but its writes are already lost
+    assert db.get_stage_runs(job_run.id) == {}
+
+
+def test_lazy_transaction_takes_write_lock_at_first_write(tmp_path):
+    db.set_db_path(str(tmp_path / "lazy.db"))
+    job_run = db.create_or_get_job_run("A", "B")
+    with db.transaction(immediate=False) as conn:
+        db.get_job_run(job_run.id)
+        assert not conn.in_transaction
+        db.set_job_run_trace_id(job_run.id, "t")
+        assert conn.in_transaction
+
+
+def test_pipeline_run_commits_once_per_stage(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "pipeline.db"))
+    manager = db.get_connection_manager()
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+    before = manager.commits
+    pipeline.run_pipeline_until_stage(job_run, "2.2")
+    # trace_id + one commit for each of the 7 stages (LLM logs commit on their own connection)
+    assert manager.commits - before == 8
+
+
+def test_failed_stage_keeps_its_llm_call_logs(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "failed.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+    run = IVCTaskExtractor.run
+
+    def extract_then_fail(self, *args, **kwargs):
+        run(self, *args, **kwargs)
+        raise RuntimeError("stage failed after its LLM call")
+
+    monkeypatch.setattr(IVCTaskExtractor, "run", extract_then_fail)
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline_until_stage(job_run, "1.1")
+
+    stages = {log.stage_name for log in db.get_llm_calls_by_job_run(job_run.id)}
+    assert "stage1_task_extractor" in stages
+    assert db.get_llm_call_rollups(stage_name="stage1_task_extractor")
+    assert db.get_stage_runs(job_run.id)["S1_1_TASK_EXTRACT"]["status"] == "failed"
+
+
+def test_detached_write_waits_for_a_unit_that_holds_the_lock(tmp_path):
+    db.set_db_path(str(tmp_path / "detached.db"))
+    job_run = db.create_or_get_job_run("A", "B")
+    with pytest.raises(RuntimeError):
+        with db.transaction(immediate=False):
+            db.run_detached(db.set_job_run_trace_id, job_run.id, "before-write")  # second connection, now
+            assert db.get_job_run(job_run.id).trace_id == "before-write"
+            db.save_workflow_plan(job_run.id, WorkflowPlan(workflow_name="wf"))
+            db.run_detached(db.set_job_run_trace_id, job_run.id, "after-write")  # deferred past the unit
+            assert db.get_job_run(job_run.id).trace_id == "before-write"
+            raise RuntimeError("stage failed")
+    assert db.get_job_run(job_run.id).trace_id == "after-write"
+    assert db.get_workflow_plan(job_run.id) is None
+
+
+@pytest.mark.parametrize(
+    "target, stage_id, owner, helper",
+    [
+        ("1.1", "S1_1_TASK_EXTRACT", db, "save_task_atoms"),
+        ("1.2", "S1_2_PHASE_CLASSIFY", db, "apply_ivc_classification"),
+        ("1.3", "S1_3_STATIC_CLASSIFY", db, "apply_static_classification"),
+        ("2.1", "S2_1_WORKFLOW_STRUCT", db, "save_workflow_plan"),
+        ("2.2", "S2_2_WORKFLOW_MERMAID", db, "save_workflow_mermaid_result"),
+        ("5", "S5_AGENT_ARCHITECT", ax_agent_repo, "apply_agent_specs"),
+    ],
+)
+def test_stage_persistence_error_fails_the_stage(tmp_path, monkeypatch, target, stage_id, owner, helper):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "persist.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+
+    def broken(*args, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(owner, helper, broken)
+    with pytest.raises(sqlite3.OperationalError):
+        pipeline.run_pipeline_until_stage(job_run, target)
+    assert db.get_stage_runs(job_run.id)[stage_id]["status"] == "failed"
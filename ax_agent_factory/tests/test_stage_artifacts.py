@@ -0,0 +1,126 @@
+from ax_agent_factory.core.ivc import static_classifier
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.infra import artifacts, db
+from ax_agent_factory.infra.llm_client import InvalidLLMJsonError
+from ax_agent_factory.models.job_run import JobResearchResult
+
+
+def _llm_calls(job_run_id: int, stage_name: str = "%") -> int:
+    conn = db._get_conn()
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM llm_call_logs WHERE job_run_id = ? AND stage_name LIKE ?", (job_run_id, stage_name)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_unchanged_inputs_load_stored_artifacts(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "artifacts.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+
+    first = pipeline.run_pipeline_until_stage(job_run, "2.2")
+    calls = _llm_calls(job_run.id)
+    assert calls > 0
+
+    second = pipeline.run_pipeline_until_stage(job_run, "2.2")
+    assert second == first
+    assert _llm_calls(job_run.id) == calls  # nothing re-executed
+
+    # Forcing the first stage re-executes it; its output is unchanged, so downstream still hits.
+    pipeline.run_pipeline_until_stage(job_run, "2.2", force_rerun={"0.1"})
+    assert _llm_calls(job_run.id) == calls + 1
+
+
+def test_input_hash_tracks_upstream_prompt_and_config():
+    base = artifacts.input_hash("S1_1_TASK_EXTRACT", upstream={"S0_2_SUMMARIZE": "a"}, prompt_name="ivc_task_extractor")
+    assert base == artifacts.input_hash(
+        "S1_1_TASK_EXTRACT", upstream={"S0_2_SUMMARIZE": "a"}, prompt_name="ivc_task_extractor"
+    )
+    assert base != artifacts.input_hash(
+        "S1_1_TASK_EXTRACT", upstream={"S0_2_SUMMARIZE": "b"}, prompt_name="ivc_task_extractor"
+    )
+    assert base != artifacts.input_hash(
+        "S1_1_TASK_EXTRACT", upstream={"S0_2_SUMMARIZE": "a"}, prompt_name="ivc_phase_classifier"
+    )
+    assert base != artifacts.input_hash(
+        "S1_1_TASK_EXTRACT",
+        upstream={"S0_2_SUMMARIZE": "a"},
+        prompt_name="ivc_task_extractor",
+        config={"manual_jd_text": "JD"},
+    )
+
+
+def test_only_newest_artifact_matches(tmp_path):
+    db.set_db_path(str(tmp_path / "artifacts.db"))
+    job_run = PipelineManager().create_or_get_job_run("Acme", "Analyst")
+    old = JobResearchResult(job_run_id=job_run.id, raw_job_desc="old", research_sources=[])
+    new = JobResearchResult(job_run_id=job_run.id, raw_job_desc="new", research_sources=[{"url": "u"}])
+    artifacts.save(job_run.id, "S0_2_SUMMARIZE", "key-a", old)
+    artifacts.save(job_run.id, "S0_2_SUMMARIZE", "key-b", new)
+
+    assert artifacts.load(job_run.id, "S0_2_SUMMARIZE", "key-a") is None
+    hit = artifacts.load(job_run.id, "S0_2_SUMMARIZE", "key-b")
+    assert hit is not None and hit.hit
+    assert hit.result == new
+
+
+def test_ax_stages_run_only_when_inputs_change(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "ax.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+
+    first = pipeline.run_pipeline_until_stage(job_run, "8")
+    assert first["stage8_prompts"] is not None
+    assert isinstance(first["stage5_agent_specs"], dict) and isinstance(first["stage6_deep_research"], list)
+    runs = db.get_stage_runs(job_run.id)
+    for stage_id in ("S5_AGENT_ARCHITECT", "S6_DEEP_SKILL_RESEARCH"):
+        assert runs[stage_id]["status"] == "done" and runs[stage_id]["artifact_id"]
+    calls = _llm_calls(job_run.id)
+
+    second = pipeline.run_pipeline_until_stage(job_run, "8")
+    assert _llm_calls(job_run.id) == calls
+    assert second["stage6_deep_research"] == first["stage6_deep_research"]
+    assert second["stage5_agent_specs"] == first["stage5_agent_specs"]
+
+    # Re-running Stage 7 with an unchanged output leaves Stage 8 on its artifact.
+    pipeline.run_pipeline_until_stage(job_run, "8", force_rerun={"7"})
+    assert _llm_calls(job_run.id) == calls + 1
+
+
+def test_ax_stages_rerun_when_task_cards_change(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "cards.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+    pipeline.run_pipeline_until_stage(job_run, "4")
+    before = _llm_calls(job_run.id, "stage4_ax_workflow")
+
+    # 1.3 now writes other static meta; 2.1/2.2 (stubs) still produce the same output
+    stub = static_classifier.StaticTaskClassifier._stub_result
+
+    def relabelled(self, phase_result):
+        result = stub(self, phase_result)
+        for meta in result.task_static_meta:
+            meta.domain_lv1 = "FINANCE"
+        return result
+
+    monkeypatch.setattr(static_classifier, "call_static_task_classifier", _raise_invalid_json)
+    monkeypatch.setattr(static_classifier.StaticTaskClassifier, "_stub_result", relabelled)
+    pipeline.run_pipeline_until_stage(job_run, "4", force_rerun={"1.3"})
+    assert "FINANCE" in {t["domain_lv1"] for t in db.get_job_tasks(job_run.id)}
+    assert _llm_calls(job_run.id, "stage4_ax_workflow") == before + 1
+
+
+def _raise_invalid_json(*args, **kwargs):
+    raise InvalidLLMJsonError("not JSON", raw_text="not JSON")
+
+
+def test_list_and_dict_results_round_trip():
+    result = [JobResearchResult(job_run_id=1, raw_job_desc="a", research_sources=[])]
+    assert artifacts.decode(*artifacts.encode(result)) == result
+    assert artifacts.decode(*artifacts.encode([])) == []
+    assert artifacts.decode(*artifacts.encode({"agent_specs": [], "n": 1})) == {"agent_specs": [], "n": 1}
@@ -0,0 +1,75 @@
+import pytest
+
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.core.schemas.common import PhaseClassificationResult, TaskExtractionResult
+from ax_agent_factory.infra import db
+
+
+def _stage_calls(job_run_id: int) -> dict[str, int]:
+    conn = db._get_conn()
+    try:
+        rows = conn.execute(
+            "SELECT stage_name, COUNT(*) FROM llm_call_logs WHERE job_run_id = ? GROUP BY stage_name", (job_run_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {r[0]: r[1] for r in rows}
+
+
+def _drop_artifacts() -> None:
+    conn = db._get_conn()
+    conn.execute("UPDATE stage_runs SET artifact_id = NULL")
+    conn.execute("DELETE FROM stage_artifacts")
+    conn.commit()
+    conn.close()
+
+
+def test_crashed_run_resumes_from_first_incomplete_stage(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "resume.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+    done: dict = {}
+
+    def crash(**kwargs):
+        raise RuntimeError("process died")
+
+    pipeline.run_stage_1_3_static = crash
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline_until_stage(job_run, "2.2", on_stage_done=done.__setitem__)
+    del pipeline.run_stage_1_3_static
+
+    runs = db.get_stage_runs(job_run.id)
+    assert runs["S1_2_PHASE_CLASSIFY"]["status"] == "done" and runs["S1_2_PHASE_CLASSIFY"]["artifact_id"]
+    assert runs["S1_3_STATIC_CLASSIFY"]["status"] == "failed" and "process died" in runs["S1_3_STATIC_CLASSIFY"]["error"]
+    assert "S2_1_WORKFLOW_STRUCT" not in runs
+    assert pipeline.resume_point(job_run, "2.2") == "S1_3_STATIC_CLASSIFY"
+
+    # Without readable artifacts the finished stages are rebuilt from job_tasks & co.
+    _drop_artifacts()
+    calls = _stage_calls(job_run.id)
+    results = pipeline.run_pipeline_until_stage(job_run, "2.2", resume=True)
+
+    new_calls = {k for k, v in _stage_calls(job_run.id).items() if v != calls.get(k, 0)}
+    assert new_calls == {"stage1_static_classifier", "stage2_workflow_struct", "stage2_workflow_mermaid"}
+    assert isinstance(results["stage1_task_extract"], TaskExtractionResult)
+    assert isinstance(results["stage1_phase"], PhaseClassificationResult)
+    assert results["stage1_phase"].ivc_tasks == done["S1_2_PHASE_CLASSIFY"].ivc_tasks
+    assert results["stage2_mermaid"] is not None
+    assert pipeline.resume_point(job_run, "2.2") is None
+
+
+def test_without_resume_changed_inputs_still_recompute(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "rerun.db"))
+    pipeline = PipelineManager()
+    job_run = pipeline.create_or_get_job_run("Acme", "Analyst")
+    pipeline.run_pipeline_until_stage(job_run, "1.1")
+    _drop_artifacts()
+
+    calls = _stage_calls(job_run.id)
+    pipeline.run_pipeline_until_stage(job_run, "1.1", resume=True)
+    assert _stage_calls(job_run.id) == calls
+
+    pipeline.run_pipeline_until_stage(job_run, "1.1")
+    assert sum(_stage_calls(job_run.id).values()) == sum(calls.values()) * 2
@@ -0,0 +1,202 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from ax_agent_factory.core import stage_runner_ax
+from ax_agent_factory.core.pipeline_manager import PipelineManager
+from ax_agent_factory.core.stage_scheduler import StageScheduler, StageTask
+from ax_agent_factory.infra import ax_skill_repo, db, llm_client, metrics, tracing
+from ax_agent_factory.models.stages import StageMeta
+
+
+def _stage(stage_id: str, order: int, inputs: tuple = ()) -> StageMeta:
+    return StageMeta(
+        id=stage_id,
+        order=order,
+        label=stage_id,
+        description="",
+        implemented=True,
+        run_fn_name="",
+        ui_group=order,
+        ui_step=0,
+        ui_label=stage_id.lower(),
+        tab_title=stage_id,
+        inputs=inputs,
+        output=stage_id.lower(),
+    )
+
+
+# a -> (b, c) -> d, plus e which nothing needs
+DIAMOND = [_stage("A", 0), _stage("B", 1, ("a",)), _stage("C", 2, ("a",)), _stage("D", 3, ("b", "c")), _stage("E", 4)]
+
+
+def test_plan_levels_and_partial_targets():
+    scheduler = StageScheduler(DIAMOND, {})
+
+    plan = scheduler.plan(["D"])
+    assert plan.levels == [["A"], ["B", "C"], ["D"]]
+    assert plan.depends_on["D"] == ("B", "C")
+    assert "L1: B <- A | C <- A" in plan.format()
+
+    assert scheduler.plan(["c"]).stage_ids == ["A", "C"]  # UI label, ancestors only
+    assert scheduler.plan(["B", "E"]).levels == [["A", "E"], ["B"]]
+    with pytest.raises(ValueError):
+        scheduler.plan(["Z"])
+
+
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def side(name):
+        return StageTask(run=lambda inputs: barrier.wait() is not None and f"{name}({inputs['a']})")
+
+    tasks = {
+        "A": StageTask(run=lambda inputs: "a"),
+        "B": side("b"),
+        "C": side("c"),
+        "D": StageTask(run=lambda inputs: inputs["b"] + inputs["c"]),
+    }
+    results = StageScheduler(DIAMOND, tasks, max_workers=2).run(["D"])
+    assert results["d"] == "b(a)c(a)"
+    assert "e" not in results
+
+
+def test_fan_out_keeps_item_order_and_failures_propagate():
+    def item(n, inputs):
+        time.sleep(0.01 * (4 - n))  # later items finish first
+        return n * 10
+
+    tasks = {
+        "A": StageTask(fan_out=lambda inputs: [1, 2, 3], run_item=item),
+        "B": StageTask(run=lambda inputs: inputs["a"]),
+    }
+    scheduler = StageScheduler(DIAMOND, tasks, max_workers=3)
+    assert scheduler.run(["B"])["b"] == [10, 20, 30]
+    assert scheduler.plan(["B"]).fan_out == ["A"]
+
+    tasks["A"] = StageTask(fan_out=lambda inputs: [1, 2], run_item=lambda n, inputs: 1 / (n - 2))
+    with pytest.raises(ZeroDivisionError):
+        scheduler.run(["B"])
+
+
+def test_pipeline_execution_plan():
+    plan = PipelineManager().execution_plan("1.3")
+    assert plan.stage_ids == ["S0_1_COLLECT", "S0_2_SUMMARIZE", "S1_1_TASK_EXTRACT", "S1_2_PHASE_CLASSIFY", "S1_3_STATIC_CLASSIFY"]
+    assert plan.depends_on["S1_2_PHASE_CLASSIFY"] == ("S0_2_SUMMARIZE", "S1_1_TASK_EXTRACT")
+
+
+def test_pipeline_runs_ax_stages_with_stage6_per_agent(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.set_db_path(str(tmp_path / "ax.db"))
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+    agents = [
+        stage_runner_ax.AgentSpecLite(
+            agent_id=f"A{n}", agent_name=f"에이전트{n}", role_and_goal="", agent_type="", execution_environment=""
+        )
+        for n in range(1, 5)
+    ]
+    monkeypatch.setattr(stage_runner_ax, "_load_agents_lite", lambda job_run_id: agents)
+    threads = set()
+    stub = llm_client.call_deep_skill_research
+
+    def research(payload, **kwargs):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.02)
+        return stub(payload, **kwargs)
+
+    monkeypatch.setattr(llm_client, "call_deep_skill_research", research)
+    durations = metrics.STAGE_DURATION.get_count(stage="stage4_ax_workflow", status="ok")
+
+    results = PipelineManager(max_workers=4).run_pipeline_until_stage(job_run, "8")
+
+    assert [r.agent_id for r in results["stage6_deep_research"]] == ["A1", "A2", "A3", "A4"]
+    assert len(threads) > 1
+    assert {r["agent_id"] for r in ax_skill_repo.get_deep_research_results(job_run.id)} == {"A1", "A2", "A3", "A4"}
+    assert results["stage8_prompts"] is not None
+    # recorded once, under the pipeline stage id
+    assert metrics.STAGE_DURATION.get_count(stage="S4_AX_WORKFLOW", status="ok") >= 1
+    assert metrics.STAGE_DURATION.get_count(stage="stage4_ax_workflow", status="ok") == durations
+
+
+def test_ax_stages_hold_no_write_lock_during_llm_calls(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    path = tmp_path / "lock.db"
+    db.set_db_path(str(path))
+    previous = tracing.set_tracer(tracing.Tracer(tracing.FileSpanExporter(str(tmp_path / "traces.jsonl"))))
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+    locked: dict[str, bool] = {}
+
+    def probing(name):
+        call = getattr(llm_client, name)
+
+        def wrapper(*args, **kwargs):
+            other = sqlite3.connect(str(path), timeout=0)
+            try:
+                other.execute("BEGIN IMMEDIATE")  # another writer (queue heartbeat, batch thread)
+                other.rollback()
+                locked[name] = False
+            except sqlite3.OperationalError:
+                locked[name] = True
+            finally:
+                other.close()
+            return call(*args, **kwargs)
+
+        return wrapper
+
+    names = ["call_ax_workflow_architect", "call_agent_architect", "call_skill_extractor", "call_prompt_builder"]
+    for name in names:
+        monkeypatch.setattr(llm_client, name, probing(name))
+    try:
+        PipelineManager().run_pipeline_until_stage(job_run, "8")
+    finally:
+        tracing.set_tracer(previous)
+
+    assert locked == dict.fromkeys(names, False)
+    assert db.get_job_run(job_run.id).trace_id is not None
+
+
+def test_stage6_runs_agents_concurrently_with_retry_and_progress(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setenv("AX_DEEP_RESEARCH_RETRY_S", "0")
+    db.set_db_path(str(tmp_path / "s6.db"))
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+    agents = [
+        stage_runner_ax.AgentSpecLite(
+            agent_id=f"A{n}", agent_name=f"에이전트{n}", role_and_goal="", agent_type="", execution_environment=""
+        )
+        for n in range(1, 5)
+    ]
+    stub = llm_client.call_deep_skill_research
+    attempts: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def research(payload, **kwargs):
+        agent_id = payload.agent.agent_id
+        with lock:
+            attempts[agent_id] = attempts.get(agent_id, 0) + 1
+            first = attempts[agent_id] == 1
+        time.sleep(0.01 * (5 - int(agent_id[1:])))  # later agents finish first
+        if agent_id == "A2" and first:
+            return {**stub(payload, **kwargs), "llm_error": "quota"}
+        if agent_id == "A3" and first:
+            raise ConnectionError("reset")
+        return stub(payload, **kwargs)
+
+    monkeypatch.setattr(llm_client, "call_deep_skill_research", research)
+    progress: list = []
+    results = stage_runner_ax.run_stage6_deep_skill_research(
+        job_run.id, agents, max_workers=4, on_progress=progress.append
+    )
+
+    assert [r.agent_id for r in results] == ["A1", "A2", "A3", "A4"]
+    assert all(r.llm_error is None for r in results)
+    assert attempts == {"A1": 1, "A2": 2, "A3": 2, "A4": 1}
+    assert [p.done for p in progress] == [1, 2, 3, 4] and {p.agent_id for p in progress} == set(attempts)
+    assert {p.agent_id: p.attempts for p in progress}["A2"] == 2
+    assert len(ax_skill_repo.get_deep_research_results(job_run.id)) == 4
+
+    monkeypatch.setattr(llm_client, "call_deep_skill_research", lambda payload, **kwargs: {**stub(payload), "llm_error": "down"})
+    kept = stage_runner_ax.run_stage6_deep_skill_research(job_run.id, agents[:1], retries=1)
+    assert kept[0].llm_error == "down"  # the stub fallback is kept once retries run out
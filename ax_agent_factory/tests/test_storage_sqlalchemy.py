@@ -0,0 +1,239 @@
+import threading
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from ax_agent_factory.core.schemas.ax import (
+    AgentPrompt,
+    AgentPromptSet,
+    AgentTableRow,
+    AXWorkflowResult,
+    DeepSkillResearchResult,
+    DeepSkillResearchSections,
+    SkillCard,
+    SkillCardSet,
+)
+from ax_agent_factory.core.schemas.common import IVCAtomicTask, IVCTask, TaskStaticMeta
+from ax_agent_factory.core.schemas.workflow import MermaidDiagram, WorkflowEdge, WorkflowNode, WorkflowPlan
+from ax_agent_factory.infra import ax_agent_repo, ax_prompt_repo, ax_skill_repo, ax_workflow_repo, db, job_queue, search, storage
+from ax_agent_factory.models.job_run import JobResearchResult
+from ax_agent_factory.models.llm_log import LLMCallLog
+
+_VOLATILE = {"id", "created_at", "updated_at"}
+
+
+@pytest.fixture(autouse=True)
+def _native_backend_after_test():
+    yield
+    storage.configure(None)
+
+
+def _strip(rows: list[dict]) -> list[dict]:
+    return [{k: v for k, v in row.items() if k not in _VOLATILE} for row in rows]
+
+
+def _exercise() -> dict:
+    """Run one job through the db/repo helpers and return the backend-independent state."""
+    job_run = db.create_or_get_job_run("A사", "CRM 운영 담당자")
+    assert db.create_or_get_job_run("A사", "CRM 운영 담당자").id == job_run.id
+    db.update_job_run_meta(job_run.id, industry_context="유통", status="running")
+    db.save_job_research_result(JobResearchResult(job_run_id=job_run.id, raw_job_desc="JD", research_sources=[{"u": 1}]))
+    with db.transaction():
+        db.save_task_atoms(
+            job_run.id,
+            [
+                IVCAtomicTask(task_id=t, task_original_sentence=f"s {t}", task_korean=f"과업 {t}", task_english=None, notes=None)
+                for t in ("T1", "T2")
+            ],
+        )
+        db.apply_ivc_classification(
+            job_run.id,
+            [
+                IVCTask(
+                    task_id="T1", task_korean="과업 T1", task_original_sentence="s T1", ivc_phase="P1_SENSE",
+                    ivc_exec_subphase=None, primitive_lv1="SENSE", classification_reason="r",
+                )
+            ],
+        )
+        db.apply_static_classification(
+            job_run.id,
+            [
+                TaskStaticMeta(
+                    task_id="T2", task_korean="과업 T2", static_type_lv1="DATA", static_type_lv2=None, domain_lv1=None,
+                    domain_lv2=None, rag_required=True, rag_reason=None, value_score=3, complexity_score=None,
+                    value_complexity_quadrant="MID", recommended_execution_env="n8n", autoability_reason=None,
+                    data_entities=["고객"], tags=["crm"],
+                )
+            ],
+        )
+    plan = WorkflowPlan(
+        workflow_name="WF",
+        nodes=[WorkflowNode(node_id="T1", label="과업 T1", is_entry=True), WorkflowNode(node_id="T2", label="과업 T2")],
+        edges=[WorkflowEdge(source="T1", target="T2"), WorkflowEdge(source="T1", target="T2")],
+    )
+    db.apply_workflow_plan(job_run.id, plan)
+    db.apply_workflow_plan(job_run.id, WorkflowPlan(workflow_name="WF", nodes=plan.nodes, edges=plan.edges[:1]))
+    db.save_workflow_plan(job_run.id, plan)
+    db.save_workflow_mermaid_result(job_run.id, None, MermaidDiagram(workflow_name="WF", mermaid_code="graph TD", warnings=["w"]))
+    for status, latency in (("success", 120), ("error", 900), ("success", 80)):
+        db.save_llm_call_log(
+            LLMCallLog(
+                created_at="2026-01-01T10:05:00", job_run_id=job_run.id, stage_name="stage1", agent_name=None,
+                model_name="m", prompt_version="v1", temperature=0.1, top_p=None, input_payload_json="{}",
+                output_text_raw="out", output_json_parsed=None, status=status, error_type=None, error_message=None,
+                latency_ms=latency, tokens_prompt=10, tokens_completion=5, tokens_total=15,
+            )
+        )
+    workflow_id = ax_workflow_repo.upsert_ax_workflow(
+        job_run.id,
+        AXWorkflowResult(
+            ax_workflow_name="AX", ax_workflow_description="d", mode="poc", mermaid_arch_code="graph LR",
+            agent_table=[
+                AgentTableRow(
+                    stage="S1", agent_id="A1", agent_name="정리 에이전트", agent_type="llm", execution_environment="n8n",
+                    rag_required=False, rag_pattern="none", role_and_goal="정리", inputs_summary="", outputs_summary="",
+                )
+            ],
+        ),
+    )
+    ax_workflow_repo.sync_ax_agents_from_agent_table(
+        job_run.id, workflow_id, [AgentTableRow(**ax_workflow_repo.get_latest_ax_workflow(job_run.id)["agent_table"][0])]
+    )
+    card = dict(
+        skill_id="S1", skill_name="중복 제거", target_agent_ids=["A1"], related_task_ids=["T1"], purpose="p", when_to_use="w",
+        core_heuristics=["h"], step_checklist=["c"], bad_signs=[], good_signs=[],
+    )
+    ax_skill_repo.apply_skill_cards(job_run.id, SkillCardSet(skill_cards=[SkillCard(**card)], agent_skill_map=[]))
+    ax_skill_repo.apply_skill_cards(
+        job_run.id, SkillCardSet(skill_cards=[SkillCard(**{**card, "purpose": "p2"})], agent_skill_map=[])
+    )
+    for n in range(3):
+        ax_prompt_repo.apply_agent_prompts(
+            job_run.id,
+            AgentPromptSet(agent_prompts=[AgentPrompt(agent_id="A1", env="n8n_gpt_node", prompt_version=f"v{n}", mode="poc")]),
+        )
+        ax_skill_repo.save_deep_research_result(
+            job_run.id,
+            DeepSkillResearchResult(
+                agent_id="A1", research_focus="skill", sections=DeepSkillResearchSections(
+                    core_skills=f"c{n}", thinking_process="t", frameworks_and_questions="f", common_pitfalls="p",
+                    good_vs_bad_examples="e",
+                ),
+            ),
+        )
+    db.save_stage_run(job_run.id, "S0_1_COLLECT", "failed", started_at="2026-01-01T10:00:00", input_hash="h1", error="e")
+    db.save_stage_run(job_run.id, "S0_1_COLLECT", "done", started_at="2026-01-01T10:01:00")
+    item_id = job_queue.enqueue_job(job_run.id, "2.2", ax_target="8", force_rerun=["1.1"])
+    assert job_queue.enqueue_job(job_run.id, "2.2", ax_target="8") == item_id
+    job_queue.claim_job("w1")
+    job_queue.heartbeat_job(item_id, "w1", progress={"stages": ["S0_1_COLLECT"]})
+    job_queue.complete_job(item_id, "w1")
+    deferred_id = job_queue.enqueue_job(job_run.id, "1.1")
+    job_queue.claim_job("w2")
+    assert job_queue.defer_job(deferred_id, "w2", 60, "circuit open")
+
+    job = db.get_job_run(job_run.id)
+    latest = db.get_latest_llm_call(job_run.id, "stage1", include_text=True)
+    return {
+        "job_run": (job.company_name, job.industry_context, job.status),
+        "research": db.get_job_research_result(job_run.id),
+        "tasks": _strip(db.get_job_tasks(job_run.id)),
+        "edges": _strip(db.get_job_task_edges(job_run.id)),
+        "plan": db.get_workflow_plan(job_run.id),
+        "mermaid": db.get_workflow_mermaid_result(job_run.id),
+        "llm_calls": [(c.status, c.latency_ms) for c in db.get_llm_calls_by_job_run(job_run.id)],
+        "latest_llm_call": {k: v for k, v in latest.items() if k != "id"},
+        "rollups": db.get_llm_call_rollups(),
+        "llm_totals": db.get_llm_call_totals(job_run.id),
+        "llm_error_window": db.get_llm_error_window("stage1", "m", since="2026-01-01", limit=2),
+        "agents": _strip(ax_agent_repo.get_agents(job_run.id)),
+        "ax_workflow": {k: v for k, v in ax_workflow_repo.get_latest_ax_workflow(job_run.id).items() if k not in _VOLATILE},
+        "skills": _strip(ax_skill_repo.get_skill_cards(job_run.id)),
+        "prompts": _strip(ax_prompt_repo.get_agent_prompts(job_run.id)),
+        "prompt_history": [(r["version"], r["is_current"]) for r in ax_prompt_repo.get_agent_prompt_history(job_run.id, "A1")],
+        "deep_research": _strip(ax_skill_repo.get_deep_research_results(job_run.id)),
+        "pruned": db.prune_ax_history(keep=1),
+        "stage_runs": {
+            stage_id: (r["status"], r["input_hash"], r["error"], r["started_at"])
+            for stage_id, r in db.get_stage_runs(job_run.id).items()
+        },
+        "queue": [
+            (r["status"], r["attempts"], r["lease_owner"], r["force_rerun_json"], r["progress_json"])
+            for r in job_queue.get_queue_items(job_run.id)
+        ],
+        "queue_depth": job_queue.get_queue_depth(),
+        "deep_research_history": [r["version"] for r in ax_skill_repo.get_deep_research_history(job_run.id, "A1")],
+    }
+
+
+def test_sqlalchemy_backend_matches_native_sqlite(tmp_path):
+    db.set_db_path(str(tmp_path / "native.db"))
+    native = _exercise()
+
+    storage.configure(f"sqlite:///{tmp_path / 'sa.db'}")
+    routed = _exercise()
+
+    assert routed == native
+    assert routed["rollups"][0]["call_count"] == 3 and routed["rollups"][0]["error_count"] == 1
+    assert [e["label"] for e in routed["edges"]] == [None]
+    assert routed["prompt_history"] == [(3, 1), (2, 0), (1, 0)]
+    assert routed["pruned"] == {"ax_prompts": 2, "ax_deep_research_docs": 2}
+    assert db.rebuild_llm_call_rollups() == 3 and db.get_llm_call_rollups() == native["rollups"]
+    with pytest.raises(RuntimeError):
+        search.search("CRM")
+
+
+def test_sqlalchemy_transaction_rolls_back_and_writers_queue(tmp_path):
+    store = storage.configure(f"sqlite:///{tmp_path / 'sa.db'}")
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.update_job_run_meta(job_run.id, status="pending")
+            assert db.get_job_run(job_run.id).status == "pending"  # joins the open unit of work
+            raise RuntimeError("abort")
+    assert db.get_job_run(job_run.id).status is None
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.update_job_run_meta(job_run.id, status="pending")
+            db.run_detached(db.set_job_run_trace_id, job_run.id, "t1")  # after the unit: one SQLite writer
+            raise RuntimeError("abort")
+    assert (db.get_job_run(job_run.id).status, db.get_job_run(job_run.id).trace_id) == (None, "t1")
+
+    with pytest.raises(db.UnitOfWorkRolledBack):
+        with db.transaction():
+            db.update_job_run_meta(job_run.id, status="pending")
+            try:
+                with db.transaction():
+                    raise RuntimeError("nested write failed")
+            except RuntimeError:
+                pass
+    assert db.get_job_run(job_run.id).status is None
+
+    # BEGIN IMMEDIATE: concurrent writers wait on busy_timeout instead of failing on lock upgrade
+    errors: list[Exception] = []
+
+    def write(worker: int) -> None:
+        try:
+            for i in range(20):
+                with db.transaction():
+                    db.get_job_run(job_run.id)
+                    db.save_llm_call_log(
+                        {
+                            "created_at": "2026-01-01T10:00:00", "job_run_id": job_run.id, "stage_name": f"w{worker}",
+                            "model_name": "m", "input_payload_json": "{}", "status": "success", "latency_ms": i,
+                        }
+                    )
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert sum(r["call_count"] for r in db.get_llm_call_rollups()) == 80
+    assert store.engine.pool.size() == 5
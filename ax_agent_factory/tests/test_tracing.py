@@ -0,0 +1,53 @@
+import pytest
+
+from ax_agent_factory.infra import db, llm_client, tracing
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    previous = tracing.set_tracer(tracing.Tracer(tracing.FileSpanExporter(str(path))))
+    yield path
+    tracing.set_tracer(previous)
+
+
+def test_db_spans_only_inside_active_trace(tmp_path, trace_file):
+    db.set_db_path(str(tmp_path / "trace.db"))
+    job_run = db.create_or_get_job_run("A사", "컨설턴트")
+    assert not trace_file.exists()
+
+    with tracing.span("pipeline.run_until_stage", job_run_id=job_run.id) as root:
+        with tracing.span("stage.S0_1_COLLECT"):
+            db.get_job_run(job_run.id)
+            llm_client._safe_save_llm_log(
+                stage_name="stage0_collect",
+                job_run_id=job_run.id,
+                model_name="gemini-test",
+                prompt_version=None,
+                temperature=None,
+                top_p=None,
+                input_payload_json="{}",
+                output_text_raw=None,
+                output_json_parsed=None,
+                status="success",
+                error_type=None,
+                error_message=None,
+                latency_ms=120,
+            )
+
+    spans = tracing.load_trace(root.trace_id, str(trace_file))
+    by_name = {s["name"]: s for s in spans}
+    assert set(by_name) >= {"pipeline.run_until_stage", "stage.S0_1_COLLECT", "db.get_job_run", "llm.stage0_collect"}
+    stage = by_name["stage.S0_1_COLLECT"]
+    assert stage["parent_span_id"] == by_name["pipeline.run_until_stage"]["span_id"]
+    assert by_name["db.get_job_run"]["parent_span_id"] == stage["span_id"]
+    assert by_name["llm.stage0_collect"]["attributes"]["llm_status"] == "success"
+    assert by_name["llm.stage0_collect"]["duration_ms"] == pytest.approx(120, abs=1)
+
+
+def test_failed_span_marked_error(trace_file):
+    with pytest.raises(ValueError):
+        with tracing.span("pipeline.run_until_stage") as root:
+            raise ValueError("boom")
+    (only,) = tracing.load_trace(root.trace_id, str(trace_file))
+    assert only["status"] == "error"